@@ -0,0 +1,373 @@
+# attendance/importer.py
+"""
+Streaming attendance CSV import.
+
+``AttendanceViewSet.import_csv`` used to look up the student, teacher and
+section of every row with its own ``get()`` and insert rows one by one, so
+a term's import took thousands of round trips and stopped at the first bad
+row. ``AttendanceImporter`` reads the file in chunks of
+``settings.ATTENDANCE_IMPORT_CHUNK_SIZE`` rows instead. For each chunk it:
+
+1. resolves the references it has not seen yet with one query per model -
+   students by ID or registration number, teachers by ID or employee ID,
+   sections by ID - into maps kept for the rest of the file;
+2. validates every row, collecting row-level errors instead of aborting;
+3. upserts the valid rows with one ``bulk_create(update_conflicts=True)``
+   on the ``(date, student, section)`` unique key, in its own transaction.
+
+``bulk_create`` sends no signals, so the importer refreshes the affected
+students' dashboard snapshots, the attendance rollups and the admin
+dashboard counters itself.
+
+Files larger than ``settings.ATTENDANCE_IMPORT_SYNC_MAX_BYTES`` are stored
+on an ``AttendanceImportJob`` and imported outside the request, like
+report batches: in a background thread (``ATTENDANCE_IMPORT_MODE =
+"thread"``, default) or by ``attendance.tasks.import_attendance``
+(``"celery"``). Every chunk stores the job's progress and refreshes
+``job.heartbeat_at``; a PROCESSING job that hasn't beaten for
+``settings.ATTENDANCE_IMPORT_TIMEOUT`` seconds lost its worker and is
+marked FAILED by ``fail_stale_import_jobs`` (the
+``attendance.tasks.fail_stale_import_jobs`` periodic task, and whenever its
+status is polled).
+"""
+
+import csv
+import logging
+import threading
+from datetime import timedelta
+from io import TextIOWrapper
+from itertools import islice
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from classroom.models import Section
+from dashboard.stats import invalidate_dashboard_stats
+from students.dashboard import schedule_snapshot_refresh
+from students.models import Student
+from teacher.models import Teacher
+
+from .models import Attendance, AttendanceImportJob
+from .rollups import schedule_rollup_refresh
+
+logger = logging.getLogger(__name__)
+
+MODE_THREAD = "thread"
+MODE_CELERY = "celery"
+
+# Row errors kept in a summary; the total is always counted
+MAX_REPORTED_ERRORS = 500
+
+DEFAULT_TIMEOUT = 30 * 60
+
+DATE_COLUMNS = ("date", "attendance_date")
+REQUIRED_COLUMNS = ("student", "section", "status")
+UPDATE_FIELDS = ["status", "teacher"]
+
+STATUS_ALIASES = {}
+for code, label in Attendance.STATUS_CHOICES:
+    STATUS_ALIASES[code.lower()] = code
+    STATUS_ALIASES[label.lower()] = code
+
+
+def get_chunk_size():
+    return max(1, int(getattr(settings, "ATTENDANCE_IMPORT_CHUNK_SIZE", 1000)))
+
+
+def get_sync_max_bytes():
+    return getattr(settings, "ATTENDANCE_IMPORT_SYNC_MAX_BYTES", 512 * 1024)
+
+
+def get_import_mode():
+    return getattr(settings, "ATTENDANCE_IMPORT_MODE", MODE_THREAD)
+
+
+def get_import_timeout():
+    return int(getattr(settings, "ATTENDANCE_IMPORT_TIMEOUT", DEFAULT_TIMEOUT))
+
+
+class ImportSummary:
+    """Counts and row-level errors of one import"""
+
+    def __init__(self):
+        self.processed = 0
+        self.imported = 0
+        self.failed = 0
+        self.errors = []
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "processed_rows": self.processed,
+            "imported_rows": self.imported,
+            "failed_rows": self.failed,
+            "errors": self.errors,
+        }
+
+
+class AttendanceImporter:
+    """Imports an attendance CSV (text stream) chunk by chunk"""
+
+    def __init__(self, chunk_size=None, on_chunk=None):
+        self.chunk_size = chunk_size or get_chunk_size()
+        self.on_chunk = on_chunk
+        self.summary = ImportSummary()
+        # Reference (as written in the CSV) -> primary key, None if unknown
+        self.students = {}
+        self.teachers = {}
+        self.sections = {}
+
+    def run(self, stream):
+        reader = csv.DictReader(stream)
+        columns = set(reader.fieldnames or [])
+        missing = [c for c in REQUIRED_COLUMNS if c not in columns]
+        if not columns.intersection(DATE_COLUMNS):
+            missing.append("date")
+        if missing:
+            raise ValueError(f"Missing CSV columns: {', '.join(missing)}")
+
+        rows = enumerate(reader, start=2)  # line 1 is the header
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.import_chunk(chunk)
+            if self.on_chunk:
+                self.on_chunk(self.summary)
+        return self.summary
+
+    # ------------------------------------------------------------------
+    # References
+    # ------------------------------------------------------------------
+
+    def _resolve(self, cache, refs, queryset, alternate_field=None):
+        """Add the unseen references to ``cache`` with one query"""
+        refs = {ref for ref in refs if ref and ref not in cache}
+        if not refs:
+            return
+        condition = Q(pk__in=[ref for ref in refs if ref.isdigit()])
+        fields = ["pk"]
+        if alternate_field:
+            condition |= Q(**{f"{alternate_field}__in": refs})
+            fields.append(alternate_field)
+
+        found = list(queryset.filter(condition).order_by().values_list(*fields))
+        for pk, *alternate in found:
+            if alternate:
+                cache[alternate[0]] = pk
+        for pk, *_ in found:
+            cache[str(pk)] = pk  # an ID wins over an equal alternate key
+        for ref in refs:
+            cache.setdefault(ref, None)
+
+    def prefetch(self, chunk):
+        self._resolve(
+            self.students,
+            {_value(row, "student") for _, row in chunk},
+            Student.objects.all(),
+            "registration_number",
+        )
+        self._resolve(
+            self.teachers,
+            {_value(row, "teacher") for _, row in chunk},
+            Teacher.objects.all(),
+            "employee_id",
+        )
+        self._resolve(
+            self.sections,
+            {_value(row, "section") for _, row in chunk},
+            Section.objects.all(),
+        )
+
+    # ------------------------------------------------------------------
+    # Rows
+    # ------------------------------------------------------------------
+
+    def build(self, row):
+        """(Attendance, None) or (None, errors) for one CSV row"""
+        errors = {}
+        values = {}
+
+        for field, cache in (("student", self.students), ("section", self.sections)):
+            ref = _value(row, field)
+            values[f"{field}_id"] = cache.get(ref)
+            if not ref:
+                errors[field] = "This field is required."
+            elif values[f"{field}_id"] is None:
+                errors[field] = f"Unknown {field} '{ref}'."
+
+        teacher = _value(row, "teacher")
+        values["teacher_id"] = self.teachers.get(teacher) if teacher else None
+        if teacher and values["teacher_id"] is None:
+            errors["teacher"] = f"Unknown teacher '{teacher}'."
+
+        raw_date = next((_value(row, c) for c in DATE_COLUMNS if _value(row, c)), "")
+        try:
+            values["date"] = parse_date(raw_date)
+        except ValueError:
+            values["date"] = None
+        if values["date"] is None:
+            errors["date"] = f"Invalid date '{raw_date}', expected YYYY-MM-DD."
+
+        raw_status = _value(row, "status")
+        values["status"] = STATUS_ALIASES.get(raw_status.lower())
+        if values["status"] is None:
+            errors["status"] = f"Invalid status '{raw_status}'."
+
+        if errors:
+            return None, errors
+        return Attendance(**values), None
+
+    def import_chunk(self, chunk):
+        self.prefetch(chunk)
+
+        records = {}
+        for line, row in chunk:
+            self.summary.processed += 1
+            record, errors = self.build(row)
+            if errors:
+                self.summary.add_error(line, errors)
+                continue
+            # A later row for the same day replaces an earlier one
+            records[(record.date, record.student_id, record.section_id)] = record
+
+        if not records:
+            return
+        with transaction.atomic():
+            Attendance.objects.bulk_create(
+                list(records.values()),
+                update_conflicts=True,
+                unique_fields=["date", "student", "section"],
+                update_fields=UPDATE_FIELDS,
+            )
+            # No signals were sent for these rows
+            schedule_snapshot_refresh(*{r.student_id for r in records.values()})
+            schedule_rollup_refresh(
+                *((r.student_id, r.section_id, r.date) for r in records.values())
+            )
+            transaction.on_commit(invalidate_dashboard_stats)
+        self.summary.imported += len(records)
+
+
+def _value(row, column):
+    return (row.get(column) or "").strip()
+
+
+def import_attendance_file(uploaded_file, **kwargs):
+    """Import an uploaded/stored CSV file; returns the summary"""
+    stream = TextIOWrapper(uploaded_file, encoding="utf-8-sig", newline="")
+    try:
+        return AttendanceImporter(**kwargs).run(stream)
+    finally:
+        stream.detach()
+
+
+# ============================================================================
+# BACKGROUND JOBS
+# ============================================================================
+
+
+def create_import_job(user, uploaded_file):
+    """Store the file on a pending job and start it once the transaction commits"""
+    job = AttendanceImportJob(
+        requested_by=user if getattr(user, "is_authenticated", False) else None
+    )
+    job.file.save(uploaded_file.name, uploaded_file, save=False)
+    job.save()
+    transaction.on_commit(lambda: dispatch_import_job(job.pk))
+    return job
+
+
+def dispatch_import_job(job_id):
+    """Hand a job to Celery or a background thread"""
+    if get_import_mode() == MODE_CELERY:
+        from .tasks import import_attendance
+
+        try:
+            import_attendance.delay(str(job_id))
+            return
+        except Exception as e:
+            logger.warning(f"Celery unavailable, importing attendance in-process: {e}")
+
+    thread = threading.Thread(
+        target=_run_in_thread, args=(job_id,), name=f"attendance-import-{job_id}"
+    )
+    thread.daemon = True
+    thread.start()
+
+
+def _run_in_thread(job_id):
+    try:
+        run_import_job(job_id)
+    finally:
+        # Threads get their own connections; don't leak them
+        connections.close_all()
+
+
+def run_import_job(job_id):
+    """Process a job; safe to call twice (only a PENDING job is picked up)"""
+    now = timezone.now()
+    claimed = AttendanceImportJob.objects.filter(pk=job_id, status="PENDING").update(
+        status="PROCESSING", started_at=now, heartbeat_at=now
+    )
+    if not claimed:
+        return AttendanceImportJob.objects.filter(pk=job_id).first()
+
+    job = AttendanceImportJob.objects.get(pk=job_id)
+
+    def save_progress(summary):
+        job.processed_rows = summary.processed
+        job.imported_rows = summary.imported
+        job.failed_rows = summary.failed
+        job.errors = summary.errors
+        job.heartbeat_at = timezone.now()
+        job.save(
+            update_fields=[
+                "processed_rows",
+                "imported_rows",
+                "failed_rows",
+                "errors",
+                "heartbeat_at",
+            ]
+        )
+
+    try:
+        with job.file.open("rb") as uploaded_file:
+            import_attendance_file(uploaded_file, on_chunk=save_progress)
+        job.status = "COMPLETED"
+    except Exception as e:
+        logger.error(f"❌ Attendance import {job_id} failed: {e}", exc_info=True)
+        job.status = "FAILED"
+        job.error_message = str(e)
+    job.completed_at = timezone.now()
+    job.save(update_fields=["status", "error_message", "completed_at"])
+    logger.info(
+        f"📥 Attendance import {job_id}: {job.imported_rows} imported, "
+        f"{job.failed_rows} failed"
+    )
+    return job
+
+
+def fail_stale_import_jobs(now=None, **filters):
+    """Mark PROCESSING jobs whose worker stopped beating as FAILED"""
+    now = now or timezone.now()
+    stale = AttendanceImportJob.objects.filter(
+        status="PROCESSING",
+        heartbeat_at__lt=now - timedelta(seconds=get_import_timeout()),
+        **filters,
+    )
+    failed = stale.update(
+        status="FAILED",
+        error_message="The import stopped responding; please upload the file again",
+        completed_at=now,
+    )
+    if failed:
+        logger.warning(f"Marked {failed} stalled attendance import(s) as failed")
+    return failed
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from academics.models import Term
+from attendance.rollups import rebuild_rollups, rebuild_term
+
+
+class Command(BaseCommand):
+    help = "Recount the per-term and per-section-day attendance rollups"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--term",
+            type=int,
+            help="Only recount the student rollups of this term ID",
+        )
+
+    def handle(self, *args, **options):
+        term_id = options.get("term")
+        if term_id:
+            term = Term.objects.filter(pk=term_id).first()
+            if not term:
+                self.stdout.write(self.style.ERROR(f"Term {term_id} not found"))
+                return
+            rebuild_term(term)
+            self.stdout.write(
+                self.style.SUCCESS(f"✅ Rebuilt attendance rollups of {term}")
+            )
+            return
+
+        student_terms, section_days = rebuild_rollups()
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Rebuilt {student_terms} student-term and {section_days} "
+                f"section-day attendance rollups"
+            )
+        )
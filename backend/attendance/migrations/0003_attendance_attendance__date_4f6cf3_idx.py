@@ -0,0 +1,20 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0002_initial'),
+        ('classroom', '0011_alter_classroomteacherassignment_classroom_and_more'),
+        ('students', '0002_resultchecktoken_and_more'),
+        ('teacher', '0002_rename_academic_year_teacherschedule_academic_session_and_more'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='attendance',
+            index=models.Index(fields=['-date', '-id'], name='attendance__date_4f6cf3_idx'),
+        ),
+    ]
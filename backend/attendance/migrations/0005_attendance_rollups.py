@@ -0,0 +1,82 @@
+# Generated by Django 5.2.1 on 2026-10-18 00:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+STATUS_FIELDS = {"P": "present", "A": "absent", "L": "late", "E": "excused"}
+
+
+def backfill_rollups(apps, schema_editor):
+    """Same counts as attendance.rollups.rebuild_rollups, on historical models"""
+    Attendance = apps.get_model("attendance", "Attendance")
+    SectionDailyAttendance = apps.get_model("attendance", "SectionDailyAttendance")
+    StudentTermAttendance = apps.get_model("attendance", "StudentTermAttendance")
+    Term = apps.get_model("academics", "Term")
+    counts = {
+        field: Count("id", filter=Q(status=code))
+        for code, field in STATUS_FIELDS.items()
+    }
+
+    days = Attendance.objects.order_by().values("section_id", "date").annotate(**counts)
+    SectionDailyAttendance.objects.bulk_create(
+        (SectionDailyAttendance(**row) for row in days.iterator()), batch_size=1000
+    )
+    for term in Term.objects.all():
+        students = (
+            Attendance.objects.filter(date__range=(term.start_date, term.end_date))
+            .order_by()
+            .values("student_id")
+            .annotate(**counts)
+        )
+        StudentTermAttendance.objects.bulk_create(
+            (StudentTermAttendance(term_id=term.pk, **row) for row in students),
+            batch_size=1000,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('academics', '0002_initial'),
+        ('attendance', '0004_attendanceimportjob'),
+        ('classroom', '0011_alter_classroomteacherassignment_classroom_and_more'),
+        ('students', '0003_studentdashboardsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SectionDailyAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('excused', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('date', models.DateField()),
+                ('section', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_attendance', to='classroom.section')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date'], name='attendance__date_8af6ec_idx')],
+                'unique_together': {('section', 'date')},
+            },
+        ),
+        migrations.CreateModel(
+            name='StudentTermAttendance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('present', models.PositiveIntegerField(default=0)),
+                ('absent', models.PositiveIntegerField(default=0)),
+                ('late', models.PositiveIntegerField(default=0)),
+                ('excused', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='term_attendance', to='students.student')),
+                ('term', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='student_attendance', to='academics.term')),
+            ],
+            options={
+                'unique_together': {('student', 'term')},
+            },
+        ),
+        migrations.RunPython(backfill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 02:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('attendance', '0005_attendance_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='attendanceimportjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
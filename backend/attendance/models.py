@@ -1,5 +1,7 @@
-from django.db import models
+import uuid
 
+from django.conf import settings
+from django.db import models
 
 from students.models import Student
 from teacher.models import Teacher
@@ -29,6 +31,117 @@ class Attendance(models.Model):
 
     class Meta:
         unique_together = ("date", "student", "section")
+        indexes = [
+            models.Index(fields=["-date", "-id"]),
+        ]
 
     def __str__(self):
         return f"{self.student} - {self.date} - {self.get_status_display()}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Rollups must also refresh the day a record is moved away from
+        loaded = dict(zip(field_names, values))
+        instance._loaded_rollup_key = tuple(
+            loaded.get(field) for field in ("student_id", "section_id", "date")
+        )
+        return instance
+
+
+class AttendanceCounts(models.Model):
+    """Attendance counts by status (rollups kept by attendance/rollups.py)"""
+
+    present = models.PositiveIntegerField(default=0)
+    absent = models.PositiveIntegerField(default=0)
+    late = models.PositiveIntegerField(default=0)
+    excused = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        abstract = True
+
+    @property
+    def total(self):
+        return self.present + self.absent + self.late + self.excused
+
+    @property
+    def rate(self):
+        """Percentage of the recorded days the student(s) were present"""
+        return round(self.present / self.total * 100, 2) if self.total else 0
+
+
+class StudentTermAttendance(AttendanceCounts):
+    """A student's attendance counts over the dates of one term"""
+
+    student = models.ForeignKey(
+        Student, on_delete=models.CASCADE, related_name="term_attendance"
+    )
+    term = models.ForeignKey(
+        "academics.Term", on_delete=models.CASCADE, related_name="student_attendance"
+    )
+
+    class Meta:
+        unique_together = ("student", "term")
+
+    def __str__(self):
+        return f"{self.student} - {self.term}: {self.present}/{self.total}"
+
+
+class SectionDailyAttendance(AttendanceCounts):
+    """A section's attendance counts on one day"""
+
+    section = models.ForeignKey(
+        Section, on_delete=models.CASCADE, related_name="daily_attendance"
+    )
+    date = models.DateField()
+
+    class Meta:
+        unique_together = ("section", "date")
+        indexes = [
+            models.Index(fields=["date"]),
+        ]
+
+    def __str__(self):
+        return f"{self.section} - {self.date}: {self.present}/{self.total}"
+
+
+class AttendanceImportJob(models.Model):
+    """Background import of a large attendance CSV (attendance/importer.py)"""
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("PROCESSING", "Processing"),
+        ("COMPLETED", "Completed"),
+        ("FAILED", "Failed"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    file = models.FileField(upload_to="attendance_imports/")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    processed_rows = models.PositiveIntegerField(default=0)
+    imported_rows = models.PositiveIntegerField(default=0)
+    failed_rows = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    error_message = models.TextField(blank=True)
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="attendance_import_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["requested_by", "-created_at"]),
+        ]
+
+    def __str__(self):
+        return f"Attendance import {self.pk} ({self.status})"
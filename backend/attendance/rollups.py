@@ -0,0 +1,244 @@
+# attendance/rollups.py
+"""
+Attendance rollups.
+
+Attendance rates used to be recomputed from the raw ``Attendance`` rows on
+every parent dashboard, ``StudentDetailView`` and student fee dashboard.
+The counts by status are now kept in two rollup tables:
+
+* ``StudentTermAttendance`` - per (student, term), over the term's dates
+  (attendance outside every term's dates is not rolled up per student);
+* ``SectionDailyAttendance`` - per (section, date).
+
+Maintenance is incremental: saving or deleting an ``Attendance`` row (and
+the bulk import, which sends no signals) marks its (student, section, date)
+as dirty, and only the rollups of the dirty keys are recounted - from the
+index-backed rows of those students/sections and days - once, when the
+transaction commits. Recounting instead of adding deltas keeps moved and
+re-imported rows correct without knowing their previous status. Changing a
+term's dates recounts that term.
+
+``python manage.py rebuild_attendance_rollups`` recounts everything (after
+a deploy, or after writes that bypassed the ORM).
+"""
+
+import logging
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Count, Q, Sum
+from django.utils.dateparse import parse_date
+
+from academics.models import Term
+from utils.commit_batches import CommitBatch, CommitBatchScheduler
+
+from .models import Attendance, SectionDailyAttendance, StudentTermAttendance
+
+logger = logging.getLogger(__name__)
+
+# Status code -> rollup counter
+STATUS_FIELDS = {"P": "present", "A": "absent", "L": "late", "E": "excused"}
+COUNT_FIELDS = list(STATUS_FIELDS.values())
+
+# Rollup rows written per INSERT by a rebuild
+REBUILD_BATCH_SIZE = 1000
+
+
+def status_counts():
+    return {
+        field: Count("id", filter=Q(status=code))
+        for code, field in STATUS_FIELDS.items()
+    }
+
+
+def _upsert(model, rows, unique_fields):
+    model.objects.bulk_create(
+        [model(**row) for row in rows],
+        batch_size=REBUILD_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=unique_fields,
+        update_fields=[*COUNT_FIELDS, "updated_at"],
+    )
+
+
+def _delete_keys(model, fields, keys):
+    if keys:
+        model.objects.filter(
+            reduce(or_, (Q(**dict(zip(fields, key))) for key in keys))
+        ).delete()
+
+
+# ============================================================================
+# INCREMENTAL REFRESH
+# ============================================================================
+
+
+def refresh_section_days(keys):
+    """Recount the (section_id, date) rollups in ``keys`` with one query"""
+    keys = set(keys)
+    if not keys:
+        return
+    rows = (
+        Attendance.objects.filter(
+            section_id__in={section_id for section_id, _ in keys},
+            date__in={day for _, day in keys},
+        )
+        .order_by()
+        .values("section_id", "date")
+        .annotate(**status_counts())
+    )
+    found = [row for row in rows if (row["section_id"], row["date"]) in keys]
+    _upsert(SectionDailyAttendance, found, ["section", "date"])
+    _delete_keys(
+        SectionDailyAttendance,
+        ["section_id", "date"],
+        keys - {(row["section_id"], row["date"]) for row in found},
+    )
+
+
+def refresh_student_terms(keys):
+    """
+    Recount the rollups of the terms covering the (student_id, date) pairs
+    in ``keys``: one query for the terms, one per term touched
+    """
+    keys = set(keys)
+    if not keys:
+        return
+    days = {day for _, day in keys}
+    terms = Term.objects.filter(
+        start_date__lte=max(days), end_date__gte=min(days)
+    ).order_by()
+
+    students_by_term = defaultdict(set)
+    for term in terms:
+        for student_id, day in keys:
+            if term.start_date <= day <= term.end_date:
+                students_by_term[term].add(student_id)
+
+    for term, student_ids in students_by_term.items():
+        rows = (
+            Attendance.objects.filter(
+                student_id__in=student_ids,
+                date__range=(term.start_date, term.end_date),
+            )
+            .order_by()
+            .values("student_id")
+            .annotate(**status_counts())
+        )
+        found = [{**row, "term_id": term.pk} for row in rows]
+        _upsert(StudentTermAttendance, found, ["student", "term"])
+        _delete_keys(
+            StudentTermAttendance,
+            ["student_id", "term_id"],
+            [
+                (student_id, term.pk)
+                for student_id in student_ids - {row["student_id"] for row in found}
+            ],
+        )
+
+
+def rebuild_term(term):
+    """Recount every student's rollup of one term"""
+    with transaction.atomic():
+        StudentTermAttendance.objects.filter(term=term).delete()
+        rows = (
+            Attendance.objects.filter(date__range=(term.start_date, term.end_date))
+            .order_by()
+            .values("student_id")
+            .annotate(**status_counts())
+        )
+        StudentTermAttendance.objects.bulk_create(
+            [StudentTermAttendance(term=term, **row) for row in rows],
+            batch_size=REBUILD_BATCH_SIZE,
+        )
+
+
+def rebuild_rollups():
+    """Recount both rollup tables from scratch; returns their row counts"""
+    with transaction.atomic():
+        SectionDailyAttendance.objects.all().delete()
+        rows = (
+            Attendance.objects.order_by()
+            .values("section_id", "date")
+            .annotate(**status_counts())
+        )
+        SectionDailyAttendance.objects.bulk_create(
+            (SectionDailyAttendance(**row) for row in rows.iterator()),
+            batch_size=REBUILD_BATCH_SIZE,
+        )
+        for term in Term.objects.order_by("start_date"):
+            rebuild_term(term)
+    return (
+        StudentTermAttendance.objects.count(),
+        SectionDailyAttendance.objects.count(),
+    )
+
+
+# ============================================================================
+# SCHEDULING
+# ============================================================================
+
+
+class RollupBatch(CommitBatch):
+    """Attendance keys and terms recounted when the transaction commits"""
+
+    error_message = "Error refreshing attendance rollups"
+
+    def __init__(self):
+        super().__init__()
+        self.keys = set()  # (student_id, section_id, date)
+        self.terms = {}
+
+    def add(self, keys=(), terms=()):
+        self.keys.update(keys)
+        self.terms.update((term.pk, term) for term in terms)
+
+    def run(self):
+        refresh_section_days({(section, day) for _, section, day in self.keys})
+        refresh_student_terms({(student, day) for student, _, day in self.keys})
+        for term in self.terms.values():
+            rebuild_term(term)
+
+
+rollup_scheduler = CommitBatchScheduler(RollupBatch)
+
+
+def schedule_rollup_refresh(*keys):
+    """Recount the rollups of (student_id, section_id, date) keys on commit"""
+    keys = [
+        (student_id, section_id, parse_date(day) if isinstance(day, str) else day)
+        for student_id, section_id, day in keys
+        if None not in (student_id, section_id, day)
+    ]
+    if keys:
+        rollup_scheduler.add(keys=keys)
+
+
+def schedule_term_rebuild(term):
+    rollup_scheduler.add(terms=[term])
+
+
+# ============================================================================
+# READING
+# ============================================================================
+
+
+def student_attendance_totals(student_ids):
+    """student_id -> {present, absent, late, excused, total, rate} over all terms"""
+    rows = (
+        StudentTermAttendance.objects.filter(student_id__in=student_ids)
+        .order_by()
+        .values("student_id")
+        .annotate(**{field: Sum(field) for field in COUNT_FIELDS})
+    )
+    totals = {}
+    for row in rows:
+        student_id = row.pop("student_id")
+        row["total"] = sum(row.values())
+        row["rate"] = (
+            round(row["present"] / row["total"] * 100, 2) if row["total"] else 0
+        )
+        totals[student_id] = row
+    return totals
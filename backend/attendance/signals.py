@@ -0,0 +1,22 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from academics.models import Term
+
+from .models import Attendance
+from .rollups import schedule_rollup_refresh, schedule_term_rebuild
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+def refresh_attendance_rollups(sender, instance, **kwargs):
+    """Recount the rollups of the record's day (and its previous day if moved)"""
+    key = (instance.student_id, instance.section_id, instance.date)
+    schedule_rollup_refresh(key, getattr(instance, "_loaded_rollup_key", key))
+    instance._loaded_rollup_key = key
+
+
+@receiver(post_save, sender=Term)
+def rebuild_term_attendance(sender, instance, **kwargs):
+    """A term's dates decide which records its rollups count"""
+    schedule_term_rebuild(instance)
@@ -0,0 +1,21 @@
+from celery import shared_task
+
+
+@shared_task
+def import_attendance(job_id):
+    """Import the CSV of an AttendanceImportJob"""
+    from .importer import run_import_job
+
+    job = run_import_job(job_id)
+
+    return f"Attendance import {job_id}: {job.status if job else 'missing'}"
+
+
+@shared_task
+def fail_stale_import_jobs():
+    """Fail the attendance imports whose worker died mid-run"""
+    from .importer import fail_stale_import_jobs
+
+    failed = fail_stale_import_jobs()
+
+    return f"Failed {failed} stalled attendance imports"
@@ -1,3 +1,294 @@
-from django.test import TestCase
+import datetime
+from io import StringIO
 
-# Create your tests here.
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from academics.models import AcademicSession, Term
+from classroom.models import GradeLevel, Section
+from students.models import Student
+from users.models import CustomUser
+
+from .importer import fail_stale_import_jobs, import_attendance_file, run_import_job
+from .models import (
+    Attendance,
+    AttendanceImportJob,
+    SectionDailyAttendance,
+    StudentTermAttendance,
+)
+from .rollups import student_attendance_totals
+
+
+class AttendanceDataTestCase(TestCase):
+    """One Primary 1 section, four pupils and an admin"""
+
+    @classmethod
+    def setUpTestData(cls):
+        grade_level = GradeLevel.objects.create(
+            name="Primary 1", education_level="PRIMARY", order=1
+        )
+        cls.section = Section.objects.create(name="A", grade_level=grade_level)
+        cls.students = []
+        for i in range(4):
+            user = CustomUser.objects.create_user(
+                email=f"pupil{i}@example.com",
+                username=f"pupil{i}",
+                first_name="Pupil",
+                last_name=str(i),
+                role="student",
+                password="x",
+            )
+            cls.students.append(
+                Student.objects.create(
+                    user=user,
+                    gender="M",
+                    date_of_birth=datetime.date(2015, 1, 1),
+                    student_class="PRIMARY_1",
+                    education_level="PRIMARY",
+                    registration_number=f"REG-{i}",
+                )
+            )
+        cls.admin = CustomUser.objects.create_user(
+            email="admin@example.com",
+            username="importer",
+            first_name="Import",
+            last_name="Admin",
+            role="admin",
+            password="x",
+            is_staff=True,
+        )
+
+
+@override_settings(
+    STORAGES={
+        "default": {"BACKEND": "django.core.files.storage.InMemoryStorage"},
+        "staticfiles": {
+            "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+        },
+    }
+)
+class AttendanceImportTest(AttendanceDataTestCase):
+    """CSV imports are chunked, upserted in bulk and report bad rows"""
+
+    url = "/api/attendance/attendance/import-csv/"
+
+    def csv(self, rows):
+        lines = ["student,teacher,section,date,status"]
+        lines += [",".join(row) for row in rows]
+        return SimpleUploadedFile(
+            "attendance.csv", "\n".join(lines).encode(), content_type="text/csv"
+        )
+
+    def upload(self, rows, **params):
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        query = "&".join(f"{key}={value}" for key, value in params.items())
+        return client.post(
+            f"{self.url}?{query}",
+            {"file": self.csv(rows)},
+            format="multipart",
+            HTTP_HOST="localhost",
+        )
+
+    def rows(self, day, status="present"):
+        section = str(self.section.pk)
+        return [
+            [str(self.students[0].pk), "", section, day, status],
+            ["REG-1", "", section, day, status],
+            [str(self.students[2].pk), "", section, day, status],
+            ["REG-3", "", section, day, status],
+        ]
+
+    def test_rows_are_upserted_and_errors_reported(self):
+        rows = self.rows("2025-10-01") + [
+            ["REG-404", "", str(self.section.pk), "2025-10-01", "P"],
+            ["REG-1", "", str(self.section.pk), "01/10/2025", "maybe"],
+        ]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload(rows)
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data["imported_rows"], data["failed_rows"]), (4, 2))
+        self.assertEqual([error["line"] for error in data["errors"]], [6, 7])
+        self.assertEqual(set(data["errors"][1]["errors"]), {"date", "status"})
+        self.assertEqual(Attendance.objects.filter(status="P").count(), 4)
+
+        # Re-importing the day updates the same rows
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload(self.rows("2025-10-01", status="A"))
+        self.assertEqual(response.json()["imported_rows"], 4)
+        self.assertEqual(Attendance.objects.count(), 4)
+        self.assertEqual(Attendance.objects.filter(status="A").count(), 4)
+
+    @override_settings(ATTENDANCE_IMPORT_CHUNK_SIZE=4)
+    def test_background_job_in_chunks(self):
+        days = [f"2025-10-{day:02}" for day in range(1, 4)]
+        rows = [row for day in days for row in self.rows(day)]
+        with self.captureOnCommitCallbacks(execute=False):
+            response = self.upload(rows, background="true")
+        self.assertEqual(response.status_code, 202)
+        job_id = response.json()["job_id"]
+
+        # Claim and load the job, 2 reference lookups for the first chunk,
+        # then an upsert (in a savepoint) and a progress update per chunk
+        with self.assertNumQueries(17):
+            job = run_import_job(job_id)
+        self.assertEqual(job.status, "COMPLETED")
+        self.assertEqual((job.processed_rows, job.imported_rows), (12, 12))
+        self.assertEqual(Attendance.objects.count(), 12)
+        self.assertEqual(
+            AttendanceImportJob.objects.get(pk=job_id).status, "COMPLETED"
+        )
+
+        client = APIClient(HTTP_HOST="localhost")
+        client.force_authenticate(self.admin)
+        url = "/api/attendance/attendance/import-jobs/{}/"
+        response = client.get(url.format(job_id))
+        self.assertEqual(response.json()["imported_rows"], 12)
+        self.assertEqual(client.get(url.format("abc")).status_code, 404)
+
+    def test_stalled_job_is_failed(self):
+        beat = timezone.now() - datetime.timedelta(minutes=10)
+        job = AttendanceImportJob.objects.create(
+            file="attendance_imports/stalled.csv",
+            status="PROCESSING",
+            started_at=beat,
+            heartbeat_at=beat,
+            requested_by=self.admin,
+        )
+        client = APIClient(HTTP_HOST="localhost")
+        client.force_authenticate(self.admin)
+        url = f"/api/attendance/attendance/import-jobs/{job.pk}/"
+
+        with override_settings(ATTENDANCE_IMPORT_TIMEOUT=3600):
+            self.assertEqual(fail_stale_import_jobs(), 0)
+            self.assertEqual(client.get(url).json()["status"], "PROCESSING")
+        # Polling the job fails it once its worker stopped beating
+        with override_settings(ATTENDANCE_IMPORT_TIMEOUT=60):
+            response = client.get(url).json()
+        self.assertEqual(response["status"], "FAILED")
+        self.assertTrue(response["error_message"])
+
+    def test_export_round_trips_through_import(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.upload(self.rows("2025-10-01"))
+        client = APIClient()
+        client.force_authenticate(self.admin)
+        response = client.get(
+            "/api/attendance/attendance/export-csv/?ordering=student",
+            HTTP_HOST="localhost",
+        )
+        self.assertEqual(response.status_code, 200)
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertTrue(lines[0].startswith("student,teacher,section,date,status,"))
+        self.assertIn(",REG-1,Pupil,1,A", lines[2])
+
+        Attendance.objects.all().delete()
+        upload = SimpleUploadedFile("export.csv", "\n".join(lines).encode())
+        with self.captureOnCommitCallbacks(execute=True):
+            import_attendance_file(upload.file)
+        self.assertEqual(Attendance.objects.filter(status="P").count(), 4)
+
+
+class AttendanceRollupTest(AttendanceDataTestCase):
+    """Rollups follow every write and can be rebuilt from scratch"""
+
+    def setUp(self):
+        session = AcademicSession.objects.create(
+            name="2025/2026",
+            start_date=datetime.date(2025, 9, 1),
+            end_date=datetime.date(2026, 7, 31),
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            self.first_term, self.second_term = [
+                Term.objects.create(
+                    name=name,
+                    academic_session=session,
+                    start_date=start,
+                    end_date=end,
+                )
+                for name, start, end in [
+                    ("FIRST", datetime.date(2025, 9, 8), datetime.date(2025, 12, 12)),
+                    ("SECOND", datetime.date(2026, 1, 5), datetime.date(2026, 4, 3)),
+                ]
+            ]
+
+    def counts(self, model, **lookup):
+        row = model.objects.filter(**lookup).first()
+        return row and (row.present, row.absent, row.late, row.excused)
+
+    def record(self, student, day, status):
+        return Attendance.objects.create(
+            student=student, section=self.section, date=day, status=status
+        )
+
+    def test_writes_update_only_their_rollups(self):
+        first, second = self.students[:2]
+        october = [datetime.date(2025, 10, day) for day in (1, 2)]
+        with self.captureOnCommitCallbacks(execute=True):
+            self.record(first, october[0], "P")
+            self.record(first, october[1], "A")
+            self.record(second, october[0], "L")
+        self.assertEqual(
+            self.counts(StudentTermAttendance, student=first, term=self.first_term),
+            (1, 1, 0, 0),
+        )
+        self.assertEqual(
+            self.counts(SectionDailyAttendance, date=october[0]), (1, 0, 1, 0)
+        )
+
+        # Moving a record recounts the day (and term) it left
+        record = Attendance.objects.get(student=first, date=october[1])
+        with self.captureOnCommitCallbacks(execute=True):
+            record.date = datetime.date(2026, 1, 12)
+            record.status = "P"
+            record.save()
+        self.assertEqual(
+            self.counts(StudentTermAttendance, student=first, term=self.first_term),
+            (1, 0, 0, 0),
+        )
+        self.assertEqual(
+            self.counts(StudentTermAttendance, student=first, term=self.second_term),
+            (1, 0, 0, 0),
+        )
+        self.assertIsNone(self.counts(SectionDailyAttendance, date=october[1]))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Attendance.objects.get(student=second).delete()
+        self.assertFalse(StudentTermAttendance.objects.filter(student=second).exists())
+        self.assertEqual(
+            self.counts(SectionDailyAttendance, date=october[0]), (1, 0, 0, 0)
+        )
+        self.assertEqual(
+            student_attendance_totals([first.id])[first.id]["rate"], 100
+        )
+
+    def test_import_and_rebuild(self):
+        rows = ["student,section,date,status"] + [
+            f"{student.pk},{self.section.pk},2025-10-0{day},{status}"
+            for student in self.students
+            for day, status in [(1, "P"), (2, "E")]
+        ]
+        upload = SimpleUploadedFile("attendance.csv", "\n".join(rows).encode())
+        with self.captureOnCommitCallbacks(execute=True):
+            import_attendance_file(upload.file)
+        self.assertEqual(StudentTermAttendance.objects.count(), 4)
+        self.assertEqual(
+            self.counts(SectionDailyAttendance, date=datetime.date(2025, 10, 2)),
+            (0, 0, 0, 4),
+        )
+
+        StudentTermAttendance.objects.all().delete()
+        SectionDailyAttendance.objects.all().delete()
+        call_command("rebuild_attendance_rollups", stdout=StringIO())
+        self.assertEqual(
+            self.counts(
+                StudentTermAttendance, student=self.students[0], term=self.first_term
+            ),
+            (1, 0, 0, 1),
+        )
+        self.assertEqual(SectionDailyAttendance.objects.count(), 2)
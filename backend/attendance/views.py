@@ -3,20 +3,38 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from django_filters.rest_framework import DjangoFilterBackend
-from .models import Attendance
+from .models import Attendance, AttendanceImportJob
+from .importer import (
+    create_import_job,
+    fail_stale_import_jobs,
+    get_sync_max_bytes,
+    import_attendance_file,
+)
 from .serializers import AttendanceSerializer
 from .filters import AttendanceFilter
 from rest_framework import viewsets
 import csv
-from io import TextIOWrapper
-from students.models import Student
-from teacher.models import Teacher
-from classroom.models import Section
+import uuid
+from django.http import Http404
+from django.shortcuts import get_object_or_404
 from parent.models import ParentProfile
 from schoolSettings.permissions import HasAttendancePermission, HasAttendancePermissionOrReadOnly
 
+from utils.exporting import CSVExport
 from utils.section_filtering import AutoSectionFilterMixin
 
+ATTENDANCE_EXPORT_COLUMNS = [
+    ("student", "student_id"),
+    ("teacher", "teacher_id"),
+    ("section", "section_id"),
+    ("date", "date"),
+    ("status", "status"),
+    ("registration_number", "student__registration_number"),
+    ("first_name", "student__user__first_name"),
+    ("last_name", "student__user__last_name"),
+    ("section_name", "section__name"),
+]
+
 
 class AttendanceViewSet(AutoSectionFilterMixin, viewsets.ModelViewSet):
     serializer_class = AttendanceSerializer
@@ -28,8 +46,14 @@ class AttendanceViewSet(AutoSectionFilterMixin, viewsets.ModelViewSet):
         filters.OrderingFilter,
     ]
     filterset_class = AttendanceFilter
-    search_fields = ["student__first_name", "teacher__first_name"]
+    search_fields = [
+        "student__user__first_name",
+        "student__user__last_name",
+        "teacher__user__first_name",
+    ]
     ordering_fields = ["date", "student"]
+    # Keyset pagination order, backed by the (date, id) index
+    cursor_ordering = ("-date", "-id")
 
     def create(self, request, *args, **kwargs):
         """Override create to add debugging"""
@@ -74,52 +98,80 @@ class AttendanceViewSet(AutoSectionFilterMixin, viewsets.ModelViewSet):
 
     @action(detail=False, methods=["post"], url_path="import-csv")
     def import_csv(self, request):
+        """
+        Import attendance rows (student, teacher, section, date, status).
+        Large files (or ?background=true) are imported by a background job:
+        poll import-jobs/<job_id>/.
+        """
         csv_file = request.FILES.get("file")
         if not csv_file:
             return Response(
                 {"error": "No CSV file uploaded"}, status=status.HTTP_400_BAD_REQUEST
             )
 
-        try:
-            decoded_file = TextIOWrapper(csv_file.file, encoding="utf-8")
-            reader = csv.DictReader(decoded_file)
-
-            for row in reader:
-                student = Student.objects.get(id=row["student"])
-                teacher = Teacher.objects.get(id=row["teacher"])
-                section = Section.objects.get(id=row["section"])
-
-                Attendance.objects.create(
-                    student=student,
-                    teacher=teacher,
-                    section=section,
-                    date=row["attendance_date"],
-                    status=row["status"].lower(),
-                )
-
+        background = request.query_params.get("background", "").lower() in [
+            "true",
+            "1",
+            "yes",
+        ]
+        if background or csv_file.size > get_sync_max_bytes():
+            job = create_import_job(request.user, csv_file)
             return Response(
-                {"message": "CSV import successful."}, status=status.HTTP_201_CREATED
+                self._import_job_payload(job), status=status.HTTP_202_ACCEPTED
             )
-        except Exception as e:
+
+        try:
+            summary = import_attendance_file(csv_file.file)
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
+        return Response(
+            {"message": "CSV import finished.", **summary.as_dict()},
+            status=(
+                status.HTTP_201_CREATED
+                if summary.imported or not summary.failed
+                else status.HTTP_400_BAD_REQUEST
+            ),
+        )
+
+    @action(
+        detail=False, methods=["get"], url_path=r"import-jobs/(?P<job_id>[0-9a-f-]+)"
+    )
+    def import_job_status(self, request, job_id=None):
+        """Progress and row errors of a background attendance import"""
+        try:
+            job_id = uuid.UUID(job_id)
+        except ValueError:
+            raise Http404("No such import job")
+        jobs = AttendanceImportJob.objects.all()
+        if not (request.user.is_staff or request.user.is_superuser):
+            jobs = jobs.filter(requested_by=request.user)
+        job = get_object_or_404(jobs, pk=job_id)
+        if job.status == "PROCESSING" and fail_stale_import_jobs(pk=job.pk):
+            job.refresh_from_db()
+        return Response(self._import_job_payload(job))
+
+    def _import_job_payload(self, job):
+        return {
+            "job_id": str(job.pk),
+            "status": job.status,
+            "processed_rows": job.processed_rows,
+            "imported_rows": job.imported_rows,
+            "failed_rows": job.failed_rows,
+            "errors": job.errors,
+            "error_message": job.error_message,
+            "created_at": job.created_at,
+            "completed_at": job.completed_at,
+        }
+
     @action(detail=False, methods=["get"], url_path="export-csv")
     def export_csv(self, request):
-        response = Response(content_type="text/csv")
-        response["Content-Disposition"] = 'attachment; filename="attendance.csv"'
-
-        writer = csv.writer(response)
-        writer.writerow(["student", "teacher", "section", "date", "status"])
-
-        for record in self.filter_queryset(self.get_queryset()):
-            writer.writerow(
-                [
-                    record.student.id,
-                    record.teacher.id if record.teacher else "",
-                    record.section.id,
-                    record.date,
-                    record.status,
-                ]
-            )
-
-        return response
+        """
+        Stream the filtered attendance as CSV (?compress=gzip for .csv.gz).
+        The first five columns are the import format.
+        """
+        return CSVExport(
+            self.filter_queryset(self.get_queryset()),
+            ATTENDANCE_EXPORT_COLUMNS,
+            "attendance.csv",
+        ).response(request)
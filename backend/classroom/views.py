@@ -14,7 +14,9 @@ from django.db.models import Prefetch
 from django.core.cache import cache
 from django.shortcuts import get_object_or_404
 import logging
+from collections import defaultdict
 
+from utils.schedule_conflicts import ConflictRules
 from utils.section_filtering import AutoSectionFilterMixin
 from .models import (
     GradeLevel,
@@ -42,6 +44,8 @@ from .serializers import (
 )
 from teacher.serializers import TeacherSerializer
 from subject.serializers import SubjectSerializer, SubjectEducationLevelSerializer
+from subject.utils import clear_subject_caches as bump_subject_caches
+from subject.utils import filter_by_levels
 from subject.models import (
     SUBJECT_CATEGORY_CHOICES,
     EDUCATION_LEVELS,
@@ -661,6 +665,9 @@ class ClassScheduleViewSet(AutoSectionFilterMixin, viewsets.ModelViewSet):
     queryset = ClassSchedule.objects.all()
     permission_classes = [IsAuthenticated]
     serializer_class = ClassScheduleSerializer
+    conflict_rules = ConflictRules(
+        "day_of_week", {"teacher": "teacher_id", "classroom": "classroom_id"}
+    )
 
     def get_queryset(self):
         # Let mixin handle section filtering
@@ -712,39 +719,53 @@ class ClassScheduleViewSet(AutoSectionFilterMixin, viewsets.ModelViewSet):
     @action(detail=False, methods=["get"])
     def conflicts(self, request):
         """Get schedule conflicts"""
-        # Find overlapping schedules
-        queryset = self.get_queryset()
+        # Load the schedule once and sweep it for overlaps
+        schedules = list(
+            self.get_queryset().select_related("classroom", "teacher__user", "subject")
+        )
+        pairs = self.conflict_rules.find(schedules)
 
-        conflicts = []
-        schedules = queryset.select_related("classroom", "teacher", "subject")
+        counts = defaultdict(lambda: {"teacher": 0, "classroom": 0})
+        for resource, first, second in pairs:
+            counts[first.id][resource] += 1
+            counts[second.id][resource] += 1
 
+        conflicts = []
         for schedule in schedules:
-            overlaps = queryset.filter(
-                day_of_week=schedule.day_of_week,
-                start_time__lt=schedule.end_time,
-                end_time__gt=schedule.start_time,
-            ).exclude(id=schedule.id)
-
-            # Check for teacher conflicts
-            teacher_conflicts = overlaps.filter(teacher=schedule.teacher)
-            # Check for classroom conflicts
-            classroom_conflicts = overlaps.filter(classroom=schedule.classroom)
-
-            if teacher_conflicts.exists() or classroom_conflicts.exists():
-                conflicts.append(
-                    {
-                        "schedule_id": schedule.id,
-                        "day": schedule.day_of_week,
-                        "time": f"{schedule.start_time} - {schedule.end_time}",
-                        "classroom": schedule.classroom.name,
-                        "teacher": schedule.teacher.user.get_full_name(),
-                        "subject": schedule.subject.name,
-                        "teacher_conflicts": teacher_conflicts.count(),
-                        "classroom_conflicts": classroom_conflicts.count(),
-                    }
-                )
+            if schedule.id not in counts:
+                continue
+            conflicts.append(
+                {
+                    "schedule_id": schedule.id,
+                    "day": schedule.day_of_week,
+                    "time": f"{schedule.start_time} - {schedule.end_time}",
+                    "classroom": schedule.classroom.name,
+                    "teacher": schedule.teacher.user.get_full_name(),
+                    "subject": schedule.subject.name,
+                    "teacher_conflicts": counts[schedule.id]["teacher"],
+                    "classroom_conflicts": counts[schedule.id]["classroom"],
+                }
+            )
 
-        return Response({"total_conflicts": len(conflicts), "conflicts": conflicts})
+        conflict_pairs = [
+            {
+                "type": resource,
+                "day": first.day_of_week,
+                "schedule_ids": [first.id, second.id],
+                "overlap": f"{max(first.start_time, second.start_time)} - "
+                f"{min(first.end_time, second.end_time)}",
+                "subjects": [first.subject.name, second.subject.name],
+            }
+            for resource, first, second in pairs
+        ]
+
+        return Response(
+            {
+                "total_conflicts": len(conflicts),
+                "conflicts": conflicts,
+                "pairs": conflict_pairs,
+            }
+        )
 
     @action(detail=False, methods=["get"])
     def daily_schedule(self, request):
@@ -1286,9 +1307,9 @@ class SubjectByEducationLevelView(APIView):
             )
 
         # Base queryset
-        queryset = Subject.objects.filter(
-            education_levels__contains=[level]
-        ).prefetch_related("grade_levels", "prerequisites")
+        queryset = filter_by_levels(Subject.objects.all(), [level]).prefetch_related(
+            "grade_levels", "prerequisites"
+        )
 
         # Additional filters
         active_only = request.query_params.get("active_only", "true").lower() == "true"
@@ -1307,7 +1328,7 @@ class SubjectByEducationLevelView(APIView):
         if nursery_level and level == "NURSERY":
             valid_nursery_levels = [code for code, _ in NURSERY_LEVELS]
             if nursery_level in valid_nursery_levels:
-                queryset = queryset.filter(nursery_levels__contains=[nursery_level])
+                queryset = filter_by_levels(queryset, [nursery_level], "nursery_levels")
 
         # SS subject type filter
         ss_type = request.query_params.get("ss_type")
@@ -1365,7 +1386,7 @@ class SubjectByEducationLevelView(APIView):
     def _get_nursery_breakdown(self, queryset):
         breakdown = {}
         for level_code, level_name in NURSERY_LEVELS:
-            level_subjects = queryset.filter(nursery_levels__contains=[level_code])
+            level_subjects = filter_by_levels(queryset, [level_code], "nursery_levels")
             breakdown[level_code] = {
                 "name": level_name,
                 "count": level_subjects.count(),
@@ -1437,7 +1458,7 @@ class SubjectQuickSearchView(APIView):
         # Apply additional filters
         education_level = request.query_params.get("education_level")
         if education_level:
-            queryset = queryset.filter(education_levels__contains=[education_level])
+            queryset = filter_by_levels(queryset, [education_level])
 
         category = request.query_params.get("category")
         if category:
@@ -1637,39 +1658,10 @@ class SubjectComparisonView(APIView):
 # ==============================================================================
 def clear_subject_caches():
     """
-    Enhanced helper function to clear all subject-related caches
+    Drop every cached subject response (the ``subjects`` cache generation)
     """
-    cache_keys = [
-        # Legacy cache keys
-        "subjects_statistics",
-        "subjects_statistics_v2",
-        "subjects_by_category",
-        "subjects_by_category_v2",
-        "active_subjects_count",
-        # New cache keys from enhanced model
-        "subjects_cache_v1",
-        "subjects_by_category_v3",
-        "subjects_by_education_level_v2",
-        "nursery_subjects_v1",
-        "ss_subjects_by_type_v1",
-        "cross_cutting_subjects_v1",
-        "subject_statistics_v1",
-        # Pattern-based cache clearing
-        "subject_*",
-        "education_level_*",
-        "nursery_*",
-        "ss_*",
-    ]
-
     try:
-        cache.delete_many(cache_keys)
-
-        # If using Redis or similar, also clear pattern-based keys
-        if hasattr(cache, "delete_pattern"):
-            patterns = ["subject_*", "education_*", "nursery_*", "ss_*"]
-            for pattern in patterns:
-                cache.delete_pattern(pattern)
-
+        bump_subject_caches()
         logger.info("Subject caches cleared successfully")
         return True
     except Exception as e:
@@ -1722,8 +1714,8 @@ def system_info(request):
         # Education level statistics
         education_stats = {}
         for level_code, level_name in EDUCATION_LEVELS:
-            count = Subject.objects.filter(
-                education_levels__contains=[level_code], is_active=True
+            count = filter_by_levels(
+                Subject.objects.filter(is_active=True), [level_code]
             ).count()
             education_stats[level_code] = {"name": level_name, "count": count}
 
@@ -2,6 +2,8 @@ from django.http import JsonResponse
 from django.conf import settings
 import sys
 
+from utils.caching import get_cache_metrics
+
 
 def health_check(request):
     """
@@ -19,5 +21,9 @@ def health_check(request):
             "database": (
                 "connected" if settings.DATABASES.get("default") else "not configured"
             ),
+            "cache": {
+                "backend": settings.CACHES["default"]["BACKEND"],
+                "metrics": get_cache_metrics(),
+            },
         }
     )
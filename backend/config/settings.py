@@ -388,8 +388,19 @@ REST_FRAMEWORK = {
     ),
     "DEFAULT_PERMISSION_CLASSES": ("rest_framework.permissions.IsAuthenticated",),
     "DEFAULT_FILTER_BACKENDS": ["django_filters.rest_framework.DjangoFilterBackend"],
+    "DEFAULT_PAGINATION_CLASS": "utils.pagination.KeysetPagination",
 }
 
+# Keyset pagination (utils/pagination.py): lists are paginated when the client
+# sends ?limit= or ?cursor=; set PAGINATION_ENFORCED once every client does
+PAGINATION_PAGE_SIZE = int(os.getenv("PAGINATION_PAGE_SIZE", "50"))
+PAGINATION_MAX_PAGE_SIZE = int(os.getenv("PAGINATION_MAX_PAGE_SIZE", "500"))
+PAGINATION_ENFORCED = os.getenv("PAGINATION_ENFORCED", "False").lower() in [
+    "true",
+    "1",
+    "yes",
+]
+
 # ============================================
 # SIMPLE JWT (FIXED - Uses SECRET_KEY now)
 # ============================================
@@ -517,6 +528,200 @@ BREVO_API_KEY = os.getenv("BREVO_API_KEY", "your-brevo-api-key-here")
 PAYSTACK_SECRET_KEY = os.getenv("PAYSTACK_SECRET_KEY")
 PAYSTACK_PUBLIC_KEY = os.getenv("PAYSTACK_PUBLIC_KEY")
 
+# ============================================
+# CACHE
+# ============================================
+
+# One cache shared by every worker process: Redis when REDIS_URL is set,
+# otherwise CACHE_BACKEND picks "file" (shared by the workers of one host),
+# "db" (run `python manage.py createcachetable` first) or "locmem" (one cache
+# per process - fine for a single dev server). Only Redis has an atomic
+# add/incr, so off Redis the stampede lock of utils.caching is best-effort.
+REDIS_URL = os.getenv("REDIS_URL")
+CACHE_BACKEND = os.getenv(
+    "CACHE_BACKEND", "redis" if REDIS_URL else ("file" if ENV == "prod" else "locmem")
+).lower()
+
+_CACHE_BACKENDS = {
+    "redis": {
+        "BACKEND": "django.core.cache.backends.redis.RedisCache",
+        "LOCATION": REDIS_URL or "redis://127.0.0.1:6379/1",
+    },
+    "file": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": os.getenv("CACHE_DIR", str(BASE_DIR / ".cache")),
+        # The default of 300 entries culls constantly (and culls the
+        # namespace version keys with everything else)
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "50000"))},
+    },
+    "db": {
+        "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+        "LOCATION": "django_cache",
+        "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CACHE_MAX_ENTRIES", "50000"))},
+    },
+    "locmem": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "school-cache",
+    },
+}
+
+CACHES = {
+    "default": {
+        **_CACHE_BACKENDS[CACHE_BACKEND],
+        "KEY_PREFIX": os.getenv("CACHE_KEY_PREFIX", "school"),
+        # Bump to invalidate everything cached by an older deploy
+        "VERSION": int(os.getenv("CACHE_VERSION", "1")),
+        "TIMEOUT": int(os.getenv("CACHE_DEFAULT_TIMEOUT", "300")),
+    }
+}
+
+# Stampede protection of utils.caching.cached_query: how long the worker
+# computing a missing value holds its lock, and how long others wait for it
+CACHE_LOCK_TIMEOUT = int(os.getenv("CACHE_LOCK_TIMEOUT", "30"))
+CACHE_STAMPEDE_WAIT = float(os.getenv("CACHE_STAMPEDE_WAIT", "5"))
+
+# ============================================
+# CELERY
+# ============================================
+
+# Broker of the "celery" background job modes (report batches,
+# recalculation, bulk messages...); defaults to the cache's Redis. See
+# config/celery.py
+CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", REDIS_URL)
+CELERY_TASK_SERIALIZER = "json"
+CELERY_BEAT_SCHEDULE = {
+    "fail-stale-report-batches": {
+        "task": "result.tasks.fail_stale_report_batches",
+        "schedule": 5 * 60,
+    },
+    "fail-stale-attendance-imports": {
+        "task": "attendance.tasks.fail_stale_import_jobs",
+        "schedule": 5 * 60,
+    },
+}
+
+# ============================================
+# RESULT PROCESSING
+# ============================================
+
+# How dirty result positions/statistics are recalculated:
+# "on_commit" (in-process, once per transaction), "celery" or "sync"
+RESULT_RECALCULATION_MODE = os.getenv("RESULT_RECALCULATION_MODE", "on_commit")
+
+# Where bulk report-card PDF jobs run: "celery" (the default once a broker is
+# configured) or "thread" (background thread in the web process - development
+# and single-host setups only); PDFs are rendered by a pool of this many
+# processes. A running job that makes no progress for REPORT_BATCH_TIMEOUT
+# seconds is marked failed.
+REPORT_BATCH_MODE = os.getenv(
+    "REPORT_BATCH_MODE", "celery" if CELERY_BROKER_URL else "thread"
+)
+REPORT_BATCH_WORKERS = int(os.getenv("REPORT_BATCH_WORKERS", "2"))
+REPORT_BATCH_TIMEOUT = int(os.getenv("REPORT_BATCH_TIMEOUT", "1800"))
+
+# Rendered term report PDFs are cached on the default storage by content
+# fingerprint; bump REPORT_TEMPLATE_VERSION when report assets change
+REPORT_PDF_CACHE_ENABLED = os.getenv("REPORT_PDF_CACHE_ENABLED", "True").lower() in [
+    "true",
+    "1",
+    "yes",
+]
+REPORT_PDF_CACHE_PREFIX = os.getenv("REPORT_PDF_CACHE_PREFIX", "report_cache")
+REPORT_TEMPLATE_VERSION = os.getenv("REPORT_TEMPLATE_VERSION", "1")
+
+# ============================================
+# ACCESS CONTROL
+# ============================================
+
+# Seconds a user's resolved role/section access is cached between requests
+ACCESS_CONTEXT_CACHE_TTL = int(os.getenv("ACCESS_CONTEXT_CACHE_TTL", "60"))
+
+# Seconds a user's compiled role permissions are cached (role/permission
+# changes invalidate them immediately)
+PERMISSION_CACHE_TTL = int(os.getenv("PERMISSION_CACHE_TTL", "300"))
+
+# ============================================
+# DASHBOARD
+# ============================================
+
+# Seconds the admin dashboard counters are cached per access scope (writes to
+# the counted models invalidate them sooner)
+DASHBOARD_STATS_CACHE_TTL = int(os.getenv("DASHBOARD_STATS_CACHE_TTL", "60"))
+
+# Seconds the student dashboard's announcement list is cached (announcement
+# writes invalidate it sooner)
+STUDENT_DASHBOARD_CACHE_TTL = int(os.getenv("STUDENT_DASHBOARD_CACHE_TTL", "60"))
+
+# ============================================
+# ATTENDANCE IMPORT
+# ============================================
+
+# CSV rows validated and upserted per batch
+ATTENDANCE_IMPORT_CHUNK_SIZE = int(os.getenv("ATTENDANCE_IMPORT_CHUNK_SIZE", "1000"))
+
+# Larger uploads are imported by a background job: "thread" (background thread
+# in the web process) or "celery". A running job that makes no progress for
+# ATTENDANCE_IMPORT_TIMEOUT seconds is marked failed.
+ATTENDANCE_IMPORT_SYNC_MAX_BYTES = int(
+    os.getenv("ATTENDANCE_IMPORT_SYNC_MAX_BYTES", str(512 * 1024))
+)
+ATTENDANCE_IMPORT_MODE = os.getenv("ATTENDANCE_IMPORT_MODE", "thread")
+ATTENDANCE_IMPORT_TIMEOUT = int(os.getenv("ATTENDANCE_IMPORT_TIMEOUT", "1800"))
+
+# ============================================
+# MESSAGING
+# ============================================
+
+# Where bulk messages are fanned out: "thread" (background thread in the web
+# process) or "celery"; recipients are processed this many at a time
+BULK_MESSAGE_MODE = os.getenv("BULK_MESSAGE_MODE", "thread")
+BULK_MESSAGE_CHUNK_SIZE = int(os.getenv("BULK_MESSAGE_CHUNK_SIZE", "500"))
+# A run renews its lease after every chunk; a "sending" message untouched for
+# longer than this is resumed by the next run (keep it above one chunk's time)
+BULK_MESSAGE_LEASE_SECONDS = int(os.getenv("BULK_MESSAGE_LEASE_SECONDS", "1800"))
+
+# Per channel: pooled sender workers (one connection/client each) and the
+# most messages per second across them
+BULK_MESSAGE_CHANNELS = {
+    "EMAIL": {
+        "workers": int(os.getenv("BULK_EMAIL_WORKERS", "4")),
+        "rate": float(os.getenv("BULK_EMAIL_RATE", "20")),
+    },
+    "SMS": {
+        "workers": int(os.getenv("BULK_SMS_WORKERS", "2")),
+        "rate": float(os.getenv("BULK_SMS_RATE", "1")),
+    },
+}
+
+# ============================================
+# EXPORTS
+# ============================================
+
+# Rows fetched per server-side cursor batch by streaming CSV exports
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "2000"))
+
+# ============================================
+# FEES
+# ============================================
+
+# Student fees inserted per INSERT by bulk fee generation
+FEE_GENERATION_BATCH_SIZE = int(os.getenv("FEE_GENERATION_BATCH_SIZE", "1000"))
+
+# Payment reminders: one per fee and channel per cooldown; each channel
+# sends through this many workers (one connection/client each), at most
+# "rate" messages per second across them
+PAYMENT_REMINDER_COOLDOWN_DAYS = int(os.getenv("PAYMENT_REMINDER_COOLDOWN_DAYS", "7"))
+PAYMENT_REMINDER_CHANNELS = {
+    "EMAIL": {
+        "workers": int(os.getenv("REMINDER_EMAIL_WORKERS", "2")),
+        "rate": float(os.getenv("REMINDER_EMAIL_RATE", "10")),
+    },
+    "SMS": {
+        "workers": int(os.getenv("REMINDER_SMS_WORKERS", "2")),
+        "rate": float(os.getenv("REMINDER_SMS_RATE", "1")),
+    },
+}
+
 # ============================================
 # LOGGING
 # ============================================
@@ -9,6 +9,7 @@ from .health import health_check
 from .views import force_migrate
 from .views import force_migrate, check_database_schema
 from authentication.views import create_first_superuser
+from utils.views import UnifiedSearchView
 
 urlpatterns = [
     path("health/", health_check, name="health"),
@@ -60,6 +61,7 @@ urlpatterns = [
     path("api/events/", include("events.urls")),
     # ===== UTILITIES =====
     path("api/utils/", include("utils.urls")),
+    path("api/search/", UnifiedSearchView.as_view(), name="search"),
     path("admin/force-migrate/", force_migrate),
     path("api/force-migrate/", force_migrate),
     path("api/check-schema/", check_database_schema),
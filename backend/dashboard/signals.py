@@ -0,0 +1,53 @@
+# dashboard/signals.py
+"""Invalidate cached dashboard counters when the counted rows change"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from attendance.models import Attendance
+from classroom.models import Classroom, ClassroomTeacherAssignment
+from parent.models import Message, ParentProfile, ParentStudentRelationship
+from students.models import Student
+from teacher.models import Teacher
+
+from .stats import invalidate_dashboard_stats
+
+
+def _invalidate_on_commit():
+    transaction.on_commit(invalidate_dashboard_stats)
+
+
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+@receiver(post_save, sender=Teacher)
+@receiver(post_delete, sender=Teacher)
+@receiver(post_save, sender=ParentProfile)
+@receiver(post_delete, sender=ParentProfile)
+@receiver(post_save, sender=ParentStudentRelationship)
+@receiver(post_delete, sender=ParentStudentRelationship)
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_save, sender=Classroom)
+@receiver(post_delete, sender=Classroom)
+@receiver(post_save, sender=ClassroomTeacherAssignment)
+@receiver(post_delete, sender=ClassroomTeacherAssignment)
+@receiver(post_save, sender=Message)
+@receiver(post_delete, sender=Message)
+def counted_row_changed(sender, **kwargs):
+    _invalidate_on_commit()
+
+
+@receiver(m2m_changed, sender=ParentProfile.students.through)
+def parent_students_changed(sender, action, **kwargs):
+    if action.startswith("post_"):
+        _invalidate_on_commit()
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+def user_changed(sender, update_fields=None, **kwargs):
+    # Logins only touch last_login, which no counter depends on
+    if update_fields and set(update_fields) <= {"last_login"}:
+        return
+    _invalidate_on_commit()
@@ -0,0 +1,139 @@
+# dashboard/stats.py
+"""
+Admin dashboard counters.
+
+``DashboardViewSet.stats`` and ``dashboard_stats_function`` used to run
+about a dozen ``COUNT(*)`` queries over the section-filtered querysets - one
+per counter, so students alone were counted three times. Every counter of an
+entity now comes from one ``aggregate(Count(..., filter=Q(...)))``.
+
+The counters only depend on what the user may see: everything, or a set of
+education levels. The payload is cached per scope for
+``settings.DASHBOARD_STATS_CACHE_TTL`` seconds; student, teacher, parent,
+classroom, message and attendance writes invalidate it (``dashboard/signals.py``).
+"""
+
+import datetime
+import logging
+import time
+
+from django.conf import settings
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from attendance.models import Attendance
+from classroom.models import Classroom
+from parent.models import Message, ParentProfile
+from students.models import Student
+from teacher.models import Teacher
+from utils.caching import bump_namespace, get_or_compute, make_key
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAMESPACE = "dashboard_stats"
+
+EMPTY_STATS = {
+    "total_students": 0,
+    "active_students": 0,
+    "inactive_students": 0,
+    "total_teachers": 0,
+    "active_teachers": 0,
+    "inactive_teachers": 0,
+    "total_classes": 0,
+    "total_messages": 0,
+    "total_parents": 0,
+    "active_parents": 0,
+    "inactive_parents": 0,
+    "attendance_today": 0,
+}
+
+
+def get_cache_ttl():
+    return getattr(settings, "DASHBOARD_STATS_CACHE_TTL", 60)
+
+
+def get_scope(access):
+    """Cache scope of an AccessContext: "all" or its education levels"""
+    if access.has_full_access:
+        return "all"
+    return ",".join(sorted(access.education_levels))
+
+
+def _active_counts(queryset, active_field):
+    return queryset.aggregate(
+        total=Count("pk"),
+        active=Count("pk", filter=Q(**{active_field: True})),
+        inactive=Count("pk", filter=Q(**{active_field: False})),
+    )
+
+
+def compute_dashboard_stats(filter_queryset):
+    """
+    Counters of the querysets narrowed by ``filter_queryset`` (a
+    ``SectionFilterMixin.apply_section_filters``), one query per entity
+    """
+    started = time.perf_counter()
+
+    students = _active_counts(filter_queryset(Student.objects.all()), "is_active")
+    teachers = _active_counts(filter_queryset(Teacher.objects.all()), "is_active")
+    parents = _active_counts(
+        filter_queryset(ParentProfile.objects.all()), "user__is_active"
+    )
+    attendance = filter_queryset(Attendance.objects.all()).aggregate(
+        today=Count("pk", filter=Q(date=datetime.date.today()))
+    )
+
+    stats = {
+        "total_students": students["total"],
+        "active_students": students["active"],
+        "inactive_students": students["inactive"],
+        "total_teachers": teachers["total"],
+        "active_teachers": teachers["active"],
+        "inactive_teachers": teachers["inactive"],
+        "total_classes": filter_queryset(Classroom.objects.all()).count(),
+        "total_messages": filter_queryset(Message.objects.all()).count(),
+        "total_parents": parents["total"],
+        "active_parents": parents["active"],
+        "inactive_parents": parents["inactive"],
+        "attendance_today": attendance["today"],
+    }
+
+    return {
+        "stats": stats,
+        "computed_at": timezone.now().isoformat(),
+        "duration_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+
+
+def get_dashboard_stats(filter_helper):
+    """
+    Dashboard counters for the user of a ``SectionFilterMixin`` view, with
+    timing metadata under ``"meta"``
+    """
+    access = filter_helper.get_access_context()
+    scope = get_scope(access)
+
+    started = time.perf_counter()
+    computed = []
+
+    def compute():
+        computed.append(True)
+        return compute_dashboard_stats(filter_helper.apply_section_filters)
+
+    payload = get_or_compute(
+        make_key(CACHE_NAMESPACE, scope), compute, get_cache_ttl(), CACHE_NAMESPACE
+    )
+
+    stats = dict(payload["stats"])
+    stats["meta"] = {
+        "scope": scope,
+        "cached": not computed,
+        "computed_at": payload["computed_at"],
+        "compute_ms": payload["duration_ms"],
+        "response_ms": round((time.perf_counter() - started) * 1000, 1),
+    }
+    return stats
+
+
+def invalidate_dashboard_stats():
+    bump_namespace(CACHE_NAMESPACE)
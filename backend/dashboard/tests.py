@@ -1,3 +1,129 @@
+import datetime
+
+from django.core.cache import cache
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from attendance.models import Attendance
+from classroom.models import GradeLevel, Section
+from parent.models import ParentProfile, ParentStudentRelationship
+from students.models import Student
+from teacher.models import Teacher
+from users.models import CustomUser
+
+
+class DashboardStatsTest(TestCase):
+    """Dashboard counters come from one aggregate per entity and are cached"""
+
+    url = "/api/dashboard/stats/"
+
+    def setUp(self):
+        cache.clear()
+        self.students = [
+            self.student("ss1", "SENIOR_SECONDARY", "SS_1"),
+            self.student("jss1", "JUNIOR_SECONDARY", "JSS_1", is_active=False),
+            self.student("pry1", "PRIMARY", "PRIMARY_1"),
+        ]
+        # One parent of two secondary students is counted once
+        parent = self.parent("parent", self.students[:2])
+        self.parent("inactive_parent", self.students[2:], is_active=False)
+
+        teacher_user = self.user("teacher", "teacher")
+        Teacher.objects.create(user=teacher_user, employee_id="T-1", is_active=False)
+
+        grade_level = GradeLevel.objects.create(
+            name="SS 1", education_level="SENIOR_SECONDARY", order=1
+        )
+        section = Section.objects.create(name="A", grade_level=grade_level)
+        Attendance.objects.create(
+            date=datetime.date.today(),
+            student=self.students[0],
+            section=section,
+            status="P",
+        )
+        self.parent_profile = parent
+
+    def user(self, username, role, is_active=True):
+        return CustomUser.objects.create_user(
+            email=f"{username}@example.com",
+            username=username,
+            first_name=username.title(),
+            last_name="User",
+            role=role,
+            password="x",
+            is_active=is_active,
+        )
+
+    def student(self, username, education_level, student_class, is_active=True):
+        return Student.objects.create(
+            user=self.user(username, "student"),
+            gender="M",
+            date_of_birth=datetime.date(2010, 1, 1),
+            student_class=student_class,
+            education_level=education_level,
+            is_active=is_active,
+        )
+
+    def parent(self, username, students, is_active=True):
+        profile = ParentProfile.objects.create(
+            user=self.user(username, "parent", is_active=is_active)
+        )
+        for student in students:
+            ParentStudentRelationship.objects.create(
+                parent=profile, student=student, relationship="Guardian"
+            )
+        return profile
+
+    def stats(self, user):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.get(pk=user.pk))
+        response = client.get(self.url, HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_counts_per_scope(self):
+        superadmin = CustomUser.objects.create_superuser(
+            email="root@example.com",
+            username="root",
+            first_name="Root",
+            last_name="User",
+            password="x",
+        )
+        stats = self.stats(superadmin)
+        self.assertEqual(
+            (stats["total_students"], stats["active_students"], stats["inactive_students"]),
+            (3, 2, 1),
+        )
+        self.assertEqual(
+            (stats["total_teachers"], stats["active_teachers"], stats["inactive_teachers"]),
+            (1, 0, 1),
+        )
+        self.assertEqual(
+            (stats["total_parents"], stats["active_parents"], stats["inactive_parents"]),
+            (2, 1, 1),
+        )
+        self.assertEqual(stats["attendance_today"], 1)
+        self.assertEqual(stats["meta"]["scope"], "all")
+
+        secondary_admin = self.user("secondary_admin", "secondary_admin")
+        stats = self.stats(secondary_admin)
+        self.assertEqual(stats["total_students"], 2)
+        self.assertEqual(stats["total_parents"], 1)
+        self.assertEqual(stats["meta"]["scope"], "JUNIOR_SECONDARY,SENIOR_SECONDARY")
+
+    def test_cached_per_scope_until_a_write(self):
+        admin = self.user("secondary_admin", "secondary_admin")
+        self.assertFalse(self.stats(admin)["meta"]["cached"])
+
+        # Another user of the same scope shares the cached counters
+        other_admin = self.user("other_admin", "secondary_admin")
+        self.stats(other_admin)
+        with self.assertNumQueries(1):  # only the user lookup
+            stats = self.stats(other_admin)
+        self.assertTrue(stats["meta"]["cached"])
 
-# Create your tests here.
+        with self.captureOnCommitCallbacks(execute=True):
+            self.student("ss2", "SENIOR_SECONDARY", "SS_1")
+        stats = self.stats(admin)
+        self.assertFalse(stats["meta"]["cached"])
+        self.assertEqual(stats["total_students"], 3)
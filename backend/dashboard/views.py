@@ -3,7 +3,6 @@ from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Q
-import datetime
 import logging
 
 from utils.section_filtering import AutoSectionFilterMixin, SectionFilterMixin
@@ -11,7 +10,8 @@ from students.models import Student
 from teacher.models import Teacher
 from classroom.models import Classroom
 from parent.models import ParentProfile, Message
-from attendance.models import Attendance
+
+from .stats import EMPTY_STATS, get_dashboard_stats
 
 logger = logging.getLogger(__name__)
 
@@ -42,54 +42,17 @@ class DashboardViewSet(AutoSectionFilterMixin, viewsets.ViewSet):
             logger.warning(f"❌ No education level access for {user.username}")
             return Response(
                 {
-                    "total_students": 0,
-                    "active_students": 0,
-                    "inactive_students": 0,
-                    "total_teachers": 0,
-                    "active_teachers": 0,
-                    "inactive_teachers": 0,
-                    "total_classes": 0,
-                    "total_messages": 0,
-                    "total_parents": 0,
-                    "active_parents": 0,
-                    "inactive_parents": 0,
-                    "attendance_today": 0,
+                    **EMPTY_STATS,
                     "user_role": role,
                     "access_levels": allowed_education_levels,
                 }
             )
 
         try:
-            # === Apply automatic filtering using the mixin ===
-            students_queryset = self.apply_section_filters(Student.objects.all())
-            classrooms_queryset = self.apply_section_filters(Classroom.objects.all())
-            teachers_queryset = self.apply_section_filters(Teacher.objects.all())
-            parents_queryset = self.apply_section_filters(ParentProfile.objects.all())
-            messages_queryset = self.apply_section_filters(Message.objects.all())
-            attendance_queryset = self.apply_section_filters(Attendance.objects.all())
-
-            # Compile statistics
-            stats = {
-                "total_students": students_queryset.count(),
-                "active_students": students_queryset.filter(is_active=True).count(),
-                "inactive_students": students_queryset.filter(is_active=False).count(),
-                "total_teachers": teachers_queryset.count(),
-                "active_teachers": teachers_queryset.filter(is_active=True).count(),
-                "inactive_teachers": teachers_queryset.filter(is_active=False).count(),
-                "total_classes": classrooms_queryset.count(),
-                "total_messages": messages_queryset.count(),
-                "total_parents": parents_queryset.count(),
-                "active_parents": parents_queryset.filter(user__is_active=True).count(),
-                "inactive_parents": parents_queryset.filter(
-                    user__is_active=False
-                ).count(),
-                "attendance_today": attendance_queryset.filter(
-                    date=datetime.date.today()
-                ).count(),
-                # Metadata
-                "user_role": role,
-                "access_levels": allowed_education_levels,
-            }
+            # Counters of the section-filtered querysets, cached per scope
+            stats = get_dashboard_stats(self)
+            stats["user_role"] = role
+            stats["access_levels"] = allowed_education_levels
 
             logger.info(
                 f"✅ Dashboard stats: Students={stats['total_students']}, "
@@ -100,23 +63,7 @@ class DashboardViewSet(AutoSectionFilterMixin, viewsets.ViewSet):
 
         except Exception as e:
             logger.error(f"❌ Error getting dashboard stats: {str(e)}", exc_info=True)
-            return Response(
-                {
-                    "error": str(e),
-                    "total_students": 0,
-                    "active_students": 0,
-                    "inactive_students": 0,
-                    "total_teachers": 0,
-                    "active_teachers": 0,
-                    "inactive_teachers": 0,
-                    "total_classes": 0,
-                    "total_messages": 0,
-                    "total_parents": 0,
-                    "active_parents": 0,
-                    "inactive_parents": 0,
-                    "attendance_today": 0,
-                }
-            )
+            return Response({"error": str(e), **EMPTY_STATS})
 
 
 # === TEACHER LIST VIEW ===
@@ -216,45 +163,18 @@ def dashboard_stats_function(request):
     if not allowed_levels:
         return Response(
             {
-                "total_students": 0,
-                "total_teachers": 0,
-                "total_classes": 0,
-                "total_parents": 0,
-                "total_messages": 0,
+                **EMPTY_STATS,
                 "user_role": role,
                 "access_levels": [],
             }
         )
 
     try:
-        # Apply filtering manually
-        students = filter_helper.apply_section_filters(Student.objects.all())
-        teachers = filter_helper.apply_section_filters(Teacher.objects.all())
-        classrooms = filter_helper.apply_section_filters(Classroom.objects.all())
-        parents = filter_helper.apply_section_filters(ParentProfile.objects.all())
-        messages = filter_helper.apply_section_filters(Message.objects.all())
-        attendance = filter_helper.apply_section_filters(Attendance.objects.all())
-
-        return Response(
-            {
-                "total_students": students.count(),
-                "active_students": students.filter(is_active=True).count(),
-                "inactive_students": students.filter(is_active=False).count(),
-                "total_teachers": teachers.count(),
-                "active_teachers": teachers.filter(is_active=True).count(),
-                "inactive_teachers": teachers.filter(is_active=False).count(),
-                "total_classes": classrooms.count(),
-                "total_parents": parents.count(),
-                "active_parents": parents.filter(user__is_active=True).count(),
-                "inactive_parents": parents.filter(user__is_active=False).count(),
-                "total_messages": messages.count(),
-                "attendance_today": attendance.filter(
-                    date=datetime.date.today()
-                ).count(),
-                "user_role": role,
-                "access_levels": allowed_levels,
-            }
-        )
+        # Same counters and cache as DashboardViewSet.stats
+        stats = get_dashboard_stats(filter_helper)
+        stats["user_role"] = role
+        stats["access_levels"] = allowed_levels
+        return Response(stats)
 
     except Exception as e:
         logger.error(f"❌ Error: {str(e)}", exc_info=True)
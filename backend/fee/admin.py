@@ -294,16 +294,14 @@ class StudentFeeAdmin(admin.ModelAdmin):
     create_payment_plan.short_description = "Create payment plans for selected fees"
 
     def send_payment_reminder(self, request, queryset):
-        count = 0
-        for fee in queryset:
-            if fee.status not in ["PAID"]:
-                PaymentReminder.objects.create(
-                    student_fee=fee,
-                    reminder_type="EMAIL",
-                    message=f"Payment reminder for {fee.fee_structure.name}",
-                )
-                count += 1
-        self.message_user(request, f"Reminders created for {count} fees.")
+        from .services.reminders import ReminderDispatcher
+
+        count = ReminderDispatcher(
+            reminder_type="DUE_DATE",
+            fee_ids=list(queryset.values_list("pk", flat=True)),
+            overdue_only=False,
+        ).run()
+        self.message_user(request, f"Reminders sent for {count} fees.")
 
     send_payment_reminder.short_description = "Send payment reminders"
 
@@ -920,10 +918,18 @@ class PaymentReminderAdmin(admin.ModelAdmin):
     list_display = (
         "student_fee",
         "reminder_type",
+        "channel",
         "sent_date",
         "is_sent",
+        "delivery_status",
+    )
+    list_filter = (
+        "reminder_type",
+        "channel",
+        "is_sent",
+        "delivery_status",
+        "sent_date",
     )
-    list_filter = ("reminder_type", "is_sent", "sent_date")
     search_fields = (
         "student_fee__student__user__first_name",
         "student_fee__student__user__last_name",
@@ -931,9 +937,12 @@ class PaymentReminderAdmin(admin.ModelAdmin):
     readonly_fields = ("sent_date",)
 
     fieldsets = (
-        ("Reminder Details", {"fields": ("student_fee", "reminder_type")}),
+        ("Reminder Details", {"fields": ("student_fee", "reminder_type", "channel")}),
         ("Message", {"fields": ("message",)}),
-        ("Status", {"fields": ("is_sent", "sent_date")}),
+        (
+            "Status",
+            {"fields": ("is_sent", "sent_date", "delivery_status", "delivery_error")},
+        ),
     )
 
 
@@ -96,6 +96,18 @@ REMINDER_TYPE_CHOICES = (
     ("PAYMENT_CONFIRMATION", "Payment Confirmation"),
 )
 
+REMINDER_CHANNEL_CHOICES = (
+    ("EMAIL", "Email"),
+    ("SMS", "SMS"),
+)
+
+REMINDER_DELIVERY_CHOICES = (
+    ("PENDING", "Pending"),
+    ("SENT", "Sent"),
+    ("FAILED", "Failed"),
+    ("SKIPPED", "Skipped"),
+)
+
 
 # class AcademicSession(models.Model):
 #     """Academic session model"""
@@ -195,6 +207,11 @@ class StudentFee(models.Model):
 
     def update_status(self):
         """Update payment status based on amounts"""
+        self.refresh_status()
+        self.save()
+
+    def refresh_status(self):
+        """Set status and overdue flag from the amounts, without saving"""
         total_paid = self.amount_paid + self.discount_amount
 
         if total_paid >= self.amount_due:
@@ -210,8 +227,6 @@ class StudentFee(models.Model):
             if self.status == "PENDING":
                 self.status = "OVERDUE"
 
-        self.save()
-
 
 class FeeDiscount(models.Model):
     """Fee discount model"""
@@ -264,8 +279,15 @@ class PaymentReminder(models.Model):
         StudentFee, on_delete=models.CASCADE, related_name="reminders"
     )
     reminder_type = models.CharField(max_length=20, choices=REMINDER_TYPE_CHOICES)
+    channel = models.CharField(
+        max_length=10, choices=REMINDER_CHANNEL_CHOICES, default="EMAIL"
+    )
     sent_date = models.DateTimeField(auto_now_add=True)
     is_sent = models.BooleanField(default=False)
+    delivery_status = models.CharField(
+        max_length=10, choices=REMINDER_DELIVERY_CHOICES, default="PENDING"
+    )
+    delivery_error = models.TextField(blank=True, null=True)
     message = models.TextField(blank=True, null=True)
     created_at = models.DateTimeField(auto_now_add=True)
 
@@ -273,6 +295,9 @@ class PaymentReminder(models.Model):
         verbose_name = "Payment Reminder"
         verbose_name_plural = "Payment Reminders"
         ordering = ["-sent_date"]
+        indexes = [
+            models.Index(fields=["student_fee", "is_sent", "sent_date"]),
+        ]
 
     def __str__(self):
         return (
@@ -712,19 +712,12 @@ class StudentDashboardSerializer(serializers.ModelSerializer):
         ][:5]
 
     def get_attendance_summary(self, obj):
-        from attendance.models import Attendance
+        from attendance.rollups import student_attendance_totals
 
-        total = Attendance.objects.filter(student=obj).count()
-        present = Attendance.objects.filter(student=obj, status="P").count()
-        absent = Attendance.objects.filter(student=obj, status="A").count()
-        late = Attendance.objects.filter(student=obj, status="L").count()
-        excused = Attendance.objects.filter(student=obj, status="E").count()
+        totals = student_attendance_totals([obj.id]).get(obj.id, {})
         return {
-            "total": total,
-            "present": present,
-            "absent": absent,
-            "late": late,
-            "excused": excused,
+            field: totals.get(field, 0)
+            for field in ["total", "present", "absent", "late", "excused"]
         }
 
 
@@ -791,14 +784,28 @@ class BulkFeeGenerationSerializer(serializers.Serializer):
         required=False,
         help_text="List of fee structure IDs to generate. If empty, all applicable fees will be generated.",
     )
+    due_date = serializers.DateField(
+        required=False,
+        help_text="Due date of the generated fees. Defaults to the start of each term.",
+    )
+    mode = serializers.ChoiceField(
+        choices=[
+            ("APPLY", "Create missing fees"),
+            ("DRY_RUN", "Preview fees to create"),
+            ("DIFF", "Compare with existing fees"),
+        ],
+        default="APPLY",
+    )
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        # Populate choices from constants
-        from .constants import EDUCATION_LEVELS, CLASSES, TERMS
+        # Populate choices from constants; levels and classes are matched
+        # against FeeStructure/Student, so they use the student choices
+        from .constants import TERMS
+        from students.models import EDUCATION_LEVEL_CHOICES, CLASS_CHOICES
 
-        self.fields["education_level"].choices = EDUCATION_LEVELS
-        self.fields["student_class"].choices = CLASSES
+        self.fields["education_level"].choices = EDUCATION_LEVEL_CHOICES
+        self.fields["student_class"].choices = CLASS_CHOICES
         self.fields["term"].choices = TERMS
 
     def validate_academic_session_id(self, value):
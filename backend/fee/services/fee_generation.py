@@ -0,0 +1,343 @@
+# fees/services/fee_generation.py
+"""
+Set-based generation of ``StudentFee`` rows for an academic session.
+
+``FeeGenerator`` loads everything it needs up front - the students in
+scope, the active ``FeeStructure``s of their classes, their active
+``StudentDiscount``s for the session and the fees that already exist - with
+one query each, works out every (student, fee structure, term) fee in
+memory and inserts the missing ones with batched
+``bulk_create(ignore_conflicts=True)`` on the unique key. Running it again
+creates nothing, so it is safe to repeat at the start of every term.
+
+Modes:
+
+* ``APPLY`` - create the missing fees;
+* ``DRY_RUN`` - report what ``APPLY`` would create, without writing;
+* ``DIFF`` - also compare the fees that already exist with what would be
+  generated today: amounts or discounts that changed since, and fees whose
+  structure no longer applies to the student.
+
+Termly and monthly structures get one fee per term; annual and one-time
+structures are charged in the first term.
+"""
+
+import logging
+from collections import defaultdict
+from decimal import ROUND_HALF_UP, Decimal
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from academics.models import AcademicSession, Term
+from students.models import Student
+
+from ..models import FeeStructure, StudentDiscount, StudentFee
+
+logger = logging.getLogger(__name__)
+
+MODE_APPLY = "APPLY"
+MODE_DRY_RUN = "DRY_RUN"
+MODE_DIFF = "DIFF"
+MODES = [MODE_APPLY, MODE_DRY_RUN, MODE_DIFF]
+
+TERMS = ["FIRST", "SECOND", "THIRD"]
+PER_TERM_FREQUENCIES = ["TERMLY", "MONTHLY"]
+
+# Fees listed per category in a dry-run/diff response
+PREVIEW_LIMIT = 50
+
+ZERO = Decimal("0")
+CENT = Decimal("0.01")
+
+
+def get_batch_size():
+    return max(1, int(getattr(settings, "FEE_GENERATION_BATCH_SIZE", 1000)))
+
+
+def structure_terms(structure, term=None):
+    """Terms a structure is charged in, optionally narrowed to one term"""
+    terms = TERMS if structure.frequency in PER_TERM_FREQUENCIES else TERMS[:1]
+    if term:
+        return [term] if term in terms else []
+    return terms
+
+
+def discount_amount(amount, fee_type, discounts, on_date):
+    """Total of the discounts that apply to a fee, capped at its amount"""
+    total = ZERO
+    for discount in discounts:
+        if not discount.is_active:
+            continue
+        fee_types = discount.applicable_fee_types
+        if fee_types and fee_type not in fee_types:
+            continue
+        if on_date and not discount.valid_from <= on_date <= discount.valid_to:
+            continue
+        if discount.discount_type == "PERCENTAGE":
+            total += amount * discount.value / 100
+        else:
+            total += discount.value
+    return min(total, amount).quantize(CENT, rounding=ROUND_HALF_UP)
+
+
+def load_discounts(academic_session_id, student_ids):
+    """student_id -> active FeeDiscounts of the session, in one query"""
+    discounts = defaultdict(list)
+    rows = StudentDiscount.objects.filter(
+        academic_session_id=academic_session_id,
+        student_id__in=student_ids,
+        is_active=True,
+        discount__is_active=True,
+    ).select_related("discount")
+    for row in rows:
+        discounts[row.student_id].append(row.discount)
+    return discounts
+
+
+class FeeGenerator:
+    """Generates a session's student fees for the validated scope"""
+
+    def __init__(
+        self,
+        academic_session_id,
+        education_level=None,
+        student_class=None,
+        term=None,
+        fee_structure_ids=None,
+        due_date=None,
+        mode=MODE_APPLY,
+    ):
+        self.academic_session = AcademicSession.objects.get(pk=academic_session_id)
+        self.education_level = education_level
+        self.student_class = student_class
+        self.term = term
+        self.fee_structure_ids = fee_structure_ids
+        self.due_date = due_date
+        self.mode = mode
+
+    # ------------------------------------------------------------------
+    # Scope
+    # ------------------------------------------------------------------
+
+    def students(self):
+        students = Student.objects.filter(is_active=True)
+        if self.education_level:
+            students = students.filter(education_level=self.education_level)
+        if self.student_class:
+            students = students.filter(student_class=self.student_class)
+        return list(
+            students.order_by().values_list("id", "education_level", "student_class")
+        )
+
+    def structures(self, classes):
+        """(education_level, student_class) -> applicable active structures"""
+        structures = FeeStructure.objects.filter(
+            reduce(
+                or_,
+                (Q(education_level=level, student_class=cls) for level, cls in classes),
+            ),
+            is_active=True,
+        )
+        if self.fee_structure_ids:
+            structures = structures.filter(pk__in=self.fee_structure_ids)
+        by_class = defaultdict(list)
+        for structure in structures.order_by("pk"):
+            by_class[(structure.education_level, structure.student_class)].append(
+                structure
+            )
+        return by_class
+
+    def due_dates(self):
+        """term -> due date: the requested one, else the term's start"""
+        if self.due_date:
+            return defaultdict(lambda: self.due_date)
+        starts = dict(
+            Term.objects.filter(academic_session=self.academic_session)
+            .order_by()
+            .values_list("name", "start_date")
+        )
+        return {
+            term: starts.get(term) or self.academic_session.start_date
+            for term in TERMS
+        }
+
+    # ------------------------------------------------------------------
+    # Generation
+    # ------------------------------------------------------------------
+
+    def planned_fees(self):
+        """Unsaved StudentFee rows of the whole scope"""
+        students = self.students()
+        if not students:
+            return []
+        structures = self.structures({(level, cls) for _, level, cls in students})
+        discounts = load_discounts(
+            self.academic_session.pk, [student_id for student_id, _, _ in students]
+        )
+        due_dates = self.due_dates()
+
+        fees = []
+        for student_id, level, cls in students:
+            for structure in structures.get((level, cls), []):
+                for term in structure_terms(structure, self.term):
+                    fee = StudentFee(
+                        student_id=student_id,
+                        fee_structure=structure,
+                        academic_session=self.academic_session,
+                        term=term,
+                        amount_due=structure.amount,
+                        amount_paid=ZERO,
+                        discount_amount=discount_amount(
+                            structure.amount,
+                            structure.fee_type,
+                            discounts.get(student_id, []),
+                            due_dates[term],
+                        ),
+                        due_date=due_dates[term],
+                    )
+                    # bulk_create sends no pre_save, so set the status here
+                    fee.refresh_status()
+                    fees.append(fee)
+        return fees
+
+    def existing_fees(self, student_ids):
+        fees = StudentFee.objects.filter(
+            academic_session=self.academic_session, student_id__in=student_ids
+        )
+        if self.term:
+            fees = fees.filter(term=self.term)
+        if self.fee_structure_ids:
+            fees = fees.filter(fee_structure_id__in=self.fee_structure_ids)
+        return {
+            (fee.student_id, fee.fee_structure_id, fee.term): fee
+            for fee in fees.order_by().only(
+                "id",
+                "student_id",
+                "fee_structure_id",
+                "term",
+                "amount_due",
+                "discount_amount",
+                "status",
+            )
+        }
+
+    def run(self):
+        planned = self.planned_fees()
+        existing = self.existing_fees({fee.student_id for fee in planned})
+        missing = [fee for fee in planned if _key(fee) not in existing]
+
+        result = {
+            "mode": self.mode,
+            "academic_session_id": self.academic_session.pk,
+            "term": self.term,
+            "students": len({fee.student_id for fee in planned}),
+            "fee_structures": len({fee.fee_structure_id for fee in planned}),
+            "planned_fees": len(planned),
+            "existing_fees": len(planned) - len(missing),
+            "new_fees": len(missing),
+            "new_amount_due": str(sum((fee.amount_due for fee in missing), ZERO)),
+            "new_discount": str(sum((fee.discount_amount for fee in missing), ZERO)),
+        }
+
+        if self.mode == MODE_APPLY:
+            with transaction.atomic():
+                StudentFee.objects.bulk_create(
+                    missing, batch_size=get_batch_size(), ignore_conflicts=True
+                )
+            logger.info(
+                f"💰 Generated {len(missing)} fees for {self.academic_session} "
+                f"({result['existing_fees']} already existed)"
+            )
+            result["created"] = len(missing)
+            return result
+
+        result["preview"] = [_describe(fee) for fee in missing[:PREVIEW_LIMIT]]
+        if self.mode == MODE_DIFF:
+            planned_keys = {_key(fee) for fee in planned}
+            changed = [
+                {**_describe(fee), "current": _amounts(existing[_key(fee)])}
+                for fee in planned
+                if _key(fee) in existing
+                and _amounts(existing[_key(fee)]) != _amounts(fee)
+            ]
+            obsolete = [
+                _describe(fee)
+                for key, fee in existing.items()
+                if key not in planned_keys
+            ]
+            result.update(
+                changed_fees=len(changed),
+                changed=changed[:PREVIEW_LIMIT],
+                obsolete_fees=len(obsolete),
+                obsolete=obsolete[:PREVIEW_LIMIT],
+            )
+        return result
+
+
+def _key(fee):
+    return (fee.student_id, fee.fee_structure_id, fee.term)
+
+
+def _amounts(fee):
+    return {
+        "amount_due": str(fee.amount_due),
+        "discount_amount": str(fee.discount_amount),
+    }
+
+
+def _describe(fee):
+    return {
+        "id": fee.pk,
+        "student_id": fee.student_id,
+        "fee_structure_id": fee.fee_structure_id,
+        "term": fee.term,
+        **_amounts(fee),
+        "due_date": fee.due_date,
+    }
+
+
+# ============================================================================
+# RECALCULATION
+# ============================================================================
+
+
+def recalculate_fees(student_fees):
+    """
+    Recompute the discounts and status of the given fees from the active
+    student discounts: one query for the discounts, one for the fee types
+    and batched bulk updates
+    """
+    fees = list(student_fees)
+    if not fees:
+        return 0
+    discounts = defaultdict(list)
+    rows = StudentDiscount.objects.filter(
+        student_id__in={fee.student_id for fee in fees},
+        academic_session_id__in={fee.academic_session_id for fee in fees},
+        is_active=True,
+        discount__is_active=True,
+    ).select_related("discount")
+    for row in rows:
+        discounts[(row.student_id, row.academic_session_id)].append(row.discount)
+
+    structures = dict(
+        FeeStructure.objects.filter(
+            pk__in={fee.fee_structure_id for fee in fees}
+        ).values_list("pk", "fee_type")
+    )
+    for fee in fees:
+        fee.discount_amount = discount_amount(
+            fee.amount_due,
+            structures[fee.fee_structure_id],
+            discounts.get((fee.student_id, fee.academic_session_id), []),
+            fee.due_date,
+        )
+        fee.refresh_status()
+    StudentFee.objects.bulk_update(
+        fees, ["discount_amount", "status", "is_overdue"], batch_size=get_batch_size()
+    )
+    return len(fees)
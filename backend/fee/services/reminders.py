@@ -0,0 +1,184 @@
+# fees/services/reminders.py
+"""
+Batched payment reminder dispatch.
+
+The old ``send_payment_reminders`` task ran an ``exists()`` query per fee,
+created its reminder, sent the email over a fresh SMTP connection and saved
+the reminder again - four round trips and one connection per fee.
+``ReminderDispatcher`` instead:
+
+1. selects the fees due a reminder in one query: unpaid, with contact
+   details joined in, and ``NOT EXISTS`` a reminder over the same channel
+   within ``settings.PAYMENT_REMINDER_COOLDOWN_DAYS`` - sent, skipped for
+   want of contact details or failed alike, so a fee without an address
+   or a provider that keeps failing costs one row per cooldown, not one
+   per run;
+2. creates their ``PaymentReminder`` rows with one ``bulk_create``;
+3. sends them with ``utils.delivery.deliver``: a few workers per channel
+   (``settings.PAYMENT_REMINDER_CHANNELS``), each reusing one email
+   backend connection / Twilio client for all of its messages, under a
+   shared per-channel rate limit;
+4. records every reminder's delivery status with one ``bulk_update``.
+
+Email goes through ``EMAIL_BACKEND``, so the console, file and locmem
+backends (or a local debug SMTP server) work for testing.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from django.utils import timezone
+
+from utils.delivery import SENDERS, deliver
+
+from ..models import PaymentReminder, StudentFee
+
+logger = logging.getLogger(__name__)
+
+UNPAID_STATUSES = ["PENDING", "PARTIAL", "OVERDUE"]
+
+# Outcomes that start a fee's cooldown; PENDING rows of a dispatch that
+# died before recording its outcome are retried
+ATTEMPTED_STATUSES = ["SENT", "SKIPPED", "FAILED"]
+
+# Reminder rows written per INSERT/UPDATE
+BATCH_SIZE = 1000
+
+DEFAULT_CHANNELS = {
+    "EMAIL": {"workers": 2, "rate": 10},
+    "SMS": {"workers": 2, "rate": 1},
+}
+
+
+def channel_settings(channel):
+    """{"workers", "rate"} of a channel; rate is messages per second, 0 = none"""
+    configured = getattr(settings, "PAYMENT_REMINDER_CHANNELS", {})
+    return {**DEFAULT_CHANNELS[channel], **configured.get(channel, {})}
+
+
+# ============================================================================
+# DISPATCH
+# ============================================================================
+
+
+class ReminderDispatcher:
+    """Sends one reminder per eligible fee over ``channel``"""
+
+    def __init__(
+        self,
+        channel="EMAIL",
+        reminder_type="OVERDUE",
+        student_ids=None,
+        fee_ids=None,
+        overdue_only=True,
+        cooldown_days=None,
+    ):
+        if channel not in SENDERS:
+            raise ValueError(f"Unknown reminder channel: {channel}")
+        self.channel = channel
+        self.reminder_type = reminder_type
+        self.student_ids = student_ids
+        self.fee_ids = fee_ids
+        self.overdue_only = overdue_only
+        if cooldown_days is None:
+            cooldown_days = getattr(settings, "PAYMENT_REMINDER_COOLDOWN_DAYS", 7)
+        self.cooldown = timedelta(days=cooldown_days)
+
+    def eligible_fees(self):
+        recently_reminded = PaymentReminder.objects.filter(
+            Q(is_sent=True) | Q(delivery_status__in=ATTEMPTED_STATUSES),
+            student_fee=OuterRef("pk"),
+            channel=self.channel,
+            sent_date__gte=timezone.now() - self.cooldown,
+        )
+        fees = StudentFee.objects.filter(status__in=UNPAID_STATUSES).filter(
+            ~Exists(recently_reminded)
+        )
+        if self.overdue_only:
+            fees = fees.filter(due_date__lt=timezone.now().date())
+        if self.student_ids:
+            fees = fees.filter(student_id__in=self.student_ids)
+        if self.fee_ids is not None:
+            fees = fees.filter(pk__in=self.fee_ids)
+        return fees.order_by("pk").values_list(
+            "pk",
+            "fee_structure__name",
+            "amount_due",
+            "amount_paid",
+            "discount_amount",
+            "due_date",
+            "student__user__email",
+            "student__parent_contact",
+            "student__phone_number",
+        )
+
+    def create_reminders(self):
+        reminders = []
+        for (
+            fee_id,
+            fee_name,
+            amount_due,
+            amount_paid,
+            discount,
+            due_date,
+            email,
+            parent_phone,
+            student_phone,
+        ) in self.eligible_fees():
+            reminder = PaymentReminder(
+                student_fee_id=fee_id,
+                reminder_type=self.reminder_type,
+                channel=self.channel,
+                message=(
+                    f"Payment reminder for {fee_name} - Amount: "
+                    f"₦{amount_due - amount_paid - discount} (due {due_date})"
+                ),
+            )
+            reminder.subject = f"Payment Reminder - {fee_name}"
+            reminder.body = reminder.message
+            reminder.address = (
+                email if self.channel == "EMAIL" else parent_phone or student_phone
+            )
+            reminders.append(reminder)
+        # Postgres returns the primary keys needed by the bulk_update below
+        PaymentReminder.objects.bulk_create(reminders, batch_size=BATCH_SIZE)
+        return reminders
+
+    def send(self, reminders):
+        sendable = []
+        for reminder in reminders:
+            if reminder.address:
+                sendable.append(reminder)
+            else:
+                reminder.delivery_status = "SKIPPED"
+                reminder.delivery_error = f"No {self.channel.lower()} contact"
+
+        options = channel_settings(self.channel)
+        for reminder in deliver(
+            self.channel, sendable, options["workers"], options["rate"]
+        ):
+            if reminder.delivered:
+                reminder.is_sent = True
+                reminder.delivery_status = "SENT"
+                reminder.sent_date = reminder.delivered_at
+            else:
+                reminder.delivery_status = "FAILED"
+                reminder.delivery_error = reminder.error
+
+        PaymentReminder.objects.bulk_update(
+            reminders,
+            ["is_sent", "delivery_status", "delivery_error", "sent_date"],
+            batch_size=BATCH_SIZE,
+        )
+
+    def run(self):
+        reminders = self.create_reminders()
+        if reminders:
+            self.send(reminders)
+        sent = sum(reminder.is_sent for reminder in reminders)
+        logger.info(
+            f"📨 Sent {sent} of {len(reminders)} {self.channel} payment reminders"
+        )
+        return sent
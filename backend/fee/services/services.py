@@ -1,25 +1,34 @@
 # fees/services.py
 from django.db import transaction
+from django.db.models import F, Q
 from django.utils import timezone
 from django.core.mail import send_mail
 from django.conf import settings
 from ..models import StudentFee, Payment, FeeStructure, StudentDiscount
 from .paystack_service import PaystackService
+from .fee_generation import FeeGenerator, recalculate_fees
+from .reminders import ReminderDispatcher
+from utils.delivery import SENDERS
 from students.models import Student
+from utils.exporting import CSVExport
 
 
 class FeeService:
     @staticmethod
     def bulk_generate_fees(data):
         """Generate fees in bulk for students"""
-        # Implementation for bulk fee generation
-        pass
+        return FeeGenerator(**data).run()
 
     @staticmethod
     def recalculate_student_fee(student_fee):
         """Recalculate student fee with discounts"""
-        # Implementation for fee recalculation
-        pass
+        recalculate_fees([student_fee])
+        return student_fee
+
+    @staticmethod
+    def recalculate_student_fees(student_fees):
+        """Recalculate many student fees with discounts, in bulk"""
+        return recalculate_fees(student_fees)
 
 
 class PaymentService:
@@ -36,10 +45,17 @@ class PaymentService:
         return paystack.verify_payment(reference)
 
     @staticmethod
-    def send_bulk_reminders(student_ids, reminder_type):
+    def send_bulk_reminders(student_ids, reminder_type, channel=None):
         """Send bulk payment reminders"""
-        # Implementation for bulk reminders
-        pass
+        # Older clients send the channel as the reminder type
+        if reminder_type in SENDERS:
+            channel, reminder_type = reminder_type, "DUE_DATE"
+        return ReminderDispatcher(
+            channel=channel or "EMAIL",
+            reminder_type=reminder_type,
+            student_ids=student_ids,
+            overdue_only=False,
+        ).run()
 
 
 class ReportService:
@@ -49,8 +65,87 @@ class ReportService:
         # Implementation for report generation
         pass
 
+    FEE_COLUMNS = [
+        ("registration_number", "student__registration_number"),
+        ("first_name", "student__user__first_name"),
+        ("last_name", "student__user__last_name"),
+        ("student_class", "student__student_class"),
+        ("academic_session", "academic_session__name"),
+        ("term", "term"),
+        ("fee", "fee_structure__name"),
+        ("fee_type", "fee_structure__fee_type"),
+        ("amount_due", "amount_due"),
+        ("discount_amount", "discount_amount"),
+        ("late_fee", "late_fee"),
+        ("amount_paid", "amount_paid"),
+        ("balance", "balance_due"),
+        ("due_date", "due_date"),
+        ("status", "status"),
+    ]
+
+    PAYMENT_COLUMNS = [
+        ("reference", "reference"),
+        ("registration_number", "student_fee__student__registration_number"),
+        ("first_name", "student_fee__student__user__first_name"),
+        ("last_name", "student_fee__student__user__last_name"),
+        ("fee", "student_fee__fee_structure__name"),
+        ("amount", "amount"),
+        ("currency", "currency"),
+        ("payment_gateway", "payment_gateway"),
+        ("payment_method", "payment_method"),
+        ("status", "status"),
+        ("verified", "verified"),
+        ("payment_date", "payment_date"),
+        ("receipt_number", "receipt_number"),
+    ]
+
     @staticmethod
     def export_csv(data):
-        """Export report as CSV"""
-        # Implementation for CSV export
-        pass
+        """
+        Report rows as a streaming ``CSVExport``: payments for payment
+        history and gateway analysis, student fees for the other reports
+        """
+        if data["report_type"] in ["PAYMENT_HISTORY", "GATEWAY_ANALYSIS"]:
+            return CSVExport(
+                ReportService._payments(data).order_by("-payment_date", "id"),
+                ReportService.PAYMENT_COLUMNS,
+                "fee_payments.csv",
+            )
+
+        fees = ReportService._fees(data, prefix="")
+        if data["report_type"] == "OVERDUE":
+            fees = fees.filter(Q(is_overdue=True) | Q(status="OVERDUE"))
+        if data.get("date_from"):
+            fees = fees.filter(due_date__gte=data["date_from"])
+        if data.get("date_to"):
+            fees = fees.filter(due_date__lte=data["date_to"])
+        fees = fees.annotate(
+            balance_due=F("amount_due") - F("amount_paid") - F("discount_amount")
+        ).order_by("student__student_class", "student__registration_number", "id")
+        return CSVExport(fees, ReportService.FEE_COLUMNS, "fee_report.csv")
+
+    @staticmethod
+    def _fees(data, prefix):
+        """Student fee filters of a report, on ``prefix``-ed lookups"""
+        filters = {
+            "academic_session_id": data.get("academic_session_id"),
+            "student__education_level": data.get("education_level"),
+            "student__student_class": data.get("student_class"),
+            "fee_structure__fee_type": data.get("fee_type"),
+            "status": data.get("status"),
+        }
+        model = Payment if prefix else StudentFee
+        return model.objects.filter(
+            **{f"{prefix}{lookup}": value for lookup, value in filters.items() if value}
+        )
+
+    @staticmethod
+    def _payments(data):
+        payments = ReportService._fees(data, prefix="student_fee__")
+        if data.get("payment_gateway"):
+            payments = payments.filter(payment_gateway=data["payment_gateway"])
+        if data.get("date_from"):
+            payments = payments.filter(payment_date__date__gte=data["date_from"])
+        if data.get("date_to"):
+            payments = payments.filter(payment_date__date__lte=data["date_to"])
+        return payments
@@ -1,3 +1,229 @@
-from django.test import TestCase
+import datetime
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core import mail
+from django.db.models import Count
+from django.test import TestCase, override_settings
+from django.urls import Resolver404, resolve
+
+from academics.models import AcademicSession, Term
+from students.models import Student
+from users.models import CustomUser
+
+from .models import (
+    FeeDiscount,
+    FeeStructure,
+    PaymentReminder,
+    StudentDiscount,
+    StudentFee,
+)
+from .services.reminders import ReminderDispatcher
+from .services.services import FeeService
+
+
+class FeeDataTestCase(TestCase):
+    """A session with terms, three primary students and their fee structures"""
+
+    @classmethod
+    def setUpTestData(cls):
+        with cls.captureOnCommitCallbacks(execute=True):
+            cls.session = AcademicSession.objects.create(
+                name="2025/2026",
+                start_date=datetime.date(2025, 9, 1),
+                end_date=datetime.date(2026, 7, 31),
+            )
+            for name, month in [("FIRST", 9), ("SECOND", 1), ("THIRD", 4)]:
+                year = 2025 if month == 9 else 2026
+                Term.objects.create(
+                    name=name,
+                    academic_session=cls.session,
+                    start_date=datetime.date(year, month, 8),
+                    end_date=datetime.date(year, month + 2, 20),
+                )
+
+        cls.students = []
+        for i, student_class in enumerate(["PRIMARY_1", "PRIMARY_1", "PRIMARY_2"]):
+            user = CustomUser.objects.create_user(
+                email=f"payer{i}@example.com",
+                username=f"payer{i}",
+                first_name="Payer",
+                last_name=str(i),
+                role="student",
+                password="x",
+            )
+            cls.students.append(
+                Student.objects.create(
+                    user=user,
+                    gender="M",
+                    date_of_birth=datetime.date(2017, 1, 1),
+                    student_class=student_class,
+                    education_level="PRIMARY",
+                )
+            )
+
+        cls.tuition = FeeStructure.objects.create(
+            name="Primary 1 tuition",
+            fee_type="TUITION",
+            education_level="PRIMARY",
+            student_class="PRIMARY_1",
+            amount=Decimal("50000.00"),
+            frequency="TERMLY",
+        )
+        FeeStructure.objects.create(
+            name="Primary 1 uniform",
+            fee_type="UNIFORM",
+            education_level="PRIMARY",
+            student_class="PRIMARY_1",
+            amount=Decimal("8000.00"),
+            frequency="ONE_TIME",
+        )
+        FeeStructure.objects.create(
+            name="Primary 2 tuition",
+            fee_type="TUITION",
+            education_level="PRIMARY",
+            student_class="PRIMARY_2",
+            amount=Decimal("55000.00"),
+            frequency="TERMLY",
+        )
+
+        cls.scholarship = FeeDiscount.objects.create(
+            name="Scholarship",
+            discount_type="PERCENTAGE",
+            value=Decimal("10"),
+            applicable_fee_types=["TUITION"],
+            valid_from=datetime.date(2025, 1, 1),
+            valid_to=datetime.date(2026, 12, 31),
+        )
+        StudentDiscount.objects.create(
+            student=cls.students[0],
+            discount=cls.scholarship,
+            academic_session=cls.session,
+            applied_by=cls.students[0].user,
+        )
+
+    def generate(self, **data):
+        return FeeService.bulk_generate_fees(
+            {"academic_session_id": self.session.pk, **data}
+        )
+
+
+class BulkFeeGenerationTest(FeeDataTestCase):
+    """Bulk generation creates a session's fees in a fixed number of queries"""
+
+    def test_generates_once_with_discounts(self):
+        with self.assertNumQueries(6):
+            preview = self.generate(mode="DRY_RUN")
+        self.assertEqual(preview["new_fees"], 3 + 1 + 3 + 1 + 3)
+        self.assertFalse(StudentFee.objects.exists())
+
+        result = self.generate()
+        self.assertEqual(result["created"], 11)
+        self.assertEqual(StudentFee.objects.count(), 11)
+
+        fees = StudentFee.objects.filter(student=self.students[0])
+        self.assertEqual(
+            sorted(
+                (fee.fee_structure.fee_type, fee.term, fee.discount_amount)
+                for fee in fees
+            ),
+            [
+                ("TUITION", "FIRST", Decimal("5000.00")),
+                ("TUITION", "SECOND", Decimal("5000.00")),
+                ("TUITION", "THIRD", Decimal("5000.00")),
+                ("UNIFORM", "FIRST", Decimal("0.00")),
+            ],
+        )
+        self.assertEqual(
+            fees.get(term="SECOND", fee_structure=self.tuition).due_date,
+            datetime.date(2026, 1, 8),
+        )
+
+        # Running again creates nothing
+        self.assertEqual(self.generate()["created"], 0)
+        self.assertEqual(StudentFee.objects.count(), 11)
+
+    def test_diff_and_recalculation(self):
+        self.generate(term="FIRST")
+        self.tuition.amount = Decimal("60000.00")
+        self.tuition.save()
+
+        diff = self.generate(mode="DIFF", term="FIRST")
+        self.assertEqual(diff["new_fees"], 0)
+        self.assertEqual(diff["changed_fees"], 2)
+
+        StudentDiscount.objects.update(is_active=False)
+        FeeService.recalculate_student_fees(
+            StudentFee.objects.filter(student=self.students[0])
+        )
+        self.assertFalse(
+            StudentFee.objects.filter(
+                student=self.students[0], discount_amount__gt=0
+            ).exists()
+        )
+
+
+@override_settings(
+    PAYMENT_REMINDER_CHANNELS={"EMAIL": {"workers": 2, "rate": 0}},
+)
+class PaymentReminderDispatchTest(FeeDataTestCase):
+    """Overdue fees get one reminder per cooldown, sent over pooled connections"""
+
+    def test_dispatch(self):
+        self.generate(due_date=datetime.date(2025, 9, 1))
+        StudentFee.objects.filter(student=self.students[2]).update(status="PAID")
+        self.students[1].user.email = ""
+        self.students[1].user.save()
+
+        with self.assertNumQueries(3):
+            sent = ReminderDispatcher().run()
+        self.assertEqual(sent, 4)
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(mail.outbox[0].to, ["payer0@example.com"])
+        self.assertEqual(
+            dict(
+                PaymentReminder.objects.values_list("delivery_status").annotate(
+                    count=Count("id")
+                )
+            ),
+            {"SENT": 4, "SKIPPED": 4},
+        )
+
+        # Reminded and skipped fees alike wait for the cooldown
+        self.assertEqual(ReminderDispatcher().run(), 0)
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(PaymentReminder.objects.count(), 8)
+        self.assertEqual(ReminderDispatcher(cooldown_days=0).run(), 4)
+        self.assertEqual(PaymentReminder.objects.count(), 16)
+
+    def test_connection_failure_fails_the_reminders(self):
+        self.generate(due_date=datetime.date(2025, 9, 1))
+        with mock.patch(
+            "django.core.mail.backends.locmem.EmailBackend.open",
+            side_effect=ConnectionRefusedError("SMTP is down"),
+        ):
+            self.assertEqual(ReminderDispatcher().run(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertEqual(
+            set(PaymentReminder.objects.values_list("delivery_status", flat=True)),
+            {"FAILED"},
+        )
+        self.assertIn(
+            "SMTP is down", PaymentReminder.objects.first().delivery_error
+        )
+        # Failed sends back off until the cooldown too
+        self.assertEqual(ReminderDispatcher().run(), 0)
+        self.assertEqual(
+            PaymentReminder.objects.count(), StudentFee.objects.count()
+        )
+
+
+class ReportRoutesTest(TestCase):
+    """Only the CSV export of the report viewset is routed"""
+
+    def test_routes(self):
+        match = resolve("/api/fee/reports/export_csv/")
+        self.assertEqual(match.url_name, "fee-report-export-csv")
+        for path in ["/api/fee/reports/generate/", "/api/fee/reports/summary/"]:
+            with self.assertRaises(Resolver404):
+                resolve(path)
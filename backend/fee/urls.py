@@ -2,7 +2,7 @@
 from django.urls import path, include
 from django.views.decorators.csrf import csrf_exempt
 from . import views
-from .views import StudentFeeViewSet
+from .views import ReportViewSet, StudentFeeViewSet
 from academics.views import AcademicSessionViewSet, TermViewSet
 from rest_framework.routers import DefaultRouter
 
@@ -15,5 +15,13 @@ router.register(
 )
 router.register(r"terms", TermViewSet, basename="term")
 
-urlpatterns = []
+# Only the CSV export of ReportViewSet is published; its other actions are
+# backed by unfinished ReportService methods
+urlpatterns = [
+    path(
+        "reports/export_csv/",
+        ReportViewSet.as_view({"post": "export_csv"}),
+        name="fee-report-export-csv",
+    ),
+]
 urlpatterns += router.urls
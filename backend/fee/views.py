@@ -7,7 +7,6 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Sum, Q, Count
 from django.shortcuts import get_object_or_404
 from django.utils import timezone
-from django.http import HttpResponse
 from django.template.loader import render_to_string
 from django.core.exceptions import ValidationError
 import csv
@@ -163,7 +162,10 @@ class StudentFeeViewSet(viewsets.ModelViewSet):
 
             # Apply discount
             student_discount = StudentDiscount.objects.create(
-                student=student_fee.student, discount=discount, applied_by=request.user
+                student=student_fee.student,
+                discount=discount,
+                academic_session=student_fee.academic_session,
+                applied_by=request.user,
             )
 
             # Recalculate fee amount
@@ -182,6 +184,9 @@ class StudentFeeViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=["post"])
     def bulk_generate(self, request):
         """Bulk generate fees for students"""
+        if not request.user.is_staff:
+            return Response({"error": "Permission denied"}, status=403)
+
         serializer = BulkFeeGenerationSerializer(data=request.data)
         if serializer.is_valid():
             result = FeeService.bulk_generate_fees(serializer.validated_data)
@@ -541,9 +546,12 @@ class StudentDiscountViewSet(viewsets.ModelViewSet):
         student_discount.save()
 
         # Recalculate affected fees
-        student_fees = StudentFee.objects.filter(student=student_discount.student)
-        for fee in student_fees:
-            FeeService.recalculate_student_fee(fee)
+        FeeService.recalculate_student_fees(
+            StudentFee.objects.filter(
+                student=student_discount.student,
+                academic_session=student_discount.academic_session,
+            )
+        )
 
         return Response({"message": "Discount deactivated successfully"})
 
@@ -561,7 +569,7 @@ class PaymentReminderViewSet(viewsets.ModelViewSet):
     serializer_class = PaymentReminderSerializer
     permission_classes = [permissions.IsAuthenticated, IsAdminOrReadOnly]
     filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
-    filterset_fields = ["sent", "reminder_type"]
+    filterset_fields = ["is_sent", "reminder_type", "channel", "delivery_status"]
     search_fields = [
         "student_fee__student__user__first_name",
         "student_fee__student__user__last_name",
@@ -573,11 +581,12 @@ class PaymentReminderViewSet(viewsets.ModelViewSet):
     def send_bulk(self, request):
         """Send bulk payment reminders"""
         reminder_type = request.data.get("reminder_type", "EMAIL")
+        channel = request.data.get("channel")
         student_ids = request.data.get("student_ids", [])
 
         try:
             count = PaymentService.send_bulk_reminders(
-                student_ids=student_ids, reminder_type=reminder_type
+                student_ids=student_ids, reminder_type=reminder_type, channel=channel
             )
             return Response({"message": f"{count} reminders sent successfully"})
         except Exception as e:
@@ -587,7 +596,8 @@ class PaymentReminderViewSet(viewsets.ModelViewSet):
     def mark_sent(self, request, pk=None):
         """Mark reminder as sent"""
         reminder = self.get_object()
-        reminder.sent = True
+        reminder.is_sent = True
+        reminder.delivery_status = "SENT"
         reminder.sent_date = timezone.now()
         reminder.save()
 
@@ -613,21 +623,11 @@ class ReportViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=["post"])
     def export_csv(self, request):
-        """Export report as CSV"""
+        """Stream the report rows as CSV (?compress=gzip for .csv.gz)"""
         serializer = FeeReportSerializer(data=request.data)
         if serializer.is_valid():
-            try:
-                # Generate CSV content
-                csv_content = ReportService.export_csv(serializer.validated_data)
-
-                response = HttpResponse(csv_content, content_type="text/csv")
-                response["Content-Disposition"] = (
-                    'attachment; filename="fee_report.csv"'
-                )
-                return response
-
-            except Exception as e:
-                return Response({"error": str(e)}, status=400)
+            export = ReportService.export_csv(serializer.validated_data)
+            return export.response(request)
         return Response(serializer.errors, status=400)
 
     @action(detail=False, methods=["get"])
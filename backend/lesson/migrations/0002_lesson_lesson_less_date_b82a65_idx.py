@@ -0,0 +1,22 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0011_alter_classroomteacherassignment_classroom_and_more'),
+        ('lesson', '0001_initial'),
+        ('subject', '0001_initial'),
+        ('teacher', '0002_rename_academic_year_teacherschedule_academic_session_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='lesson',
+            index=models.Index(fields=['-date', 'start_time', '-id'], name='lesson_less_date_b82a65_idx'),
+        ),
+    ]
@@ -117,6 +117,7 @@ class Lesson(models.Model):
         unique_together = ['classroom', 'date', 'start_time', 'subject']
         indexes = [
             models.Index(fields=['date', 'start_time']),
+            models.Index(fields=['-date', 'start_time', '-id']),
             models.Index(fields=['teacher', 'date']),
             models.Index(fields=['classroom', 'date']),
             models.Index(fields=['status']),
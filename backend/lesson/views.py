@@ -1166,6 +1166,8 @@ class LessonViewSet(viewsets.ModelViewSet):
     ]
 
     ordering = ["-date", "start_time"]
+    # Keyset pagination order, backed by the (date, start_time, id) index
+    cursor_ordering = ("-date", "start_time", "-id")
 
     def get_serializer_class(self):
         """Return appropriate serializer based on action"""
@@ -0,0 +1,180 @@
+# messaging/counters.py
+"""
+Mailbox counters.
+
+``MessageViewSet.stats`` used to run five ``COUNT`` queries over ``Message``
+on every call, and the frontend polls it for the unread badge. The same
+figures are now kept per user in ``MailboxCounter``:
+
+* ``inbox`` / ``unread`` - received, not deleted (unread: not read);
+* ``sent`` / ``drafts`` - sent, not deleted (drafts: ``status="draft"``);
+* ``archived`` - sent or received, archived and not deleted.
+
+Every ``Message`` save/delete (``messaging/signals.py``) works out what the
+message counted towards before and after - from the state it was loaded
+with - and applies the difference with ``F()`` updates in the same
+transaction, so concurrent writers never lose an increment. Writes that
+send no signals (the bulk message fan-out) call ``apply_deltas`` directly.
+
+Counter rows are created on demand: a user without one (or a message saved
+without a known previous state) is recounted from ``Message``. ``python
+manage.py reconcile_mailbox_counters`` recounts everybody, e.g. after
+writes that bypassed the ORM.
+"""
+
+from collections import Counter, defaultdict
+
+from django.db.models import Count, F, Q
+
+from .models import MailboxCounter, Message
+
+COUNTER_FIELDS = ["inbox", "unread", "sent", "drafts", "archived"]
+
+# Counter rows written per INSERT by a reconcile
+RECONCILE_BATCH_SIZE = 1000
+
+
+def state_counts(state):
+    """user_id -> Counter of the mailbox counters a message state counts in"""
+    counts = defaultdict(Counter)
+    if state is None:
+        return counts
+    sender_id, recipient_id, status, is_read, is_archived, is_deleted = state
+    if is_deleted:
+        return counts
+    counts[recipient_id]["inbox"] += 1
+    if not is_read:
+        counts[recipient_id]["unread"] += 1
+    counts[sender_id]["sent"] += 1
+    if status == "draft":
+        counts[sender_id]["drafts"] += 1
+    if is_archived:
+        for user_id in {sender_id, recipient_id}:
+            counts[user_id]["archived"] += 1
+    return counts
+
+
+def state_deltas(old_state, new_state):
+    """user_id -> {counter: change} between two message states"""
+    old, new = state_counts(old_state), state_counts(new_state)
+    deltas = {}
+    for user_id in old.keys() | new.keys():
+        delta = {
+            field: new[user_id][field] - old[user_id][field]
+            for field in COUNTER_FIELDS
+            if new[user_id][field] != old[user_id][field]
+        }
+        if delta:
+            deltas[user_id] = delta
+    return deltas
+
+
+def apply_deltas(deltas):
+    """
+    Apply user_id -> {counter: change}: one F() update per distinct change;
+    users without a counter row yet are recounted instead
+    """
+    groups = defaultdict(list)
+    for user_id, delta in deltas.items():
+        if any(delta.values()):
+            groups[frozenset(delta.items())].append(user_id)
+    if not groups:
+        return
+
+    user_ids = [user_id for group in groups.values() for user_id in group]
+    existing = set(
+        MailboxCounter.objects.filter(user_id__in=user_ids).values_list(
+            "user_id", flat=True
+        )
+    )
+    for delta, group in groups.items():
+        group = [user_id for user_id in group if user_id in existing]
+        if group:
+            MailboxCounter.objects.filter(user_id__in=group).update(
+                **{field: F(field) + change for field, change in delta}
+            )
+    missing = set(user_ids) - existing
+    if missing:
+        reconcile_counters(missing)
+
+
+# ============================================================================
+# RECOUNTING
+# ============================================================================
+
+
+def count_mailboxes(user_ids=None):
+    """user_id -> {counter: count}, counted from the messages"""
+    messages = Message.objects.filter(is_deleted=False).order_by()
+    received = messages
+    sent = messages
+    if user_ids is not None:
+        received = received.filter(recipient_id__in=user_ids)
+        sent = sent.filter(sender_id__in=user_ids)
+
+    counts = defaultdict(lambda: dict.fromkeys(COUNTER_FIELDS, 0))
+    for row in received.values("recipient_id").annotate(
+        inbox=Count("id"),
+        unread=Count("id", filter=Q(is_read=False)),
+        archived=Count("id", filter=Q(is_archived=True)),
+    ):
+        counts[row["recipient_id"]].update(
+            inbox=row["inbox"], unread=row["unread"], archived=row["archived"]
+        )
+    for row in sent.values("sender_id").annotate(
+        sent=Count("id"),
+        drafts=Count("id", filter=Q(status="draft")),
+        # Messages to oneself are already archived on the recipient side
+        archived=Count(
+            "id", filter=Q(is_archived=True) & ~Q(recipient_id=F("sender_id"))
+        ),
+    ):
+        user_counts = counts[row["sender_id"]]
+        user_counts["sent"] = row["sent"]
+        user_counts["drafts"] = row["drafts"]
+        user_counts["archived"] += row["archived"]
+    return counts
+
+
+def reconcile_counters(user_ids=None):
+    """
+    Recount the counters of ``user_ids`` (everybody when None) and write
+    the ones that drifted; returns how many rows were written
+    """
+    counts = count_mailboxes(user_ids)
+    if user_ids is not None:
+        for user_id in user_ids:
+            # Users without messages get a row of zeros
+            counts.setdefault(user_id, dict.fromkeys(COUNTER_FIELDS, 0))
+        current = MailboxCounter.objects.filter(user_id__in=user_ids)
+    else:
+        current = MailboxCounter.objects.all()
+
+    stale = {
+        counter.user_id: counter
+        for counter in current
+        if {field: getattr(counter, field) for field in COUNTER_FIELDS}
+        != counts[counter.user_id]
+    }
+    missing = counts.keys() - {counter.user_id for counter in current}
+    rows = [
+        MailboxCounter(user_id=user_id, **counts[user_id])
+        for user_id in [*stale, *missing]
+    ]
+    MailboxCounter.objects.bulk_create(
+        rows,
+        batch_size=RECONCILE_BATCH_SIZE,
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=[*COUNTER_FIELDS, "updated_at"],
+    )
+    return len(rows)
+
+
+def get_counter(user):
+    """The user's counter row, recounted into existence if missing"""
+    counter = MailboxCounter.objects.filter(user_id=user.pk).first()
+    if counter is None:
+        reconcile_counters([user.pk])
+        counter = MailboxCounter.objects.get(user_id=user.pk)
+    return counter
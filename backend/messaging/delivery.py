@@ -0,0 +1,494 @@
+# messaging/delivery.py
+"""
+Bulk message fan-out.
+
+``BulkMessageViewSet.send_now`` used to flip the status to ``sent`` without
+creating a single ``Message``. Sending a bulk message now runs outside the
+request, like the report batches and attendance imports:
+
+* ``settings.BULK_MESSAGE_MODE = "thread"`` (default) - a background thread
+  in the web process, started once the request's transaction commits;
+* ``"celery"`` - ``messaging.tasks.send_bulk_message`` on a worker (falls
+  back to a thread if the broker is unavailable).
+
+Scheduled messages (``status="pending"`` with a ``scheduled_at``) are picked
+up by ``send_due_bulk_messages`` - the ``send_scheduled_messages``
+management command or the ``messaging.tasks.send_scheduled_bulk_messages``
+periodic task.
+
+Recipients are the union of ``recipient_roles``, ``recipient_groups`` and
+``custom_recipients``, resolved as one query over user IDs (each group is an
+``id IN (subquery)``, so nobody is counted twice) and read in keyset chunks
+of ``settings.BULK_MESSAGE_CHUNK_SIZE``. Each chunk is a ``bulk_create`` of
+its ``Message`` rows, email/SMS delivery through ``utils.delivery`` (pooled
+connections, ``settings.BULK_MESSAGE_CHANNELS`` workers and rate per
+channel; no transaction is held open while sending) and one transaction
+with a ``bulk_update`` of the delivery outcome and an ``F()`` update of the
+bulk message counters.
+
+A run holds the bulk message in ``sending`` under a lease: every chunk
+refreshes ``updated_at``, and a ``sending`` message untouched for
+``settings.BULK_MESSAGE_LEASE_SECONDS`` is taken to belong to a dead worker
+or web process. ``run_bulk_message`` claims it again (``send_due_bulk_messages``
+does so on its schedule) and the new run first delivers the messages the dead
+one created but never sent (still ``pending``), then carries on with the
+recipients who have no message yet. Nobody gets a second ``Message``; a
+provider that accepted a message just before the process died may deliver
+it twice.
+
+Recipient groups are ``"<kind>:<value>"`` strings, optionally suffixed with
+``":parents"`` to reach the students' parents instead of the students:
+``class:PRIMARY_1``, ``level:NURSERY``, ``section:<id>``,
+``classroom:<id>``. A bare class code (``"PRIMARY_1"``) means ``class:``.
+
+Only administrators fan out to roles, classes, levels and sections.
+``check_audience`` holds everyone else to ``sender_audience``: teachers
+reach the students (and parents) of the classrooms they teach, as
+``classroom:<id>`` groups or custom recipients; parents reach their
+children's teachers.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+from functools import reduce
+from operator import or_
+
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.db import connections, transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from users.models import CustomUser
+from utils.delivery import EMAIL, SMS, RateLimiter, deliver
+
+from .counters import apply_deltas
+from .models import BulkMessage, Message
+
+logger = logging.getLogger(__name__)
+
+
+MODE_THREAD = "thread"
+MODE_CELERY = "celery"
+
+# Message type -> external channel; the others are in-app only
+CHANNELS = {"email": EMAIL, "sms": SMS}
+
+DEFAULT_CHANNELS = {
+    EMAIL: {"workers": 4, "rate": 20},
+    SMS: {"workers": 2, "rate": 1},
+}
+
+GROUP_FILTERS = {
+    "class": "student_class",
+    "level": "education_level",
+    "section": "studentenrollment__classroom__section_id",
+    "classroom": "studentenrollment__classroom_id",
+}
+
+# Statuses a bulk message can be sent from
+SENDABLE_STATUSES = ["draft", "pending"]
+
+DEFAULT_LEASE_SECONDS = 30 * 60
+
+
+def get_bulk_mode():
+    return getattr(settings, "BULK_MESSAGE_MODE", MODE_THREAD)
+
+
+def get_chunk_size():
+    return max(1, int(getattr(settings, "BULK_MESSAGE_CHUNK_SIZE", 500)))
+
+
+def get_lease_seconds():
+    return int(getattr(settings, "BULK_MESSAGE_LEASE_SECONDS", DEFAULT_LEASE_SECONDS))
+
+
+def lease_expired(now=None):
+    """Q of ``sending`` bulk messages whose run stopped renewing its lease"""
+    expired = (now or timezone.now()) - timedelta(seconds=get_lease_seconds())
+    return Q(status="sending", updated_at__lt=expired)
+
+
+def is_stalled(bulk_message):
+    """Whether a ``sending`` bulk message's run died (its lease expired)"""
+    return BulkMessage.objects.filter(lease_expired(), pk=bulk_message.pk).exists()
+
+
+def channel_settings(channel):
+    """{"workers", "rate"} of a channel; rate is messages per second, 0 = none"""
+    configured = getattr(settings, "BULK_MESSAGE_CHANNELS", {})
+    return {**DEFAULT_CHANNELS[channel], **configured.get(channel, {})}
+
+
+# ============================================================================
+# RECIPIENTS
+# ============================================================================
+
+
+def parse_group(group):
+    """"kind:value[:parents]" -> (kind, value, parents); ValueError if unknown"""
+    parts = str(group).split(":")
+    if len(parts) == 1:
+        parts = ["class", *parts]
+    parents = len(parts) == 3 and parts[2] == "parents"
+    if len(parts) not in (2, 3) or (len(parts) == 3 and not parents):
+        raise ValueError(f"Invalid recipient group: {group}")
+    kind, value = parts[0], parts[1]
+    if kind not in GROUP_FILTERS or not value:
+        raise ValueError(f"Invalid recipient group: {group}")
+    if kind in ("section", "classroom") and not value.isdigit():
+        raise ValueError(f"Invalid recipient group: {group}")
+    return kind, value, parents
+
+
+def group_condition(group):
+    """Q on CustomUser for the students (or their parents) of one group"""
+    from parent.models import ParentProfile
+    from students.models import Student
+
+    kind, value, parents = parse_group(group)
+    students = Student.objects.filter(is_active=True, **{GROUP_FILTERS[kind]: value})
+    if kind in ("section", "classroom"):
+        students = students.filter(studentenrollment__is_active=True)
+    if parents:
+        return Q(
+            pk__in=ParentProfile.objects.filter(students__in=students).values("user_id")
+        )
+    return Q(pk__in=students.values("user_id"))
+
+
+def parse_recipient_id(pk):
+    """A custom recipient's user ID; ValueError if it is not one"""
+    if isinstance(pk, bool) or not str(pk).strip().isdigit():
+        raise ValueError(f"Invalid recipient ID: {pk}")
+    return int(pk)
+
+
+def resolve_recipients(bulk_message):
+    """The distinct active users a bulk message goes to, sender excluded"""
+    conditions = []
+    if bulk_message.recipient_roles:
+        conditions.append(Q(role__in=bulk_message.recipient_roles))
+    if bulk_message.custom_recipients:
+        conditions.append(
+            Q(pk__in=[parse_recipient_id(pk) for pk in bulk_message.custom_recipients])
+        )
+    conditions.extend(group_condition(group) for group in bulk_message.recipient_groups)
+    if not conditions:
+        return CustomUser.objects.none()
+    return CustomUser.objects.filter(reduce(or_, conditions), is_active=True).exclude(
+        pk=bulk_message.sender_id
+    )
+
+
+# ============================================================================
+# SENDERS
+# ============================================================================
+
+
+def is_bulk_admin(user):
+    return user.is_superuser or user.is_admin
+
+
+def teacher_classroom_ids(user):
+    """Active classrooms ``user`` is the class or a subject teacher of"""
+    from classroom.models import Classroom
+
+    return set(
+        Classroom.objects.filter(
+            Q(class_teacher__user=user)
+            | Q(
+                classroomteacherassignment__teacher__user=user,
+                classroomteacherassignment__is_active=True,
+            ),
+            is_active=True,
+        ).values_list("pk", flat=True)
+    )
+
+
+def sender_audience(user):
+    """Q on CustomUser of everyone a non-administrator may message in bulk"""
+    from classroom.models import Classroom
+    from teacher.models import Teacher
+
+    if user.role == "teacher":
+        groups = [
+            f"classroom:{pk}{suffix}"
+            for pk in teacher_classroom_ids(user)
+            for suffix in ("", ":parents")
+        ]
+        return reduce(or_, map(group_condition, groups), Q(pk__in=[]))
+    if user.role == "parent":
+        classrooms = Classroom.objects.filter(
+            is_active=True,
+            studentenrollment__is_active=True,
+            studentenrollment__student__parents__user=user,
+        )
+        teachers = Teacher.objects.filter(
+            Q(primary_classes__in=classrooms)
+            | Q(classroom_assignments__classroom__in=classrooms)
+        )
+        return Q(pk__in=teachers.values("user_id"))
+    return Q(pk__in=[])
+
+
+def check_audience(user, roles, groups, custom_recipients):
+    """Raise PermissionDenied unless ``user`` may send to these recipients"""
+    if is_bulk_admin(user):
+        return
+    if roles:
+        raise PermissionDenied("Only administrators can send to user roles")
+    if groups:
+        classrooms = teacher_classroom_ids(user) if user.role == "teacher" else set()
+        for group in groups:
+            kind, value, _ = parse_group(group)
+            if kind != "classroom" or int(value) not in classrooms:
+                raise PermissionDenied(
+                    f"You can only send to the classrooms you teach: {group}"
+                )
+    if custom_recipients:
+        recipient_ids = {parse_recipient_id(pk) for pk in custom_recipients}
+        reachable = CustomUser.objects.filter(
+            sender_audience(user), pk__in=recipient_ids
+        ).count()
+        if reachable != len(recipient_ids):
+            raise PermissionDenied("Some recipients are outside your classes")
+
+
+# ============================================================================
+# DISPATCH
+# ============================================================================
+
+
+def start_bulk_message(bulk_message):
+    """Queue a draft (or a stalled run) for sending once the transaction commits"""
+    bulk_message.status = "pending"
+    bulk_message.save(update_fields=["status", "updated_at"])
+    transaction.on_commit(lambda: dispatch_bulk_message(bulk_message.pk))
+
+
+def dispatch_bulk_message(bulk_id):
+    """Hand a bulk message to Celery or a background thread"""
+    if get_bulk_mode() == MODE_CELERY:
+        from .tasks import send_bulk_message
+
+        try:
+            send_bulk_message.delay(bulk_id)
+            return
+        except Exception as e:
+            logger.warning(f"Celery unavailable, sending bulk message in-process: {e}")
+
+    thread = threading.Thread(
+        target=_run_in_thread, args=(bulk_id,), name=f"bulk-message-{bulk_id}"
+    )
+    thread.daemon = True
+    thread.start()
+
+
+def _run_in_thread(bulk_id):
+    try:
+        run_bulk_message(bulk_id)
+    finally:
+        # Threads get their own connections; don't leak them
+        connections.close_all()
+
+
+def run_bulk_message(bulk_id):
+    """
+    Send a bulk message, or resume one whose run died; safe to call twice
+    (only one run claims it)
+    """
+    now = timezone.now()
+    claimed = BulkMessage.objects.filter(
+        Q(status__in=SENDABLE_STATUSES) | lease_expired(now), pk=bulk_id
+    ).update(status="sending", updated_at=now)
+    if not claimed:
+        return BulkMessage.objects.filter(pk=bulk_id).first()
+
+    bulk_message = BulkMessage.objects.get(pk=bulk_id)
+    try:
+        BulkMessageRunner(bulk_message).run()
+    except Exception as e:
+        logger.error(f"❌ Bulk message {bulk_id} failed: {e}", exc_info=True)
+        BulkMessage.objects.filter(pk=bulk_id).update(
+            status="failed", updated_at=timezone.now()
+        )
+    bulk_message.refresh_from_db()
+    return bulk_message
+
+
+def send_due_bulk_messages(now=None):
+    """
+    Send the scheduled bulk messages that are due and resume the runs whose
+    lease expired; returns how many ran
+    """
+    now = now or timezone.now()
+    due = BulkMessage.objects.filter(
+        Q(status="pending", scheduled_at__lte=now) | lease_expired(now)
+    ).order_by("scheduled_at", "pk")
+    sent = 0
+    for bulk_id in list(due.values_list("pk", flat=True)):
+        run_bulk_message(bulk_id)
+        sent += 1
+    return sent
+
+
+class BulkMessageRunner:
+    """Creates and delivers the messages of one ``BulkMessage``"""
+
+    def __init__(self, bulk_message, chunk_size=None):
+        self.bulk_message = bulk_message
+        self.channel = CHANNELS.get(bulk_message.message_type)
+        self.chunk_size = chunk_size or get_chunk_size()
+        self.options = channel_settings(self.channel) if self.channel else {}
+        # One limiter for the whole run, so chunks don't reset the rate
+        self.limiter = RateLimiter(self.options.get("rate", 0))
+
+    def unsent_chunks(self):
+        """Lists of (message, email, phone) of messages created but not sent"""
+        unsent = (
+            Message.objects.filter(bulk_message=self.bulk_message, status="pending")
+            .select_related("recipient")
+            .order_by("pk")
+        )
+        last_pk = 0
+        while True:
+            chunk = list(unsent.filter(pk__gt=last_pk)[: self.chunk_size])
+            if not chunk:
+                return
+            yield [
+                (
+                    message,
+                    message.recipient.email,
+                    message.recipient.phone_number or message.recipient.phone,
+                )
+                for message in chunk
+            ]
+            last_pk = chunk[-1].pk
+
+    def recipient_chunks(self):
+        """Lists of (id, email, phone) of the recipients not yet messaged"""
+        recipients = (
+            resolve_recipients(self.bulk_message)
+            .exclude(
+                pk__in=Message.objects.filter(
+                    bulk_message=self.bulk_message
+                ).values("recipient_id")
+            )
+            .order_by("pk")
+        )
+        last_pk = 0
+        while True:
+            chunk = list(
+                recipients.filter(pk__gt=last_pk).values_list(
+                    "pk", "email", "phone_number", "phone"
+                )[: self.chunk_size]
+            )
+            if not chunk:
+                return
+            yield chunk
+            last_pk = chunk[-1][0]
+
+    def run(self):
+        bulk = self.bulk_message
+        BulkMessage.objects.filter(pk=bulk.pk).update(
+            total_recipients=resolve_recipients(bulk).count()
+        )
+        if self.channel:
+            # Left behind by a run that died before sending them
+            for chunk in self.unsent_chunks():
+                self.deliver_messages(chunk)
+        for chunk in self.recipient_chunks():
+            self.send_chunk(chunk)
+
+        bulk.refresh_from_db()
+        bulk.status = "failed" if bulk.failed_count and not bulk.sent_count else "sent"
+        bulk.sent_at = timezone.now()
+        bulk.save(update_fields=["status", "sent_at", "updated_at"])
+        logger.info(
+            f"📨 Bulk message {bulk.pk}: {bulk.sent_count} sent, "
+            f"{bulk.failed_count} failed of {bulk.total_recipients}"
+        )
+
+    def send_chunk(self, chunk):
+        bulk = self.bulk_message
+        now = timezone.now()
+        messages = [
+            Message(
+                sender_id=bulk.sender_id,
+                recipient_id=recipient_id,
+                bulk_message=bulk,
+                subject=bulk.subject,
+                content=bulk.content,
+                message_type=bulk.message_type,
+                priority=bulk.priority,
+                status="pending" if self.channel else "delivered",
+                sent_at=None if self.channel else now,
+                delivered_at=None if self.channel else now,
+            )
+            for recipient_id, _, _, _ in chunk
+        ]
+        Message.objects.bulk_create(messages)
+        # bulk_create sends no signals; count the new messages here
+        deltas = {
+            message.recipient_id: {"inbox": 1, "unread": 1} for message in messages
+        }
+        deltas[bulk.sender_id] = {"sent": len(messages)}
+        apply_deltas(deltas)
+
+        if not self.channel:
+            self._count(sent=len(messages), delivered=len(messages))
+            return
+
+        self.deliver_messages(
+            [
+                (message, email, phone_number or phone)
+                for message, (_, email, phone_number, phone) in zip(messages, chunk)
+            ]
+        )
+
+    def deliver_messages(self, chunk):
+        """Send (message, email, phone) over the channel and record the outcome"""
+        messages = [message for message, _, _ in chunk]
+        sendable = []
+        for message, email, phone in chunk:
+            message.body = message.content
+            message.address = email if self.channel == EMAIL else phone
+            if message.address:
+                sendable.append(message)
+            else:
+                message.status = "failed"
+                message.delivery_status = f"No {self.channel.lower()} contact"
+
+        deliver(
+            self.channel,
+            sendable,
+            workers=self.options["workers"],
+            limiter=self.limiter,
+        )
+        for message in sendable:
+            if message.delivered:
+                # Accepted by the provider; delivery receipts are not tracked
+                message.status = "sent"
+                message.sent_at = message.delivered_at
+                message.delivery_status = "accepted"
+            else:
+                message.status = "failed"
+                message.delivery_status = message.error
+
+        sent = sum(message.status == "sent" for message in messages)
+        with transaction.atomic():
+            Message.objects.bulk_update(
+                messages, ["status", "sent_at", "external_id", "delivery_status"]
+            )
+            self._count(sent=sent, failed=len(messages) - sent)
+
+    def _count(self, sent=0, delivered=0, failed=0):
+        BulkMessage.objects.filter(pk=self.bulk_message.pk).update(
+            sent_count=F("sent_count") + sent,
+            delivered_count=F("delivered_count") + delivered,
+            failed_count=F("failed_count") + failed,
+            updated_at=timezone.now(),
+        )
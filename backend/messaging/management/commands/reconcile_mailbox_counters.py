@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from messaging.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = "Recount the per-user mailbox counters behind the messaging stats"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            type=int,
+            action="append",
+            help="Only recount this user ID (repeatable)",
+        )
+
+    def handle(self, *args, **options):
+        written = reconcile_counters(options.get("user"))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"✅ Reconciled mailbox counters ({written} rows written)"
+            )
+        )
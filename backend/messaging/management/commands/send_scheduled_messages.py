@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from messaging.delivery import send_due_bulk_messages
+
+
+class Command(BaseCommand):
+    help = "Send the scheduled bulk messages that are due (run from cron)"
+
+    def handle(self, *args, **options):
+        sent = send_due_bulk_messages()
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Sent {sent} scheduled bulk messages")
+        )
@@ -0,0 +1,30 @@
+# Generated by Django 5.2.1 on 2026-10-18 00:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0004_message_messaging_m_recipie_cd364f_idx_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='message',
+            name='bulk_message',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='messages', to='messaging.bulkmessage'),
+        ),
+        migrations.AlterField(
+            model_name='bulkmessage',
+            name='status',
+            field=models.CharField(choices=[('draft', 'Draft'), ('sent', 'Sent'), ('delivered', 'Delivered'), ('failed', 'Failed'), ('pending', 'Pending'), ('sending', 'Sending')], default='draft', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='bulkmessage',
+            index=models.Index(fields=['status', 'scheduled_at'], name='messaging_b_status_b872c1_idx'),
+        ),
+    ]
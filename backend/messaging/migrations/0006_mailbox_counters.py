@@ -0,0 +1,37 @@
+# Generated by Django 5.2.1 on 2026-10-18 00:44
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('messaging', '0005_bulk_message_delivery'),
+        ('users', '0006_fix_admin_username'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MailboxCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='mailbox_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('inbox', models.IntegerField(default=0)),
+                ('unread', models.IntegerField(default=0)),
+                ('sent', models.IntegerField(default=0)),
+                ('drafts', models.IntegerField(default=0)),
+                ('archived', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['recipient', 'is_read', 'is_deleted'], name='messaging_m_recipie_715fb1_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='message',
+            index=models.Index(fields=['sender', 'status'], name='messaging_m_sender__ae6db4_idx'),
+        ),
+    ]
@@ -32,6 +32,9 @@ class Message(models.Model):
     recipient = models.ForeignKey(
         CustomUser, on_delete=models.CASCADE, related_name="messaging_received_messages"
     )
+    bulk_message = models.ForeignKey(
+        'BulkMessage', on_delete=models.SET_NULL, null=True, blank=True, related_name="messages"
+    )
     subject = models.CharField(max_length=255)
     content = models.TextField()
     message_type = models.CharField(max_length=20, choices=MESSAGE_TYPE_CHOICES, default='in_app')
@@ -58,7 +61,32 @@ class Message(models.Model):
 
     class Meta:
         ordering = ["-created_at"]
-        
+        indexes = [
+            models.Index(fields=["recipient", "-created_at", "-id"]),
+            models.Index(fields=["sender", "-created_at", "-id"]),
+            models.Index(fields=["recipient", "is_read", "is_deleted"]),
+            models.Index(fields=["sender", "status"]),
+        ]
+
+    # Fields deciding which mailbox counters a message counts towards
+    MAILBOX_FIELDS = (
+        "sender_id", "recipient_id", "status", "is_read", "is_archived", "is_deleted"
+    )
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Counters must be taken back from what the message counted as loaded
+        loaded = dict(zip(field_names, values))
+        if all(field in loaded for field in cls.MAILBOX_FIELDS):
+            instance._loaded_mailbox_state = tuple(
+                loaded[field] for field in cls.MAILBOX_FIELDS
+            )
+        return instance
+
+    def mailbox_state(self):
+        return tuple(getattr(self, field) for field in self.MAILBOX_FIELDS)
+
     def mark_as_read(self):
         """Mark message as read"""
         if not self.is_read:
@@ -99,6 +127,8 @@ class MessageTemplate(models.Model):
 
 class BulkMessage(models.Model):
     """For sending messages to multiple recipients"""
+    STATUS_CHOICES = Message.STATUS_CHOICES + [('sending', 'Sending')]
+
     sender = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name="messaging_bulk_messages")
     subject = models.CharField(max_length=255)
     content = models.TextField()
@@ -116,7 +146,7 @@ class BulkMessage(models.Model):
     delivered_count = models.IntegerField(default=0)
     failed_count = models.IntegerField(default=0)
     
-    status = models.CharField(max_length=20, choices=Message.STATUS_CHOICES, default='draft')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='draft')
     scheduled_at = models.DateTimeField(null=True, blank=True)
     sent_at = models.DateTimeField(null=True, blank=True)
     
@@ -128,3 +158,22 @@ class BulkMessage(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'scheduled_at']),
+        ]
+
+
+class MailboxCounter(models.Model):
+    """Per-user mailbox counts behind the stats badge (kept by messaging/counters.py)"""
+    user = models.OneToOneField(
+        CustomUser, on_delete=models.CASCADE, primary_key=True, related_name="mailbox_counter"
+    )
+    inbox = models.IntegerField(default=0)
+    unread = models.IntegerField(default=0)
+    sent = models.IntegerField(default=0)
+    drafts = models.IntegerField(default=0)
+    archived = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Mailbox of {self.user}: {self.unread} unread"
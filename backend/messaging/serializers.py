@@ -133,6 +133,43 @@ class BulkMessageSerializer(serializers.ModelSerializer):
             "message_type_display", "priority_display", "status_display"
         ]
 
+    def validate_recipient_groups(self, value):
+        from .delivery import parse_group
+
+        for group in value:
+            try:
+                parse_group(group)
+            except ValueError as e:
+                raise serializers.ValidationError(str(e))
+        return value
+
+    def validate_custom_recipients(self, value):
+        from .delivery import parse_recipient_id
+
+        if not isinstance(value, list):
+            raise serializers.ValidationError("Expected a list of user IDs")
+        try:
+            return [parse_recipient_id(pk) for pk in value]
+        except ValueError as e:
+            raise serializers.ValidationError(str(e))
+
+    def validate(self, attrs):
+        from .delivery import check_audience
+
+        request = self.context.get("request")
+        if request is not None:
+            recipients = {
+                field: attrs.get(field, getattr(self.instance, field, None) or [])
+                for field in ("recipient_roles", "recipient_groups", "custom_recipients")
+            }
+            check_audience(
+                request.user,
+                recipients["recipient_roles"],
+                recipients["recipient_groups"],
+                recipients["custom_recipients"],
+            )
+        return attrs
+
 
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for user selection in messaging"""
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .counters import apply_deltas, reconcile_counters, state_deltas
+from .models import Message
+
+
+@receiver(post_save, sender=Message)
+def update_mailbox_counters(sender, instance, created, **kwargs):
+    """Move the message's counts from its loaded state to its saved one"""
+    state = instance.mailbox_state()
+    loaded = None if created else getattr(instance, "_loaded_mailbox_state", None)
+    if created or loaded is not None:
+        apply_deltas(state_deltas(loaded, state))
+    else:
+        # Saved without a known previous state (e.g. loaded with only())
+        reconcile_counters({instance.sender_id, instance.recipient_id})
+    instance._loaded_mailbox_state = state
+
+
+@receiver(post_delete, sender=Message)
+def remove_from_mailbox_counters(sender, instance, **kwargs):
+    loaded = getattr(instance, "_loaded_mailbox_state", instance.mailbox_state())
+    apply_deltas(state_deltas(loaded, None))
@@ -0,0 +1,22 @@
+from celery import shared_task
+
+
+@shared_task
+def send_bulk_message(bulk_id):
+    """Fan a bulk message out to its recipients"""
+    from .delivery import run_bulk_message
+
+    bulk_message = run_bulk_message(bulk_id)
+    status = bulk_message.status if bulk_message else "missing"
+
+    return f"Bulk message {bulk_id}: {status}"
+
+
+@shared_task
+def send_scheduled_bulk_messages():
+    """Periodic: send the scheduled bulk messages that are due"""
+    from .delivery import send_due_bulk_messages
+
+    sent = send_due_bulk_messages()
+
+    return f"Sent {sent} scheduled bulk messages"
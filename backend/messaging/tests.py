@@ -1,3 +1,336 @@
-from django.test import TestCase
+import datetime
 
-# Create your tests here.
+from unittest import mock
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from parent.models import ParentProfile
+from students.models import Student
+from users.models import CustomUser
+
+from .counters import COUNTER_FIELDS, count_mailboxes
+from .delivery import resolve_recipients, run_bulk_message, send_due_bulk_messages
+from .models import BulkMessage, MailboxCounter, Message
+
+
+@override_settings(
+    BULK_MESSAGE_CHUNK_SIZE=2,
+    BULK_MESSAGE_CHANNELS={"EMAIL": {"workers": 2, "rate": 0}},
+)
+class BulkMessageDeliveryTest(TestCase):
+    """Bulk messages fan out to de-duplicated recipients in chunks"""
+
+    @classmethod
+    def setUpTestData(cls):
+        def user(name, role):
+            return CustomUser.objects.create_user(
+                email=f"{name}@example.com",
+                username=name,
+                first_name=name.title(),
+                last_name="User",
+                role=role,
+                password="x",
+                is_active=True,
+            )
+
+        cls.admin = user("bulkadmin", "admin")
+        cls.parents = [user(f"bulkparent{i}", "parent") for i in range(3)]
+        for i, student_class in enumerate(["PRIMARY_1", "PRIMARY_1", "PRIMARY_2"]):
+            student = Student.objects.create(
+                user=user(f"bulkstudent{i}", "student"),
+                gender="F",
+                date_of_birth=datetime.date(2017, 1, 1),
+                student_class=student_class,
+                education_level="PRIMARY",
+            )
+            profile = ParentProfile.objects.create(user=cls.parents[i])
+            profile.students.add(student)
+
+    def bulk_message(self, **fields):
+        return BulkMessage.objects.create(
+            sender=self.admin, subject="Open day", content="See you there", **fields
+        )
+
+    def test_recipients_are_deduplicated(self):
+        bulk = self.bulk_message(
+            recipient_roles=["parent"],
+            recipient_groups=["class:PRIMARY_1:parents", "PRIMARY_2"],
+            custom_recipients=[self.parents[0].pk, self.admin.pk],
+        )
+        self.assertEqual(
+            set(resolve_recipients(bulk).values_list("username", flat=True)),
+            {"bulkparent0", "bulkparent1", "bulkparent2", "bulkstudent2"},
+        )
+
+    def test_email_fan_out(self):
+        bulk = self.bulk_message(
+            message_type="email",
+            recipient_groups=["class:PRIMARY_1:parents", "PRIMARY_2"],
+        )
+        bulk = run_bulk_message(bulk.pk)
+
+        self.assertEqual(bulk.status, "sent")
+        self.assertEqual((bulk.total_recipients, bulk.sent_count), (3, 3))
+        self.assertEqual(
+            sorted(to for message in mail.outbox for to in message.to),
+            [
+                "bulkparent0@example.com",
+                "bulkparent1@example.com",
+                "bulkstudent2@example.com",
+            ],
+        )
+        self.assertEqual(bulk.messages.filter(status="sent").count(), 3)
+
+        # A second run finds nothing to send
+        self.assertEqual(run_bulk_message(bulk.pk).sent_count, 3)
+        self.assertEqual(len(mail.outbox), 3)
+
+    def test_stalled_run_is_resumed(self):
+        bulk = self.bulk_message(
+            message_type="email",
+            recipient_groups=["class:PRIMARY_1:parents", "PRIMARY_2"],
+        )
+        # The process dies after creating the first chunk's messages
+        with mock.patch(
+            "messaging.delivery.BulkMessageRunner.deliver_messages",
+            side_effect=SystemExit,
+        ), self.assertRaises(SystemExit):
+            run_bulk_message(bulk.pk)
+        bulk.refresh_from_db()
+        self.assertEqual(bulk.status, "sending")
+        self.assertEqual(bulk.messages.filter(status="pending").count(), 2)
+
+        # Still within its lease: nobody else claims it
+        self.assertEqual(send_due_bulk_messages(), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+        later = timezone.now() + datetime.timedelta(hours=1)
+        with mock.patch("django.utils.timezone.now", return_value=later):
+            self.assertEqual(send_due_bulk_messages(), 1)
+
+        bulk.refresh_from_db()
+        self.assertEqual((bulk.status, bulk.sent_count), ("sent", 3))
+        self.assertEqual(bulk.messages.filter(status="sent").count(), 3)
+        self.assertEqual(len(mail.outbox), 3)
+        # The messages of the dead run were counted once
+        self.assertEqual(MailboxCounter.objects.get(user=self.parents[0]).inbox, 1)
+
+    def test_scheduled_in_app(self):
+        bulk = self.bulk_message(
+            recipient_roles=["parent"],
+            status="pending",
+            scheduled_at=timezone.now() + datetime.timedelta(hours=1),
+        )
+        self.assertEqual(send_due_bulk_messages(), 0)
+        self.assertEqual(
+            send_due_bulk_messages(now=timezone.now() + datetime.timedelta(hours=2)), 1
+        )
+
+        bulk.refresh_from_db()
+        self.assertEqual(
+            (bulk.status, bulk.sent_count, bulk.delivered_count), ("sent", 3, 3)
+        )
+        self.assertEqual(
+            bulk.messages.filter(recipient=self.parents[2]).count(), 1
+        )
+        self.assertEqual(MailboxCounter.objects.get(user=self.parents[2]).unread, 1)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+class MailboxCounterTest(TestCase):
+    """Mailbox counters follow message writes and serve the stats badge"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher, cls.parent = [
+            CustomUser.objects.create_user(
+                email=f"{role}@mailbox.com",
+                username=f"mailbox{role}",
+                first_name=role.title(),
+                last_name="User",
+                role=role,
+                password="x",
+                is_active=True,
+            )
+            for role in ["teacher", "parent"]
+        ]
+
+    def assertCountersMatch(self):
+        counts = count_mailboxes()
+        for counter in MailboxCounter.objects.all():
+            self.assertEqual(
+                {field: getattr(counter, field) for field in COUNTER_FIELDS},
+                counts[counter.user_id],
+            )
+
+    def message(self, **fields):
+        fields = {
+            "sender": self.teacher,
+            "recipient": self.parent,
+            "status": "sent",
+            **fields,
+        }
+        return Message.objects.create(subject="Homework", content="Page 12", **fields)
+
+    def test_counters_follow_writes(self):
+        first = self.message()
+        self.message(status="draft")
+        self.message(recipient=self.teacher, is_archived=True)
+        Message.objects.get(pk=first.pk).mark_as_read()
+        archived = Message.objects.get(pk=first.pk)
+        archived.is_archived = True
+        archived.save(update_fields=["is_archived"])
+        self.message().delete()
+        deleted = self.message()
+        deleted.is_deleted = True
+        deleted.save()
+
+        parent = MailboxCounter.objects.get(user=self.parent)
+        self.assertEqual((parent.inbox, parent.unread, parent.archived), (2, 1, 1))
+        teacher = MailboxCounter.objects.get(user=self.teacher)
+        self.assertEqual(
+            (teacher.inbox, teacher.sent, teacher.drafts, teacher.archived),
+            (1, 3, 1, 2),
+        )
+        self.assertCountersMatch()
+
+    def test_stats_etag(self):
+        self.message()
+        client = APIClient(HTTP_HOST="localhost")
+        client.force_authenticate(self.parent)
+        url = "/api/messaging/messages/stats/"
+
+        with self.assertNumQueries(1):
+            response = client.get(url)
+        self.assertEqual(response.data["unread_inbox"], 1)
+
+        etag = response["ETag"]
+        self.assertEqual(client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.message()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data["unread_inbox"], 2)
+
+
+class BulkMessageAudienceTest(TestCase):
+    """Only administrators fan out; teachers reach their own classrooms"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from academics.models import AcademicSession, Term
+        from classroom.models import Classroom, GradeLevel, Section, StudentEnrollment
+        from teacher.models import Teacher
+
+        def user(name, role):
+            return CustomUser.objects.create_user(
+                email=f"{name}@audience.com",
+                username=name,
+                first_name=name.title(),
+                last_name="User",
+                role=role,
+                password="x",
+                is_active=True,
+            )
+
+        cls.admin = user("audienceadmin", "admin")
+        cls.teacher = user("audienceteacher", "teacher")
+        teacher = Teacher.objects.create(user=cls.teacher, employee_id="T-AUD")
+        session = AcademicSession.objects.create(
+            name="2025/2026",
+            start_date=datetime.date(2025, 9, 1),
+            end_date=datetime.date(2026, 7, 1),
+        )
+        with cls.captureOnCommitCallbacks(execute=True):
+            term = Term.objects.create(
+                name="FIRST",
+                academic_session=session,
+                start_date=datetime.date(2025, 9, 8),
+                end_date=datetime.date(2025, 12, 12),
+            )
+        grade_level = GradeLevel.objects.create(
+            name="Primary 1", education_level="PRIMARY", order=1
+        )
+        cls.classroom = Classroom.objects.create(
+            name="Primary 1A",
+            section=Section.objects.create(name="A", grade_level=grade_level),
+            academic_session=session,
+            term=term,
+            class_teacher=teacher,
+        )
+
+        cls.parents, cls.students = [], []
+        for i in range(2):
+            student = Student.objects.create(
+                user=user(f"audiencestudent{i}", "student"),
+                gender="F",
+                date_of_birth=datetime.date(2017, 1, 1),
+                student_class="PRIMARY_1",
+                education_level="PRIMARY",
+            )
+            parent = user(f"audienceparent{i}", "parent")
+            ParentProfile.objects.create(user=parent).students.add(student)
+            cls.students.append(student.user)
+            cls.parents.append(parent)
+        # Only the first child is in the teacher's classroom
+        StudentEnrollment.objects.create(
+            student=Student.objects.get(user=cls.students[0]), classroom=cls.classroom
+        )
+
+    def create(self, user, **recipients):
+        client = APIClient(HTTP_HOST="localhost")
+        client.force_authenticate(user)
+        return client.post(
+            "/api/messaging/bulk-messages/",
+            {"subject": "Trip", "content": "Bring a hat", **recipients},
+            format="json",
+        )
+
+    def test_admin_fans_out(self):
+        response = self.create(self.admin, recipient_roles=["parent"])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["total_recipients"], 2)
+
+    def test_teacher_reaches_own_classroom(self):
+        own = f"classroom:{self.classroom.pk}:parents"
+        response = self.create(self.teacher, recipient_groups=[own])
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data["total_recipients"], 1)
+        response = self.create(
+            self.teacher, custom_recipients=[self.students[0].pk, self.parents[0].pk]
+        )
+        self.assertEqual(response.status_code, 201)
+
+        for recipients in [
+            {"recipient_roles": ["parent"]},
+            {"recipient_groups": ["level:PRIMARY:parents"]},
+            {"recipient_groups": [f"classroom:{self.classroom.pk + 1}"]},
+            {"custom_recipients": [self.parents[1].pk]},
+        ]:
+            self.assertEqual(self.create(self.teacher, **recipients).status_code, 403)
+
+        # A draft saved before recipients were checked is not sent either
+        bulk = BulkMessage.objects.create(
+            sender=self.teacher, subject="Trip", content="Hat", recipient_roles=["parent"]
+        )
+        client = APIClient(HTTP_HOST="localhost")
+        client.force_authenticate(self.teacher)
+        response = client.post(f"/api/messaging/bulk-messages/{bulk.pk}/send_now/")
+        self.assertEqual(response.status_code, 403)
+
+    def test_parent_reaches_child_teachers(self):
+        response = self.create(self.parents[0], custom_recipients=[self.teacher.pk])
+        self.assertEqual(response.status_code, 201)
+        for user, recipients in [
+            (self.parents[1], {"custom_recipients": [self.teacher.pk]}),
+            (self.parents[0], {"custom_recipients": [self.parents[1].pk]}),
+            (self.parents[0], {"recipient_groups": ["PRIMARY_1"]}),
+        ]:
+            self.assertEqual(self.create(user, **recipients).status_code, 403)
+
+    def test_invalid_recipient_ids(self):
+        response = self.create(self.admin, custom_recipients=["abc"])
+        self.assertEqual(response.status_code, 400)
+        self.assertIn("custom_recipients", response.data)
@@ -2,19 +2,28 @@ from rest_framework import viewsets, permissions, status
 from rest_framework.response import Response
 from rest_framework.decorators import action
 from django.db.models import Q, Count
-from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
 from .models import Message, MessageTemplate, BulkMessage
 from .serializers import (
     MessageSerializer, MessageCreateSerializer, MessageUpdateSerializer,
     MessageTemplateSerializer, BulkMessageSerializer, UserSerializer
 )
 from .permissions import IsParentTeacherOrAdmin
+from .counters import get_counter
+from .delivery import (
+    check_audience,
+    is_stalled,
+    resolve_recipients,
+    start_bulk_message,
+)
 from users.models import CustomUser
 
 
 class MessageViewSet(viewsets.ModelViewSet):
     serializer_class = MessageSerializer
     permission_classes = [permissions.IsAuthenticated, IsParentTeacherOrAdmin]
+    # Keyset pagination order, backed by the mailbox indexes
+    cursor_ordering = ("-created_at", "-id")
 
     def get_queryset(self):
         user = self.request.user
@@ -97,24 +106,22 @@ class MessageViewSet(viewsets.ModelViewSet):
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get message statistics for the current user"""
-        user = request.user
-        total_inbox = Message.objects.filter(recipient=user, is_deleted=False).count()
-        unread_inbox = Message.objects.filter(recipient=user, is_read=False, is_deleted=False).count()
-        total_sent = Message.objects.filter(sender=user, is_deleted=False).count()
-        total_drafts = Message.objects.filter(sender=user, status='draft', is_deleted=False).count()
-        total_archived = Message.objects.filter(
-            Q(sender=user) | Q(recipient=user), 
-            is_archived=True, 
-            is_deleted=False
-        ).count()
-
-        return Response({
-            'total_inbox': total_inbox,
-            'unread_inbox': unread_inbox,
-            'total_sent': total_sent,
-            'total_drafts': total_drafts,
-            'total_archived': total_archived,
-        })
+        # One primary-key read of the kept counters; pollers send the ETag
+        # back and get an empty 304 while nothing changed
+        counter = get_counter(request.user)
+        counts = {
+            'total_inbox': counter.inbox,
+            'unread_inbox': counter.unread,
+            'total_sent': counter.sent,
+            'total_drafts': counter.drafts,
+            'total_archived': counter.archived,
+        }
+        etag = quote_etag('-'.join(str(count) for count in counts.values()))
+        headers = {'ETag': etag, 'Cache-Control': 'private, no-cache'}
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(counts, headers=headers)
 
     @action(detail=False, methods=['get'])
     def users(self, request):
@@ -152,44 +159,36 @@ class BulkMessageViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         bulk_message = serializer.save(sender=self.request.user)
-        
-        # Calculate total recipients
-        total_recipients = 0
-        
-        # Count recipients by roles
-        if bulk_message.recipient_roles:
-            role_count = CustomUser.objects.filter(
-                role__in=bulk_message.recipient_roles,
-                is_active=True
-            ).exclude(id=self.request.user.id).count()
-            total_recipients += role_count
-        
-        # Count custom recipients
-        if bulk_message.custom_recipients:
-            total_recipients += len(bulk_message.custom_recipients)
-        
-        # Update total recipients count
-        bulk_message.total_recipients = total_recipients
+        bulk_message.total_recipients = resolve_recipients(bulk_message).count()
         bulk_message.save(update_fields=['total_recipients'])
 
     @action(detail=True, methods=['post'])
     def send_now(self, request, pk=None):
-        """Send bulk message immediately"""
+        """Send bulk message immediately (in the background)"""
         bulk_message = self.get_object()
         
-        if bulk_message.status != 'draft':
+        # A run that died half-way is resumed where it stopped
+        if bulk_message.status != 'draft' and not (
+            bulk_message.status == 'sending' and is_stalled(bulk_message)
+        ):
             return Response(
                 {'error': 'Only draft messages can be sent'}, 
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        # Here you would implement the actual sending logic
-        # For now, we'll just mark it as sent
-        bulk_message.status = 'sent'
-        bulk_message.sent_at = timezone.now()
-        bulk_message.save(update_fields=['status', 'sent_at'])
+        # Drafts saved before recipients were checked
+        check_audience(
+            request.user,
+            bulk_message.recipient_roles,
+            bulk_message.recipient_groups,
+            bulk_message.custom_recipients,
+        )
+        start_bulk_message(bulk_message)
         
-        return Response({'status': 'Bulk message sent'})
+        return Response(
+            {'status': 'Bulk message queued for sending', 'id': bulk_message.pk},
+            status=status.HTTP_202_ACCEPTED
+        )
 
     @action(detail=True, methods=['post'])
     def schedule(self, request, pk=None):
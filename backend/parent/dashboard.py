@@ -0,0 +1,122 @@
+# parent/dashboard.py
+"""
+Attendance and result summaries of a parent's children.
+
+``ParentViewSet.dashboard`` and ``StudentDetailView`` used to query each
+child on its own: attendance count, present count, average score, the last
+five attendance records, the last five results and then each result's
+subject lazily - a dozen queries and more per child. ``ChildrenSummary``
+loads the same figures for any number of children with a fixed number of
+queries:
+
+* attendance rates from the per-term attendance rollups
+  (``attendance/rollups.py``) and average scores in one grouped query each;
+* the latest N attendance records and results per child with a
+  ``ROW_NUMBER() OVER (PARTITION BY student ...)`` window.
+"""
+
+from collections import defaultdict
+
+from django.db.models import Avg, F, Window
+from django.db.models.functions import RowNumber
+
+from attendance.models import Attendance
+from attendance.rollups import student_attendance_totals
+from result.models import StudentResult
+
+RECENT_LIMIT = 5
+LOW_PERFORMANCE_SCORE = 50
+
+
+def _unchanged(value):
+    return value
+
+
+def latest_per_student(queryset, student_ids, order_by, limit, fields):
+    """The ``limit`` latest rows of each student, newest first"""
+    rows = (
+        queryset.filter(student_id__in=student_ids)
+        .annotate(
+            row_number=Window(
+                RowNumber(), partition_by=F("student_id"), order_by=order_by
+            )
+        )
+        .filter(row_number__lte=limit)
+        .order_by("student_id", "row_number")
+        .values("student_id", *fields)
+    )
+    latest = defaultdict(list)
+    for row in rows:
+        latest[row.pop("student_id")].append(row)
+    return latest
+
+
+class ChildrenSummary:
+    """Dashboard figures of several students, loaded together"""
+
+    def __init__(self, student_ids, recent_limit=RECENT_LIMIT):
+        student_ids = list(student_ids)
+
+        self.attendance_totals = student_attendance_totals(student_ids)
+
+        scores = (
+            StudentResult.objects.filter(student_id__in=student_ids)
+            .values("student_id")
+            .annotate(avg=Avg("total_score"))
+        )
+        self.average_scores = {row["student_id"]: row["avg"] for row in scores}
+
+        self.recent_attendance = latest_per_student(
+            Attendance.objects.all(),
+            student_ids,
+            [F("date").desc(), F("id").desc()],
+            recent_limit,
+            ["date", "status"],
+        )
+        self.recent_results = latest_per_student(
+            StudentResult.objects.all(),
+            student_ids,
+            [F("exam_session__start_date").desc(), F("created_at").desc()],
+            recent_limit,
+            ["subject__name", "total_score", "exam_session__start_date"],
+        )
+
+    def attendance_percentage(self, student_id):
+        totals = self.attendance_totals.get(student_id)
+        return totals["rate"] if totals else 0
+
+    def average_score(self, student_id):
+        return self.average_scores.get(student_id) or 0
+
+    def attendance_list(self, student_id, date_format=str):
+        """Latest attendance records; ``date_format=None`` keeps date objects"""
+        date_format = date_format or _unchanged
+        return [
+            {"date": date_format(row["date"]), "status": row["status"]}
+            for row in self.recent_attendance.get(student_id, [])
+        ]
+
+    def result_list(self, student_id, date_format=str):
+        """Latest results; ``date_format=None`` keeps date objects"""
+        date_format = date_format or _unchanged
+        return [
+            {
+                "subject": row["subject__name"] or "N/A",
+                "score": row["total_score"],
+                "exam_date": date_format(row["exam_session__start_date"]),
+            }
+            for row in self.recent_results.get(student_id, [])
+        ]
+
+    def for_dashboard(self, student):
+        """One child's entry of the parent dashboard"""
+        avg_score = self.average_score(student.id)
+        return {
+            "student_id": student.id,
+            "student": student.user.full_name,
+            "attendance_percentage": self.attendance_percentage(student.id),
+            "average_score": round(avg_score, 2),
+            "recent_attendance": self.attendance_list(student.id),
+            "recent_results": self.result_list(student.id),
+            "alert": "Low performance" if avg_score < LOW_PERFORMANCE_SCORE else None,
+        }
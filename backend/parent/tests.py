@@ -1,3 +1,120 @@
+import datetime
+from decimal import Decimal
+
 from django.test import TestCase
 
-# Create your tests here.
+from attendance.models import Attendance
+from classroom.models import GradeLevel, Section
+from students.models import Student
+from users.models import CustomUser
+
+from .dashboard import ChildrenSummary
+
+
+class ChildrenSummaryTest(TestCase):
+    """Dashboard figures of any number of children take a fixed number of queries"""
+
+    @classmethod
+    def setUpTestData(cls):
+        from academics.models import AcademicSession, Term
+        from result.models import ExamSession, GradingSystem, StudentResult
+        from subject.models import Subject
+
+        grade_level = GradeLevel.objects.create(
+            name="SS 1", education_level="SENIOR_SECONDARY", order=1
+        )
+        section = Section.objects.create(name="A", grade_level=grade_level)
+        grading_system = GradingSystem.objects.create(
+            name="Standard", grading_type="PERCENTAGE"
+        )
+        subject = Subject.objects.create(
+            name="Mathematics", code="MTH", education_levels=["SENIOR_SECONDARY"]
+        )
+        exam_sessions = [
+            ExamSession.objects.create(
+                name=f"Test {i}",
+                academic_session=AcademicSession.objects.create(
+                    name=f"Session {i}",
+                    start_date=datetime.date(2025, 9, 1),
+                    end_date=datetime.date(2026, 7, 1),
+                ),
+                term="FIRST",
+                exam_type="FINAL_EXAM",
+                start_date=datetime.date(2025, 10, 1 + i),
+                end_date=datetime.date(2025, 10, 1 + i),
+            )
+            for i in range(7)
+        ]
+        with cls.captureOnCommitCallbacks(execute=True):
+            Term.objects.create(
+                name="FIRST",
+                academic_session=exam_sessions[0].academic_session,
+                start_date=datetime.date(2025, 9, 8),
+                end_date=datetime.date(2025, 12, 12),
+            )
+
+        cls.students = []
+        for i in range(3):
+            user = CustomUser.objects.create_user(
+                email=f"child{i}@example.com",
+                username=f"child{i}",
+                first_name="Child",
+                last_name=str(i),
+                role="student",
+                password="x",
+            )
+            student = Student.objects.create(
+                user=user,
+                gender="F",
+                date_of_birth=datetime.date(2010, 1, 1),
+                student_class="SS_1",
+                education_level="SENIOR_SECONDARY",
+            )
+            cls.students.append(student)
+
+            # 7 days, absent on the first three for the first child only;
+            # rates are read from the term rollups refreshed on commit
+            with cls.captureOnCommitCallbacks(execute=True):
+                for day in range(7):
+                    Attendance.objects.create(
+                        student=student,
+                        section=section,
+                        date=datetime.date(2025, 10, 1 + day),
+                        status="A" if i == 0 and day < 3 else "P",
+                    )
+            for j, exam_session in enumerate(exam_sessions):
+                StudentResult.objects.create(
+                    student=student,
+                    subject=subject,
+                    exam_session=exam_session,
+                    grading_system=grading_system,
+                    exam_score=Decimal(30 + 10 * i + j),
+                )
+
+    def test_query_count_does_not_grow_with_children(self):
+        with self.assertNumQueries(4):
+            ChildrenSummary([self.students[0].id])
+        with self.assertNumQueries(4):
+            summary = ChildrenSummary([student.id for student in self.students])
+
+        with self.assertNumQueries(0):
+            entries = [summary.for_dashboard(student) for student in self.students]
+
+        first, _, last = entries
+        self.assertEqual(first["attendance_percentage"], 57.14)
+        self.assertEqual(last["attendance_percentage"], 100)
+        self.assertEqual(first["average_score"], Decimal("33.00"))
+        self.assertEqual(first["alert"], "Low performance")
+        self.assertIsNone(last["alert"])
+
+        # The five latest rows of each child, newest first
+        self.assertEqual(
+            [row["date"] for row in first["recent_attendance"]],
+            [f"2025-10-0{day}" for day in (7, 6, 5, 4, 3)],
+        )
+        self.assertEqual(
+            [row["score"] for row in last["recent_results"]],
+            [Decimal(score) for score in (56, 55, 54, 53, 52)],
+        )
+        self.assertEqual(last["recent_results"][0]["subject"], "Mathematics")
+        self.assertEqual(last["recent_results"][0]["exam_date"], "2025-10-07")
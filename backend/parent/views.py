@@ -591,18 +591,18 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import NotFound
 from rest_framework.permissions import AllowAny
-from django.db.models import Avg, Q
+from django.db.models import Q
 from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 import logging
 
 from utils.section_filtering import AutoSectionFilterMixin
+from utils.search import SEARCH_ENTITIES, search
 from .models import ParentProfile
 from .serializers import ParentProfileSerializer
 from .permissions import IsParent, IsParentOrAdmin
+from .dashboard import ChildrenSummary
 
-from attendance.models import Attendance
-from result.models import StudentResult
 from users.models import CustomUser
 
 logger = logging.getLogger(__name__)
@@ -656,13 +656,9 @@ class ParentViewSet(AutoSectionFilterMixin, viewsets.ModelViewSet):
         # Use get_queryset() to apply section filtering
         parents = self.get_queryset()
 
-        if query:
-            parents = parents.filter(
-                Q(user__first_name__icontains=query)
-                | Q(user__last_name__icontains=query)
-                | Q(user__username__icontains=query)
-                | Q(user__email__icontains=query)
-            )
+        if query.strip():
+            # Trigram-indexed, best matches first
+            parents = search(parents, SEARCH_ENTITIES["parent"].fields, query)
 
         results = [
             {
@@ -727,59 +723,16 @@ class ParentViewSet(AutoSectionFilterMixin, viewsets.ModelViewSet):
         # Apply section filtering to students
         from students.models import Student
 
-        students_qs = Student.objects.filter(id__in=[s.id for s in students])
-        students_filtered = self.apply_section_filters(students_qs)
-
-        dashboard_data = []
-
-        for student in students_filtered:
-            attendance_records = Attendance.objects.filter(student=student)
-            total_attendance = attendance_records.count()
-            present_count = attendance_records.filter(status="present").count()
-            attendance_percentage = (
-                round((present_count / total_attendance) * 100, 2)
-                if total_attendance > 0
-                else 0
-            )
-
-            avg_score = (
-                StudentResult.objects.filter(student=student).aggregate(
-                    avg=Avg("score")
-                )["avg"]
-                or 0
-            )
+        students_qs = Student.objects.filter(
+            id__in=[s.id for s in students]
+        ).select_related("user")
+        students_filtered = list(self.apply_section_filters(students_qs))
 
-            recent_attendance = attendance_records.order_by("-date")[:5]
-            attendance_list = [
-                {"date": str(att.date), "status": att.status}
-                for att in recent_attendance
-            ]
-
-            recent_results = StudentResult.objects.filter(student=student).order_by(
-                "-exam__exam_date"
-            )[:5]
-            result_list = [
-                {
-                    "subject": getattr(
-                        getattr(res.exam, "subject", None), "name", "N/A"
-                    ),
-                    "score": res.score,
-                    "exam_date": str(getattr(res.exam, "exam_date", None)),
-                }
-                for res in recent_results
-            ]
-
-            dashboard_data.append(
-                {
-                    "student_id": student.id,
-                    "student": student.user.full_name,
-                    "attendance_percentage": attendance_percentage,
-                    "average_score": round(avg_score, 2),
-                    "recent_attendance": attendance_list,
-                    "recent_results": result_list,
-                    "alert": "Low performance" if avg_score < 50 else None,
-                }
-            )
+        # Attendance and results of every child in a fixed number of queries
+        summary = ChildrenSummary([student.id for student in students_filtered])
+        dashboard_data = [
+            summary.for_dashboard(student) for student in students_filtered
+        ]
 
         return Response({"dashboard": dashboard_data})
 
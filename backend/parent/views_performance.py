@@ -2,10 +2,9 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.exceptions import NotFound, PermissionDenied
-from attendance.models import Attendance
-from result.models import StudentResult
 from students.models import Student
-from django.db import models
+
+from .dashboard import ChildrenSummary
 
 
 class StudentDetailView(APIView):
@@ -22,50 +21,16 @@ class StudentDetailView(APIView):
         if not parent_profile.students.filter(id=student_id).exists():
             raise PermissionDenied("You do not have access to this student's data.")
 
-        student = Student.objects.get(id=student_id)
+        student = Student.objects.select_related("user").get(id=student_id)
 
         # Gather attendance & result data
-        attendance_records = Attendance.objects.filter(student=student)
-        total_attendance = attendance_records.count()
-        present_count = attendance_records.filter(status="present").count()
-        attendance_percentage = (
-            round((present_count / total_attendance) * 100, 2)
-            if total_attendance
-            else 0
-        )
-
-        avg_score = (
-            StudentResult.objects.filter(student=student).aggregate(
-                avg=models.Avg("score")
-            )["avg"]
-            or 0
-        )
-
-        recent_attendance = attendance_records.order_by("-attendance_date")[:5]
-        attendance_list = [
-            {"date": att.attendance_date, "status": att.status}
-            for att in recent_attendance
-        ]
-
-        recent_results = StudentResult.objects.filter(student=student).order_by(
-            "-exam__exam_date"
-        )[:5]
-        result_list = [
-            {
-                "subject": (
-                    res.exam.subject.name if res.exam and res.exam.subject else "N/A"
-                ),
-                "score": res.score,
-                "exam_date": res.exam.exam_date if res.exam else None,
-            }
-            for res in recent_results
-        ]
+        summary = ChildrenSummary([student.id])
 
         data = {
             "student": str(student),
-            "attendance_percentage": attendance_percentage,
-            "average_score": round(avg_score, 2),
-            "recent_attendance": attendance_list,
-            "recent_results": result_list,
+            "attendance_percentage": summary.attendance_percentage(student.id),
+            "average_score": round(summary.average_score(student.id), 2),
+            "recent_attendance": summary.attendance_list(student.id, date_format=None),
+            "recent_results": summary.result_list(student.id, date_format=None),
         }
         return Response(data)
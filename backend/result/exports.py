@@ -0,0 +1,142 @@
+# result/exports.py
+"""
+Result sheet exports for ``ResultImportExportViewSet.export_results``.
+
+Each education level keeps its scores in its own model with its own
+columns, so the export picks the model from ``education_level`` (the
+generic ``StudentResult`` when none is given) and streams one row per
+student and subject with ``utils.exporting.CSVExport``: student and subject
+details are joined in the same query.
+"""
+
+from utils.exporting import CSVExport
+
+from .models import (
+    JuniorSecondaryResult,
+    NurseryResult,
+    PrimaryResult,
+    SeniorSecondaryResult,
+    StudentResult,
+)
+
+STUDENT_COLUMNS = [
+    ("registration_number", "student__registration_number"),
+    ("first_name", "student__user__first_name"),
+    ("last_name", "student__user__last_name"),
+    ("student_class", "student__student_class"),
+    ("subject_code", "subject__code"),
+    ("subject", "subject__name"),
+]
+
+STATISTICS_COLUMNS = [
+    ("class_average", "class_average"),
+    ("highest_in_class", "highest_in_class"),
+    ("lowest_in_class", "lowest_in_class"),
+]
+
+TERM_REMARK_COLUMNS = [
+    ("teacher_remark", "teacher_remark"),
+    ("class_teacher_remark", "class_teacher_remark"),
+    ("head_teacher_remark", "head_teacher_remark"),
+]
+
+BASIC_SCORE_COLUMNS = [
+    ("ca_total", "ca_total"),
+    ("exam_score", "exam_score"),
+    ("total_score", "total_score"),
+    ("percentage", "total_percentage"),
+    ("grade", "grade"),
+    ("position", "subject_position"),
+    ("status", "status"),
+]
+
+# model, score columns, statistics columns, comment columns
+RESULT_EXPORTS = {
+    "SENIOR_SECONDARY": (
+        SeniorSecondaryResult,
+        [
+            ("ca_total", "total_ca_score"),
+            ("exam_score", "exam_score"),
+            ("total_score", "total_score"),
+            ("percentage", "percentage"),
+            ("grade", "grade"),
+            ("position", "subject_position"),
+            ("status", "status"),
+        ],
+        STATISTICS_COLUMNS,
+        TERM_REMARK_COLUMNS,
+    ),
+    "JUNIOR_SECONDARY": (
+        JuniorSecondaryResult,
+        BASIC_SCORE_COLUMNS,
+        STATISTICS_COLUMNS,
+        TERM_REMARK_COLUMNS,
+    ),
+    "PRIMARY": (
+        PrimaryResult,
+        BASIC_SCORE_COLUMNS,
+        STATISTICS_COLUMNS,
+        TERM_REMARK_COLUMNS,
+    ),
+    "NURSERY": (
+        NurseryResult,
+        [
+            ("max_marks_obtainable", "max_marks_obtainable"),
+            ("mark_obtained", "mark_obtained"),
+            ("percentage", "percentage"),
+            ("grade", "grade"),
+            ("position", "subject_position"),
+            ("status", "status"),
+        ],
+        [],
+        [("academic_comment", "academic_comment")],
+    ),
+}
+
+GENERIC_EXPORT = (
+    StudentResult,
+    [
+        ("ca_score", "ca_score"),
+        ("exam_score", "exam_score"),
+        ("total_score", "total_score"),
+        ("percentage", "percentage"),
+        ("grade", "grade"),
+        ("position", "position"),
+        ("status", "status"),
+    ],
+    [],
+    [("remarks", "remarks")],
+)
+
+
+def build_result_export(data, restrict=None):
+    """
+    A ``CSVExport`` for validated ``ResultExportSerializer`` data;
+    ``restrict(queryset)`` applies section access
+    """
+    education_level = (data.get("education_level") or "").upper()
+    model, scores, statistics, comments = RESULT_EXPORTS.get(
+        education_level, GENERIC_EXPORT
+    )
+
+    columns = STUDENT_COLUMNS + scores
+    if data.get("include_statistics"):
+        columns += statistics
+    if data.get("include_comments"):
+        columns += comments
+
+    queryset = model.objects.filter(exam_session_id=data["exam_session_id"])
+    if education_level:
+        queryset = queryset.filter(student__education_level=education_level)
+    if data.get("student_class"):
+        queryset = queryset.filter(student__student_class=data["student_class"])
+    if restrict is not None:
+        queryset = restrict(queryset)
+    queryset = queryset.order_by(
+        "student__student_class", "student__registration_number", "subject__name"
+    )
+
+    level = education_level.lower() or "all"
+    return CSVExport(
+        queryset, columns, f"results_{data['exam_session_id']}_{level}.csv"
+    )
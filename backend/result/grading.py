@@ -0,0 +1,165 @@
+# result/grading.py
+"""
+In-process cache of grading system grade bands.
+
+Every result save used to run ``grading_system.grades.filter(min_score__lte=...,
+max_score__gte=...)``. The bands of a grading system change rarely, so they are
+loaded once into a sorted ``GradeTable`` and looked up with ``bisect``.
+
+Entries are versioned by ``GradingSystem.updated_at``: saving or deleting a
+``Grade`` touches its grading system's ``updated_at`` (see the signal handlers
+in ``result/models.py``), so any worker holding an older table reloads it the
+next time it sees the fresh grading system row.
+
+A term report is graded with the grading system of its subject results.
+``SessionGradeTables`` resolves that once per exam session for code that
+recalculates many reports, instead of one query per report.
+"""
+
+import threading
+from bisect import bisect_right
+from collections import namedtuple
+from decimal import Decimal, InvalidOperation
+
+GradeBand = namedtuple(
+    "GradeBand", ["grade", "min_score", "max_score", "grade_point", "is_passing"]
+)
+
+
+def _to_decimal(value):
+    """Decimal of a score, or None when there is no (valid) score"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, Decimal):
+        return value
+    try:
+        return Decimal(str(value))
+    except (InvalidOperation, ValueError):
+        return None
+
+
+class GradeTable:
+    """Grade bands of one grading system, sorted by ``min_score``"""
+
+    def __init__(self, bands, version=None):
+        self.bands = sorted(bands, key=lambda band: band.min_score)
+        self._mins = [band.min_score for band in self.bands]
+        self.version = version
+        points = [b.grade_point for b in self.bands if b.grade_point is not None]
+        self.max_grade_point = max(points) if points else None
+
+    def __len__(self):
+        return len(self.bands)
+
+    def lookup(self, score):
+        """
+        Band with ``min_score <= score <= max_score``.
+
+        When bands overlap, the one with the highest ``min_score`` wins, which
+        matches the ``Grade`` model's ``-min_score`` ordering. A missing score
+        has no grade.
+        """
+        score = _to_decimal(score)
+        if score is None:
+            return None
+        index = bisect_right(self._mins, score) - 1
+        while index >= 0:
+            band = self.bands[index]
+            if band.max_score >= score:
+                return band
+            index -= 1
+        return None
+
+    def lookup_by_grade_point(self, point):
+        """Band with the highest ``grade_point`` not above ``point``"""
+        point = _to_decimal(point)
+        if point is None:
+            return None
+        candidates = [
+            band
+            for band in self.bands
+            if band.grade_point is not None and band.grade_point <= point
+        ]
+        if not candidates:
+            return None
+        return max(candidates, key=lambda band: band.grade_point)
+
+
+_tables = {}
+_lock = threading.Lock()
+
+
+def _load_table(grading_system_id, version):
+    from .models import Grade
+
+    bands = [
+        GradeBand(*row)
+        for row in Grade.objects.filter(grading_system_id=grading_system_id)
+        .order_by()
+        .values_list("grade", "min_score", "max_score", "grade_point", "is_passing")
+    ]
+    return GradeTable(bands, version=version)
+
+
+def get_grade_table(grading_system):
+    """
+    Cached ``GradeTable`` for a ``GradingSystem`` instance.
+
+    Costs no queries while the cached version matches the instance's
+    ``updated_at``; otherwise reloads the bands with a single query.
+    """
+    if grading_system is None:
+        return GradeTable([])
+
+    key = grading_system.pk
+    version = getattr(grading_system, "updated_at", None)
+
+    table = _tables.get(key)
+    if table is not None and table.version == version:
+        return table
+
+    table = _load_table(key, version)
+    with _lock:
+        _tables[key] = table
+    return table
+
+
+def lookup_grade(grading_system, score):
+    """Convenience wrapper: ``GradeBand`` for ``score`` or ``None``"""
+    return get_grade_table(grading_system).lookup(score)
+
+
+class SessionGradeTables:
+    """
+    ``GradeTable`` of each exam session's results of one result model,
+    looked up once per exam session (for one recalculation run)
+    """
+
+    def __init__(self, result_model):
+        self.result_model = result_model
+        self._tables = {}
+
+    def for_report(self, report):
+        exam_session_id = report.exam_session_id
+        if exam_session_id not in self._tables:
+            result = (
+                self.result_model.objects.filter(
+                    exam_session_id=exam_session_id, grading_system__isnull=False
+                )
+                .select_related("grading_system")
+                .order_by("pk")
+                .first()
+            )
+            self._tables[exam_session_id] = (
+                get_grade_table(result.grading_system) if result else None
+            )
+        return self._tables[exam_session_id]
+
+
+def invalidate_grade_table(grading_system_id=None):
+    """Drop one cached table, or all of them"""
+    with _lock:
+        if grading_system_id is None:
+            _tables.clear()
+        else:
+            _tables.pop(grading_system_id, None)
@@ -0,0 +1,67 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from result.report_generation import get_report_generator
+from result.score_sheet import get_score_sheet_config
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure queries and time per report card context, one generator per "
+        "report (single downloads) vs one shared generator (batch jobs)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--education-level", type=str, required=True)
+        parser.add_argument("--exam-session", type=int, required=True)
+        parser.add_argument("--student-class", type=str, required=True)
+        parser.add_argument("--limit", type=int, default=50)
+
+    def handle(self, *args, **options):
+        education_level = options["education_level"].upper()
+        try:
+            report_model = get_score_sheet_config(education_level).report_model
+        except (KeyError, ValueError):
+            raise CommandError(f"Invalid education level: {education_level}")
+
+        report_ids = list(
+            report_model.objects.filter(
+                exam_session_id=options["exam_session"],
+                student__student_class=options["student_class"],
+            ).values_list("id", flat=True)[: options["limit"]]
+        )
+        if not report_ids:
+            raise CommandError("No term reports found for that class and session")
+
+        self.stdout.write(f"Benchmarking {len(report_ids)} {education_level} reports")
+
+        single = self._measure(
+            education_level,
+            report_ids,
+            lambda: get_report_generator(education_level),
+        )
+        shared_generator = get_report_generator(education_level)
+        shared = self._measure(education_level, report_ids, lambda: shared_generator)
+
+        for label, (queries, seconds) in [
+            ("One generator per report", single),
+            ("Shared class context", shared),
+        ]:
+            self.stdout.write(
+                f"  {label:<26} {queries / len(report_ids):6.1f} queries/report  "
+                f"{seconds * 1000 / len(report_ids):7.1f} ms/report"
+            )
+
+    def _measure(self, education_level, report_ids, make_generator):
+        """Build each report's template context; returns (queries, seconds)"""
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            for report_id in report_ids:
+                generator = make_generator()
+                report = generator.get_term_report(report_id)
+                generator.get_term_context(report, generator.get_class_context(report))
+            elapsed = time.perf_counter() - started
+        return len(queries), elapsed
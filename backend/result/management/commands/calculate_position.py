@@ -10,6 +10,8 @@ from result.models import (
     PrimaryTermReport,
     NurseryTermReport,
 )
+from result.grading import SessionGradeTables
+from result.ranking import rank
 
 
 class Command(BaseCommand):
@@ -52,8 +54,6 @@ class Command(BaseCommand):
                     "result_model": SeniorSecondaryResult,
                     "report_model": SeniorSecondaryTermReport,
                     "name": "Senior Secondary",
-                    "score_field": "total_score",
-                    "report_score_field": "average_score",
                 }
             )
 
@@ -63,8 +63,6 @@ class Command(BaseCommand):
                     "result_model": JuniorSecondaryResult,
                     "report_model": JuniorSecondaryTermReport,
                     "name": "Junior Secondary",
-                    "score_field": "total_percentage",  # Fixed: Use percentage
-                    "report_score_field": "average_score",
                 }
             )
 
@@ -74,8 +72,6 @@ class Command(BaseCommand):
                     "result_model": PrimaryResult,
                     "report_model": PrimaryTermReport,
                     "name": "Primary",
-                    "score_field": "total_percentage",  # Fixed: Use percentage
-                    "report_score_field": "average_score",
                 }
             )
 
@@ -85,8 +81,7 @@ class Command(BaseCommand):
                     "result_model": NurseryResult,
                     "report_model": NurseryTermReport,
                     "name": "Nursery",
-                    "score_field": "percentage",  # Fixed: Nursery uses percentage
-                    "report_score_field": "overall_percentage",  # Fixed: Different field
+                    "graded": False,  # Nursery reports have no overall grade
                 }
             )
 
@@ -97,14 +92,13 @@ class Command(BaseCommand):
             result_model = config["result_model"]
             report_model = config["report_model"]
             name = config["name"]
-            score_field = config["score_field"]
-            report_score_field = config["report_score_field"]
 
             self.stdout.write(f"\n📚 Processing {name} Results...")
 
-            # STEP 1: Recalculate Subject Positions
+            # STEP 1: Recalculate Subject Positions (scores as ranked by
+            # result/ranking.py)
             results_updated = self._recalculate_subject_positions(
-                result_model, score_field, exam_session_id, student_class
+                result_model, exam_session_id, student_class
             )
             total_results_updated += results_updated
 
@@ -113,8 +107,12 @@ class Command(BaseCommand):
             )
 
             # STEP 2: Recalculate Term Report Metrics
+            # The grading system is looked up once per exam session
+            grade_tables = (
+                SessionGradeTables(result_model) if config.get("graded", True) else None
+            )
             metrics_updated = self._recalculate_term_report_metrics(
-                report_model, exam_session_id, student_class
+                report_model, exam_session_id, student_class, grade_tables
             )
             self.stdout.write(
                 self.style.SUCCESS(
@@ -124,7 +122,7 @@ class Command(BaseCommand):
 
             # STEP 3: Recalculate Term Report Positions
             reports_updated = self._recalculate_term_report_positions(
-                report_model, report_score_field, exam_session_id, student_class
+                report_model, exam_session_id, student_class
             )
             total_reports_updated += reports_updated
 
@@ -145,60 +143,20 @@ class Command(BaseCommand):
         self.stdout.write(self.style.SUCCESS("=" * 60 + "\n"))
 
     def _recalculate_subject_positions(
-        self, model_class, score_field, exam_session_id=None, student_class=None
+        self, model_class, exam_session_id=None, student_class=None
     ):
-        """Recalculate subject positions for all results"""
-        updated_count = 0
-
-        filters = {"status__in": ["APPROVED", "PUBLISHED"]}
+        """Recalculate subject positions for all results in one statement"""
+        filters = {}
         if exam_session_id:
             filters["exam_session_id"] = exam_session_id
         if student_class:
             filters["student__student_class"] = student_class
 
-        unique_combos = (
-            model_class.objects.filter(**filters)
-            .values(
-                "subject",
-                "exam_session",
-                "student__student_class",
-                "student__education_level",
-            )
-            .distinct()
-        )
-
-        for combo in unique_combos:
-            # Get all results for this combo, ordered by score
-            results = model_class.objects.filter(
-                subject=combo["subject"],
-                exam_session=combo["exam_session"],
-                student__student_class=combo["student__student_class"],
-                student__education_level=combo["student__education_level"],
-                status__in=["APPROVED", "PUBLISHED"],
-            ).order_by(f"-{score_field}", "student__user__first_name")
-
-            if results.exists():
-                # Calculate statistics
-                scores = [getattr(r, score_field) for r in results]
-                class_avg = sum(scores) / len(scores)
-                highest = max(scores)
-                lowest = min(scores)
-
-                # Update positions
-                with transaction.atomic():
-                    for position, result in enumerate(results, start=1):
-                        model_class.objects.filter(id=result.id).update(
-                            subject_position=position,
-                            class_average=class_avg,
-                            highest_in_class=highest,
-                            lowest_in_class=lowest,
-                        )
-                        updated_count += 1
-
-        return updated_count
+        with transaction.atomic():
+            return rank(model_class, **filters)
 
     def _recalculate_term_report_metrics(
-        self, report_model, exam_session_id=None, student_class=None
+        self, report_model, exam_session_id=None, student_class=None, grade_tables=None
     ):
         """Recalculate term report metrics (total_score, average_score, etc.)"""
         updated_count = 0
@@ -213,7 +171,10 @@ class Command(BaseCommand):
 
         for report in reports:
             try:
-                report.calculate_metrics()
+                if grade_tables is not None:
+                    report.calculate_metrics(grade_tables.for_report(report))
+                else:
+                    report.calculate_metrics()
                 updated_count += 1
             except Exception as e:
                 self.stdout.write(
@@ -225,44 +186,14 @@ class Command(BaseCommand):
         return updated_count
 
     def _recalculate_term_report_positions(
-        self, report_model, score_field, exam_session_id=None, student_class=None
+        self, report_model, exam_session_id=None, student_class=None
     ):
         """Recalculate overall class positions in term reports"""
-        updated_count = 0
-
-        filters = {"status__in": ["APPROVED", "PUBLISHED"]}
+        filters = {}
         if exam_session_id:
             filters["exam_session_id"] = exam_session_id
         if student_class:
             filters["student__student_class"] = student_class
 
-        unique_combos = (
-            report_model.objects.filter(**filters)
-            .values(
-                "exam_session", "student__student_class", "student__education_level"
-            )
-            .distinct()
-        )
-
-        for combo in unique_combos:
-            # Get all term reports for this combo, ordered by average score
-            reports = report_model.objects.filter(
-                exam_session=combo["exam_session"],
-                student__student_class=combo["student__student_class"],
-                student__education_level=combo["student__education_level"],
-                status__in=["APPROVED", "PUBLISHED"],
-            ).order_by(f"-{score_field}", "student__user__first_name")
-
-            if reports.exists():
-                total_students = reports.count()
-
-                # Update class positions
-                with transaction.atomic():
-                    for position, report in enumerate(reports, start=1):
-                        report_model.objects.filter(id=report.id).update(
-                            class_position=position,
-                            total_students=total_students,
-                        )
-                        updated_count += 1
-
-        return updated_count
+        with transaction.atomic():
+            return rank(report_model, **filters)
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:11
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('result', '0007_juniorsecondarytermreport_class_teacher_signature_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportBatchJob',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('education_level', models.CharField(choices=[('NURSERY', 'Nursery'), ('PRIMARY', 'Primary'), ('JUNIOR_SECONDARY', 'Junior Secondary'), ('SENIOR_SECONDARY', 'Senior Secondary')], max_length=50)),
+                ('report_ids', models.JSONField(default=list)),
+                ('output_format', models.CharField(choices=[('ZIP', 'ZIP archive of PDFs'), ('MERGED_PDF', 'Single merged PDF')], default='ZIP', max_length=20)),
+                ('status', models.CharField(choices=[('PENDING', 'Pending'), ('PROCESSING', 'Processing'), ('COMPLETED', 'Completed'), ('FAILED', 'Failed')], default='PENDING', max_length=20)),
+                ('total_reports', models.PositiveIntegerField(default=0)),
+                ('processed_reports', models.PositiveIntegerField(default=0)),
+                ('failed_reports', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('error_message', models.TextField(blank=True)),
+                ('output_file', models.FileField(blank=True, null=True, upload_to='report_batches/')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('completed_at', models.DateTimeField(blank=True, null=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='report_batch_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'results_report_batch_job',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['requested_by', '-created_at'], name='results_rep_request_56da78_idx'), models.Index(fields=['status'], name='results_rep_status_9535d0_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 01:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('result', '0008_report_batch_job'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reportbatchjob',
+            name='heartbeat_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
@@ -2,7 +2,6 @@
 import logging
 from django.db import models, transaction
 from django.conf import settings
-from django.core.cache import cache
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from subject.models import Subject
@@ -15,11 +14,32 @@ from datetime import timedelta
 from students.models import Student, CLASS_CHOICES, EDUCATION_LEVEL_CHOICES
 from classroom.models import Stream
 
+from .grading import get_grade_table, invalidate_grade_table, lookup_grade
+from .ranking import rank, rank_class, rank_subject
+from utils.caching import cached_query
+
 
 # Initialize logger
 logger = logging.getLogger(__name__)
 
 
+@cached_query("class_stats", timeout=300)
+def get_subject_class_stats(
+    result_model, score_field, subject_id, exam_session_id, student_class
+):
+    """Average/highest/lowest of a subject's approved results in a class"""
+    return result_model.objects.filter(
+        subject_id=subject_id,
+        exam_session_id=exam_session_id,
+        student__student_class=student_class,
+        status__in=["APPROVED", "PUBLISHED"],
+    ).aggregate(
+        avg=Avg(score_field),
+        highest=Max(score_field),
+        lowest=Min(score_field),
+    )
+
+
 class GradingSystem(models.Model):
     """Grading system configuration"""
 
@@ -520,11 +540,8 @@ class StudentResult(models.Model):
             self.grade_point = None
             return
 
-        grade_obj = (
-            gs.grades.filter(min_score__lte=pct, max_score__gte=pct)
-            .order_by("-min_score")
-            .first()
-        )
+        grade_table = get_grade_table(gs)
+        grade_obj = grade_table.lookup(pct)
         if grade_obj:
             self.grade = grade_obj.grade
             # if grade_point is present, use it; else None
@@ -536,20 +553,13 @@ class StudentResult(models.Model):
 
         if gs.grading_type == "POINTS":
             # attempt to find an approximate grade by scaling total_score
-            try:
-                max_gp = gs.grades.aggregate(Max("grade_point"))["grade_point__max"]
-                max_gp = float(max_gp) if max_gp is not None else None
-            except Exception:
-                max_gp = None
+            max_gp = grade_table.max_grade_point
+            max_gp = float(max_gp) if max_gp is not None else None
 
             if max_gp and float(gs.max_score or 0) > 0:
                 point_score = (float(self.total_score) / float(gs.max_score)) * max_gp
                 # find the grade with nearest grade_point where grade_point <= point_score (descending)
-                fallback_grade = (
-                    gs.grades.filter(grade_point__lte=point_score)
-                    .order_by("-grade_point")
-                    .first()
-                )
+                fallback_grade = grade_table.lookup_by_grade_point(point_score)
                 if fallback_grade:
                     self.grade = fallback_grade.grade
                     self.grade_point = fallback_grade.grade_point
@@ -803,9 +813,12 @@ class SeniorSecondaryTermReport(BaseTermReport, models.Model):
     def __str__(self):
         return f"{self.student.full_name} - {self.exam_session.name} Senior Secondary Term Report"
 
-    def calculate_metrics(self):
+    def calculate_metrics(self, grade_table=None):
         """
         goodIMPROVED: Efficient metric calculation with single query
+
+        ``grade_table`` (e.g. from ``SessionGradeTables``) saves looking up
+        the grading system when many reports are recalculated
         """
         subject_results = self.subject_results.filter(
             status__in=["APPROVED", "PUBLISHED"]
@@ -818,38 +831,16 @@ class SeniorSecondaryTermReport(BaseTermReport, models.Model):
         if subject_results["count"]:
             self.total_score = subject_results["total"] or 0
             self.average_score = subject_results["avg_pct"] or 0
-            self.overall_grade = self._get_grade_for_percentage(self.average_score)
+            self.overall_grade = self._get_grade_for_percentage(
+                self.average_score, grade_table
+            )
 
         self.save(update_fields=["total_score", "average_score", "overall_grade"])
 
     @classmethod
     def bulk_recalculate_positions(cls, exam_session, student_class, education_level):
-        """
-        goodNEW: Bulk position recalculation
-        """
-        with transaction.atomic():
-            reports = (
-                cls.objects.filter(
-                    exam_session=exam_session,
-                    student__student_class=student_class,
-                    student__education_level=education_level,
-                    status__in=["APPROVED", "PUBLISHED"],
-                )
-                .select_for_update()
-                .order_by("-average_score")
-            )
-
-            total_students = reports.count()
-            updates = []
-
-            for position, report in enumerate(reports, start=1):
-                report.class_position = position
-                report.total_students = total_students
-                updates.append(report)
-
-            cls.objects.bulk_update(
-                updates, ["class_position", "total_students"], batch_size=50
-            )
+        """Bulk position recalculation (single window-function UPDATE)"""
+        rank_class(cls, exam_session, student_class, education_level)
 
     def _get_default_grade(self, percentage):
         """Fallback grading system"""
@@ -908,22 +899,24 @@ class SeniorSecondaryTermReport(BaseTermReport, models.Model):
 
         self.save()
 
-    def _get_grade_for_percentage(self, percentage):
+    def _get_grade_for_percentage(self, percentage, grade_table=None):
         """
         goodNEW: Get grade for a given percentage
         Uses grading system if available, otherwise fallback to default
         """
         try:
-            # Try to get grading system from first subject result
-            first_result = self.subject_results.first()
-            if first_result and hasattr(first_result, "grading_system"):
-                grading_system = first_result.grading_system
-                grade_obj = grading_system.grades.filter(
-                    min_score__lte=percentage, max_score__gte=percentage
+            if grade_table is None:
+                # Try to get grading system from first subject result
+                first_result = self.subject_results.select_related(
+                    "grading_system"
                 ).first()
+                grade_table = get_grade_table(
+                    first_result.grading_system if first_result else None
+                )
+            grade_obj = grade_table.lookup(percentage)
 
-                if grade_obj:
-                    return grade_obj.grade
+            if grade_obj:
+                return grade_obj.grade
         except Exception as e:
             logger.error(f"Error getting grade from grading system: {e}")
 
@@ -1147,9 +1140,7 @@ class SeniorSecondaryResult(models.Model):
     def determine_grade(self):
         """Determine grade based on grading system"""
         try:
-            grade_obj = self.grading_system.grades.filter(
-                min_score__lte=self.total_score, max_score__gte=self.total_score
-            ).first()
+            grade_obj = lookup_grade(self.grading_system, self.total_score)
 
             if grade_obj:
                 self.grade = grade_obj.grade
@@ -1169,32 +1160,16 @@ class SeniorSecondaryResult(models.Model):
         goodIMPROVED: Calculate ONLY this student's position without recalculating others
         Cache class statistics to avoid repeated queries
         """
-        cache_key = f"class_stats_{self.subject.id}_{self.exam_session.id}_{self.student.student_class}"
-        cached_stats = cache.get(cache_key)
-
-        if cached_stats:
-            self.class_average = cached_stats["avg"]
-            self.highest_in_class = cached_stats["highest"]
-            self.lowest_in_class = cached_stats["lowest"]
-        else:
-            # Calculate and cache statistics
-            stats = self.__class__.objects.filter(
-                subject=self.subject,
-                exam_session=self.exam_session,
-                student__student_class=self.student.student_class,
-                status__in=["APPROVED", "PUBLISHED"],
-            ).aggregate(
-                avg=Avg("total_score"),
-                highest=Max("total_score"),
-                lowest=Min("total_score"),
-            )
-
-            self.class_average = stats["avg"] or 0
-            self.highest_in_class = stats["highest"] or 0
-            self.lowest_in_class = stats["lowest"] or 0
-
-            # Cache for 5 minutes
-            cache.set(cache_key, stats, 300)
+        stats = get_subject_class_stats(
+            self.__class__,
+            "total_score",
+            self.subject_id,
+            self.exam_session_id,
+            self.student.student_class,
+        )
+        self.class_average = stats["avg"] or 0
+        self.highest_in_class = stats["highest"] or 0
+        self.lowest_in_class = stats["lowest"] or 0
 
         # Calculate position
         self._calculate_position()
@@ -1240,58 +1215,12 @@ class SeniorSecondaryResult(models.Model):
     def bulk_recalculate_class(
         cls, exam_session, subject, student_class, education_level
     ):
-        """
-        goodNEW: Efficient bulk recalculation method
-        Use this for batch operations instead of individual saves
-        """
-        with transaction.atomic():
-            # Get all results
-            results = (
-                cls.objects.filter(
-                    exam_session=exam_session,
-                    subject=subject,
-                    student__student_class=student_class,
-                    student__education_level=education_level,
-                    status__in=["APPROVED", "PUBLISHED"],
-                )
-                .select_for_update()
-                .order_by("-total_score")
-            )
-
-            if not results.exists():
-                return
-
-            # Calculate class statistics once
-            stats = results.aggregate(
-                avg=Avg("total_score"),
-                highest=Max("total_score"),
-                lowest=Min("total_score"),
-            )
+        """Recalculate positions and class statistics for a subject/class"""
+        rank_subject(cls, exam_session, subject, student_class, education_level)
 
-            # Update all results in bulk
-            updates = []
-            for position, result in enumerate(results, start=1):
-                result.subject_position = position
-                result.class_average = stats["avg"] or 0
-                result.highest_in_class = stats["highest"] or 0
-                result.lowest_in_class = stats["lowest"] or 0
-                updates.append(result)
-
-            # Bulk update without triggering signals
-            cls.objects.bulk_update(
-                updates,
-                [
-                    "subject_position",
-                    "class_average",
-                    "highest_in_class",
-                    "lowest_in_class",
-                ],
-                batch_size=50,
-            )
-
-            # Clear cache
-            cache_key = f"class_stats_{subject.id}_{exam_session.id}_{student_class}"
-            cache.delete(cache_key)
+        get_subject_class_stats.invalidate(
+            cls, "total_score", subject.id, exam_session.id, student_class
+        )
 
     @property
     def position_formatted(self):
@@ -1810,8 +1739,11 @@ class JuniorSecondaryTermReport(BaseTermReport, models.Model):
     def __str__(self):
         return f"{self.student.full_name} - {self.exam_session.name} Junior Secondary Report"
 
-    def calculate_metrics(self):
-        """Calculate consolidated metrics from individual subject results"""
+    def calculate_metrics(self, grade_table=None):
+        """
+        Calculate consolidated metrics from individual subject results;
+        ``grade_table`` saves looking up the grading system
+        """
         from django.db.models import Sum, Count, Avg
 
         subject_results = JuniorSecondaryResult.objects.filter(
@@ -1830,16 +1762,17 @@ class JuniorSecondaryTermReport(BaseTermReport, models.Model):
             self.total_score = totals["total_score_sum"] or 0
             self.average_score = totals["avg_percentage"] or 0
 
-            if hasattr(subject_results.first(), "grading_system"):
-                grading_system = subject_results.first().grading_system
-                grade_obj = grading_system.grades.filter(
-                    min_score__lte=self.average_score, max_score__gte=self.average_score
+            if grade_table is None:
+                first_result = subject_results.select_related(
+                    "grading_system"
                 ).first()
+                grade_table = get_grade_table(
+                    first_result.grading_system if first_result else None
+                )
+            grade_obj = grade_table.lookup(self.average_score)
 
-                if grade_obj:
-                    self.overall_grade = grade_obj.grade
-                else:
-                    self.overall_grade = self._get_default_grade(self.average_score)
+            if grade_obj:
+                self.overall_grade = grade_obj.grade
             else:
                 self.overall_grade = self._get_default_grade(self.average_score)
 
@@ -1904,32 +1837,8 @@ class JuniorSecondaryTermReport(BaseTermReport, models.Model):
 
     @classmethod
     def bulk_recalculate_positions(cls, exam_session, student_class, education_level):
-        """Bulk position recalculation"""
-        from django.db import transaction
-
-        with transaction.atomic():
-            reports = (
-                cls.objects.filter(
-                    exam_session=exam_session,
-                    student__student_class=student_class,
-                    student__education_level=education_level,
-                    status__in=["APPROVED", "PUBLISHED"],
-                )
-                .select_for_update()
-                .order_by("-average_score")
-            )
-
-            total_students = reports.count()
-            updates = []
-
-            for position, report in enumerate(reports, start=1):
-                report.class_position = position
-                report.total_students = total_students
-                updates.append(report)
-
-            cls.objects.bulk_update(
-                updates, ["class_position", "total_students"], batch_size=50
-            )
+        """Bulk position recalculation (single window-function UPDATE)"""
+        rank_class(cls, exam_session, student_class, education_level)
 
 
 class JuniorSecondaryResult(models.Model):
@@ -2184,10 +2093,7 @@ class JuniorSecondaryResult(models.Model):
     def determine_grade(self):
         """Determine grade based on grading system"""
         try:
-            grade_obj = self.grading_system.grades.filter(
-                min_score__lte=self.total_percentage,
-                max_score__gte=self.total_percentage,
-            ).first()
+            grade_obj = lookup_grade(self.grading_system, self.total_percentage)
 
             if grade_obj:
                 self.grade = grade_obj.grade
@@ -2205,30 +2111,16 @@ class JuniorSecondaryResult(models.Model):
 
     def calculate_class_statistics(self):
         """goodIMPROVED: Cached class statistics"""
-        cache_key = f"class_stats_junior_{self.subject.id}_{self.exam_session.id}_{self.student.student_class}"
-        cached_stats = cache.get(cache_key)
-
-        if cached_stats:
-            self.class_average = cached_stats["avg"]
-            self.highest_in_class = cached_stats["highest"]
-            self.lowest_in_class = cached_stats["lowest"]
-        else:
-            stats = self.__class__.objects.filter(
-                subject=self.subject,
-                exam_session=self.exam_session,
-                student__student_class=self.student.student_class,
-                status__in=["APPROVED", "PUBLISHED"],
-            ).aggregate(
-                avg=Avg("total_percentage"),
-                highest=Max("total_percentage"),
-                lowest=Min("total_percentage"),
-            )
-
-            self.class_average = stats["avg"] or 0
-            self.highest_in_class = stats["highest"] or 0
-            self.lowest_in_class = stats["lowest"] or 0
-
-            cache.set(cache_key, stats, 300)  # Cache 5 minutes
+        stats = get_subject_class_stats(
+            self.__class__,
+            "total_percentage",
+            self.subject_id,
+            self.exam_session_id,
+            self.student.student_class,
+        )
+        self.class_average = stats["avg"] or 0
+        self.highest_in_class = stats["highest"] or 0
+        self.lowest_in_class = stats["lowest"] or 0
 
         self._calculate_position()
 
@@ -2269,52 +2161,12 @@ class JuniorSecondaryResult(models.Model):
     def bulk_recalculate_class(
         cls, exam_session, subject, student_class, education_level
     ):
-        """goodNEW: Efficient bulk recalculation"""
-        with transaction.atomic():
-            results = (
-                cls.objects.filter(
-                    exam_session=exam_session,
-                    subject=subject,
-                    student__student_class=student_class,
-                    student__education_level=education_level,
-                    status__in=["APPROVED", "PUBLISHED"],
-                )
-                .select_for_update()
-                .order_by("-total_percentage")
-            )
+        """Recalculate positions and class statistics for a subject/class"""
+        rank_subject(cls, exam_session, subject, student_class, education_level)
 
-            if not results.exists():
-                return
-
-            stats = results.aggregate(
-                avg=Avg("total_percentage"),
-                highest=Max("total_percentage"),
-                lowest=Min("total_percentage"),
-            )
-
-            updates = []
-            for position, result in enumerate(results, start=1):
-                result.subject_position = position
-                result.class_average = stats["avg"] or 0
-                result.highest_in_class = stats["highest"] or 0
-                result.lowest_in_class = stats["lowest"] or 0
-                updates.append(result)
-
-            cls.objects.bulk_update(
-                updates,
-                [
-                    "subject_position",
-                    "class_average",
-                    "highest_in_class",
-                    "lowest_in_class",
-                ],
-                batch_size=50,
-            )
-
-            cache_key = (
-                f"class_stats_junior_{subject.id}_{exam_session.id}_{student_class}"
-            )
-            cache.delete(cache_key)
+        get_subject_class_stats.invalidate(
+            cls, "total_percentage", subject.id, exam_session.id, student_class
+        )
 
     @property
     def exam_marks(self):
@@ -2434,8 +2286,11 @@ class PrimaryTermReport(BaseTermReport, models.Model):
     def __str__(self):
         return f"{self.student.full_name} - {self.exam_session.name} Primary Report"
 
-    def calculate_metrics(self):
-        """Calculate consolidated metrics from individual subject results"""
+    def calculate_metrics(self, grade_table=None):
+        """
+        Calculate consolidated metrics from individual subject results;
+        ``grade_table`` saves looking up the grading system
+        """
         from django.db.models import Sum, Count, Avg
 
         subject_results = PrimaryResult.objects.filter(
@@ -2454,16 +2309,17 @@ class PrimaryTermReport(BaseTermReport, models.Model):
             self.total_score = totals["total_score_sum"] or 0
             self.average_score = totals["avg_percentage"] or 0
 
-            if hasattr(subject_results.first(), "grading_system"):
-                grading_system = subject_results.first().grading_system
-                grade_obj = grading_system.grades.filter(
-                    min_score__lte=self.average_score, max_score__gte=self.average_score
+            if grade_table is None:
+                first_result = subject_results.select_related(
+                    "grading_system"
                 ).first()
+                grade_table = get_grade_table(
+                    first_result.grading_system if first_result else None
+                )
+            grade_obj = grade_table.lookup(self.average_score)
 
-                if grade_obj:
-                    self.overall_grade = grade_obj.grade
-                else:
-                    self.overall_grade = self._get_default_grade(self.average_score)
+            if grade_obj:
+                self.overall_grade = grade_obj.grade
             else:
                 self.overall_grade = self._get_default_grade(self.average_score)
 
@@ -2528,30 +2384,8 @@ class PrimaryTermReport(BaseTermReport, models.Model):
 
     @classmethod
     def bulk_recalculate_positions(cls, exam_session, student_class, education_level):
-        """goodNEW: Bulk position recalculation"""
-        with transaction.atomic():
-            reports = (
-                cls.objects.filter(
-                    exam_session=exam_session,
-                    student__student_class=student_class,
-                    student__education_level=education_level,
-                    status__in=["APPROVED", "PUBLISHED"],
-                )
-                .select_for_update()
-                .order_by("-average_score")
-            )
-
-            total_students = reports.count()
-            updates = []
-
-            for position, report in enumerate(reports, start=1):
-                report.class_position = position
-                report.total_students = total_students
-                updates.append(report)
-
-            cls.objects.bulk_update(
-                updates, ["class_position", "total_students"], batch_size=50
-            )
+        """Bulk position recalculation (single window-function UPDATE)"""
+        rank_class(cls, exam_session, student_class, education_level)
 
 
 class PrimaryResult(models.Model):
@@ -2805,10 +2639,7 @@ class PrimaryResult(models.Model):
     def determine_grade(self):
         """Determine grade based on grading system"""
         try:
-            grade_obj = self.grading_system.grades.filter(
-                min_score__lte=self.total_percentage,
-                max_score__gte=self.total_percentage,
-            ).first()
+            grade_obj = lookup_grade(self.grading_system, self.total_percentage)
 
             if grade_obj:
                 self.grade = grade_obj.grade
@@ -2825,30 +2656,16 @@ class PrimaryResult(models.Model):
             self.is_passed = False
 
     def calculate_class_statistics(self):
-        cache_key = f"class_stats_primary_{self.subject.id}_{self.exam_session.id}_{self.student.student_class}"
-        cached_stats = cache.get(cache_key)
-
-        if cached_stats:
-            self.class_average = cached_stats["avg"]
-            self.highest_in_class = cached_stats["highest"]
-            self.lowest_in_class = cached_stats["lowest"]
-        else:
-            stats = self.__class__.objects.filter(
-                subject=self.subject,
-                exam_session=self.exam_session,
-                student__student_class=self.student.student_class,
-                status__in=["APPROVED", "PUBLISHED"],
-            ).aggregate(
-                avg=Avg("total_percentage"),
-                highest=Max("total_percentage"),
-                lowest=Min("total_percentage"),
-            )
-
-            self.class_average = stats["avg"] or 0
-            self.highest_in_class = stats["highest"] or 0
-            self.lowest_in_class = stats["lowest"] or 0
-
-            cache.set(cache_key, stats, 300)
+        stats = get_subject_class_stats(
+            self.__class__,
+            "total_percentage",
+            self.subject_id,
+            self.exam_session_id,
+            self.student.student_class,
+        )
+        self.class_average = stats["avg"] or 0
+        self.highest_in_class = stats["highest"] or 0
+        self.lowest_in_class = stats["lowest"] or 0
 
         self._calculate_position()
 
@@ -2886,51 +2703,11 @@ class PrimaryResult(models.Model):
     def bulk_recalculate_class(
         cls, exam_session, subject, student_class, education_level
     ):
-        with transaction.atomic():
-            results = (
-                cls.objects.filter(
-                    exam_session=exam_session,
-                    subject=subject,
-                    student__student_class=student_class,
-                    student__education_level=education_level,
-                    status__in=["APPROVED", "PUBLISHED"],
-                )
-                .select_for_update()
-                .order_by("-total_percentage")
-            )
-
-            if not results.exists():
-                return
-
-            stats = results.aggregate(
-                avg=Avg("total_percentage"),
-                highest=Max("total_percentage"),
-                lowest=Min("total_percentage"),
-            )
-
-            updates = []
-            for position, result in enumerate(results, start=1):
-                result.subject_position = position
-                result.class_average = stats["avg"] or 0
-                result.highest_in_class = stats["highest"] or 0
-                result.lowest_in_class = stats["lowest"] or 0
-                updates.append(result)
-
-            cls.objects.bulk_update(
-                updates,
-                [
-                    "subject_position",
-                    "class_average",
-                    "highest_in_class",
-                    "lowest_in_class",
-                ],
-                batch_size=50,
-            )
+        rank_subject(cls, exam_session, subject, student_class, education_level)
 
-            cache_key = (
-                f"class_stats_primary_{subject.id}_{exam_session.id}_{student_class}"
-            )
-            cache.delete(cache_key)
+        get_subject_class_stats.invalidate(
+            cls, "total_percentage", subject.id, exam_session.id, student_class
+        )
 
     @property
     def exam_marks(self):
@@ -3305,30 +3082,8 @@ class NurseryTermReport(BaseTermReport, models.Model):
 
     @classmethod
     def bulk_recalculate_positions(cls, exam_session, student_class, education_level):
-        """Bulk position recalculation for entire class"""
-        with transaction.atomic():
-            reports = (
-                cls.objects.filter(
-                    exam_session=exam_session,
-                    student__student_class=student_class,
-                    student__education_level=education_level,
-                    status__in=["APPROVED", "PUBLISHED"],
-                )
-                .select_for_update()
-                .order_by("-overall_percentage")
-            )
-
-            total_students = reports.count()
-            updates = []
-
-            for position, report in enumerate(reports, start=1):
-                report.class_position = position
-                report.total_students_in_class = total_students
-                updates.append(report)
-
-            cls.objects.bulk_update(
-                updates, ["class_position", "total_students_in_class"], batch_size=50
-            )
+        """Bulk position recalculation (single window-function UPDATE)"""
+        rank_class(cls, exam_session, student_class, education_level)
 
 
 class NurseryResult(models.Model):
@@ -3493,9 +3248,7 @@ class NurseryResult(models.Model):
     def determine_grade(self):
         """Determine grade based on grading system"""
         try:
-            grade_obj = self.grading_system.grades.filter(
-                min_score__lte=self.percentage, max_score__gte=self.percentage
-            ).first()
+            grade_obj = lookup_grade(self.grading_system, self.percentage)
 
             if grade_obj:
                 self.grade = grade_obj.grade
@@ -3580,38 +3333,8 @@ class NurseryResult(models.Model):
     def bulk_recalculate_class(
         cls, exam_session, subject, student_class, education_level
     ):
-        """goodNEW: Efficient bulk recalculation for Nursery"""
-        with transaction.atomic():
-            results = (
-                cls.objects.filter(
-                    exam_session=exam_session,
-                    subject=subject,
-                    student__student_class=student_class,
-                    student__education_level=education_level,
-                    status__in=["APPROVED", "PUBLISHED"],
-                )
-                .select_for_update()
-                .order_by("-percentage")
-            )
-
-            if not results.exists():
-                return
-
-            # Calculate statistics
-            stats = results.aggregate(
-                avg=Avg("percentage"),
-                highest=Max("percentage"),
-                lowest=Min("percentage"),
-            )
-
-            # Update positions
-            updates = []
-            for position, result in enumerate(results, start=1):
-                result.subject_position = position
-                # Note: Nursery doesn't have class_average fields in individual results
-                updates.append(result)
-
-            cls.objects.bulk_update(updates, ["subject_position"], batch_size=50)
+        """Recalculate positions and class statistics for a subject/class"""
+        rank_subject(cls, exam_session, subject, student_class, education_level)
 
 
 # ============================================
@@ -3890,6 +3613,70 @@ class ResultTemplate(models.Model):
         return f"{self.name} ({self.get_template_type_display()})"
 
 
+class ReportBatchJob(models.Model):
+    """Background generation of many term report PDFs into one download"""
+
+    STATUS_CHOICES = [
+        ("PENDING", "Pending"),
+        ("PROCESSING", "Processing"),
+        ("COMPLETED", "Completed"),
+        ("FAILED", "Failed"),
+    ]
+
+    OUTPUT_CHOICES = [
+        ("ZIP", "ZIP archive of PDFs"),
+        ("MERGED_PDF", "Single merged PDF"),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    education_level = models.CharField(max_length=50, choices=EDUCATION_LEVEL_CHOICES)
+    report_ids = models.JSONField(default=list)
+    output_format = models.CharField(
+        max_length=20, choices=OUTPUT_CHOICES, default="ZIP"
+    )
+
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="PENDING")
+    total_reports = models.PositiveIntegerField(default=0)
+    processed_reports = models.PositiveIntegerField(default=0)
+    failed_reports = models.PositiveIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)
+    error_message = models.TextField(blank=True)
+
+    output_file = models.FileField(upload_to="report_batches/", null=True, blank=True)
+
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name="report_batch_jobs",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    # Refreshed with the progress; a PROCESSING job that stops beating died
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "results_report_batch_job"
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["requested_by", "-created_at"]),
+            models.Index(fields=["status"]),
+        ]
+
+    def __str__(self):
+        return f"{self.get_output_format_display()} of {self.total_reports} reports ({self.status})"
+
+    @property
+    def progress(self):
+        """Percentage of reports rendered (successfully or not)"""
+        if not self.total_reports:
+            return 100 if self.status == "COMPLETED" else 0
+        done = self.processed_reports + self.failed_reports
+        return round(done * 100 / self.total_reports)
+
+
 # ============================================
 # SIGNAL HANDLERS FOR BULK RECALCULATION
 # ============================================
@@ -3898,6 +3685,9 @@ from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
 from django.db.models import Avg, Max, Min
 
+from .recalculation import schedule_result_recalculation
+from .report_cache import invalidate_report_pdfs
+
 
 # Helper function to recalculate all statistics for a subject/class
 def recalculate_subject_statistics(
@@ -3905,59 +3695,8 @@ def recalculate_subject_statistics(
 ):
     """
     Recalculate positions and statistics for all students in a subject/class.
-    This is the KEY function that fixes your issue.
     """
-    # Get all results for this subject and class
-    all_results = result_model.objects.filter(
-        subject=subject,
-        exam_session=exam_session,
-        student__student_class=student_class,
-        student__education_level=education_level,
-        status__in=["APPROVED", "PUBLISHED"],
-    ).order_by(
-        "-total_score"
-        if hasattr(result_model.objects.first() or result_model(), "total_score")
-        else "-percentage"
-    )
-
-    if not all_results.exists():
-        return
-
-    # Determine the scoring field to use
-    if hasattr(all_results.first(), "total_percentage"):
-        score_field = "total_percentage"
-    elif hasattr(all_results.first(), "percentage"):
-        score_field = "percentage"
-    else:
-        score_field = "total_score"
-
-    # Calculate class statistics
-    stats = all_results.aggregate(
-        avg=Avg(score_field),
-        highest=Max(score_field),
-        lowest=Min(score_field),
-    )
-
-    class_average = stats["avg"] or 0
-    highest_in_class = stats["highest"] or 0
-    lowest_in_class = stats["lowest"] or 0
-
-    # Get all scores sorted in descending order
-    all_scores = list(all_results.values_list(score_field, flat=True))
-    all_scores.sort(reverse=True)
-
-    # Update each result with correct position and statistics
-    for result in all_results:
-        score = getattr(result, score_field)
-        position = all_scores.index(score) + 1
-
-        # Update without triggering save signals
-        result_model.objects.filter(id=result.id).update(
-            subject_position=position,
-            class_average=class_average,
-            highest_in_class=highest_in_class,
-            lowest_in_class=lowest_in_class,
-        )
+    rank_subject(result_model, exam_session, subject, student_class, education_level)
 
 
 def recalculate_class_positions(
@@ -3966,31 +3705,69 @@ def recalculate_class_positions(
     """
     Recalculate class positions for all students in a class.
     """
-    # Get all reports for this class
-    all_reports = report_model.objects.filter(
-        exam_session=exam_session,
-        student__student_class=student_class,
-        student__education_level=education_level,
-        status__in=["APPROVED", "PUBLISHED"],
-    ).order_by("-average_score")
-
-    if not all_reports.exists():
+    rank_class(report_model, exam_session, student_class, education_level)
+
+
+# GRADE BAND CACHE SIGNALS
+@receiver(post_save, sender=Grade)
+@receiver(post_delete, sender=Grade)
+def handle_grade_change(sender, instance, **kwargs):
+    """Bump the grading system version so cached grade tables reload"""
+    GradingSystem.objects.filter(pk=instance.grading_system_id).update(
+        updated_at=timezone.now()
+    )
+    invalidate_grade_table(instance.grading_system_id)
+
+
+@receiver(post_save, sender=GradingSystem)
+@receiver(post_delete, sender=GradingSystem)
+def handle_grading_system_change(sender, instance, **kwargs):
+    invalidate_grade_table(instance.pk)
+
+
+# REPORT PDF CACHE SIGNALS
+REPORT_PDF_CACHE_LEVELS = {
+    SeniorSecondaryTermReport: "SENIOR_SECONDARY",
+    JuniorSecondaryTermReport: "JUNIOR_SECONDARY",
+    PrimaryTermReport: "PRIMARY",
+    NurseryTermReport: "NURSERY",
+    SeniorSecondaryResult: "SENIOR_SECONDARY",
+    JuniorSecondaryResult: "JUNIOR_SECONDARY",
+    PrimaryResult: "PRIMARY",
+    NurseryResult: "NURSERY",
+}
+
+
+@receiver(post_save, sender=SeniorSecondaryTermReport)
+@receiver(post_delete, sender=SeniorSecondaryTermReport)
+@receiver(post_save, sender=JuniorSecondaryTermReport)
+@receiver(post_delete, sender=JuniorSecondaryTermReport)
+@receiver(post_save, sender=PrimaryTermReport)
+@receiver(post_delete, sender=PrimaryTermReport)
+@receiver(post_save, sender=NurseryTermReport)
+@receiver(post_delete, sender=NurseryTermReport)
+@receiver(post_save, sender=SeniorSecondaryResult)
+@receiver(post_delete, sender=SeniorSecondaryResult)
+@receiver(post_save, sender=JuniorSecondaryResult)
+@receiver(post_delete, sender=JuniorSecondaryResult)
+@receiver(post_save, sender=PrimaryResult)
+@receiver(post_delete, sender=PrimaryResult)
+@receiver(post_save, sender=NurseryResult)
+@receiver(post_delete, sender=NurseryResult)
+def handle_report_pdf_cache_change(sender, instance, **kwargs):
+    """Drop cached PDFs of the affected term report once the change commits"""
+    if kwargs.get("raw", False):
         return
 
-    # Get all scores sorted
-    all_scores = list(all_reports.values_list("average_score", flat=True))
-    all_scores.sort(reverse=True)
-
-    total_students = len(all_scores)
-
-    # Update each report with correct class position
-    for report in all_reports:
-        position = all_scores.index(report.average_score) + 1
+    education_level = REPORT_PDF_CACHE_LEVELS[sender]
+    if isinstance(instance, BaseTermReport):
+        report_id = instance.pk
+    else:
+        report_id = instance.term_report_id
 
-        # Update without triggering save signals
-        report_model.objects.filter(id=report.id).update(
-            class_position=position,
-            total_students=total_students,
+    if report_id:
+        transaction.on_commit(
+            lambda: invalidate_report_pdfs(education_level, report_id)
         )
 
 
@@ -4009,22 +3786,9 @@ def handle_senior_result_save(sender, instance, created, **kwargs):
     if instance.status not in ["APPROVED", "PUBLISHED"]:
         return
 
-    # Schedule bulk recalculation (run async if using Celery)
-    # For now, run synchronously but efficiently
     try:
-        SeniorSecondaryResult.bulk_recalculate_class(
-            instance.exam_session,
-            instance.subject,
-            instance.student.student_class,
-            instance.student.education_level,
-        )
-
-        # Update term report positions
-        SeniorSecondaryTermReport.bulk_recalculate_positions(
-            instance.exam_session,
-            instance.student.student_class,
-            instance.student.education_level,
-        )
+        # Coalesced per transaction; see result/recalculation.py
+        schedule_result_recalculation(instance)
     except Exception as e:
         logger.error(f"Error in bulk recalculation: {e}")
 
@@ -4035,22 +3799,12 @@ def handle_senior_result_delete(sender, instance, **kwargs):
     goodIMPROVED: Efficient deletion handling
     """
     try:
-        # Recalculate remaining students
-        SeniorSecondaryResult.bulk_recalculate_class(
-            instance.exam_session,
-            instance.subject,
-            instance.student.student_class,
-            instance.student.education_level,
-        )
-
-        # Update term report if it exists
         if instance.term_report:
             instance.term_report.calculate_metrics()
-            SeniorSecondaryTermReport.bulk_recalculate_positions(
-                instance.exam_session,
-                instance.student.student_class,
-                instance.student.education_level,
-            )
+
+        # Remaining students and term report positions are recalculated once
+        # the deleting transaction commits
+        schedule_result_recalculation(instance)
     except Exception as e:
         logger.error(f"Error handling result deletion: {e}")
 
@@ -4060,31 +3814,12 @@ def recalculate_senior_session_on_save(sender, instance, created, **kwargs):
     """Recalculate session statistics for all students"""
     if instance.status in ["APPROVED", "PUBLISHED"]:
         # Recalculate subject statistics
-        all_results = SeniorSecondarySessionResult.objects.filter(
+        rank(
+            SeniorSecondarySessionResult,
             subject=instance.subject,
             academic_session=instance.academic_session,
             student__student_class=instance.student.student_class,
-            status__in=["APPROVED", "PUBLISHED"],
-        ).order_by("-average_for_year")
-
-        if all_results.exists():
-            stats = all_results.aggregate(
-                avg=Avg("average_for_year"),
-                highest=Max("average_for_year"),
-                lowest=Min("average_for_year"),
-            )
-
-            all_scores = list(all_results.values_list("average_for_year", flat=True))
-            all_scores.sort(reverse=True)
-
-            for result in all_results:
-                position = all_scores.index(result.average_for_year) + 1
-                SeniorSecondarySessionResult.objects.filter(id=result.id).update(
-                    subject_position=position,
-                    class_average=stats["avg"] or 0,
-                    highest_in_class=stats["highest"] or 0,
-                    lowest_in_class=stats["lowest"] or 0,
-                )
+        )
 
         # Update session report
         session_report, _ = SeniorSecondarySessionReport.objects.get_or_create(
@@ -4101,24 +3836,12 @@ def recalculate_senior_session_on_save(sender, instance, created, **kwargs):
         session_report.calculate_session_metrics()
 
         # Recalculate class positions
-        all_reports = SeniorSecondarySessionReport.objects.filter(
+        rank(
+            SeniorSecondarySessionReport,
             academic_session=instance.academic_session,
             student__student_class=instance.student.student_class,
             student__education_level=instance.student.education_level,
-            status__in=["APPROVED", "PUBLISHED"],
-        ).order_by("-average_for_year")
-
-        if all_reports.exists():
-            all_scores = list(all_reports.values_list("average_for_year", flat=True))
-            all_scores.sort(reverse=True)
-            total_students = len(all_scores)
-
-            for report in all_reports:
-                position = all_scores.index(report.average_for_year) + 1
-                SeniorSecondarySessionReport.objects.filter(id=report.id).update(
-                    class_position=position,
-                    total_students=total_students,
-                )
+        )
 
 
 # JUNIOR SECONDARY SIGNALS
@@ -4132,18 +3855,8 @@ def handle_junior_result_save(sender, instance, created, **kwargs):
         return
 
     try:
-        JuniorSecondaryResult.bulk_recalculate_class(
-            instance.exam_session,
-            instance.subject,
-            instance.student.student_class,
-            instance.student.education_level,
-        )
-
-        JuniorSecondaryTermReport.bulk_recalculate_positions(
-            instance.exam_session,
-            instance.student.student_class,
-            instance.student.education_level,
-        )
+        # Coalesced per transaction; see result/recalculation.py
+        schedule_result_recalculation(instance)
     except Exception as e:
         logger.error(f"Error in Junior bulk recalculation: {e}")
 
@@ -4152,20 +3865,12 @@ def handle_junior_result_save(sender, instance, created, **kwargs):
 def handle_junior_result_delete(sender, instance, **kwargs):
     """goodIMPROVED: Efficient deletion handling"""
     try:
-        JuniorSecondaryResult.bulk_recalculate_class(
-            instance.exam_session,
-            instance.subject,
-            instance.student.student_class,
-            instance.student.education_level,
-        )
-
         if instance.term_report:
             instance.term_report.calculate_metrics()
-            JuniorSecondaryTermReport.bulk_recalculate_positions(
-                instance.exam_session,
-                instance.student.student_class,
-                instance.student.education_level,
-            )
+
+        # Remaining students and term report positions are recalculated once
+        # the deleting transaction commits
+        schedule_result_recalculation(instance)
     except Exception as e:
         logger.error(f"Error handling Junior result deletion: {e}")
 
@@ -4180,18 +3885,8 @@ def handle_primary_result_save(sender, instance, created, **kwargs):
         return
 
     try:
-        PrimaryResult.bulk_recalculate_class(
-            instance.exam_session,
-            instance.subject,
-            instance.student.student_class,
-            instance.student.education_level,
-        )
-
-        PrimaryTermReport.bulk_recalculate_positions(
-            instance.exam_session,
-            instance.student.student_class,
-            instance.student.education_level,
-        )
+        # Coalesced per transaction; see result/recalculation.py
+        schedule_result_recalculation(instance)
     except Exception as e:
         logger.error(f"Error in Primary bulk recalculation: {e}")
 
@@ -4199,20 +3894,12 @@ def handle_primary_result_save(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=PrimaryResult)
 def handle_primary_result_delete(sender, instance, **kwargs):
     try:
-        PrimaryResult.bulk_recalculate_class(
-            instance.exam_session,
-            instance.subject,
-            instance.student.student_class,
-            instance.student.education_level,
-        )
-
         if instance.term_report:
             instance.term_report.calculate_metrics()
-            PrimaryTermReport.bulk_recalculate_positions(
-                instance.exam_session,
-                instance.student.student_class,
-                instance.student.education_level,
-            )
+
+        # Remaining students and term report positions are recalculated once
+        # the deleting transaction commits
+        schedule_result_recalculation(instance)
     except Exception as e:
         logger.error(f"Error handling Primary result deletion: {e}")
 
@@ -4227,18 +3914,8 @@ def handle_nursery_result_save(sender, instance, created, **kwargs):
         return
 
     try:
-        NurseryResult.bulk_recalculate_class(
-            instance.exam_session,
-            instance.subject,
-            instance.student.student_class,
-            instance.student.education_level,
-        )
-
-        NurseryTermReport.bulk_recalculate_positions(
-            instance.exam_session,
-            instance.student.student_class,
-            instance.student.education_level,
-        )
+        # Coalesced per transaction; see result/recalculation.py
+        schedule_result_recalculation(instance)
     except Exception as e:
         logger.error(f"Error in Nursery bulk recalculation: {e}")
 
@@ -4246,20 +3923,12 @@ def handle_nursery_result_save(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=NurseryResult)
 def handle_nursery_result_delete(sender, instance, **kwargs):
     try:
-        NurseryResult.bulk_recalculate_class(
-            instance.exam_session,
-            instance.subject,
-            instance.student.student_class,
-            instance.student.education_level,
-        )
-
         if instance.term_report:
             instance.term_report.calculate_metrics()
-            NurseryTermReport.bulk_recalculate_positions(
-                instance.exam_session,
-                instance.student.student_class,
-                instance.student.education_level,
-            )
+
+        # Remaining students and term report positions are recalculated once
+        # the deleting transaction commits
+        schedule_result_recalculation(instance)
     except Exception as e:
         logger.error(f"Error handling Nursery result deletion: {e}")
 
@@ -0,0 +1,231 @@
+# result/ranking.py
+"""
+Single-pass ranking engine for subject positions, class statistics and
+term/session report positions.
+
+Positions and class statistics are computed by the database with window
+functions (``RANK() OVER (PARTITION BY ...)``, ``AVG() OVER`` ...) and written
+back with one ``UPDATE ... FROM (<ranked subquery>)`` statement, however many
+classes/subjects the filter covers. Recalculating an entire exam session is
+therefore one statement per model instead of one query per student.
+
+Ties use competition ranking (1, 2, 2, 4) everywhere, which matches the
+"number of higher scores + 1" rule used when a single result is saved. Rows
+without a score rank last (PostgreSQL sorts NULLs first in descending order).
+"""
+
+from django.db import connections, router
+from django.db.models import Avg, Count, F, Max, Min, Window
+from django.db.models.functions import DenseRank, Rank
+
+COMPETITION = "competition"
+DENSE = "dense"
+
+RANK_FUNCTIONS = {
+    COMPETITION: Rank,
+    DENSE: DenseRank,
+}
+
+RANKED_STATUSES = ["APPROVED", "PUBLISHED"]
+
+
+class RankingSpec:
+    """How a model is ranked and which columns receive the results"""
+
+    def __init__(
+        self,
+        score_field,
+        partition_by,
+        position_field,
+        total_field=None,
+        average_field=None,
+        highest_field=None,
+        lowest_field=None,
+    ):
+        self.score_field = score_field
+        self.partition_by = partition_by
+        self.position_field = position_field
+        self.total_field = total_field
+        self.average_field = average_field
+        self.highest_field = highest_field
+        self.lowest_field = lowest_field
+
+
+SUBJECT_PARTITION = (
+    "exam_session_id",
+    "subject_id",
+    "student__student_class",
+    "student__education_level",
+)
+CLASS_PARTITION = (
+    "exam_session_id",
+    "student__student_class",
+    "student__education_level",
+)
+
+
+def _subject_spec(score_field):
+    return RankingSpec(
+        score_field=score_field,
+        partition_by=SUBJECT_PARTITION,
+        position_field="subject_position",
+        average_field="class_average",
+        highest_field="highest_in_class",
+        lowest_field="lowest_in_class",
+    )
+
+
+RANKING_SPECS = {
+    # Subject results
+    "result.SeniorSecondaryResult": _subject_spec("total_score"),
+    "result.JuniorSecondaryResult": _subject_spec("total_percentage"),
+    "result.PrimaryResult": _subject_spec("total_percentage"),
+    "result.NurseryResult": RankingSpec(
+        score_field="percentage",
+        partition_by=SUBJECT_PARTITION,
+        position_field="subject_position",
+    ),
+    "result.SeniorSecondarySessionResult": RankingSpec(
+        score_field="average_for_year",
+        partition_by=("academic_session_id", "subject_id", "student__student_class"),
+        position_field="subject_position",
+        average_field="class_average",
+        highest_field="highest_in_class",
+        lowest_field="lowest_in_class",
+    ),
+    # Term / session reports
+    "result.SeniorSecondaryTermReport": RankingSpec(
+        score_field="average_score",
+        partition_by=CLASS_PARTITION,
+        position_field="class_position",
+        total_field="total_students",
+    ),
+    "result.JuniorSecondaryTermReport": RankingSpec(
+        score_field="average_score",
+        partition_by=CLASS_PARTITION,
+        position_field="class_position",
+        total_field="total_students",
+    ),
+    "result.PrimaryTermReport": RankingSpec(
+        score_field="average_score",
+        partition_by=CLASS_PARTITION,
+        position_field="class_position",
+        total_field="total_students",
+    ),
+    "result.NurseryTermReport": RankingSpec(
+        score_field="overall_percentage",
+        partition_by=CLASS_PARTITION,
+        position_field="class_position",
+        total_field="total_students_in_class",
+    ),
+    "result.SeniorSecondarySessionReport": RankingSpec(
+        score_field="average_for_year",
+        partition_by=(
+            "academic_session_id",
+            "student__student_class",
+            "student__education_level",
+        ),
+        position_field="class_position",
+        total_field="total_students",
+    ),
+}
+
+
+def get_ranking_spec(model):
+    return RANKING_SPECS[model._meta.label]
+
+
+def rank(model, method=COMPETITION, **filters):
+    """
+    Rank every APPROVED/PUBLISHED row of ``model`` matching ``filters``.
+
+    All partitions covered by the filters are ranked and written back in a
+    single statement. Returns the number of rows updated.
+
+    Example::
+
+        rank(SeniorSecondaryResult, exam_session=session)  # whole session
+        rank(PrimaryTermReport, exam_session=session, student__student_class="PRIMARY_1")
+    """
+    spec = get_ranking_spec(model)
+    queryset = model.objects.filter(status__in=RANKED_STATUSES, **filters)
+    return rank_queryset(queryset, spec, method=method)
+
+
+def rank_queryset(queryset, spec, method=COMPETITION):
+    """Rank an arbitrary queryset according to ``spec`` in one UPDATE"""
+    model = queryset.model
+    partition = [F(field) for field in spec.partition_by]
+
+    def over(expression, **kwargs):
+        return Window(expression, partition_by=partition, **kwargs)
+
+    annotations = {
+        "ranking_position": over(
+            RANK_FUNCTIONS[method](),
+            order_by=F(spec.score_field).desc(nulls_last=True),
+        )
+    }
+    assignments = {spec.position_field: "ranking_position"}
+
+    if spec.total_field:
+        annotations["ranking_total"] = over(Count("pk"))
+        assignments[spec.total_field] = "ranking_total"
+    if spec.average_field:
+        annotations["ranking_average"] = over(Avg(spec.score_field))
+        assignments[spec.average_field] = "ranking_average"
+    if spec.highest_field:
+        annotations["ranking_highest"] = over(Max(spec.score_field))
+        assignments[spec.highest_field] = "ranking_highest"
+    if spec.lowest_field:
+        annotations["ranking_lowest"] = over(Min(spec.score_field))
+        assignments[spec.lowest_field] = "ranking_lowest"
+
+    ranked = (
+        queryset.order_by()
+        .annotate(ranking_pk=F("pk"), **annotations)
+        .values("ranking_pk", *annotations.keys())
+    )
+
+    using = router.db_for_write(model)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+
+    subquery_sql, params = ranked.query.get_compiler(using).as_sql()
+    table = qn(model._meta.db_table)
+    pk_column = qn(model._meta.pk.column)
+
+    set_clause = ", ".join(
+        f"{qn(model._meta.get_field(field).column)} = ranked.{qn(alias)}"
+        for field, alias in assignments.items()
+    )
+    sql = (
+        f"UPDATE {table} SET {set_clause} "
+        f"FROM ({subquery_sql}) AS ranked "
+        f"WHERE {table}.{pk_column} = ranked.{qn('ranking_pk')}"
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
+
+
+def rank_subject(result_model, exam_session, subject, student_class, education_level):
+    """Recalculate positions/statistics for one subject in one class"""
+    return rank(
+        result_model,
+        exam_session=exam_session,
+        subject=subject,
+        student__student_class=student_class,
+        student__education_level=education_level,
+    )
+
+
+def rank_class(report_model, exam_session, student_class, education_level):
+    """Recalculate term report class positions for one class"""
+    return rank(
+        report_model,
+        exam_session=exam_session,
+        student__student_class=student_class,
+        student__education_level=education_level,
+    )
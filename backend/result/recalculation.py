@@ -0,0 +1,195 @@
+# result/recalculation.py
+"""
+Deferred, coalescing recalculation of subject positions/statistics and
+term-report class positions.
+
+Saving a result used to recalculate the whole class synchronously from the
+post_save signal, so entering 40 scores recalculated the class 40 times.
+Signals now only *mark* the (exam_session, subject, class, education_level)
+as dirty; duplicates collapse into one key and each key is recalculated once
+when the surrounding transaction commits (or in a Celery worker).
+
+Modes (``settings.RESULT_RECALCULATION_MODE``):
+
+* ``"on_commit"`` (default) - run the coalesced batch in-process on commit.
+* ``"celery"`` - on commit, hand the batch to ``result.tasks.recalculate_results``.
+* ``"sync"`` - recalculate immediately on every schedule call (tests/fallback).
+"""
+
+import logging
+
+from django.apps import apps
+from django.conf import settings
+
+from utils.commit_batches import CommitBatch, CommitBatchScheduler
+
+logger = logging.getLogger(__name__)
+
+
+MODE_ON_COMMIT = "on_commit"
+MODE_CELERY = "celery"
+MODE_SYNC = "sync"
+
+# Result model -> term report model whose class positions depend on it
+TERM_REPORT_MODELS = {
+    "result.SeniorSecondaryResult": "result.SeniorSecondaryTermReport",
+    "result.JuniorSecondaryResult": "result.JuniorSecondaryTermReport",
+    "result.PrimaryResult": "result.PrimaryTermReport",
+    "result.NurseryResult": "result.NurseryTermReport",
+}
+
+
+def get_recalculation_mode():
+    return getattr(settings, "RESULT_RECALCULATION_MODE", MODE_ON_COMMIT)
+
+
+class RecalculationBatch(CommitBatch):
+    """Set of dirty subject keys collected within one transaction"""
+
+    def __init__(self, mode=MODE_ON_COMMIT):
+        super().__init__()
+        self.mode = mode
+        self.subject_keys = set()
+
+    def add(self, key):
+        self.subject_keys.add(key)
+
+    def to_payload(self):
+        """JSON-serialisable form of the batch (for Celery)"""
+        return [list(key) for key in sorted(self.subject_keys, key=str)]
+
+    def run(self):
+        """Run in-process or hand off to Celery"""
+        if self.mode == MODE_CELERY:
+            self.dispatch()
+        else:
+            run_recalculation(self.subject_keys)
+
+    def dispatch(self):
+        from .tasks import recalculate_results
+
+        try:
+            recalculate_results.delay(self.to_payload())
+        except Exception as e:
+            # Broker unavailable - never lose the recalculation
+            logger.warning(f"Celery unavailable, recalculating in-process: {e}")
+            run_recalculation(self.subject_keys)
+
+
+def _make_key(result_model, exam_session, subject, student_class, education_level):
+    return (
+        result_model._meta.label,
+        getattr(exam_session, "pk", exam_session),
+        getattr(subject, "pk", subject),
+        student_class,
+        education_level,
+    )
+
+
+def run_recalculation(subject_keys):
+    """
+    Recalculate a collection of subject keys.
+
+    Each key is ``(model_label, exam_session_id, subject_id, student_class,
+    education_level)``. Subject statistics run once per key and term-report
+    positions run once per distinct (model, exam_session, class, level).
+    """
+    from .models import ExamSession
+    from subject.models import Subject
+
+    subject_keys = {tuple(key) for key in subject_keys}
+    if not subject_keys:
+        return 0
+
+    sessions = ExamSession.objects.in_bulk({key[1] for key in subject_keys})
+    subjects = Subject.objects.in_bulk({key[2] for key in subject_keys})
+
+    class_keys = set()
+    for label, session_id, subject_id, student_class, education_level in sorted(
+        subject_keys, key=str
+    ):
+        exam_session = sessions.get(session_id)
+        subject = subjects.get(subject_id)
+        if exam_session is None or subject is None:
+            continue
+
+        try:
+            apps.get_model(label).bulk_recalculate_class(
+                exam_session, subject, student_class, education_level
+            )
+        except Exception as e:
+            logger.error(
+                f"Error recalculating {label} for subject {subject_id} "
+                f"({student_class}): {e}",
+                exc_info=True,
+            )
+        class_keys.add((label, session_id, student_class, education_level))
+
+    for label, session_id, student_class, education_level in sorted(
+        class_keys, key=str
+    ):
+        try:
+            apps.get_model(TERM_REPORT_MODELS[label]).bulk_recalculate_positions(
+                sessions[session_id], student_class, education_level
+            )
+        except Exception as e:
+            logger.error(
+                f"Error recalculating term report positions for {label} "
+                f"({student_class}): {e}",
+                exc_info=True,
+            )
+
+    return len(subject_keys)
+
+
+class RecalculationScheduler(CommitBatchScheduler):
+    """
+    Thread-local collector of dirty recalculation keys: one
+    ``RecalculationBatch`` per thread and transaction, so any number of saves
+    in the same transaction result in a single recalculation per key.
+    """
+
+    batch_class = RecalculationBatch
+
+    def new_batch(self):
+        return RecalculationBatch(get_recalculation_mode())
+
+    def schedule(
+        self, result_model, exam_session, subject, student_class, education_level
+    ):
+        """Mark a subject/class as needing recalculation"""
+        key = _make_key(
+            result_model, exam_session, subject, student_class, education_level
+        )
+        if get_recalculation_mode() == MODE_SYNC:
+            run_recalculation([key])
+            return
+        self.add(key)
+
+    def pending(self):
+        """Keys waiting for the current transaction to commit"""
+        batch = self.current()
+        return set(batch.subject_keys) if batch else set()
+
+    def flush(self):
+        """Run the pending batch in-process now instead of waiting for commit"""
+        batch = self.current()
+        if batch is None:
+            return 0
+        batch.done = True
+        run_recalculation(batch.subject_keys)
+        return len(batch.subject_keys)
+
+
+recalculation_scheduler = RecalculationScheduler()
+
+
+def schedule_result_recalculation(instance):
+    """Schedule recalculation for the class/subject of a result instance"""
+    recalculation_scheduler.schedule(
+        type(instance),
+        instance.exam_session_id,
+        instance.subject_id,
+        instance.student.student_class,
+        instance.student.education_level,
+    )
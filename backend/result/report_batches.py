@@ -0,0 +1,347 @@
+# result/report_batches.py
+"""
+Bulk report-card PDF generation.
+
+Printing a whole class (or school) used to mean one synchronous WeasyPrint
+render per request. A ``ReportBatchJob`` instead records the report IDs to
+print and is processed outside the request/response cycle:
+
+* ``settings.REPORT_BATCH_MODE = "celery"`` (the default wherever a broker is
+  configured) - ``result.tasks.generate_report_batch`` on a worker (falls
+  back to a thread if the broker is unavailable);
+* ``"thread"`` - a background thread in the web process, started once the
+  creating transaction commits. Meant for development and single-host
+  setups: the batch shares the web worker's CPU and dies with it.
+
+Report HTML is built in the job's own thread (it needs the database); the
+CPU-heavy HTML -> PDF step is spread over a process pool of
+``settings.REPORT_BATCH_WORKERS`` processes, started with ``spawn`` so the
+pool is never forked from a multi-threaded web worker. At most
+``PENDING_PER_WORKER`` documents per worker are in flight, so memory stays
+flat however many reports the job has. Finished PDFs are written into a ZIP
+archive as they complete, or appended in order to one merged PDF, and saved
+to ``job.output_file``.
+
+Progress is stored on the job row as it goes and refreshes
+``job.heartbeat_at``. A PROCESSING job that hasn't beaten for
+``settings.REPORT_BATCH_TIMEOUT`` seconds lost its worker; it is marked
+FAILED by ``fail_stale_report_batches`` (the
+``result.tasks.fail_stale_report_batches`` periodic task, and whenever its
+status is polled).
+"""
+
+import io
+import logging
+import multiprocessing
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files import File
+from django.db import connections, transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+MODE_THREAD = "thread"
+MODE_CELERY = "celery"
+
+ZIP = "ZIP"
+MERGED_PDF = "MERGED_PDF"
+
+# Progress is written back to the job row at most this often (in reports)
+PROGRESS_EVERY = 5
+
+# Documents submitted to the process pool ahead of the results, per worker
+PENDING_PER_WORKER = 2
+
+DEFAULT_TIMEOUT = 30 * 60
+
+
+def get_batch_mode():
+    return getattr(settings, "REPORT_BATCH_MODE", MODE_CELERY)
+
+
+def get_batch_workers():
+    return max(1, int(getattr(settings, "REPORT_BATCH_WORKERS", 2)))
+
+
+def get_batch_timeout():
+    return int(getattr(settings, "REPORT_BATCH_TIMEOUT", DEFAULT_TIMEOUT))
+
+
+def _render_pdf(html_string, base_url):
+    """Process pool entry point: HTML -> PDF bytes (no database access)"""
+    from weasyprint import HTML
+
+    return HTML(string=html_string, base_url=base_url).write_pdf()
+
+
+def create_report_batch(user, education_level, report_ids, output_format=ZIP):
+    """Create a pending job and start it once the transaction commits"""
+    from .models import ReportBatchJob
+
+    report_ids = [str(report_id) for report_id in dict.fromkeys(report_ids)]
+    job = ReportBatchJob.objects.create(
+        requested_by=user if getattr(user, "is_authenticated", False) else None,
+        education_level=education_level,
+        report_ids=report_ids,
+        output_format=output_format,
+        total_reports=len(report_ids),
+    )
+    transaction.on_commit(lambda: dispatch_report_batch(job.pk))
+    return job
+
+
+def dispatch_report_batch(job_id):
+    """Hand a job to Celery or a background thread"""
+    if get_batch_mode() == MODE_CELERY:
+        from .tasks import generate_report_batch
+
+        try:
+            generate_report_batch.delay(str(job_id))
+            return
+        except Exception as e:
+            logger.warning(f"Celery unavailable, running report batch in-process: {e}")
+
+    thread = threading.Thread(
+        target=_run_in_thread, args=(job_id,), name=f"report-batch-{job_id}"
+    )
+    thread.daemon = True
+    thread.start()
+
+
+def _run_in_thread(job_id):
+    try:
+        run_report_batch(job_id)
+    finally:
+        # Threads get their own connections; don't leak them
+        connections.close_all()
+
+
+def run_report_batch(job_id):
+    """Process a job; safe to call twice (only a PENDING job is picked up)"""
+    from .models import ReportBatchJob
+
+    now = timezone.now()
+    claimed = ReportBatchJob.objects.filter(pk=job_id, status="PENDING").update(
+        status="PROCESSING", started_at=now, heartbeat_at=now
+    )
+    if not claimed:
+        return ReportBatchJob.objects.filter(pk=job_id).first()
+
+    job = ReportBatchJob.objects.get(pk=job_id)
+    try:
+        ReportBatchRunner(job).run()
+    except Exception as e:
+        logger.error(f"Report batch {job_id} failed: {e}", exc_info=True)
+        job.status = "FAILED"
+        job.error_message = str(e)
+        job.completed_at = timezone.now()
+        job.save(update_fields=["status", "error_message", "completed_at"])
+    return job
+
+
+def fail_stale_report_batches(now=None, **filters):
+    """Mark PROCESSING jobs whose worker stopped beating as FAILED"""
+    from .models import ReportBatchJob
+
+    now = now or timezone.now()
+    stale = ReportBatchJob.objects.filter(
+        status="PROCESSING",
+        heartbeat_at__lt=now - timedelta(seconds=get_batch_timeout()),
+        **filters,
+    )
+    failed = stale.update(
+        status="FAILED",
+        error_message="The report batch stopped responding; please start it again",
+        completed_at=now,
+    )
+    if failed:
+        logger.warning(f"Marked {failed} stalled report batch(es) as failed")
+    return failed
+
+
+class ReportBatchRunner:
+    """Renders the reports of one ``ReportBatchJob`` into its output file"""
+
+    def __init__(self, job):
+        from .report_generation import get_report_generator
+
+        self.job = job
+        self.generator = get_report_generator(job.education_level)
+        self.base_url = self.generator.get_base_url()
+
+    def run(self):
+        from .report_generation import WEASYPRINT_AVAILABLE
+
+        if not WEASYPRINT_AVAILABLE:
+            raise RuntimeError("WeasyPrint system dependencies are not installed")
+
+        with tempfile.TemporaryFile() as output:
+            if self.job.output_format == MERGED_PDF:
+                written = self.write_merged_pdf(output)
+                extension = "pdf"
+            else:
+                written = self.write_zip(output)
+                extension = "zip"
+
+            self.save_progress(force=True)
+            if not written:
+                raise RuntimeError("None of the reports could be generated")
+
+            output.seek(0)
+            self.job.output_file.save(
+                f"{self.job.education_level.lower()}_reports_{self.job.pk}.{extension}",
+                File(output),
+                save=False,
+            )
+
+        self.job.status = "COMPLETED"
+        self.job.completed_at = timezone.now()
+        self.job.save(update_fields=["output_file", "status", "completed_at"])
+        logger.info(
+            f"Report batch {self.job.pk}: {self.job.processed_reports} rendered, "
+            f"{self.job.failed_reports} failed"
+        )
+
+    # ------------------------------------------------------------------
+    # Building and rendering
+    # ------------------------------------------------------------------
+    def build_html(self):
+        """Yield ``(index, html_string, filename)``; failures are recorded"""
+        for index, report_id in enumerate(self.job.report_ids):
+            try:
+                html_string, filename = self.generator.build_term_report(report_id)
+            except Exception as e:
+                self.record_failure(report_id, e)
+                continue
+            yield index, html_string, filename
+
+    def render_pdfs(self, ordered=False):
+        """
+        Yield ``(index, pdf_bytes, filename)`` as PDFs finish rendering, or
+        in report order when ``ordered``.
+
+        Uses a process pool when more than one worker is configured and the
+        current process may start children (Celery's prefork children are
+        daemonic and cannot), otherwise renders in-process.
+        """
+        workers = get_batch_workers()
+        if workers == 1 or multiprocessing.current_process().daemon:
+            for index, html_string, filename in self.build_html():
+                try:
+                    yield index, _render_pdf(html_string, self.base_url), filename
+                except Exception as e:
+                    self.record_failure(self.job.report_ids[index], e)
+            return
+
+        window = workers * PENDING_PER_WORKER
+        pending = {}
+        # index -> (pdf, filename), or None for a failed report; in order
+        # mode later reports wait here for the earlier ones
+        finished = {}
+        next_index = 0
+
+        def drain():
+            nonlocal next_index
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, filename = pending.pop(future)
+                try:
+                    finished[index] = (future.result(), filename)
+                except Exception as e:
+                    self.record_failure(self.job.report_ids[index], e)
+                    finished[index] = None
+
+            ready = sorted(finished)
+            if ordered:
+                ready = []
+                while next_index in finished:
+                    ready.append(next_index)
+                    next_index += 1
+            for index in ready:
+                result = finished.pop(index)
+                if result is not None:
+                    yield index, *result
+
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+            previous = -1
+            for index, html_string, filename in self.build_html():
+                # Reports that failed to build leave a gap in the order
+                for skipped in range(previous + 1, index):
+                    finished[skipped] = None
+                previous = index
+
+                future = pool.submit(_render_pdf, html_string, self.base_url)
+                pending[future] = (index, filename)
+                while pending and len(pending) + len(finished) >= window:
+                    yield from drain()
+            while pending:
+                yield from drain()
+
+    def write_zip(self, output):
+        """Stream finished PDFs into a ZIP archive (already-compressed, so STORED)"""
+        names = set()
+        written = 0
+        with zipfile.ZipFile(output, "w", compression=zipfile.ZIP_STORED) as archive:
+            for index, pdf, filename in self.render_pdfs():
+                archive.writestr(self.unique_name(filename, index, names), pdf)
+                written += 1
+                self.record_success()
+        return written
+
+    def write_merged_pdf(self, output):
+        """One PDF containing every report, in the requested order"""
+        from pypdf import PdfWriter
+
+        merged = PdfWriter()
+        written = 0
+        for _, pdf, _ in self.render_pdfs(ordered=True):
+            merged.append(io.BytesIO(pdf))
+            written += 1
+            self.record_success()
+
+        if written:
+            merged.write(output)
+        return written
+
+    @staticmethod
+    def unique_name(filename, index, names):
+        name = filename or f"report_{index + 1}.pdf"
+        if name in names:
+            stem, _, extension = name.rpartition(".")
+            name = f"{stem}_{index + 1}.{extension}"
+        names.add(name)
+        return name
+
+    # ------------------------------------------------------------------
+    # Progress
+    # ------------------------------------------------------------------
+    def record_success(self):
+        self.job.processed_reports += 1
+        self.save_progress()
+
+    def record_failure(self, report_id, error):
+        logger.warning(f"Report batch {self.job.pk}: report {report_id} failed: {error}")
+        self.job.failed_reports += 1
+        self.job.errors.append({"report_id": str(report_id), "error": str(error)})
+        self.save_progress()
+
+    def save_progress(self, force=False):
+        done = self.job.processed_reports + self.job.failed_reports
+        if force or done % PROGRESS_EVERY == 0:
+            self.job.heartbeat_at = timezone.now()
+            self.job.save(
+                update_fields=[
+                    "processed_reports",
+                    "failed_reports",
+                    "errors",
+                    "heartbeat_at",
+                ]
+            )
@@ -0,0 +1,170 @@
+# result/report_cache.py
+"""
+Content-addressed cache of rendered term report PDFs.
+
+Rendering a report card (query the report, build the context, render the
+template, run WeasyPrint) is by far the most expensive read in the app, and
+on release day the same published report is downloaded over and over.
+
+A report's *fingerprint* is a hash of everything that ends up on the page:
+the term report row (scores, positions, remarks, signatures), its subject
+results, the student/class/session details, the school settings, the
+class-level values of its ``ClassReportContext`` (class size, average age,
+next term date), the student's term attendance rollup and the template source (plus
+``settings.REPORT_TEMPLATE_VERSION`` for changes the template source doesn't
+show, e.g. static assets). It costs a handful of small queries, most of them
+shared with the render through the class context, and is used as:
+
+* the storage key - ``<prefix>/<LEVEL>/<report_id>/<fingerprint>.pdf`` on the
+  default storage, so a changed report simply misses;
+* the HTTP ``ETag`` - a matching ``If-None-Match`` gets a 304 without even
+  touching storage.
+
+Result/report saves and deletes also drop a report's cached files (see the
+signal handlers in ``result/models.py``); writes that bypass signals (bulk
+updates, ranking) are still caught by the fingerprint, and storing a new
+entry removes the report's older ones.
+"""
+
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+
+def is_enabled():
+    return getattr(settings, "REPORT_PDF_CACHE_ENABLED", True)
+
+
+def get_prefix():
+    return getattr(settings, "REPORT_PDF_CACHE_PREFIX", "report_cache").strip("/")
+
+
+_template_hashes = {}
+
+
+def template_fingerprint(template_name):
+    """Hash of a template's source (cached per process outside DEBUG)"""
+    if settings.DEBUG or template_name not in _template_hashes:
+        template = get_template(template_name)
+        source = getattr(getattr(template, "template", template), "source", "")
+        _template_hashes[template_name] = hashlib.sha256(
+            source.encode("utf-8")
+        ).hexdigest()
+    return _template_hashes[template_name]
+
+
+def _row(instance):
+    if instance is None:
+        return None
+    return [getattr(instance, field.attname) for field in instance._meta.concrete_fields]
+
+
+def report_fingerprint(report, template_name, class_context):
+    """
+    Hash of everything rendered on a term report.
+
+    ``report`` should come with ``student__user`` and
+    ``exam_session__academic_session`` (and ``stream`` where the model has
+    one) already selected; ``class_context`` is the report's
+    ``ClassReportContext``, so enrolments and term dates change the hash of
+    every report of the class, and attendance edits the hash of the
+    student's report.
+    """
+    from schoolSettings.models import SchoolSettings
+
+    result_model = report.subject_results.model
+    result_fields = [field.attname for field in result_model._meta.concrete_fields]
+    results = list(
+        report.subject_results.order_by("pk").values_list(
+            *result_fields, "subject__name", "subject__code"
+        )
+    )
+
+    student = report.student
+    parts = [
+        report._meta.label,
+        _row(report),
+        _row(student),
+        [student.user.username, student.user.first_name, student.user.last_name],
+        _row(getattr(report, "stream", None)),
+        _row(report.exam_session),
+        _row(report.exam_session.academic_session),
+        results,
+        [
+            class_context.class_size,
+            class_context.class_average_age,
+            class_context.next_term_begins_for(report),
+        ],
+        _row(class_context.term_attendance.get(report.student_id)),
+        _row(SchoolSettings.objects.first()),
+        template_fingerprint(template_name),
+        getattr(settings, "REPORT_TEMPLATE_VERSION", ""),
+    ]
+    return hashlib.sha256(repr(parts).encode("utf-8")).hexdigest()
+
+
+class ReportPDFCache:
+    """Rendered PDFs on the default storage, keyed by report fingerprint"""
+
+    def __init__(self, storage=None):
+        self.storage = storage or default_storage
+
+    def report_dir(self, education_level, report_id):
+        return f"{get_prefix()}/{education_level}/{report_id}"
+
+    def path(self, education_level, report_id, fingerprint):
+        return f"{self.report_dir(education_level, report_id)}/{fingerprint}.pdf"
+
+    def get(self, education_level, report_id, fingerprint):
+        path = self.path(education_level, report_id, fingerprint)
+        try:
+            with self.storage.open(path, "rb") as f:
+                return f.read()
+        except (FileNotFoundError, OSError):
+            return None
+        except Exception as e:
+            logger.warning(f"Report PDF cache read failed for {path}: {e}")
+            return None
+
+    def put(self, education_level, report_id, fingerprint, pdf):
+        """Store a PDF and drop the report's stale entries"""
+        self.invalidate(education_level, report_id, keep=fingerprint)
+        path = self.path(education_level, report_id, fingerprint)
+        try:
+            if not self.storage.exists(path):
+                self.storage.save(path, ContentFile(pdf))
+        except Exception as e:
+            logger.warning(f"Report PDF cache write failed for {path}: {e}")
+
+    def invalidate(self, education_level, report_id, keep=None):
+        report_dir = self.report_dir(education_level, report_id)
+        try:
+            _, files = self.storage.listdir(report_dir)
+        except (FileNotFoundError, OSError):
+            return
+        except Exception as e:
+            logger.warning(f"Report PDF cache listing failed for {report_dir}: {e}")
+            return
+
+        for name in files:
+            if keep and name == f"{keep}.pdf":
+                continue
+            try:
+                self.storage.delete(f"{report_dir}/{name}")
+            except Exception as e:
+                logger.warning(f"Report PDF cache delete failed for {name}: {e}")
+
+
+report_pdf_cache = ReportPDFCache()
+
+
+def invalidate_report_pdfs(education_level, report_id):
+    """Drop every cached PDF of a term report"""
+    if report_id and is_enabled():
+        report_pdf_cache.invalidate(education_level, report_id)
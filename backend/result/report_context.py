@@ -0,0 +1,207 @@
+# result/report_context.py
+"""
+Class-level values shared by every report card of a class.
+
+Each generator used to look these up per report: ``SchoolSettings`` on every
+call, the class average age by loading every ``Student`` of the class, the
+class size and the next-term date with one query each. None of them depend on
+the individual student, so ``ClassReportContext`` computes them once per
+(education level, class, exam session), lazily, and ``ReportGenerator`` keeps
+one per class for as long as the generator lives - a single download builds
+one, a batch job shares it across the whole class.
+
+Attendance not entered on a report is read from the term's attendance
+rollups (``attendance/rollups.py``), loaded for the whole class at once.
+"""
+
+import logging
+from datetime import datetime
+from functools import cached_property
+
+from dateutil.relativedelta import relativedelta
+
+logger = logging.getLogger(__name__)
+
+DATE_FORMAT = "%B %d, %Y"
+TO_BE_ANNOUNCED = "To Be Announced"
+TERM_ORDER = ["FIRST", "SECOND", "THIRD"]
+
+
+def load_school_info():
+    """School information for the report header"""
+    from schoolSettings.models import SchoolSettings
+
+    try:
+        school = SchoolSettings.objects.first()
+        if not school:
+            return {}
+
+        return {
+            "name": school.school_name or school.site_name or "",
+            "address": school.school_address or "",
+            "phone": school.school_phone or "",
+            "email": school.school_email or "",
+            # Logo is already a string URL from Cloudinary, don't access .url
+            "logo": school.logo if school.logo else None,
+            "motto": school.school_motto or "",
+        }
+    except Exception as e:
+        logger.error(f"Error fetching school info: {e}", exc_info=True)
+        return {}
+
+
+def calculate_age(date_of_birth, today=None):
+    """Age in whole years, or "N/A" without a date of birth"""
+    if not date_of_birth:
+        return "N/A"
+
+    try:
+        return relativedelta(today or datetime.now().date(), date_of_birth).years
+    except Exception as e:
+        logger.error(f"Error calculating age: {e}")
+        return "N/A"
+
+
+def grade_summary(subject_results):
+    """Grade distribution of one student's subject results"""
+    grade_counts = {}
+    for result in subject_results:
+        grade = result.grade or "N/A"
+        grade_counts[grade] = grade_counts.get(grade, 0) + 1
+
+    return [{"grade": k, "count": v} for k, v in sorted(grade_counts.items())]
+
+
+class ClassReportContext:
+    """Per (education level, class, exam session) report card values"""
+
+    def __init__(self, education_level, student_class, exam_session, result_model=None):
+        self.education_level = education_level
+        self.student_class = student_class
+        self.exam_session = exam_session
+        self.result_model = result_model
+
+    @classmethod
+    def for_report(cls, report, result_model=None):
+        return cls(
+            report.student.education_level,
+            report.student.student_class,
+            report.exam_session,
+            result_model,
+        )
+
+    @property
+    def key(self):
+        return (self.education_level, self.student_class, self.exam_session.pk)
+
+    @cached_property
+    def school_info(self):
+        return load_school_info()
+
+    @cached_property
+    def class_average_age(self):
+        """Average (rounded) age of the students of the class"""
+        from students.models import Student
+
+        try:
+            dates_of_birth = Student.objects.filter(
+                student_class=self.student_class,
+                education_level=self.education_level,
+                date_of_birth__isnull=False,
+            ).values_list("date_of_birth", flat=True)
+
+            today = datetime.now().date()
+            ages = [relativedelta(today, dob).years for dob in dates_of_birth]
+            if ages:
+                return round(sum(ages) / len(ages))
+            return "N/A"
+        except Exception as e:
+            logger.error(f"Error calculating class average age: {e}")
+            return "N/A"
+
+    @cached_property
+    def class_size(self):
+        """Students of the class with approved/published results this session"""
+        if self.result_model is None:
+            return 0
+
+        try:
+            return (
+                self.result_model.objects.filter(
+                    exam_session=self.exam_session,
+                    student__student_class=self.student_class,
+                    student__education_level=self.education_level,
+                    status__in=["APPROVED", "PUBLISHED"],
+                )
+                .values("student")
+                .distinct()
+                .count()
+            )
+        except Exception as e:
+            logger.error(f"Error getting total students in class: {e}")
+            return 0
+
+    @cached_property
+    def next_term_begins(self):
+        """Next term's start date from the exam session or the Term calendar"""
+        exam_session = self.exam_session
+        try:
+            if getattr(exam_session, "next_term_begins", None):
+                return exam_session.next_term_begins.strftime(DATE_FORMAT)
+
+            if exam_session.term not in TERM_ORDER:
+                return TO_BE_ANNOUNCED
+
+            current_index = TERM_ORDER.index(exam_session.term)
+            if current_index == len(TERM_ORDER) - 1:
+                # The next session's first term isn't known yet
+                return TO_BE_ANNOUNCED
+
+            from academics.models import Term
+
+            next_term = Term.objects.filter(
+                academic_session_id=exam_session.academic_session_id,
+                name=TERM_ORDER[current_index + 1],
+                is_active=True,
+            ).first()
+            if next_term and next_term.start_date:
+                return next_term.start_date.strftime(DATE_FORMAT)
+        except Exception as e:
+            logger.error(f"Error getting next term begins: {e}")
+
+        return TO_BE_ANNOUNCED
+
+    @cached_property
+    def term_attendance(self):
+        """student_id -> attendance rollup of the exam session's term"""
+        from attendance.models import StudentTermAttendance
+
+        try:
+            rollups = StudentTermAttendance.objects.filter(
+                term__academic_session_id=self.exam_session.academic_session_id,
+                term__name=self.exam_session.term,
+                student__student_class=self.student_class,
+                student__education_level=self.education_level,
+            )
+            return {rollup.student_id: rollup for rollup in rollups}
+        except Exception as e:
+            logger.error(f"Error loading term attendance: {e}")
+            return {}
+
+    def attendance_for(
+        self, report, opened_field="times_opened", present_field="times_present"
+    ):
+        """Attendance entered on the report wins over the term's rollup"""
+        rollup = self.term_attendance.get(report.student_id)
+        return {
+            "times_opened": getattr(report, opened_field)
+            or (rollup.total if rollup else 0),
+            "times_present": getattr(report, present_field)
+            or (rollup.present if rollup else 0),
+        }
+
+    def next_term_begins_for(self, report):
+        """A report's own next-term date wins over the class-level one"""
+        if getattr(report, "next_term_begins", None):
+            return report.next_term_begins.strftime(DATE_FORMAT)
+        return self.next_term_begins
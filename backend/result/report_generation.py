@@ -3,11 +3,12 @@ Complete implementation for PDF report generation using WeasyPrint - WITH DEBUGG
 """
 
 from django.template.loader import render_to_string
-from django.http import HttpResponse, JsonResponse
+from django.http import HttpResponse, HttpResponseNotModified, JsonResponse
+from django.utils.http import parse_etags, quote_etag
 from django.conf import settings
-from dateutil.relativedelta import relativedelta
+from django.db.models import Prefetch
+from django.core.exceptions import ObjectDoesNotExist
 
-import tempfile
 import logging
 from datetime import datetime
 from decimal import Decimal
@@ -18,12 +19,19 @@ from .models import (
     SeniorSecondarySessionReport,
     JuniorSecondaryTermReport,
     PrimaryTermReport,
-    PrimaryResult,
     NurseryTermReport,
     ExamSession,
 )
+from .grading import lookup_grade
+from .report_context import (
+    DATE_FORMAT,
+    ClassReportContext,
+    calculate_age,
+    grade_summary,
+    load_school_info,
+)
+from . import report_cache
 from students.models import Student
-from schoolSettings.models import SchoolSettings
 
 try:
     from weasyprint import HTML
@@ -55,9 +63,12 @@ class ReportGenerator:
     """Base class for generating PDF reports"""
 
     EDUCATION_LEVEL = None  # To be set by subclasses
+    TERM_REPORT_MODEL = None
 
     def __init__(self, request=None):
         self.request = request
+        # ClassReportContext per (education level, class, exam session)
+        self._class_contexts = {}
 
     def get_template(self, report_type="term"):
         """Get template path based on education level and report type"""
@@ -70,27 +81,7 @@ class ReportGenerator:
 
     def get_school_info(self):
         """Get school information for the report header"""
-        try:
-            school = SchoolSettings.objects.first()
-            if not school:
-                return {}
-
-            return {
-                "name": school.school_name or school.site_name or "",
-                "address": school.school_address or "",
-                "phone": school.school_phone or "",
-                "email": school.school_email or "",
-                # goodLogo is already a string URL from Cloudinary, don't access .url
-                "logo": school.logo if school.logo else None,
-                "motto": school.school_motto or "",
-            }
-        except Exception as e:
-            print(f"Error fetching school info: {e}")
-            import traceback
-
-            traceback.print_exc()
-            return {}
-    # Add to the ReportGenerator base class (around line 60, after get_school_info)
+        return load_school_info()
 
     def get_signatures(self, report):
         """
@@ -183,6 +174,16 @@ class ReportGenerator:
         sanitized = re.sub(r"_+", "_", sanitized)
         return sanitized
 
+    def get_base_url(self):
+        """Base URL WeasyPrint resolves relative static/media URLs against"""
+        if self.request:
+            return self.request.build_absolute_uri("/")
+        return getattr(settings, "WEASYPRINT_BASEURL", "")
+
+    def render_pdf(self, html_string):
+        """Render an HTML string to PDF bytes"""
+        return HTML(string=html_string, base_url=self.get_base_url()).write_pdf()
+
     def generate_pdf(self, html_string, filename):
         """Generate PDF from HTML string"""
         if not WEASYPRINT_AVAILABLE:
@@ -195,18 +196,7 @@ class ReportGenerator:
             )
 
         try:
-            with tempfile.NamedTemporaryFile(delete=True, suffix=".pdf") as output:
-                base_url = (
-                    self.request.build_absolute_uri("/")
-                    if self.request
-                    else getattr(settings, "WEASYPRINT_BASEURL", "")
-                )
-
-                HTML(string=html_string, base_url=base_url).write_pdf(
-                    target=output.name
-                )
-                output.seek(0)
-                pdf = output.read()
+            pdf = self.render_pdf(html_string)
 
             response = HttpResponse(pdf, content_type="application/pdf")
             response["Content-Disposition"] = f'attachment; filename="{filename}"'
@@ -218,209 +208,193 @@ class ReportGenerator:
                 {"error": "Failed to generate PDF report", "detail": str(e)}, status=500
             )
 
-
-class SeniorSecondaryReportGenerator(ReportGenerator):
-    """Generate reports for Senior Secondary students"""
-
-    EDUCATION_LEVEL = "SENIOR_SECONDARY"
-
-    def generate_term_report(self, report_id):
-        """Generate term report for Senior Secondary student"""
-        try:
-            # 🔍 DEBUG: Log the report_id being requested
-            print(f"\n{'='*60}")
-            print(f"🔍 GENERATING REPORT FOR ID: {report_id}")
-            print(f"🚀 GENERATOR TYPE: {type(report_id)}")
-            print(f"{'='*60}")
-
-            report = (
-                SeniorSecondaryTermReport.objects.select_related(
-                    "student", "student__user", "exam_session", "stream"
-                )
-                .prefetch_related(
-                    "subject_results__subject", "subject_results__grading_system"
+    def term_report_queryset(self):
+        related = ["student__user", "exam_session__academic_session"]
+        if hasattr(self.TERM_REPORT_MODEL, "stream"):
+            related.append("stream")
+        return self.TERM_REPORT_MODEL.objects.select_related(*related)
+
+    def get_term_report(self, report_id):
+        """A term report with everything its context needs, in two queries"""
+        result_model = self.TERM_REPORT_MODEL.subject_results.rel.related_model
+        return (
+            self.term_report_queryset()
+            .prefetch_related(
+                Prefetch(
+                    "subject_results",
+                    queryset=result_model.objects.select_related(
+                        "subject", "grading_system"
+                    ).order_by("subject__name"),
                 )
-                .get(id=report_id)
             )
+            .get(id=report_id)
+        )
 
-            subject_results = (
-                report.subject_results.all()
-                .select_related("subject", "grading_system")
-                .order_by("subject__name")
-            )
+    def get_class_context(self, report):
+        """Shared ClassReportContext of the report's class and exam session"""
+        class_context = ClassReportContext.for_report(
+            report, report.subject_results.model
+        )
+        return self._class_contexts.setdefault(class_context.key, class_context)
 
-            subjects_data = []
-            for idx, result in enumerate(subject_results, 1):
-                subject_info = {
-                    "name": result.subject.name,
-                    "code": result.subject.code,
-                    "first_test": float(result.first_test_score or 0),
-                    "second_test": float(result.second_test_score or 0),
-                    "third_test": float(result.third_test_score or 0),
-                    "ca_total": float(result.total_ca_score or 0),
-                    "exam": float(result.exam_score or 0),
-                    "total": float(result.total_score or 0),
-                    "grade": result.grade or "",
-                    "position": self.format_grade_suffix(result.subject_position),
-                    "remark": result.teacher_remark or "",
-                }
-                subjects_data.append(subject_info)
+    def get_term_info(self, report):
+        return {
+            "name": report.exam_session.get_term_display(),
+            "session": report.exam_session.academic_session.name,
+            "year": report.exam_session.academic_session.start_date.year,
+        }
 
-                # 🔍 DEBUG: Print first 3 subjects
-                if idx <= 3:
-                    print(
-                        f"  {idx}. {result.subject.name}: {result.total_score} ({result.grade})"
-                    )
+    def get_term_context(self, report, class_context):
+        """Template context of a term report"""
+        raise NotImplementedError
 
-            grade_summary = self._calculate_grade_summary(subject_results)
+    def build_term_report(self, report_id):
+        """Return ``(html_string, filename)`` for a term report"""
+        report = self.get_term_report(report_id)
+        context = self.get_term_context(report, self.get_class_context(report))
+        html_string = render_to_string(self.get_template("term"), context)
+        return html_string, self.get_term_report_filename(report)
 
-            # ✅ Get next term begins with multiple fallback methods
-            next_term_begins_str = self._get_next_term_begins(report)
+    def render_term_report(self, report_id):
+        """Return ``(pdf_bytes, filename)`` for a term report (batch jobs)"""
+        html_string, filename = self.build_term_report(report_id)
+        return self.render_pdf(html_string), filename
 
-            DATE_FORMAT = "%B %d, %Y"
-            context = {
-                "report_type": "TERM_REPORT",
-                "school": self.get_school_info(),
-                "student": {
-                    "name": report.student.full_name,
-                    "admission_number": report.student.registration_number or "",
-                    "class": report.student.get_student_class_display(),
-                    "stream": report.stream.name if report.stream else "",
-                },
-                "term": {
-                    "name": report.exam_session.get_term_display(),
-                    "session": report.exam_session.academic_session.name,
-                    "year": report.exam_session.academic_session.start_date.year,
-                },
-                "subjects": subjects_data,
-                "summary": {
-                    "total_subjects": len(subjects_data),
-                    "total_score": float(report.total_score or 0),
-                    "average": float(report.average_score or 0),
-                    "grade": report.overall_grade or "",
-                    "position": self.format_grade_suffix(report.class_position),
-                    "total_students": report.total_students or 0,
-                },
-                "grade_summary": grade_summary,
-                "attendance": {
-                    "times_opened": report.times_opened or 0,
-                    "times_present": report.times_present or 0,
-                },
-                "next_term_begins": next_term_begins_str,
-                "remarks": {
-                    "class_teacher": report.class_teacher_remark or "",
-                    "head_teacher": report.head_teacher_remark or "",
-                },
-                "signatures": self.get_signatures(report),
-                "generated_date": datetime.now().strftime(DATE_FORMAT),
-            }
+    def get_term_report_filename(self, report):
+        return self.sanitize_filename(
+            f"{report.student.registration_number or report.student.user.username}_term_report.pdf"
+        )
 
-            # Use template mapping
-            template = self.get_template("term")
-            html_string = render_to_string(template, context)
+    def get_term_report_for_fingerprint(self, report_id):
+        return self.term_report_queryset().get(id=report_id)
 
-            filename = self.sanitize_filename(
-                f"{report.student.registration_number or report.student.user.username}_term_report.pdf"
-            )
+    def generate_term_report(self, report_id):
+        """
+        Generate a term report PDF response.
 
-            print(f"💾 Filename: {filename}\n")
+        Rendered PDFs are cached by report fingerprint (see report_cache), which
+        doubles as the ETag so unchanged reports get a 304.
+        """
+        if not WEASYPRINT_AVAILABLE or not report_cache.is_enabled():
+            return self._generate_uncached_term_report(report_id)
 
-            return self.generate_pdf(html_string, filename)
+        try:
+            report = self.get_term_report_for_fingerprint(report_id)
+            fingerprint = report_cache.report_fingerprint(
+                report, self.get_template("term"), self.get_class_context(report)
+            )
+        except ObjectDoesNotExist:
+            logger.error(f"Report with ID {report_id} not found")
+            return JsonResponse(
+                {"error": f"Report with ID {report_id} not found"}, status=404
+            )
+        except Exception as e:
+            logger.warning(f"Report fingerprint failed, rendering uncached: {e}")
+            return self._generate_uncached_term_report(report_id)
+
+        etag = quote_etag(fingerprint)
+        if_none_match = self.request and self.request.headers.get("If-None-Match")
+        if if_none_match and etag in parse_etags(if_none_match):
+            response = HttpResponseNotModified()
+            response["ETag"] = etag
+            return response
 
-        except SeniorSecondaryTermReport.DoesNotExist:
-            logger.error(f"❌ Report with ID {report_id} not found")
+        filename = self.get_term_report_filename(report)
+        pdf = report_cache.report_pdf_cache.get(
+            self.EDUCATION_LEVEL, report.pk, fingerprint
+        )
+        if pdf is None:
+            response = self._generate_uncached_term_report(report_id)
+            if response.status_code != 200:
+                return response
+            pdf = response.content
+            report_cache.report_pdf_cache.put(
+                self.EDUCATION_LEVEL, report.pk, fingerprint, pdf
+            )
+
+        response = HttpResponse(pdf, content_type="application/pdf")
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        response["ETag"] = etag
+        response["Cache-Control"] = "private, no-cache"
+        return response
+
+    def _generate_uncached_term_report(self, report_id):
+        try:
+            html_string, filename = self.build_term_report(report_id)
+        except ObjectDoesNotExist:
+            logger.error(f"Report with ID {report_id} not found")
             return JsonResponse(
                 {"error": f"Report with ID {report_id} not found"}, status=404
             )
         except Exception as e:
             logger.error(
-                f"❌ Error generating Senior Secondary term report: {e}", exc_info=True
+                f"Error generating {self.EDUCATION_LEVEL} term report: {e}",
+                exc_info=True,
             )
             return JsonResponse(
                 {"error": "Failed to generate report", "detail": str(e)}, status=500
             )
 
-    def _calculate_grade_summary(self, subject_results):
-        """Calculate grade distribution summary"""
-        grade_counts = {}
-        for result in subject_results:
-            grade = result.grade or "N/A"
-            grade_counts[grade] = grade_counts.get(grade, 0) + 1
+        return self.generate_pdf(html_string, filename)
 
-        return [{"grade": k, "count": v} for k, v in sorted(grade_counts.items())]
 
-    def _get_next_term_begins(self, report):
-        """
-        Get the next term's start date with multiple fallback methods
-        ✅ IMPROVED METHOD
-        """
-        try:
-            # Method 1: Check report's next_term_begins field directly
-            if hasattr(report, "next_term_begins") and report.next_term_begins:
-                print(f"✅ Next term begins from report: {report.next_term_begins}")
-                return report.next_term_begins.strftime("%B %d, %Y")
+class SeniorSecondaryReportGenerator(ReportGenerator):
+    """Generate reports for Senior Secondary students"""
 
-            # Method 2: Check exam_session's next_term_begins
-            if (
-                hasattr(report.exam_session, "next_term_begins")
-                and report.exam_session.next_term_begins
-            ):
-                print(
-                    f"✅ Next term begins from exam_session: {report.exam_session.next_term_begins}"
-                )
-                return report.exam_session.next_term_begins.strftime("%B %d, %Y")
-
-            # Method 3: Try to find next term in Term model
-            try:
-                from academics.models import Term
-
-                current_term = report.exam_session.term  # "FIRST", "SECOND", or "THIRD"
-                current_session = report.exam_session.academic_session
-
-                # Map term order
-                term_order = ["FIRST", "SECOND", "THIRD"]
-                if current_term in term_order:
-                    current_index = term_order.index(current_term)
-
-                    # If we're not on the last term, get next term in same session
-                    if current_index < len(term_order) - 1:
-                        next_term_name = term_order[current_index + 1]
-                        next_term = Term.objects.filter(
-                            academic_session=current_session,
-                            name=next_term_name,
-                            is_active=True,
-                        ).first()
-
-                        if (
-                            next_term
-                            and hasattr(next_term, "start_date")
-                            and next_term.start_date
-                        ):
-                            print(
-                                f"✅ Next term begins from Term model: {next_term.start_date}"
-                            )
-                            return next_term.start_date.strftime("%B %d, %Y")
-                    else:
-                        # It's the last term, try to get first term of next session
-                        print(
-                            "ℹ️ Current term is THIRD, looking for next session's FIRST term"
-                        )
-                        # This would require finding the next academic session
-                        # For now, return TBA
-                        return "To Be Announced"
-
-            except ImportError:
-                print("⚠️ Term model not available for next term lookup")
-            except Exception as term_error:
-                print(f"⚠️ Error looking up next term: {term_error}")
-
-            # Method 4: Default fallback
-            print("⚠️ Could not determine next term begins date")
-            return "To Be Announced"
+    EDUCATION_LEVEL = "SENIOR_SECONDARY"
+    TERM_REPORT_MODEL = SeniorSecondaryTermReport
 
-        except Exception as e:
-            logger.error(f"Error getting next term begins: {e}")
-            return "To Be Announced"
+    def get_term_context(self, report, class_context):
+        """Template context of a Senior Secondary term report"""
+        subject_results = report.subject_results.all()
+
+        subjects_data = []
+        for result in subject_results:
+            subjects_data.append(
+                {
+                    "name": result.subject.name,
+                    "code": result.subject.code,
+                    "first_test": float(result.first_test_score or 0),
+                    "second_test": float(result.second_test_score or 0),
+                    "third_test": float(result.third_test_score or 0),
+                    "ca_total": float(result.total_ca_score or 0),
+                    "exam": float(result.exam_score or 0),
+                    "total": float(result.total_score or 0),
+                    "grade": result.grade or "",
+                    "position": self.format_grade_suffix(result.subject_position),
+                    "remark": result.teacher_remark or "",
+                }
+            )
+
+        return {
+            "report_type": "TERM_REPORT",
+            "school": class_context.school_info,
+            "student": {
+                "name": report.student.full_name,
+                "admission_number": report.student.registration_number or "",
+                "class": report.student.get_student_class_display(),
+                "stream": report.stream.name if report.stream else "",
+            },
+            "term": self.get_term_info(report),
+            "subjects": subjects_data,
+            "summary": {
+                "total_subjects": len(subjects_data),
+                "total_score": float(report.total_score or 0),
+                "average": float(report.average_score or 0),
+                "grade": report.overall_grade or "",
+                "position": self.format_grade_suffix(report.class_position),
+                "total_students": report.total_students or 0,
+            },
+            "grade_summary": grade_summary(subject_results),
+            "attendance": class_context.attendance_for(report),
+            "next_term_begins": class_context.next_term_begins_for(report),
+            "remarks": {
+                "class_teacher": report.class_teacher_remark or "",
+                "head_teacher": report.head_teacher_remark or "",
+            },
+            "signatures": self.get_signatures(report),
+            "generated_date": datetime.now().strftime(DATE_FORMAT),
+        }
 
     def generate_session_report(self, report_id):
         """Generate session report for Senior Secondary student"""
@@ -754,607 +728,147 @@ class JuniorSecondaryReportGenerator(ReportGenerator):
     """Generate reports for Junior Secondary students"""
 
     EDUCATION_LEVEL = "JUNIOR_SECONDARY"
+    TERM_REPORT_MODEL = JuniorSecondaryTermReport
 
-    def generate_term_report(self, report_id):
-        """Generate term report for Junior Secondary student"""
-        try:
-            report = (
-                JuniorSecondaryTermReport.objects.select_related(
-                    "student", "student__user", "exam_session"
-                )
-                .prefetch_related(
-                    "subject_results__subject", "subject_results__grading_system"
-                )
-                .get(id=report_id)
-            )
-
-            subject_results = (
-                report.subject_results.all()
-                .select_related("subject", "grading_system")
-                .order_by("subject__name")
-            )
-
-            subjects_data = []
-            for result in subject_results:
-                subjects_data.append(
-                    {
-                        "name": result.subject.name,
-                        "code": result.subject.code,
-                        "ca": float(result.continuous_assessment_score or 0),
-                        "take_home": float(result.take_home_test_score or 0),
-                        "practical": float(result.practical_score or 0),
-                        "appearance": float(result.appearance_score or 0),
-                        "project": float(result.project_score or 0),
-                        "note_copying": float(result.note_copying_score or 0),
-                        "ca_total": float(result.ca_total or 0),
-                        "exam": float(result.exam_score or 0),
-                        "total": float(result.total_score or 0),
-                        "grade": result.grade or "",
-                        "position": self.format_grade_suffix(result.subject_position),
-                        "remark": result.teacher_remark or "",
-                    }
-                )
-
-            # ✅ FIX 1: Calculate student age
-            student_age = self._calculate_student_age(report.student.date_of_birth)
-
-            # ✅ FIX 2: Get class average age (if needed)
-            class_age = self._get_class_average_age(report.student, report.exam_session)
-
-            # ✅ FIX 3: Get next term begins with multiple fallback methods
-            next_term_begins_str = self._get_next_term_begins(report)
-
-            DATE_FORMAT = "%B %d, %Y"
-            context = {
-                "report_type": "TERM_REPORT",
-                "school": self.get_school_info(),
-                "student": {
-                    "name": report.student.full_name,
-                    "admission_number": report.student.registration_number or "",
-                    "class": report.student.get_student_class_display(),
-                    "age": student_age,
-                    "class_age": class_age,
-                },
-                "term": {
-                    "name": report.exam_session.get_term_display(),
-                    "session": report.exam_session.academic_session.name,
-                    "year": report.exam_session.academic_session.start_date.year,
-                },
-                "subjects": subjects_data,
-                "summary": {
-                    "total_subjects": len(subjects_data),
-                    "total_score": float(report.total_score or 0),
-                    "average": float(report.average_score or 0),
-                    "grade": report.overall_grade or "",
-                    "position": self.format_grade_suffix(report.class_position),
-                    "total_students": report.total_students or 0,
-                },
-                "attendance": {
-                    "times_opened": report.times_opened or 0,
-                    "times_present": report.times_present or 0,
-                },
-                "next_term_begins": next_term_begins_str,
-                "remarks": {
-                    "class_teacher": report.class_teacher_remark or "",
-                    "head_teacher": report.head_teacher_remark or "",
-                },
-                "generated_date": datetime.now().strftime(DATE_FORMAT),
-                "signatures": self.get_signatures(report),
-                "generated_date": datetime.now().strftime(DATE_FORMAT),
-            }
-
-            template = self.get_template("term")
-            html_string = render_to_string(template, context)
-
-            filename = self.sanitize_filename(
-                f"{report.student.registration_number or report.student.user.username}_term_report.pdf"
-            )
-
-            return self.generate_pdf(html_string, filename)
-
-        except JuniorSecondaryTermReport.DoesNotExist:
-            logger.error(f"Report with ID {report_id} not found")
-            return JsonResponse(
-                {"error": f"Report with ID {report_id} not found"}, status=404
-            )
-        except Exception as e:
-            logger.error(
-                f"Error generating Junior Secondary term report: {e}", exc_info=True
-            )
-            return JsonResponse(
-                {"error": "Failed to generate report", "detail": str(e)}, status=500
-            )
-
-    def _calculate_student_age(self, date_of_birth):
-        """
-        Calculate student age from date of birth
-        ✅ NEW METHOD - Copied from PrimaryReportGenerator
-        """
-        if not date_of_birth:
-            return "N/A"
-
-        try:
-            today = datetime.now().date()
-            age = relativedelta(today, date_of_birth).years
-            return age
-        except Exception as e:
-            logger.error(f"Error calculating age: {e}")
-            return "N/A"
-
-    def _get_class_average_age(self, student, exam_session):
-        """
-        Calculate average age of students in the same class
-        ✅ NEW METHOD
-        """
-        try:
-            from django.db.models import Avg
-            from students.models import Student
-
-            # Get all students in the same class with valid birthdates
-            same_class_students = Student.objects.filter(
-                student_class=student.student_class,
-                education_level=student.education_level,
-                date_of_birth__isnull=False,
+    def get_term_context(self, report, class_context):
+        """Template context of a Junior Secondary term report"""
+        subjects_data = []
+        for result in report.subject_results.all():
+            subjects_data.append(
+                {
+                    "name": result.subject.name,
+                    "code": result.subject.code,
+                    "ca": float(result.continuous_assessment_score or 0),
+                    "take_home": float(result.take_home_test_score or 0),
+                    "practical": float(result.practical_score or 0),
+                    "appearance": float(result.appearance_score or 0),
+                    "project": float(result.project_score or 0),
+                    "note_copying": float(result.note_copying_score or 0),
+                    "ca_total": float(result.ca_total or 0),
+                    "exam": float(result.exam_score or 0),
+                    "total": float(result.total_score or 0),
+                    "grade": result.grade or "",
+                    "position": self.format_grade_suffix(result.subject_position),
+                    "remark": result.teacher_remark or "",
+                }
             )
 
-            if not same_class_students.exists():
-                return "N/A"
-
-            # Calculate ages and get average
-            today = datetime.now().date()
-            ages = []
-            for s in same_class_students:
-                if s.date_of_birth:
-                    from dateutil.relativedelta import relativedelta
-
-                    age = relativedelta(today, s.date_of_birth).years
-                    ages.append(age)
-
-            if ages:
-                avg_age = sum(ages) / len(ages)
-                return round(avg_age)
-
-            return "N/A"
-        except Exception as e:
-            logger.error(f"Error calculating class average age: {e}")
-            return "N/A"
-
-    def _get_next_term_begins(self, report):
-        """
-        Get the next term's start date with multiple fallback methods
-        ✅ IMPROVED METHOD
-        """
-        try:
-            # Method 1: Check report's next_term_begins field directly
-            if hasattr(report, "next_term_begins") and report.next_term_begins:
-                print(f"✅ Next term begins from report: {report.next_term_begins}")
-                return report.next_term_begins.strftime("%B %d, %Y")
-
-            # Method 2: Check exam_session's next_term_begins
-            if (
-                hasattr(report.exam_session, "next_term_begins")
-                and report.exam_session.next_term_begins
-            ):
-                print(
-                    f"✅ Next term begins from exam_session: {report.exam_session.next_term_begins}"
-                )
-                return report.exam_session.next_term_begins.strftime("%B %d, %Y")
-
-            # Method 3: Try to find next term in Term model
-            try:
-                from academics.models import Term
-
-                current_term = report.exam_session.term  # "FIRST", "SECOND", or "THIRD"
-                current_session = report.exam_session.academic_session
-
-                # Map term order
-                term_order = ["FIRST", "SECOND", "THIRD"]
-                if current_term in term_order:
-                    current_index = term_order.index(current_term)
-
-                    # If we're not on the last term, get next term in same session
-                    if current_index < len(term_order) - 1:
-                        next_term_name = term_order[current_index + 1]
-                        next_term = Term.objects.filter(
-                            academic_session=current_session,
-                            name=next_term_name,
-                            is_active=True,
-                        ).first()
-
-                        if (
-                            next_term
-                            and hasattr(next_term, "start_date")
-                            and next_term.start_date
-                        ):
-                            print(
-                                f"✅ Next term begins from Term model: {next_term.start_date}"
-                            )
-                            return next_term.start_date.strftime("%B %d, %Y")
-                    else:
-                        # It's the last term, try to get first term of next session
-                        print(
-                            "ℹ️ Current term is THIRD, looking for next session's FIRST term"
-                        )
-                        # This would require finding the next academic session
-                        # For now, return TBA
-                        return "To Be Announced"
-
-            except ImportError:
-                print("⚠️ Term model not available for next term lookup")
-            except Exception as term_error:
-                print(f"⚠️ Error looking up next term: {term_error}")
-
-            # Method 4: Default fallback
-            print("⚠️ Could not determine next term begins date")
-            return "To Be Announced"
-
-        except Exception as e:
-            logger.error(f"Error getting next term begins: {e}")
-            return "To Be Announced"
+        return {
+            "report_type": "TERM_REPORT",
+            "school": class_context.school_info,
+            "student": {
+                "name": report.student.full_name,
+                "admission_number": report.student.registration_number or "",
+                "class": report.student.get_student_class_display(),
+                "age": calculate_age(report.student.date_of_birth),
+                "class_age": class_context.class_average_age,
+            },
+            "term": self.get_term_info(report),
+            "subjects": subjects_data,
+            "summary": {
+                "total_subjects": len(subjects_data),
+                "total_score": float(report.total_score or 0),
+                "average": float(report.average_score or 0),
+                "grade": report.overall_grade or "",
+                "position": self.format_grade_suffix(report.class_position),
+                "total_students": report.total_students or 0,
+            },
+            "attendance": class_context.attendance_for(report),
+            "next_term_begins": class_context.next_term_begins_for(report),
+            "remarks": {
+                "class_teacher": report.class_teacher_remark or "",
+                "head_teacher": report.head_teacher_remark or "",
+            },
+            "signatures": self.get_signatures(report),
+            "generated_date": datetime.now().strftime(DATE_FORMAT),
+        }
 
 
 class PrimaryReportGenerator(ReportGenerator):
     """Generate reports for Primary students"""
 
     EDUCATION_LEVEL = "PRIMARY"
+    TERM_REPORT_MODEL = PrimaryTermReport
 
-    def calculate_student_age(self, date_of_birth):
-        """Calculate student age from date of birth"""
-        if not date_of_birth:
-            return "N/A"  # ✅ Return string instead of None
-
-        try:
-            today = datetime.now().date()
-            age = relativedelta(today, date_of_birth).years
-            return age
-        except Exception as e:
-            logger.error(f"Error calculating age: {e}")
-            return "N/A"
-
-    def get_class_average_age(self, student, exam_session):
-        """Calculate average age of students in the same class"""
-        try:
-            from students.models import Student
-
-            same_class_students = Student.objects.filter(
-                student_class=student.student_class,
-                education_level=student.education_level,
-                date_of_birth__isnull=False,
-            )
-
-            if not same_class_students.exists():
-                return "N/A"
-
-            today = datetime.now().date()
-            ages = []
-            for s in same_class_students:
-                if s.date_of_birth:
-                    age = relativedelta(today, s.date_of_birth).years
-                    ages.append(age)
-
-            if ages:
-                avg_age = sum(ages) / len(ages)
-                return round(avg_age)
-
-            return "N/A"
-        except Exception as e:
-            logger.error(f"Error calculating class average age: {e}")
-            return "N/A"
-
-    def get_total_students_in_class(self, student, exam_session):
-        """Get total number of students in the same class for this exam session"""
-        try:
-            # Count distinct students in same class with results in this exam session
-            total_students = (
-                PrimaryResult.objects.filter(
-                    exam_session=exam_session,
-                    student__student_class=student.student_class,
-                    student__education_level=student.education_level,
-                    status__in=["APPROVED", "PUBLISHED"],
-                )
-                .values("student")
-                .distinct()
-                .count()
-            )
-
-            return total_students if total_students > 0 else 0
-        except Exception as e:
-            logger.error(f"Error getting total students in class: {e}")
-            return 0
-
-    def get_next_term_begins(self, report):
-        """Get the next term's start date with multiple fallback methods"""
-        try:
-            # Method 1: Check report's next_term_begins field directly
-            if hasattr(report, "next_term_begins") and report.next_term_begins:
-                print(f"✅ Next term begins from report: {report.next_term_begins}")
-                return report.next_term_begins.strftime("%B %d, %Y")
-
-            # Method 2: Check exam_session's next_term_begins
-            if (
-                hasattr(report.exam_session, "next_term_begins")
-                and report.exam_session.next_term_begins
-            ):
-                print(
-                    f"✅ Next term begins from exam_session: {report.exam_session.next_term_begins}"
-                )
-                return report.exam_session.next_term_begins.strftime("%B %d, %Y")
-
-            # Method 3: Try to find next term in Term model
-            try:
-                from academics.models import Term
-
-                current_term = report.exam_session.term
-                current_session = report.exam_session.academic_session
-
-                term_order = ["FIRST", "SECOND", "THIRD"]
-                if current_term in term_order:
-                    current_index = term_order.index(current_term)
-
-                    if current_index < len(term_order) - 1:
-                        next_term_name = term_order[current_index + 1]
-                        next_term = Term.objects.filter(
-                            academic_session=current_session,
-                            name=next_term_name,
-                            is_active=True,
-                        ).first()
-
-                        if (
-                            next_term
-                            and hasattr(next_term, "start_date")
-                            and next_term.start_date
-                        ):
-                            print(
-                                f"✅ Next term begins from Term model: {next_term.start_date}"
-                            )
-                            return next_term.start_date.strftime("%B %d, %Y")
-
-            except ImportError:
-                print("⚠️ Term model not available for next term lookup")
-            except Exception as term_error:
-                print(f"⚠️ Error looking up next term: {term_error}")
-
-            # Method 4: Default fallback
-            print("⚠️ Could not determine next term begins date")
-            return "To Be Announced"
-
-        except Exception as e:
-            logger.error(f"Error getting next term begins: {e}")
-            return "To Be Announced"
-
-    def generate_term_report(self, report_id):
-        """Generate term report for Primary student"""
-        try:
-            report = (
-                PrimaryTermReport.objects.select_related(
-                    "student", "student__user", "exam_session"
-                )
-                .prefetch_related(
-                    "subject_results__subject", "subject_results__grading_system"
-                )
-                .get(id=report_id)
-            )
-
-            subject_results = (
-                report.subject_results.all()
-                .select_related("subject", "grading_system")
-                .order_by("subject__name")
-            )
-
-            subjects_data = []
-            for result in subject_results:
-                subjects_data.append(
-                    {
-                        "name": result.subject.name,
-                        "code": result.subject.code,
-                        "ca": float(result.continuous_assessment_score or 0),
-                        "take_home": float(result.take_home_test_score or 0),
-                        "practical": float(result.practical_score or 0),
-                        "appearance": float(result.appearance_score or 0),
-                        "project": float(result.project_score or 0),
-                        "note_copying": float(result.note_copying_score or 0),
-                        "ca_total": float(result.ca_total or 0),
-                        "exam": float(result.exam_score or 0),
-                        "total": float(result.total_score or 0),
-                        "grade": result.grade or "",
-                        "position": self.format_grade_suffix(result.subject_position),
-                        "remark": result.teacher_remark or "",
-                    }
-                )
-
-            # ✅ FIX 1: Calculate student age
-            student_age = self.calculate_student_age(report.student.date_of_birth)
-
-            # ✅ FIX 2: Get class average age
-            class_age = self.get_class_average_age(report.student, report.exam_session)
-
-            # ✅ FIX 3: Get total students - use the method, not report field
-            total_students = self.get_total_students_in_class(
-                report.student, report.exam_session
-            )
-            # If method returns 0, try report field as fallback
-            if total_students == 0 and report.total_students:
-                total_students = report.total_students
-
-            # ✅ FIX 4: Get next term begins with fallback methods
-            next_term_begins_str = self.get_next_term_begins(report)
-
-            DATE_FORMAT = "%B %d, %Y"
-            context = {
-                "report_type": "TERM_REPORT",
-                "school": self.get_school_info(),
-                "student": {
-                    "name": report.student.full_name,
-                    "admission_number": report.student.registration_number or "",
-                    "class": report.student.get_student_class_display(),
-                    "age": student_age,  # ✅ ADDED
-                    "class_age": class_age,  # ✅ ADDED
-                },
-                "term": {
-                    "name": report.exam_session.get_term_display(),
-                    "session": report.exam_session.academic_session.name,
-                    "year": report.exam_session.academic_session.start_date.year,
-                },
-                "subjects": subjects_data,
-                "summary": {
-                    "total_subjects": len(subjects_data),
-                    "total_score": float(report.total_score or 0),
-                    "average": float(report.average_score or 0),
-                    "grade": report.overall_grade or "",
-                    "position": self.format_grade_suffix(report.class_position),
-                    "total_students": total_students,  # ✅ FIXED
-                },
-                "attendance": {
-                    "times_opened": report.times_opened or 0,
-                    "times_present": report.times_present or 0,
-                },
-                "next_term_begins": next_term_begins_str,  # ✅ FIXED
-                "remarks": {
-                    "class_teacher": report.class_teacher_remark or "",
-                    "head_teacher": report.head_teacher_remark or "",
-                },
-                "generated_date": datetime.now().strftime(DATE_FORMAT),
-                "signatures": self.get_signatures(report),
-                "generated_date": datetime.now().strftime(DATE_FORMAT),
-            }
-
-            template = self.get_template("term")
-            html_string = render_to_string(template, context)
-
-            filename = self.sanitize_filename(
-                f"{report.student.registration_number or report.student.user.username}_term_report.pdf"
+    def get_term_context(self, report, class_context):
+        """Template context of a Primary term report"""
+        subjects_data = []
+        for result in report.subject_results.all():
+            subjects_data.append(
+                {
+                    "name": result.subject.name,
+                    "code": result.subject.code,
+                    "ca": float(result.continuous_assessment_score or 0),
+                    "take_home": float(result.take_home_test_score or 0),
+                    "practical": float(result.practical_score or 0),
+                    "appearance": float(result.appearance_score or 0),
+                    "project": float(result.project_score or 0),
+                    "note_copying": float(result.note_copying_score or 0),
+                    "ca_total": float(result.ca_total or 0),
+                    "exam": float(result.exam_score or 0),
+                    "total": float(result.total_score or 0),
+                    "grade": result.grade or "",
+                    "position": self.format_grade_suffix(result.subject_position),
+                    "remark": result.teacher_remark or "",
+                }
             )
 
-            return self.generate_pdf(html_string, filename)
+        # Students with approved results this session; the report's own count
+        # is the fallback
+        total_students = class_context.class_size or report.total_students or 0
 
-        except PrimaryTermReport.DoesNotExist:
-            logger.error(f"Report with ID {report_id} not found")
-            return JsonResponse(
-                {"error": f"Report with ID {report_id} not found"}, status=404
-            )
-        except Exception as e:
-            logger.error(f"Error generating Primary term report: {e}", exc_info=True)
-            return JsonResponse(
-                {"error": "Failed to generate report", "detail": str(e)}, status=500
-            )
+        return {
+            "report_type": "TERM_REPORT",
+            "school": class_context.school_info,
+            "student": {
+                "name": report.student.full_name,
+                "admission_number": report.student.registration_number or "",
+                "class": report.student.get_student_class_display(),
+                "age": calculate_age(report.student.date_of_birth),
+                "class_age": class_context.class_average_age,
+            },
+            "term": self.get_term_info(report),
+            "subjects": subjects_data,
+            "summary": {
+                "total_subjects": len(subjects_data),
+                "total_score": float(report.total_score or 0),
+                "average": float(report.average_score or 0),
+                "grade": report.overall_grade or "",
+                "position": self.format_grade_suffix(report.class_position),
+                "total_students": total_students,
+            },
+            "attendance": class_context.attendance_for(report),
+            "next_term_begins": class_context.next_term_begins_for(report),
+            "remarks": {
+                "class_teacher": report.class_teacher_remark or "",
+                "head_teacher": report.head_teacher_remark or "",
+            },
+            "signatures": self.get_signatures(report),
+            "generated_date": datetime.now().strftime(DATE_FORMAT),
+        }
 
 
 class NurseryReportGenerator(ReportGenerator):
     """Generate reports for Nursery students"""
 
     EDUCATION_LEVEL = "NURSERY"
-
-    def calculate_student_age(self, date_of_birth):
-        """Calculate student age from date of birth"""
-        if not date_of_birth:
-            return "N/A"
-
-        try:
-            today = datetime.now().date()
-            age = relativedelta(today, date_of_birth).years
-            return age
-        except Exception as e:
-            logger.error(f"Error calculating age: {e}")
-            return "N/A"
-
-    def get_class_average_age(self, student, exam_session):
-        """Calculate average age of students in the same class"""
-        try:
-            from students.models import Student
-
-            same_class_students = Student.objects.filter(
-                student_class=student.student_class,
-                education_level=student.education_level,
-                date_of_birth__isnull=False,
-            )
-
-            if not same_class_students.exists():
-                return "N/A"
-
-            today = datetime.now().date()
-            ages = []
-            for s in same_class_students:
-                if s.date_of_birth:
-                    age = relativedelta(today, s.date_of_birth).years
-                    ages.append(age)
-
-            if ages:
-                avg_age = sum(ages) / len(ages)
-                return round(avg_age)
-
-            return "N/A"
-        except Exception as e:
-            logger.error(f"Error calculating class average age: {e}")
-            return "N/A"
-
-    def get_next_term_begins(self, report):
-        """Get the next term's start date with multiple fallback methods"""
-        try:
-            # Method 1: Check report's next_term_begins field directly
-            if hasattr(report, "next_term_begins") and report.next_term_begins:
-                print(f"✅ Next term begins from report: {report.next_term_begins}")
-                return report.next_term_begins.strftime("%B %d, %Y")
-
-            # Method 2: Check exam_session's next_term_begins
-            if (
-                hasattr(report.exam_session, "next_term_begins")
-                and report.exam_session.next_term_begins
-            ):
-                print(
-                    f"✅ Next term begins from exam_session: {report.exam_session.next_term_begins}"
-                )
-                return report.exam_session.next_term_begins.strftime("%B %d, %Y")
-
-            # Method 3: Try to find next term in Term model
-            try:
-                from academics.models import Term
-
-                current_term = report.exam_session.term
-                current_session = report.exam_session.academic_session
-
-                term_order = ["FIRST", "SECOND", "THIRD"]
-                if current_term in term_order:
-                    current_index = term_order.index(current_term)
-
-                    if current_index < len(term_order) - 1:
-                        next_term_name = term_order[current_index + 1]
-                        next_term = Term.objects.filter(
-                            academic_session=current_session,
-                            name=next_term_name,
-                            is_active=True,
-                        ).first()
-
-                        if (
-                            next_term
-                            and hasattr(next_term, "start_date")
-                            and next_term.start_date
-                        ):
-                            print(
-                                f"✅ Next term begins from Term model: {next_term.start_date}"
-                            )
-                            return next_term.start_date.strftime("%B %d, %Y")
-
-            except ImportError:
-                print("⚠️ Term model not available for next term lookup")
-            except Exception as term_error:
-                print(f"⚠️ Error looking up next term: {term_error}")
-
-            # Method 4: Default fallback
-            print("⚠️ Could not determine next term begins date")
-            return "To Be Announced"
-
-        except Exception as e:
-            logger.error(f"Error getting next term begins: {e}")
-            return "To Be Announced"
+    TERM_REPORT_MODEL = NurseryTermReport
 
     def get_overall_grade(self, report):
         """Calculate overall grade from percentage"""
         try:
-            if report.overall_percentage > 0 and hasattr(report, "grading_system"):
-                grade_obj = report.grading_system.grades.filter(
-                    min_score__lte=report.overall_percentage,
-                    max_score__gte=report.overall_percentage,
-                ).first()
+            if report.overall_percentage > 0:
+                # Nursery term reports have no grading system of their own;
+                # use the (prefetched) one from the subject results
+                grading_system = next(
+                    (
+                        result.grading_system
+                        for result in report.subject_results.all()
+                        if result.grading_system_id
+                    ),
+                    None,
+                )
+                grade_obj = lookup_grade(grading_system, report.overall_percentage)
 
                 if grade_obj:
                     return grade_obj.grade
@@ -1363,131 +877,84 @@ class NurseryReportGenerator(ReportGenerator):
             logger.error(f"Error calculating overall grade: {e}")
             return "N/A"
 
-    def generate_term_report(self, report_id):
-        """Generate term report for Nursery student"""
-        try:
-            report = (
-                NurseryTermReport.objects.select_related(
-                    "student", "student__user", "exam_session"
-                )
-                .prefetch_related(
-                    "subject_results__subject", "subject_results__grading_system"
-                )
-                .get(id=report_id)
-            )
-
-            subject_results = (
-                report.subject_results.all()
-                .select_related("subject", "grading_system")
-                .order_by("subject__name")
-            )
-
-            subjects_data = []
-            for result in subject_results:
-                subjects_data.append(
-                    {
-                        "name": result.subject.name,
-                        "max_obtainable": float(result.max_marks_obtainable or 0),
-                        "mark_obtained": float(result.mark_obtained or 0),
-                        "percentage": float(result.percentage or 0),
-                        "grade": result.grade or "",
-                        "position": (
-                            self.format_grade_suffix(result.subject_position)
-                            if result.subject_position
-                            else "N/A"
-                        ),
-                        "remark": result.academic_comment or "",
-                    }
-                )
-
-            student_age = self.calculate_student_age(report.student.date_of_birth)
-            class_age = self.get_class_average_age(report.student, report.exam_session)
-            next_term_begins_str = self.get_next_term_begins(report)
-
-            DATE_FORMAT = "%B %d, %Y"
-            context = {
-                "report_type": "TERM_REPORT",
-                "school": self.get_school_info(),
-                "student": {
-                    "name": report.student.full_name,
-                    "admission_number": report.student.registration_number or "",
-                    "class": report.student.get_student_class_display(),
-                    "age": student_age,
-                    "class_age": class_age,
-                },
-                "term": {
-                    "name": report.exam_session.get_term_display(),
-                    "session": report.exam_session.academic_session.name,
-                    "year": report.exam_session.academic_session.start_date.year,
-                },
-                "subjects": subjects_data,
-                "summary": {
-                    "total_subjects": report.total_subjects or 0,
-                    "total_max_marks": float(report.total_max_marks or 0),
-                    "total_marks_obtained": float(report.total_marks_obtained or 0),
-                    "overall_percentage": float(report.overall_percentage or 0),
-                    "position": self.format_grade_suffix(report.class_position),
-                    "total_students": report.total_students_in_class or 0,
-                    "grade": self.get_overall_grade(report),  # ✅ Calculate dynamically
-                },
-                "attendance": {
-                    "times_opened": report.times_school_opened or 0,
-                    "times_present": report.times_student_present or 0,
-                },
-                "development": {
-                    "physical": (
-                        report.get_physical_development_display()
-                        if report.physical_development
-                        else "Good"
-                    ),
-                    "health": report.get_health_display() if report.health else "Good",
-                    "cleanliness": (
-                        report.get_cleanliness_display()
-                        if report.cleanliness
-                        else "Good"
-                    ),
-                    "conduct": (
-                        report.get_general_conduct_display()
-                        if report.general_conduct
-                        else "Good"
+    def get_term_context(self, report, class_context):
+        """Template context of a Nursery term report"""
+        subjects_data = []
+        for result in report.subject_results.all():
+            subjects_data.append(
+                {
+                    "name": result.subject.name,
+                    "max_obtainable": float(result.max_marks_obtainable or 0),
+                    "mark_obtained": float(result.mark_obtained or 0),
+                    "percentage": float(result.percentage or 0),
+                    "grade": result.grade or "",
+                    "position": (
+                        self.format_grade_suffix(result.subject_position)
+                        if result.subject_position
+                        else "N/A"
                     ),
-                    "punctuality": "Very Good",
-                    "comment": report.physical_development_comment or "",
-                },
-                "measurements": {
-                    "height_beginning": report.height_beginning or "",
-                    "height_end": report.height_end or "",
-                    "weight_beginning": report.weight_beginning or "",
-                    "weight_end": report.weight_end or "",
-                },
-                "next_term_begins": next_term_begins_str,
-                "remarks": {
-                    "class_teacher": report.class_teacher_remark or "",
-                    "head_teacher": report.head_teacher_remark or "",
-                },
-                "generated_date": datetime.now().strftime(DATE_FORMAT),
-                "signatures": self.get_signatures(report),
-            }
-
-            template = self.get_template("term")
-            html_string = render_to_string(template, context)
-
-            filename = self.sanitize_filename(
-                f"{report.student.registration_number or report.student.user.username}_term_report.pdf"
+                    "remark": result.academic_comment or "",
+                }
             )
 
-            return self.generate_pdf(html_string, filename)
-
-        except NurseryTermReport.DoesNotExist:
-            logger.error(f"Report with ID {report_id} not found")
-            return JsonResponse(
-                {"error": f"Report with ID {report_id} not found"}, status=404
-            )
-        except Exception as e:
-            logger.error(f"Error generating Nursery term report: {e}", exc_info=True)
-            return JsonResponse(
-                {"error": "Failed to generate report", "detail": str(e)}, status=500
-            )
+        return {
+            "report_type": "TERM_REPORT",
+            "school": class_context.school_info,
+            "student": {
+                "name": report.student.full_name,
+                "admission_number": report.student.registration_number or "",
+                "class": report.student.get_student_class_display(),
+                "age": calculate_age(report.student.date_of_birth),
+                "class_age": class_context.class_average_age,
+            },
+            "term": self.get_term_info(report),
+            "subjects": subjects_data,
+            "summary": {
+                "total_subjects": report.total_subjects or 0,
+                "total_max_marks": float(report.total_max_marks or 0),
+                "total_marks_obtained": float(report.total_marks_obtained or 0),
+                "overall_percentage": float(report.overall_percentage or 0),
+                "position": self.format_grade_suffix(report.class_position),
+                "total_students": report.total_students_in_class or 0,
+                "grade": self.get_overall_grade(report),  # ✅ Calculate dynamically
+            },
+            "attendance": class_context.attendance_for(
+                report, "times_school_opened", "times_student_present"
+            ),
+            "development": {
+                "physical": (
+                    report.get_physical_development_display()
+                    if report.physical_development
+                    else "Good"
+                ),
+                "health": report.get_health_display() if report.health else "Good",
+                "cleanliness": (
+                    report.get_cleanliness_display()
+                    if report.cleanliness
+                    else "Good"
+                ),
+                "conduct": (
+                    report.get_general_conduct_display()
+                    if report.general_conduct
+                    else "Good"
+                ),
+                "punctuality": "Very Good",
+                "comment": report.physical_development_comment or "",
+            },
+            "measurements": {
+                "height_beginning": report.height_beginning or "",
+                "height_end": report.height_end or "",
+                "weight_beginning": report.weight_beginning or "",
+                "weight_end": report.weight_end or "",
+            },
+            "next_term_begins": class_context.next_term_begins_for(report),
+            "remarks": {
+                "class_teacher": report.class_teacher_remark or "",
+                "head_teacher": report.head_teacher_remark or "",
+            },
+            "generated_date": datetime.now().strftime(DATE_FORMAT),
+            "signatures": self.get_signatures(report),
+        }
 
 
 def get_report_generator(education_level, request=None):
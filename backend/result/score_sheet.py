@@ -0,0 +1,730 @@
+# result/score_sheet.py
+"""
+Bulk ingestion of a class score sheet.
+
+Posting a sheet through ``serializer.save()`` row by row ran the per-row
+statistics/position queries, ``update_term_report`` and the post_save signals
+for every single score. ``ScoreSheetIngestor`` processes the whole sheet in
+one pass instead:
+
+1. validate every row (score limits come from the level's create/update
+   serializer, foreign keys are resolved from prefetched maps),
+2. compute CA totals, percentages, grades and provisional class statistics in
+   memory (grades come from the cached grade tables in ``result/grading.py``),
+3. write new and existing rows with one upserting ``bulk_create`` (on
+   ``student, subject, exam_session``),
+4. create/link term reports in bulk and refresh their metrics/status from
+   one grouped aggregate,
+5. schedule one recalculation per affected (subject, class) on commit.
+
+Rows that fail validation are reported individually; the others are saved.
+"""
+
+import logging
+from bisect import bisect_right
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import Avg, Count, Q, Sum
+from django.utils import timezone
+from rest_framework import serializers
+
+from .grading import lookup_grade
+from .recalculation import recalculation_scheduler
+
+logger = logging.getLogger(__name__)
+
+
+RANKED_STATUSES = ["APPROVED", "PUBLISHED"]
+UNIQUE_FIELDS = ["student", "subject", "exam_session"]
+
+
+class ScoreSheetConfig:
+    """How one education level's result model is ingested"""
+
+    def __init__(
+        self,
+        result_model,
+        report_model,
+        serializer_class,
+        education_level,
+        score_field,
+        computed_fields,
+        statistics=True,
+        related_fields=("student", "subject", "exam_session", "grading_system"),
+        report_defaults=(),
+        report_for_all_statuses=False,
+        report_average_field=None,
+    ):
+        self.result_model = result_model
+        self.report_model = report_model
+        self.serializer_class = serializer_class
+        self.education_level = education_level
+        self.score_field = score_field
+        self.computed_fields = list(computed_fields)
+        self.statistics = statistics
+        self.related_fields = tuple(related_fields)
+        self.report_defaults = tuple(report_defaults)
+        self.report_for_all_statuses = report_for_all_statuses
+        self.report_average_field = report_average_field
+        self._score_serializer = None
+
+    @property
+    def score_serializer(self):
+        """
+        The level's create/update serializer without its foreign keys.
+
+        Foreign keys are resolved from prefetched maps, so validating a row
+        costs no queries (this also drops the per-row unique_together check,
+        which the upsert makes unnecessary).
+        """
+        if self._score_serializer is None:
+            base = self.serializer_class
+            score_fields = [
+                f for f in base.Meta.fields if f not in self.related_fields
+            ]
+            meta = type("Meta", (base.Meta,), {"fields": score_fields})
+            self._score_serializer = type(
+                f"{base.__name__}ScoreSheet", (base,), {"Meta": meta}
+            )
+        return self._score_serializer
+
+    @property
+    def input_fields(self):
+        return list(self.score_serializer.Meta.fields)
+
+
+_SUBJECT_STATISTICS = [
+    "class_average",
+    "highest_in_class",
+    "lowest_in_class",
+    "subject_position",
+]
+_GRADE_FIELDS = ["grade", "grade_point", "is_passed"]
+
+
+def _build_configs():
+    from .models import (
+        SeniorSecondaryResult,
+        SeniorSecondaryTermReport,
+        JuniorSecondaryResult,
+        JuniorSecondaryTermReport,
+        PrimaryResult,
+        PrimaryTermReport,
+        NurseryResult,
+        NurseryTermReport,
+    )
+    from .serializers import (
+        SeniorSecondaryResultCreateUpdateSerializer,
+        JuniorSecondaryResultCreateUpdateSerializer,
+        PrimaryResultCreateUpdateSerializer,
+        NurseryResultCreateUpdateSerializer,
+    )
+
+    percentage_fields = [
+        "ca_total",
+        "total_score",
+        "ca_percentage",
+        "exam_percentage",
+        "total_percentage",
+    ]
+
+    return {
+        "SENIOR_SECONDARY": ScoreSheetConfig(
+            SeniorSecondaryResult,
+            SeniorSecondaryTermReport,
+            SeniorSecondaryResultCreateUpdateSerializer,
+            "SENIOR_SECONDARY",
+            score_field="total_score",
+            computed_fields=["total_ca_score", "total_score", "percentage"]
+            + _GRADE_FIELDS
+            + _SUBJECT_STATISTICS,
+            related_fields=(
+                "student",
+                "subject",
+                "exam_session",
+                "grading_system",
+                "stream",
+            ),
+            report_defaults=("stream",),
+            report_average_field="percentage",
+        ),
+        "JUNIOR_SECONDARY": ScoreSheetConfig(
+            JuniorSecondaryResult,
+            JuniorSecondaryTermReport,
+            JuniorSecondaryResultCreateUpdateSerializer,
+            "JUNIOR_SECONDARY",
+            score_field="total_percentage",
+            computed_fields=percentage_fields + _GRADE_FIELDS + _SUBJECT_STATISTICS,
+            report_average_field="total_percentage",
+        ),
+        "PRIMARY": ScoreSheetConfig(
+            PrimaryResult,
+            PrimaryTermReport,
+            PrimaryResultCreateUpdateSerializer,
+            "PRIMARY",
+            score_field="total_percentage",
+            computed_fields=percentage_fields + _GRADE_FIELDS + _SUBJECT_STATISTICS,
+            report_average_field="total_percentage",
+        ),
+        # Nursery results have no class statistics, their reports total marks
+        # rather than averaging percentages, and they keep the report up to
+        # date whatever their status (see NurseryResult.save)
+        "NURSERY": ScoreSheetConfig(
+            NurseryResult,
+            NurseryTermReport,
+            NurseryResultCreateUpdateSerializer,
+            "NURSERY",
+            score_field="percentage",
+            computed_fields=["percentage"] + _GRADE_FIELDS + ["subject_position"],
+            statistics=False,
+            report_for_all_statuses=True,
+        ),
+    }
+
+
+_configs = None
+
+
+def get_score_sheet_config(education_level):
+    global _configs
+    if _configs is None:
+        _configs = _build_configs()
+    return _configs[education_level]
+
+
+def format_errors(detail):
+    """Flatten serializer errors into a readable message"""
+    if isinstance(detail, dict):
+        messages = []
+        for field, value in detail.items():
+            message = format_errors(value)
+            if field != "non_field_errors":
+                message = f"{field}: {message}"
+            messages.append(message)
+        return "; ".join(messages)
+    if isinstance(detail, (list, tuple)):
+        return " ".join(format_errors(item) for item in detail)
+    return str(detail)
+
+
+def get_next_term_begins(exam_session):
+    """Start date of the following term (same rule as the auto-report signals)"""
+    from academics.models import Term
+
+    term_order = ["FIRST", "SECOND", "THIRD"]
+    current_term = getattr(exam_session, "term", None)
+    if current_term not in term_order:
+        return None
+
+    current_index = term_order.index(current_term)
+    if current_index >= len(term_order) - 1:
+        return None
+
+    next_term = Term.objects.filter(
+        academic_session_id=exam_session.academic_session_id,
+        name=term_order[current_index + 1],
+        is_active=True,
+    ).first()
+    return next_term.next_term_begins if next_term else None
+
+
+class ScoreSheetRow:
+    def __init__(self, index, data):
+        self.index = index
+        self.data = data
+        self.instance = None
+        self.created = False
+        self.error = None
+
+
+class ScoreSheetIngestor:
+    """
+    Validate and save a whole score sheet in a handful of queries.
+
+    Usage::
+
+        result = ScoreSheetIngestor("SENIOR_SECONDARY", user=request.user).ingest(rows)
+        result.saved   # list of saved model instances
+        result.errors  # [{"index", "error", "data"}, ...]
+    """
+
+    def __init__(self, education_level, user=None):
+        self.config = get_score_sheet_config(education_level)
+        self.user = user if getattr(user, "is_authenticated", False) else None
+        # One serializer instance validates every row, so its fields are
+        # built once rather than per row
+        self._validator = self.config.score_serializer()
+        self._term_reports = []
+        self._report_grading = {}
+
+    # ------------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------------
+    def ingest(self, raw_rows):
+        rows = [
+            ScoreSheetRow(index, self._to_dict(raw))
+            for index, raw in enumerate(raw_rows or [])
+        ]
+
+        with transaction.atomic():
+            lookups = self._prefetch(rows)
+            seen = set()
+            for row in rows:
+                self._build_row(row, lookups, seen)
+
+            valid = [row for row in rows if row.error is None]
+            self._apply_statistics(valid)
+            self._link_term_reports(valid, lookups)
+            self._write(valid)
+            self._refresh_term_reports()
+            self._schedule_recalculation(valid)
+
+        return ScoreSheetResult(self.config, rows)
+
+    # ------------------------------------------------------------------
+    # Prefetching
+    # ------------------------------------------------------------------
+    @staticmethod
+    def _to_dict(raw):
+        if isinstance(raw, dict):
+            return raw.copy()
+        try:
+            return dict(raw)
+        except (TypeError, ValueError):
+            return {}
+
+    def _related_model(self, field_name):
+        return self.config.result_model._meta.get_field(field_name).related_model
+
+    def _prefetch(self, rows):
+        """One query per related model plus one for the existing results"""
+        wanted = defaultdict(set)
+        for row in rows:
+            for field in self.config.related_fields:
+                value = row.data.get(field)
+                if value not in (None, ""):
+                    wanted[field].add(str(value))
+
+        lookups = {}
+        for field in self.config.related_fields:
+            model = self._related_model(field)
+            queryset = model.objects.all()
+            if field == "student":
+                queryset = queryset.select_related("user")
+            elif field == "exam_session":
+                queryset = queryset.select_related("academic_session")
+            lookups[field] = {
+                str(obj.pk): obj for obj in self._in_bulk(queryset, wanted[field])
+            }
+
+        existing = {}
+        students, subjects, sessions = (
+            lookups["student"],
+            lookups["subject"],
+            lookups["exam_session"],
+        )
+        if students and subjects and sessions:
+            queryset = self.config.result_model.objects.filter(
+                student_id__in=[obj.pk for obj in students.values()],
+                subject_id__in=[obj.pk for obj in subjects.values()],
+                exam_session_id__in=[obj.pk for obj in sessions.values()],
+            )
+            for result in queryset:
+                existing[_result_key(result)] = result
+        lookups["existing"] = existing
+        return lookups
+
+    def _in_bulk(self, queryset, values):
+        pk_field = queryset.model._meta.pk
+        pks = []
+        for value in values:
+            try:
+                pks.append(pk_field.to_python(value))
+            except Exception:
+                continue
+        if not pks:
+            return []
+        return queryset.filter(pk__in=pks)
+
+    # ------------------------------------------------------------------
+    # Validation and in-memory calculation
+    # ------------------------------------------------------------------
+    def _resolve(self, row, lookups):
+        related = {}
+        errors = {}
+        for field in self.config.related_fields:
+            value = row.data.get(field)
+            model_field = self.config.result_model._meta.get_field(field)
+            if value in (None, ""):
+                if not model_field.null:
+                    errors[field] = ["This field is required."]
+                continue
+            obj = lookups[field].get(str(value))
+            if obj is None:
+                errors[field] = [f'Invalid pk "{value}" - object does not exist.']
+            else:
+                related[field] = obj
+
+        student = related.get("student")
+        if student and student.education_level != self.config.education_level:
+            errors["student"] = [
+                f"Student's education level is {student.education_level}, "
+                f"expected {self.config.education_level}."
+            ]
+        return related, errors
+
+    def _build_row(self, row, lookups, seen):
+        related, errors = self._resolve(row, lookups)
+
+        validated_data = {}
+        try:
+            validated_data = self._validator.run_validation(row.data)
+        except serializers.ValidationError as e:
+            detail = e.detail
+            errors.update(detail if isinstance(detail, dict) else {"data": detail})
+
+        if errors:
+            row.error = format_errors(errors)
+            return
+
+        key = (
+            related["student"].pk,
+            related["subject"].pk,
+            related["exam_session"].pk,
+        )
+        if key in seen:
+            row.error = "Duplicate row for this student and subject in the sheet"
+            return
+        seen.add(key)
+
+        instance = lookups["existing"].get(key)
+        row.created = instance is None
+        if instance is None:
+            instance = self.config.result_model(entered_by=self.user)
+        else:
+            instance.last_edited_by = self.user
+            instance.last_edited_at = timezone.now()
+
+        for field, obj in related.items():
+            setattr(instance, field, obj)
+        for field, value in validated_data.items():
+            setattr(instance, field, value)
+
+        try:
+            self._calculate(instance)
+        except Exception as e:
+            row.error = f"Failed to calculate scores: {e}"
+            return
+
+        row.instance = instance
+
+    def _calculate(self, instance):
+        if hasattr(instance, "calculate_scores"):
+            instance.calculate_scores()
+        else:
+            instance.calculate_percentage()
+        instance.determine_grade()
+
+    def _apply_statistics(self, rows):
+        """
+        Provisional class statistics for every row, from one query.
+
+        Mirrors ``calculate_class_statistics``/``_calculate_position`` on save:
+        each row is compared with the APPROVED/PUBLISHED results already in
+        its subject/class. Ranked rows are recalculated for real on commit.
+        """
+        if not rows:
+            return
+
+        score_field = self.config.score_field
+        instances = [row.instance for row in rows]
+        scores = defaultdict(list)
+        queryset = self.config.result_model.objects.filter(
+            exam_session_id__in={i.exam_session_id for i in instances},
+            subject_id__in={i.subject_id for i in instances},
+            student__student_class__in={i.student.student_class for i in instances},
+            status__in=RANKED_STATUSES,
+        ).values_list(
+            "exam_session_id", "subject_id", "student__student_class", score_field
+        )
+        for session_id, subject_id, student_class, score in queryset:
+            if score is not None:
+                scores[(session_id, subject_id, student_class)].append(score)
+        for values in scores.values():
+            values.sort()
+
+        for instance in instances:
+            values = scores.get(
+                (
+                    instance.exam_session_id,
+                    instance.subject_id,
+                    instance.student.student_class,
+                ),
+                [],
+            )
+            score = getattr(instance, score_field) or 0
+            instance.subject_position = len(values) - bisect_right(values, score) + 1
+            if self.config.statistics:
+                instance.class_average = sum(values) / len(values) if values else 0
+                instance.highest_in_class = values[-1] if values else 0
+                instance.lowest_in_class = values[0] if values else 0
+
+    # ------------------------------------------------------------------
+    # Term reports
+    # ------------------------------------------------------------------
+    def _needs_term_report(self, instance):
+        return self.config.report_for_all_statuses or (
+            instance.status in RANKED_STATUSES
+        )
+
+    def _link_term_reports(self, rows, lookups):
+        """Get or create the term report of every affected student in bulk"""
+        instances = [
+            row.instance for row in rows if self._needs_term_report(row.instance)
+        ]
+        if not instances:
+            return
+
+        report_model = self.config.report_model
+        reports = {
+            (report.student_id, report.exam_session_id): report
+            for report in report_model.objects.select_related("student").filter(
+                student_id__in={i.student_id for i in instances},
+                exam_session_id__in={i.exam_session_id for i in instances},
+            )
+        }
+
+        next_term_begins = {}
+        missing = []
+        for instance in instances:
+            key = (instance.student_id, instance.exam_session_id)
+            if key in reports:
+                continue
+            session = instance.exam_session
+            if session.pk not in next_term_begins:
+                next_term_begins[session.pk] = get_next_term_begins(session)
+            report = report_model(
+                student=instance.student,
+                exam_session=session,
+                status="DRAFT",
+                next_term_begins=next_term_begins[session.pk],
+            )
+            for field in self.config.report_defaults:
+                setattr(report, field, getattr(instance, field))
+            reports[key] = report
+            missing.append(report)
+
+        if missing:
+            report_model.objects.bulk_create(missing, ignore_conflicts=True)
+            # Re-read so conflicting rows (created concurrently) get real pks
+            for report in report_model.objects.select_related("student").filter(
+                student_id__in={r.student_id for r in missing},
+                exam_session_id__in={r.exam_session_id for r in missing},
+            ):
+                reports[(report.student_id, report.exam_session_id)] = report
+
+        touched = {}
+        for instance in instances:
+            report = reports[(instance.student_id, instance.exam_session_id)]
+            if not instance.term_report_id:
+                instance.term_report = report
+            touched[report.pk] = report
+            self._report_grading.setdefault(report.pk, instance.grading_system)
+        self._term_reports = list(touched.values())
+
+    def _refresh_term_reports(self):
+        """
+        Recalculate metrics and status of every affected report at once.
+
+        Same rules as the reports' ``calculate_metrics`` and
+        ``sync_status_with_subjects``, from one grouped aggregate and one
+        ``bulk_update`` instead of several queries per student.
+        """
+        reports = self._term_reports
+        if not reports:
+            return
+
+        config = self.config
+        ranked = Q(status__in=RANKED_STATUSES)
+        annotations = {
+            "ranked_count": Count("id", filter=ranked),
+            "draft_count": Count("id", filter=Q(status="DRAFT")),
+            "result_count": Count("id"),
+        }
+        if config.report_average_field:
+            annotations["total"] = Sum("total_score", filter=ranked)
+            annotations["average"] = Avg(config.report_average_field, filter=ranked)
+            metric_fields = ["total_score", "average_score", "overall_grade"]
+        else:
+            annotations["total_max"] = Sum("max_marks_obtainable", filter=ranked)
+            annotations["total_obtained"] = Sum("mark_obtained", filter=ranked)
+            metric_fields = [
+                "total_subjects",
+                "total_max_marks",
+                "total_marks_obtained",
+                "overall_percentage",
+            ]
+
+        totals = {
+            (row["student_id"], row["exam_session_id"]): row
+            for row in config.result_model.objects.filter(
+                student_id__in={r.student_id for r in reports},
+                exam_session_id__in={r.exam_session_id for r in reports},
+            )
+            .order_by()
+            .values("student_id", "exam_session_id")
+            .annotate(**annotations)
+        }
+
+        now = timezone.now()
+        for report in reports:
+            row = totals.get((report.student_id, report.exam_session_id), {})
+            if row.get("ranked_count"):
+                self._apply_report_metrics(report, row)
+            if report.status not in RANKED_STATUSES:
+                pending = row.get("draft_count") or not row.get("result_count")
+                report.status = "DRAFT" if pending else "SUBMITTED"
+            report.updated_at = now
+
+        config.report_model.objects.bulk_update(
+            reports, metric_fields + ["status", "updated_at"], batch_size=500
+        )
+
+    def _apply_report_metrics(self, report, row):
+        if not self.config.report_average_field:
+            report.total_subjects = row["ranked_count"]
+            report.total_max_marks = row["total_max"] or 0
+            report.total_marks_obtained = row["total_obtained"] or 0
+            if report.total_max_marks > 0:
+                report.overall_percentage = (
+                    report.total_marks_obtained / report.total_max_marks
+                ) * 100
+            else:
+                report.overall_percentage = 0
+            return
+
+        report.total_score = row["total"] or 0
+        report.average_score = row["average"] or 0
+        band = lookup_grade(
+            self._report_grading.get(report.pk), report.average_score
+        )
+        if band:
+            report.overall_grade = band.grade
+        else:
+            report.overall_grade = report._get_default_grade(report.average_score)
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+    def _write(self, rows):
+        """
+        Insert new rows and update existing ones with one upsert.
+
+        Existing rows keep their primary key, so ``INSERT ... ON CONFLICT
+        (student, subject, exam_session) DO UPDATE`` updates them in place;
+        this is much cheaper than ``bulk_update``'s per-field CASE statements.
+        ``updated_at`` is refreshed by the field's ``auto_now``.
+        """
+        config = self.config
+        instances = [row.instance for row in rows]
+        if not instances:
+            return
+
+        fields = (
+            config.input_fields
+            + [f for f in config.related_fields if f not in UNIQUE_FIELDS]
+            + config.computed_fields
+            + ["term_report", "last_edited_by", "last_edited_at", "updated_at"]
+        )
+        config.result_model.objects.bulk_create(
+            instances,
+            batch_size=500,
+            update_conflicts=True,
+            unique_fields=UNIQUE_FIELDS,
+            update_fields=list(dict.fromkeys(fields)),
+        )
+
+        created = sum(1 for row in rows if row.created)
+        logger.info(
+            f"Score sheet saved: {created} created, {len(rows) - created} updated "
+            f"{config.result_model.__name__} rows"
+        )
+
+    def _schedule_recalculation(self, rows):
+        """One recalculation per affected (subject, class), on commit"""
+        for key in sorted(
+            {
+                (
+                    row.instance.exam_session_id,
+                    row.instance.subject_id,
+                    row.instance.student.student_class,
+                    row.instance.student.education_level,
+                )
+                for row in rows
+            },
+            key=str,
+        ):
+            recalculation_scheduler.schedule(self.config.result_model, *key)
+
+
+class ScoreSheetResult:
+    """Outcome of ``ScoreSheetIngestor.ingest``"""
+
+    def __init__(self, config, rows):
+        self.config = config
+        self.rows = rows
+
+    @property
+    def saved(self):
+        return [row.instance for row in self.rows if row.error is None]
+
+    @property
+    def created_count(self):
+        return sum(1 for row in self.rows if row.error is None and row.created)
+
+    @property
+    def updated_count(self):
+        return sum(1 for row in self.rows if row.error is None and not row.created)
+
+    @property
+    def errors(self):
+        return [
+            {"index": row.index, "error": row.error, "data": row.data}
+            for row in self.rows
+            if row.error is not None
+        ]
+
+    def saved_queryset(self):
+        """Saved rows re-read with everything the detail serializers touch"""
+        saved = self.saved
+        if not saved:
+            return []
+
+        order = {_result_key(instance): i for i, instance in enumerate(saved)}
+        related = [
+            "student__user",
+            "subject",
+            "exam_session__academic_session",
+            "grading_system",
+            "entered_by",
+            "approved_by",
+        ]
+        if "stream" in self.config.related_fields:
+            related.append("stream")
+
+        queryset = (
+            self.config.result_model.objects.filter(
+                student_id__in={key[0] for key in order},
+                subject_id__in={key[1] for key in order},
+                exam_session_id__in={key[2] for key in order},
+            )
+            .select_related(*related)
+            .prefetch_related("grading_system__grades")
+        )
+        results = [obj for obj in queryset if _result_key(obj) in order]
+        return sorted(results, key=lambda obj: order[_result_key(obj)])
+
+
+def _result_key(result):
+    return (result.student_id, result.subject_id, result.exam_session_id)
@@ -1690,22 +1690,38 @@ class ReportGenerationSerializer(serializers.Serializer):
 
 
 class BulkReportGenerationSerializer(serializers.Serializer):
-    """Serializer for bulk report generation"""
+    """
+    Serializer for bulk report generation.
+    Either pass report_ids, or exam_session_id + student_class to print a class.
+    """
 
-    exam_session_id = serializers.UUIDField(required=True)
+    report_ids = serializers.ListField(
+        child=serializers.CharField(), required=False, allow_empty=True
+    )
+    exam_session_id = serializers.IntegerField(required=False, allow_null=True)
     student_class = serializers.CharField(required=False, allow_blank=True)
-    education_level = serializers.CharField(required=False, allow_blank=True)
+    education_level = serializers.ChoiceField(
+        choices=["NURSERY", "PRIMARY", "JUNIOR_SECONDARY", "SENIOR_SECONDARY"]
+    )
     stream_id = serializers.IntegerField(required=False, allow_null=True)
-    report_type = serializers.ChoiceField(
-        choices=["TERM_REPORT", "SESSION_REPORT"], required=True
+    output_format = serializers.ChoiceField(
+        choices=["ZIP", "MERGED_PDF"], default="ZIP"
     )
-    format = serializers.ChoiceField(choices=["PDF", "EXCEL"], default="PDF")
 
     def validate_exam_session_id(self, value):
-        if not ExamSession.objects.filter(id=value).exists():
+        if value and not ExamSession.objects.filter(id=value).exists():
             raise serializers.ValidationError("Exam session does not exist")
         return value
 
+    def validate(self, attrs):
+        if not attrs.get("report_ids") and not (
+            attrs.get("exam_session_id") and attrs.get("student_class")
+        ):
+            raise serializers.ValidationError(
+                "Provide report_ids, or exam_session_id and student_class"
+            )
+        return attrs
+
 
 # ===== STATISTICS SERIALIZERS =====
 class ResultStatisticsSerializer(serializers.Serializer):
@@ -1845,10 +1861,10 @@ class ResultImportSerializer(serializers.Serializer):
 class ResultExportSerializer(serializers.Serializer):
     """Serializer for exporting results"""
 
-    exam_session_id = serializers.UUIDField(required=True)
+    exam_session_id = serializers.IntegerField(required=True)
     education_level = serializers.CharField(required=False, allow_blank=True)
     student_class = serializers.CharField(required=False, allow_blank=True)
-    format = serializers.ChoiceField(choices=["CSV", "EXCEL", "PDF"], default="EXCEL")
+    format = serializers.ChoiceField(choices=["CSV", "EXCEL", "PDF"], default="CSV")
     include_statistics = serializers.BooleanField(default=True)
     include_comments = serializers.BooleanField(default=False)
 
@@ -0,0 +1,31 @@
+from celery import shared_task
+
+
+@shared_task
+def recalculate_results(subject_keys):
+    """Recalculate a coalesced batch of dirty result keys"""
+    from .recalculation import run_recalculation
+
+    recalculated = run_recalculation(subject_keys)
+
+    return f"Recalculated {recalculated} subject/class keys"
+
+
+@shared_task
+def generate_report_batch(job_id):
+    """Render a bulk report-card job into its ZIP/merged PDF"""
+    from .report_batches import run_report_batch
+
+    job = run_report_batch(job_id)
+
+    return f"Report batch {job_id}: {job.status if job else 'missing'}"
+
+
+@shared_task
+def fail_stale_report_batches():
+    """Fail the report batches whose worker died mid-run"""
+    from .report_batches import fail_stale_report_batches
+
+    failed = fail_stale_report_batches()
+
+    return f"Failed {failed} stalled report batches"
@@ -1,3 +1,733 @@
-from django.test import TestCase
+from decimal import Decimal
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from .grading import GradeBand, GradeTable, invalidate_grade_table
+from .models import SeniorSecondaryResult, SeniorSecondaryTermReport, PrimaryResult
+from .recalculation import RecalculationScheduler
+from .score_sheet import ScoreSheetIngestor
+
+
+class RecalculationSchedulerTest(TestCase):
+    """Dirty result keys are coalesced and run once per transaction"""
+
+    def setUp(self):
+        self.scheduler = RecalculationScheduler()
+
+    @mock.patch("result.recalculation.run_recalculation")
+    def test_duplicate_keys_collapse_into_one_commit_callback(self, run):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for _ in range(40):
+                self.scheduler.schedule(
+                    SeniorSecondaryResult, 1, 2, "SS1", "SENIOR_SECONDARY"
+                )
+            self.scheduler.schedule(PrimaryResult, 1, 3, "PRIMARY_1", "PRIMARY")
+            self.assertEqual(len(self.scheduler.pending()), 2)
+
+        self.assertEqual(len(callbacks), 1)
+        run.assert_called_once()
+        self.assertEqual(
+            run.call_args[0][0],
+            {
+                ("result.SeniorSecondaryResult", 1, 2, "SS1", "SENIOR_SECONDARY"),
+                ("result.PrimaryResult", 1, 3, "PRIMARY_1", "PRIMARY"),
+            },
+        )
+
+    @mock.patch("result.recalculation.run_recalculation")
+    def test_manual_flush_runs_pending_batch_once(self, run):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.scheduler.schedule(
+                SeniorSecondaryResult, 1, 2, "SS1", "SENIOR_SECONDARY"
+            )
+            self.assertEqual(self.scheduler.flush(), 1)
+            self.assertEqual(self.scheduler.pending(), set())
+
+        run.assert_called_once()
+
+    @override_settings(RESULT_RECALCULATION_MODE="sync")
+    @mock.patch("result.recalculation.run_recalculation")
+    def test_sync_mode_runs_immediately(self, run):
+        with self.captureOnCommitCallbacks() as callbacks:
+            self.scheduler.schedule(
+                SeniorSecondaryResult, 1, 2, "SS1", "SENIOR_SECONDARY"
+            )
+            self.scheduler.schedule(
+                SeniorSecondaryResult, 1, 2, "SS1", "SENIOR_SECONDARY"
+            )
+
+        self.assertEqual(callbacks, [])
+        self.assertEqual(run.call_count, 2)
+
+
+class GradeTableTest(SimpleTestCase):
+    """Bisect lookups match the old min_score/max_score range query"""
+
+    def setUp(self):
+        self.table = GradeTable(
+            [
+                GradeBand("F", Decimal("0"), Decimal("39.99"), Decimal("0"), False),
+                GradeBand("A", Decimal("70"), Decimal("100"), Decimal("5"), True),
+                GradeBand("C", Decimal("50"), Decimal("69.99"), Decimal("3"), True),
+                GradeBand("E", Decimal("40"), Decimal("49.99"), Decimal("1"), True),
+            ]
+        )
+
+    def test_lookup_within_bands(self):
+        self.assertEqual(self.table.lookup(0).grade, "F")
+        self.assertEqual(self.table.lookup(40).grade, "E")
+        self.assertEqual(self.table.lookup(Decimal("69.99")).grade, "C")
+        self.assertEqual(self.table.lookup(100).grade, "A")
+
+    def test_lookup_outside_bands(self):
+        self.assertIsNone(self.table.lookup(Decimal("49.995")))
+        self.assertIsNone(self.table.lookup(101))
+
+    def test_missing_score_is_not_graded(self):
+        for score in [None, "", "n/a"]:
+            self.assertIsNone(self.table.lookup(score))
+        self.assertIsNone(self.table.lookup_by_grade_point(None))
+
+    def test_lookup_by_grade_point(self):
+        self.assertEqual(self.table.max_grade_point, Decimal("5"))
+        self.assertEqual(self.table.lookup_by_grade_point(3.5).grade, "C")
+
+
+class ResultDataTestCase(TestCase):
+    """One exam session, grading system, two SS subjects and three SS 1 students"""
+
+    @classmethod
+    def setUpTestData(cls):
+        import datetime
+
+        from academics.models import AcademicSession
+        from students.models import Student
+        from subject.models import Subject
+        from users.models import CustomUser
+
+        from .models import ExamSession, Grade, GradingSystem
+
+        session = AcademicSession.objects.create(
+            name="2025/2026",
+            start_date=datetime.date(2025, 9, 1),
+            end_date=datetime.date(2026, 7, 1),
+        )
+        cls.exam_session = ExamSession.objects.create(
+            name="First Term",
+            academic_session=session,
+            term="FIRST",
+            exam_type="FINAL_EXAM",
+            start_date=datetime.date(2025, 12, 1),
+            end_date=datetime.date(2025, 12, 10),
+        )
+        cls.grading_system = GradingSystem.objects.create(
+            name="Standard", grading_type="PERCENTAGE"
+        )
+        for grade, low, high, passing in [
+            ("A", 70, 100, True),
+            ("C", 50, 69.99, True),
+            ("F", 0, 49.99, False),
+        ]:
+            Grade.objects.create(
+                grading_system=cls.grading_system,
+                grade=grade,
+                min_score=low,
+                max_score=high,
+                is_passing=passing,
+            )
+        cls.subjects = [
+            Subject.objects.create(
+                name=f"Subject {i}",
+                code=f"SUB{i}",
+                education_levels=["SENIOR_SECONDARY"],
+            )
+            for i in range(2)
+        ]
+        cls.students = []
+        for i in range(3):
+            user = CustomUser.objects.create_user(
+                email=f"student{i}@example.com",
+                username=f"student{i}",
+                first_name="Test",
+                last_name=f"Student{i}",
+                role="student",
+                password="x",
+            )
+            cls.students.append(
+                Student.objects.create(
+                    user=user,
+                    gender="M",
+                    date_of_birth=datetime.date(2010, 1, 1),
+                    student_class="SS_1",
+                    education_level="SENIOR_SECONDARY",
+                )
+            )
+
+    def sheet(self, exam_score, status="DRAFT"):
+        return [
+            {
+                "student": student.pk,
+                "subject": subject.pk,
+                "exam_session": self.exam_session.pk,
+                "grading_system": self.grading_system.pk,
+                "first_test_score": 10,
+                "second_test_score": 5,
+                "exam_score": exam_score,
+                "status": status,
+            }
+            for student in self.students
+            for subject in self.subjects
+        ]
+
+
+class ScoreSheetIngestorTest(ResultDataTestCase):
+    """A whole sheet is validated, computed and upserted in one pass"""
+
+    def test_sheet_is_inserted_then_upserted(self):
+        rows = self.sheet(60)
+        rows.append(dict(rows[0], first_test_score=11))
+        rows.append(dict(rows[0], student=999999))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = ScoreSheetIngestor("SENIOR_SECONDARY").ingest(rows)
+
+        self.assertEqual(result.created_count, 6)
+        self.assertEqual([error["index"] for error in result.errors], [6, 7])
+        saved = SeniorSecondaryResult.objects.filter(exam_session=self.exam_session)
+        self.assertEqual(saved.count(), 6)
+        self.assertEqual(
+            set(saved.values_list("total_score", "grade")), {(Decimal("75"), "A")}
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            result = ScoreSheetIngestor("SENIOR_SECONDARY").ingest(
+                self.sheet(40, status="APPROVED")
+            )
+
+        self.assertEqual(result.updated_count, 6)
+        self.assertEqual(saved.count(), 6)
+        self.assertEqual(
+            set(saved.values_list("total_score", "grade", "subject_position")),
+            {(Decimal("55"), "C", 1)},
+        )
+        report = SeniorSecondaryTermReport.objects.get(
+            student=self.students[0], exam_session=self.exam_session
+        )
+        self.assertEqual(report.average_score, Decimal("55"))
+        self.assertEqual(report.status, "SUBMITTED")
+        self.assertEqual(saved.filter(term_report__isnull=True).count(), 0)
+
+    def test_sheet_costs_a_fixed_number_of_queries(self):
+        invalidate_grade_table()
+        with self.assertNumQueries(16):
+            ScoreSheetIngestor("SENIOR_SECONDARY").ingest(self.sheet(60, "APPROVED"))
+
+
+class SessionGradeTablesTest(ResultDataTestCase):
+    """Recalculating many reports looks the grading system up once"""
+
+    def test_reports_share_the_session_grade_table(self):
+        from .grading import SessionGradeTables
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ScoreSheetIngestor("SENIOR_SECONDARY").ingest(self.sheet(40, "APPROVED"))
+        reports = list(
+            SeniorSecondaryTermReport.objects.filter(exam_session=self.exam_session)
+        )
+        invalidate_grade_table()
+
+        grade_tables = SessionGradeTables(SeniorSecondaryResult)
+        # The session's grading system, then its bands
+        with self.assertNumQueries(2):
+            tables = {id(grade_tables.for_report(report)) for report in reports}
+        self.assertEqual(len(tables), 1)
+
+        # Aggregate and save only
+        with self.assertNumQueries(2):
+            reports[0].calculate_metrics(grade_tables.for_report(reports[0]))
+        self.assertEqual(reports[0].overall_grade, "C")
+
+
+class ResultExportTest(ResultDataTestCase):
+    """Result exports only contain the sections the user can see"""
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            ScoreSheetIngestor("SENIOR_SECONDARY").ingest(self.sheet(60, "APPROVED"))
+
+    def export(self, role, **data):
+        from rest_framework.test import APIClient
+
+        from users.models import CustomUser
+
+        user = CustomUser.objects.filter(
+            username=f"export{role}"
+        ).first() or CustomUser.objects.create_user(
+            email=f"{role}@export.com",
+            username=f"export{role}",
+            first_name="Export",
+            last_name=role.title(),
+            role=role,
+            password="x",
+        )
+        client = APIClient(HTTP_HOST="localhost")
+        client.force_authenticate(user)
+        return client.post(
+            "/api/results/import-export/export_results/",
+            {"exam_session_id": self.exam_session.pk, **data},
+            format="json",
+        )
+
+    def rows(self, response):
+        self.assertEqual(response.status_code, 200)
+        return b"".join(response.streaming_content).decode().splitlines()[1:]
+
+    def test_section_access(self):
+        self.assertEqual(
+            len(self.rows(self.export("admin", education_level="SENIOR_SECONDARY"))),
+            6,
+        )
+        self.assertEqual(
+            len(
+                self.rows(
+                    self.export("secondary_admin", education_level="SENIOR_SECONDARY")
+                )
+            ),
+            6,
+        )
+        self.assertEqual(
+            self.export("nursery_admin", education_level="SENIOR_SECONDARY").status_code,
+            403,
+        )
+        # A teacher only reaches the levels of their own classes
+        self.assertEqual(
+            self.export("teacher", education_level="SENIOR_SECONDARY").status_code,
+            403,
+        )
+
+
+class RankingTest(ResultDataTestCase):
+    """Positions and class statistics are ranked per subject and exam session"""
+
+    def setUp(self):
+        import datetime
+
+        from .models import ExamSession
+
+        self.second_session = ExamSession.objects.create(
+            name="Second Term",
+            academic_session=self.exam_session.academic_session,
+            term="SECOND",
+            exam_type="FINAL_EXAM",
+            start_date=datetime.date(2026, 3, 1),
+            end_date=datetime.date(2026, 3, 10),
+        )
+        rows = self.sheet(60, "APPROVED")
+        rows += [dict(row, exam_session=self.second_session.pk) for row in rows]
+        ScoreSheetIngestor("SENIOR_SECONDARY").ingest(rows)
+
+    def score(self, exam_session, subject, scores):
+        for student, total_score in zip(self.students, scores):
+            SeniorSecondaryResult.objects.filter(
+                exam_session=exam_session, subject=subject, student=student
+            ).update(total_score=total_score)
+
+    def column(self, exam_session, subject, field):
+        return [
+            SeniorSecondaryResult.objects.values_list(field, flat=True).get(
+                exam_session=exam_session, subject=subject, student=student
+            )
+            for student in self.students
+        ]
+
+    def test_ties_and_partitions(self):
+        from .ranking import DENSE, rank
+
+        first, second = self.subjects
+        self.score(self.exam_session, first, [90, 90, 80])
+        self.score(self.exam_session, second, [50, 70, 60])
+        self.score(self.second_session, first, [10, 30, 20])
+
+        # One statement ranks every subject of every exam session
+        with self.assertNumQueries(1):
+            self.assertEqual(rank(SeniorSecondaryResult), 12)
+
+        position = "subject_position"
+        self.assertEqual(self.column(self.exam_session, first, position), [1, 1, 3])
+        self.assertEqual(self.column(self.exam_session, second, position), [3, 1, 2])
+        self.assertEqual(self.column(self.second_session, first, position), [3, 1, 2])
+        self.assertEqual(self.column(self.second_session, second, position), [1, 1, 1])
+
+        rank(SeniorSecondaryResult, method=DENSE, exam_session=self.exam_session)
+        self.assertEqual(self.column(self.exam_session, first, position), [1, 1, 2])
+        # Other exam sessions are left alone
+        self.assertEqual(self.column(self.second_session, first, position), [3, 1, 2])
+
+    def test_class_statistics(self):
+        from .ranking import rank
+
+        first, second = self.subjects
+        self.score(self.exam_session, first, [90, 90, 81])
+        rank(SeniorSecondaryResult, exam_session=self.exam_session)
+
+        for field, value in [
+            ("class_average", Decimal("87")),
+            ("highest_in_class", Decimal("90")),
+            ("lowest_in_class", Decimal("81")),
+        ]:
+            self.assertEqual(
+                self.column(self.exam_session, first, field), [value] * 3
+            )
+        self.assertEqual(
+            self.column(self.exam_session, second, "class_average"),
+            [Decimal("75")] * 3,
+        )
+
+    def test_calculate_position_command(self):
+        from io import StringIO
+
+        from django.core.management import call_command
+
+        first, _ = self.subjects
+        self.score(self.exam_session, first, [70, 90, 80])
+        call_command(
+            "calculate_position",
+            education_level="SENIOR_SECONDARY",
+            exam_session=str(self.exam_session.pk),
+            stdout=StringIO(),
+        )
+        self.assertEqual(
+            self.column(self.exam_session, first, "subject_position"), [3, 1, 2]
+        )
+
+
+@override_settings(REPORT_BATCH_WORKERS=1)
+class ReportBatchTest(TestCase):
+    """A batch job renders each report once and records failures per report"""
+
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+
+    def build(self, report_id):
+        if report_id == "missing":
+            raise SeniorSecondaryTermReport.DoesNotExist("gone")
+        return f"<p>{report_id}</p>", "report.pdf"
+
+    @mock.patch("result.report_generation.WEASYPRINT_AVAILABLE", True)
+    @mock.patch("result.report_batches._render_pdf", return_value=b"%PDF-1.7")
+    def test_zip_batch(self, render):
+        import zipfile
+
+        from .models import ReportBatchJob
+        from .report_batches import create_report_batch, run_report_batch
+        from .report_generation import SeniorSecondaryReportGenerator
+
+        with mock.patch.object(
+            SeniorSecondaryReportGenerator, "build_term_report", side_effect=self.build
+        ), mock.patch("result.report_batches.dispatch_report_batch") as dispatch:
+            with self.captureOnCommitCallbacks(execute=True):
+                job = create_report_batch(
+                    None, "SENIOR_SECONDARY", ["a", "b", "missing", "a"]
+                )
+            dispatch.assert_called_once_with(job.pk)
+            run_report_batch(job.pk)
+
+        job = ReportBatchJob.objects.get(pk=job.pk)
+        self.assertEqual(job.status, "COMPLETED")
+        self.assertEqual((job.total_reports, job.processed_reports), (3, 2))
+        self.assertEqual(job.errors[0]["report_id"], "missing")
+        self.assertEqual(render.call_count, 2)
+        with zipfile.ZipFile(job.output_file.open("rb")) as archive:
+            self.assertEqual(archive.namelist(), ["report.pdf", "report_2.pdf"])
+
+        # Already processed; a second run is a no-op
+        run_report_batch(job.pk)
+        self.assertEqual(render.call_count, 2)
+
+    @override_settings(REPORT_BATCH_WORKERS=2)
+    @mock.patch("result.report_generation.WEASYPRINT_AVAILABLE", True)
+    def test_merged_pdf_is_ordered_with_bounded_work_in_flight(self):
+        import io
+        import time
+        from concurrent.futures import ThreadPoolExecutor
+
+        from pypdf import PdfReader, PdfWriter
+
+        from .models import ReportBatchJob
+        from .report_batches import (
+            PENDING_PER_WORKER,
+            ReportBatchRunner,
+            run_report_batch,
+        )
+        from .report_generation import SeniorSecondaryReportGenerator
+
+        def render(html_string, base_url):
+            # Page width identifies the report; later reports finish first
+            width = int(html_string[3:-4])
+            time.sleep(0.01 * (110 - width))
+            pdf = io.BytesIO()
+            writer = PdfWriter()
+            writer.add_blank_page(width=width, height=100)
+            writer.write(pdf)
+            return pdf.getvalue()
+
+        built, merged, outstanding = [], [], []
+
+        def build(report_id):
+            if report_id == "missing":
+                raise SeniorSecondaryTermReport.DoesNotExist("gone")
+            # Built but not yet merged when the next one is built
+            outstanding.append(len(built) - len(merged))
+            built.append(report_id)
+            return f"<p>{report_id}</p>", "report.pdf"
+
+        def record_success(runner):
+            merged.append(runner)
+            original_record_success(runner)
+
+        original_record_success = ReportBatchRunner.record_success
+        report_ids = ["101", "102", "missing", "103", "104", "105", "106"]
+        job = ReportBatchJob.objects.create(
+            education_level="SENIOR_SECONDARY",
+            report_ids=report_ids,
+            output_format="MERGED_PDF",
+            total_reports=len(report_ids),
+        )
+        with mock.patch.object(
+            SeniorSecondaryReportGenerator, "build_term_report", side_effect=build
+        ), mock.patch("result.report_batches._render_pdf", render), mock.patch(
+            "result.report_batches.ProcessPoolExecutor",
+            lambda max_workers, mp_context: ThreadPoolExecutor(max_workers),
+        ), mock.patch.object(ReportBatchRunner, "record_success", record_success):
+            run_report_batch(job.pk)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "COMPLETED")
+        self.assertEqual((job.processed_reports, job.failed_reports), (6, 1))
+        self.assertLess(max(outstanding), 2 * PENDING_PER_WORKER)
+        with job.output_file.open("rb") as f:
+            widths = [int(page.mediabox.width) for page in PdfReader(f).pages]
+        self.assertEqual(widths, [101, 102, 103, 104, 105, 106])
+
+    def test_stalled_job_is_failed(self):
+        import datetime
+
+        from django.utils import timezone
+
+        from .models import ReportBatchJob
+        from .report_batches import fail_stale_report_batches
+
+        beat = timezone.now() - datetime.timedelta(minutes=10)
+        job = ReportBatchJob.objects.create(
+            education_level="SENIOR_SECONDARY",
+            status="PROCESSING",
+            started_at=beat,
+            heartbeat_at=beat,
+        )
+        with override_settings(REPORT_BATCH_TIMEOUT=3600):
+            self.assertEqual(fail_stale_report_batches(), 0)
+        with override_settings(REPORT_BATCH_TIMEOUT=60):
+            self.assertEqual(fail_stale_report_batches(), 1)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, "FAILED")
+        self.assertTrue(job.error_message)
+
+    def test_job_status_lookup(self):
+        from django.urls import reverse
+        from rest_framework.test import APIClient
+
+        from users.models import CustomUser
+
+        from .models import ReportBatchJob
+
+        job = ReportBatchJob.objects.create(education_level="SENIOR_SECONDARY")
+        client = APIClient(HTTP_HOST="localhost")
+        client.force_authenticate(
+            CustomUser.objects.create_superuser(
+                email="batches@example.com",
+                username="batches",
+                first_name="Batch",
+                last_name="Admin",
+                password="x",
+            )
+        )
+        for job_id, status_code in [(job.pk, 200), ("abc", 404), ("0-0", 404)]:
+            url = reverse("results:report-generation-bulk-job-status", args=[job_id])
+            self.assertEqual(client.get(url).status_code, status_code)
+
+
+@mock.patch("result.report_generation.WEASYPRINT_AVAILABLE", True)
+class ReportPDFCacheTest(ResultDataTestCase):
+    """Unchanged reports are served from the PDF cache or answered with a 304"""
+
+    def setUp(self):
+        import shutil
+        import tempfile
+
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root, ignore_errors=True)
+        self.enterContext(override_settings(MEDIA_ROOT=media_root))
+        self.render = self.enterContext(
+            mock.patch(
+                "result.report_generation.ReportGenerator.render_pdf",
+                return_value=b"%PDF-1.7",
+            )
+        )
+        self.enterContext(
+            mock.patch(
+                "result.report_generation.SeniorSecondaryReportGenerator.build_term_report",
+                return_value=("<p>report</p>", "report.pdf"),
+            )
+        )
+        self.enterContext(
+            mock.patch("result.report_cache.template_fingerprint", return_value="v1")
+        )
+        with self.captureOnCommitCallbacks(execute=True):
+            ScoreSheetIngestor("SENIOR_SECONDARY").ingest(self.sheet(60, "APPROVED"))
+        self.report = SeniorSecondaryTermReport.objects.get(
+            student=self.students[0], exam_session=self.exam_session
+        )
+
+    def download(self, **headers):
+        from django.test import RequestFactory
+
+        from .report_generation import get_report_generator
+
+        request = RequestFactory().get("/", headers=headers)
+        generator = get_report_generator("SENIOR_SECONDARY", request)
+        return generator.generate_term_report(self.report.pk)
+
+    def test_cache_hit_etag_and_invalidation(self):
+        first = self.download()
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(self.download().content, b"%PDF-1.7")
+        self.assertEqual(self.render.call_count, 1)
+
+        not_modified = self.download(if_none_match=first["ETag"])
+        self.assertEqual(not_modified.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.report.class_teacher_remark = "Excellent"
+            self.report.save()
+
+        changed = self.download(if_none_match=first["ETag"])
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], first["ETag"])
+        self.assertEqual(self.render.call_count, 2)
+
+    def test_class_level_changes_change_the_etag(self):
+        import datetime
+
+        from academics.models import Term
+        from students.models import Student
+        from users.models import CustomUser
+
+        etags = [self.download()["ETag"]]
+
+        # Next term's start date is printed on every report of the class
+        Term.objects.create(
+            name="SECOND",
+            academic_session=self.exam_session.academic_session,
+            start_date=datetime.date(2026, 1, 5),
+            end_date=datetime.date(2026, 4, 1),
+        )
+        etags.append(self.download()["ETag"])
+
+        # So is the class average age
+        Student.objects.create(
+            user=CustomUser.objects.create_user(
+                email="late@example.com",
+                username="late",
+                first_name="Late",
+                last_name="Enrolment",
+                role="student",
+                password="x",
+            ),
+            gender="F",
+            date_of_birth=datetime.date(2006, 1, 1),
+            student_class="SS_1",
+            education_level="SENIOR_SECONDARY",
+        )
+        etags.append(self.download()["ETag"])
+
+        self.assertEqual(len(set(etags)), 3)
+
+    def test_attendance_changes_change_the_etag(self):
+        import datetime
+
+        from academics.models import Term
+        from attendance.models import StudentTermAttendance
+
+        term = Term.objects.create(
+            name="FIRST",
+            academic_session=self.exam_session.academic_session,
+            start_date=datetime.date(2025, 9, 8),
+            end_date=datetime.date(2025, 12, 12),
+        )
+        rollup = StudentTermAttendance.objects.create(
+            student=self.students[0], term=term, present=50, absent=10
+        )
+        first = self.download()["ETag"]
+
+        # Attendance is read from the rollup, not the report row
+        StudentTermAttendance.objects.filter(pk=rollup.pk).update(present=55)
+        changed = self.download(if_none_match=first)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed["ETag"], first)
+
+
+class ClassReportContextTest(ResultDataTestCase):
+    """Class-level report values are computed once per class, not per report"""
+
+    def test_reports_of_a_class_share_one_context(self):
+        import datetime
+
+        from academics.models import Term
+        from attendance.models import StudentTermAttendance
+
+        from .report_generation import get_report_generator
+
+        with self.captureOnCommitCallbacks(execute=True):
+            ScoreSheetIngestor("SENIOR_SECONDARY").ingest(self.sheet(60, "APPROVED"))
+        term = Term.objects.create(
+            name="FIRST",
+            academic_session=self.exam_session.academic_session,
+            start_date=datetime.date(2025, 9, 8),
+            end_date=datetime.date(2025, 12, 12),
+        )
+        StudentTermAttendance.objects.create(
+            student=self.students[0], term=term, present=50, absent=10
+        )
+        report_ids = list(
+            SeniorSecondaryTermReport.objects.filter(
+                exam_session=self.exam_session
+            ).values_list("id", flat=True)
+        )
+
+        generator = get_report_generator("SENIOR_SECONDARY")
+        # Report + subject results per report; school settings, the next
+        # term lookup and the term's attendance rollups once for the class
+        with self.assertNumQueries(2 * 3 + 3):
+            contexts = [
+                generator.get_term_context(report, generator.get_class_context(report))
+                for report in map(generator.get_term_report, report_ids)
+            ]
+
+        self.assertEqual(len(generator._class_contexts), 1)
+        self.assertEqual(
+            [len(context["subjects"]) for context in contexts], [2, 2, 2]
+        )
+        self.assertEqual(contexts[0]["next_term_begins"], "To Be Announced")
+        attendance = sorted(
+            tuple(context["attendance"].values()) for context in contexts
+        )
+        self.assertEqual(attendance, [(0, 0), (0, 0), (60, 50)])
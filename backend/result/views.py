@@ -1,11 +1,13 @@
 import tempfile
 import logging
+import uuid
 from decimal import Decimal
 from django.apps import apps
-from django.http import HttpResponse
+from django.http import FileResponse, Http404, HttpResponse
 from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Avg, Count, Max, Min, F, Case, When, DecimalField
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
 from django.db import transaction
 from django.core.exceptions import ValidationError
@@ -16,11 +18,15 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from django.template.loader import render_to_string
 from utils.section_filtering import SectionFilterMixin, AutoSectionFilterMixin
 from .report_generation import get_report_generator
+from .score_sheet import ScoreSheetIngestor, get_score_sheet_config
+from .report_batches import create_report_batch, fail_stale_report_batches
+from .exports import build_result_export
 from utils.teacher_portal_permissions import TeacherPortalCheckMixin
 from django.db.models import Prefetch
 from .filters import StudentTermResultFilter
 from utils.signature_handler import upload_signature_to_cloudinary
 from rest_framework.pagination import PageNumberPagination
+from utils.pagination import KeysetPagination
 
 
 from rest_framework.parsers import MultiPartParser, FormParser
@@ -48,6 +54,7 @@ from .models import (
     SeniorSecondaryTermReport,
     SeniorSecondarySessionResult,
     SeniorSecondarySessionReport,
+    ReportBatchJob,
 )
 
 from .serializers import (
@@ -576,6 +583,40 @@ class BaseResultViewSetMixin:
             request.data.copy() if hasattr(request.data, "copy") else dict(request.data)
         )
 
+    def handle_bulk_create(self, request, education_level, result_serializer_class):
+        """Common bulk score-sheet logic; see result/score_sheet.py"""
+        try:
+            sheet = ScoreSheetIngestor(education_level, user=request.user).ingest(
+                request.data.get("results", [])
+            )
+            errors = sheet.errors
+            saved = sheet.saved_queryset()
+
+            if errors and not saved:
+                return Response(
+                    {"error": "Failed to create any results", "errors": errors},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+            response_data = {
+                "message": f"Successfully saved {len(saved)} results "
+                f"({sheet.created_count} created, {sheet.updated_count} updated)",
+                "results": result_serializer_class(saved, many=True).data,
+            }
+
+            if errors:
+                response_data["partial_success"] = True
+                response_data["errors"] = errors
+
+            return Response(response_data, status=status.HTTP_201_CREATED)
+
+        except Exception as e:
+            logger.error(f"Failed to bulk create results: {str(e)}", exc_info=True)
+            return Response(
+                {"error": f"Failed to bulk create results: {str(e)}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
     def handle_approve(self, request, result, serializer_class):
         """Common approve logic"""
         user_role = self.get_user_role()
@@ -662,12 +703,19 @@ class BaseResultViewSetMixin:
             )
 
 
-class StandardResultsPagination(PageNumberPagination):
+class PageNumberResultsPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
 
 
+class StandardResultsPagination(KeysetPagination):
+    """Keyset pages on ?limit=/?cursor=, the old page numbers otherwise"""
+
+    ordering = ("-created_at",)
+    legacy_pagination_class = PageNumberResultsPagination
+
+
 # ===== SENIOR SECONDARY VIEWSETS =====
 class SeniorSecondaryResultViewSet(
     BaseResultViewSetMixin,
@@ -783,54 +831,10 @@ class SeniorSecondaryResultViewSet(
 
     @action(detail=False, methods=["post"])
     def bulk_create(self, request):
-        results_data = request.data.get("results", [])
-        created_results = []
-        errors = []
-
-        try:
-            with transaction.atomic():
-                for i, raw_item in enumerate(results_data):
-                    if isinstance(raw_item, dict):
-                        item = raw_item.copy()
-                    else:
-                        item = dict(raw_item)
-
-                    item["entered_by"] = request.user.id
-                    serializer = self.get_serializer(data=item)
-
-                    try:
-                        serializer.is_valid(raise_exception=True)
-                        result = serializer.save()
-                        created_results.append(
-                            SeniorSecondaryResultSerializer(result).data
-                        )
-                    except Exception as e:
-                        logger.warning(f"Error saving item index {i}: {e}")
-                        errors.append({"index": i, "error": str(e), "data": item})
-
-                if not created_results and errors:
-                    return Response(
-                        {"error": "Failed to create any results", "errors": errors},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                response_data = {
-                    "message": f"Successfully created {len(created_results)} results",
-                    "results": created_results,
-                }
-
-                if errors:
-                    response_data["partial_success"] = True
-                    response_data["errors"] = errors
-
-                return Response(response_data, status=status.HTTP_201_CREATED)
-
-        except Exception as e:
-            logger.error(f"Failed to bulk create results: {str(e)}", exc_info=True)
-            return Response(
-                {"error": f"Failed to bulk create results: {str(e)}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        """Save a whole score sheet in one pass"""
+        return self.handle_bulk_create(
+            request, SENIOR_SECONDARY, SeniorSecondaryResultSerializer
+        )
 
     def destroy(self, request, *args, **kwargs):
         """
@@ -2181,54 +2185,10 @@ class JuniorSecondaryResultViewSet(
 
     @action(detail=False, methods=["post"])
     def bulk_create(self, request):
-        results_data = request.data.get("results", [])
-        created_results = []
-        errors = []
-
-        try:
-            with transaction.atomic():
-                for i, raw_item in enumerate(results_data):
-                    try:
-                        result_data = (
-                            dict(raw_item)
-                            if not isinstance(raw_item, dict)
-                            else raw_item.copy()
-                        )
-                        result_data["entered_by"] = request.user.id
-                        serializer = self.get_serializer(data=result_data)
-                        serializer.is_valid(raise_exception=True)
-                        result = serializer.save()
-                        created_results.append(
-                            JuniorSecondaryResultSerializer(result).data
-                        )
-                    except Exception as e:
-                        errors.append(
-                            {"index": i, "error": str(e), "data": result_data}
-                        )
-
-                if errors and not created_results:
-                    return Response(
-                        {"error": "Failed to create any results", "errors": errors},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                response_data = {
-                    "message": f"Successfully created {len(created_results)} results",
-                    "results": created_results,
-                }
-
-                if errors:
-                    response_data["partial_success"] = True
-                    response_data["errors"] = errors
-
-                return Response(response_data, status=status.HTTP_201_CREATED)
-
-        except Exception as e:
-            logger.error(f"Failed to bulk create results: {str(e)}")
-            return Response(
-                {"error": f"Failed to bulk create results: {str(e)}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        """Save a whole score sheet in one pass"""
+        return self.handle_bulk_create(
+            request, JUNIOR_SECONDARY, JuniorSecondaryResultSerializer
+        )
 
     def destroy(self, request, *args, **kwargs):
         """
@@ -3265,47 +3225,8 @@ class PrimaryResultViewSet(
 
     @action(detail=False, methods=["post"])
     def bulk_create(self, request):
-        results_data = request.data.get("results", [])
-        created_results = []
-        errors = []
-
-        try:
-            with transaction.atomic():
-                for i, result_data in enumerate(results_data):
-                    try:
-                        result_data["entered_by"] = request.user.id
-                        serializer = self.get_serializer(data=result_data)
-                        serializer.is_valid(raise_exception=True)
-                        result = serializer.save()
-                        created_results.append(PrimaryResultSerializer(result).data)
-                    except Exception as e:
-                        errors.append(
-                            {"index": i, "error": str(e), "data": result_data}
-                        )
-
-                if errors and not created_results:
-                    return Response(
-                        {"error": "Failed to create any results", "errors": errors},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                response_data = {
-                    "message": f"Successfully created {len(created_results)} results",
-                    "results": created_results,
-                }
-
-                if errors:
-                    response_data["partial_success"] = True
-                    response_data["errors"] = errors
-
-                return Response(response_data, status=status.HTTP_201_CREATED)
-
-        except Exception as e:
-            logger.error(f"Failed to bulk create results: {str(e)}")
-            return Response(
-                {"error": f"Failed to bulk create results: {str(e)}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        """Save a whole score sheet in one pass"""
+        return self.handle_bulk_create(request, PRIMARY, PrimaryResultSerializer)
 
     def destroy(self, request, *args, **kwargs):
         """
@@ -4298,47 +4219,8 @@ class NurseryResultViewSet(
 
     @action(detail=False, methods=["post"])
     def bulk_create(self, request):
-        results_data = request.data.get("results", [])
-        created_results = []
-        errors = []
-
-        try:
-            with transaction.atomic():
-                for i, result_data in enumerate(results_data):
-                    try:
-                        result_data["entered_by"] = request.user.id
-                        serializer = self.get_serializer(data=result_data)
-                        serializer.is_valid(raise_exception=True)
-                        result = serializer.save()
-                        created_results.append(NurseryResultSerializer(result).data)
-                    except Exception as e:
-                        errors.append(
-                            {"index": i, "error": str(e), "data": result_data}
-                        )
-
-                if errors and not created_results:
-                    return Response(
-                        {"error": "Failed to create any results", "errors": errors},
-                        status=status.HTTP_400_BAD_REQUEST,
-                    )
-
-                response_data = {
-                    "message": f"Successfully created {len(created_results)} results",
-                    "results": created_results,
-                }
-
-                if errors:
-                    response_data["partial_success"] = True
-                    response_data["errors"] = errors
-
-                return Response(response_data, status=status.HTTP_201_CREATED)
-
-        except Exception as e:
-            logger.error(f"Failed to bulk create results: {str(e)}")
-            return Response(
-                {"error": f"Failed to bulk create results: {str(e)}"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        """Save a whole score sheet in one pass"""
+        return self.handle_bulk_create(request, NURSERY, NurseryResultSerializer)
 
     def destroy(self, request, *args, **kwargs):
         """
@@ -5992,7 +5874,7 @@ class ResultAnalyticsViewSet(viewsets.ViewSet):
         return Response(summary)
 
 
-class ResultImportExportViewSet(viewsets.ViewSet):
+class ResultImportExportViewSet(SectionFilterMixin, viewsets.ViewSet):
     """ViewSet for importing and exporting results"""
 
     permission_classes = [IsAuthenticated]
@@ -6011,15 +5893,37 @@ class ResultImportExportViewSet(viewsets.ViewSet):
 
     @action(detail=False, methods=["post"])
     def export_results(self, request):
-        """Export results to file"""
+        """Stream an exam session's results as CSV (?compress=gzip for .csv.gz)"""
+        if getattr(request.user, "role", None) in ["student", "parent"]:
+            return Response(
+                {"error": "You do not have permission to export results"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
         serializer = ResultExportSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        # TODO: Implement CSV/Excel/PDF export logic
-        return Response(
-            {"message": "Export functionality to be implemented", "status": "pending"},
-            status=status.HTTP_501_NOT_IMPLEMENTED,
-        )
+        if serializer.validated_data["format"] != "CSV":
+            return Response(
+                {"error": "Only CSV exports are supported"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        education_level = (
+            serializer.validated_data.get("education_level") or ""
+        ).upper()
+        if education_level and education_level not in (
+            self.get_user_education_level_access()
+        ):
+            return Response(
+                {"error": "You do not have access to this section's results"},
+                status=status.HTTP_403_FORBIDDEN,
+            )
+
+        # Like the result viewsets, only the user's sections are exported
+        return build_result_export(
+            serializer.validated_data, restrict=self.apply_section_filters
+        ).response(request)
 
 
 class ReportGenerationViewSet(viewsets.ViewSet):
@@ -6136,31 +6040,45 @@ class ReportGenerationViewSet(viewsets.ViewSet):
     @action(detail=False, methods=["post"], url_path="bulk-download")
     def bulk_download_reports(self, request):
         """
-        Bulk download multiple PDF reports
-        Payload: { report_ids: [], education_level: "" }
+        Queue a batch of PDF reports, returned as a ZIP (or one merged PDF).
+        Payload: { report_ids: [] | exam_session_id + student_class [+ stream_id],
+                   education_level: "", output_format: "ZIP" | "MERGED_PDF" }
+        Poll bulk-jobs/<job_id>/ and fetch bulk-jobs/<job_id>/download/.
         """
         serializer = BulkReportGenerationSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
+        data = serializer.validated_data
 
-        report_ids = serializer.validated_data.get("report_ids", [])
-        education_level = serializer.validated_data.get("education_level")
-
-        if not report_ids:
-            return Response(
-                {"error": "report_ids are required"},
-                status=status.HTTP_400_BAD_REQUEST,
-            )
+        education_level = data["education_level"]
+        report_ids = data.get("report_ids") or []
 
         try:
-            generator = get_report_generator(education_level, request)
+            if not report_ids:
+                report_model = get_score_sheet_config(education_level).report_model
+                reports = report_model.objects.filter(
+                    exam_session_id=data["exam_session_id"],
+                    student__student_class=data["student_class"],
+                )
+                if data.get("stream_id") and hasattr(report_model, "stream"):
+                    reports = reports.filter(stream_id=data["stream_id"])
+                report_ids = list(
+                    reports.order_by(
+                        "student__user__last_name", "student__user__first_name"
+                    ).values_list("id", flat=True)
+                )
+
+            if not report_ids:
+                return Response(
+                    {"error": "No term reports found for the selection"},
+                    status=status.HTTP_404_NOT_FOUND,
+                )
+
+            job = create_report_batch(
+                request.user, education_level, report_ids, data["output_format"]
+            )
 
-            # For bulk downloads, we'd typically create a ZIP file
-            # For now, return success message
             return Response(
-                {
-                    "message": f"Bulk download initiated for {len(report_ids)} reports",
-                    "status": "processing",
-                },
+                self._batch_job_payload(request, job),
                 status=status.HTTP_202_ACCEPTED,
             )
 
@@ -6171,6 +6089,65 @@ class ReportGenerationViewSet(viewsets.ViewSet):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+    @action(
+        detail=False, methods=["get"], url_path=r"bulk-jobs/(?P<job_id>[0-9a-f-]+)"
+    )
+    def bulk_job_status(self, request, job_id=None):
+        """Progress of a bulk report job"""
+        job = self._get_batch_job(request, job_id)
+        return Response(self._batch_job_payload(request, job))
+
+    @action(
+        detail=False,
+        methods=["get"],
+        url_path=r"bulk-jobs/(?P<job_id>[0-9a-f-]+)/download",
+    )
+    def bulk_job_download(self, request, job_id=None):
+        """Download the ZIP / merged PDF of a completed bulk report job"""
+        job = self._get_batch_job(request, job_id)
+        if job.status != "COMPLETED" or not job.output_file:
+            return Response(
+                {"error": "Report batch is not ready", "status": job.status},
+                status=status.HTTP_409_CONFLICT,
+            )
+
+        return FileResponse(
+            job.output_file.open("rb"),
+            as_attachment=True,
+            filename=job.output_file.name.rsplit("/", 1)[-1],
+        )
+
+    def _get_batch_job(self, request, job_id):
+        try:
+            job_id = uuid.UUID(job_id)
+        except ValueError:
+            raise Http404("No such report batch")
+        jobs = ReportBatchJob.objects.all()
+        if not (request.user.is_staff or request.user.is_superuser):
+            jobs = jobs.filter(requested_by=request.user)
+        job = get_object_or_404(jobs, pk=job_id)
+        if job.status == "PROCESSING" and fail_stale_report_batches(pk=job.pk):
+            job.refresh_from_db()
+        return job
+
+    def _batch_job_payload(self, request, job):
+        base = request.build_absolute_uri(
+            reverse("results:report-generation-bulk-job-status", args=[job.pk])
+        )
+        return {
+            "job_id": str(job.pk),
+            "status": job.status,
+            "output_format": job.output_format,
+            "total_reports": job.total_reports,
+            "processed_reports": job.processed_reports,
+            "failed_reports": job.failed_reports,
+            "progress": job.progress,
+            "errors": job.errors,
+            "error_message": job.error_message,
+            "status_url": base,
+            "download_url": f"{base}download/" if job.status == "COMPLETED" else None,
+        }
+
     @action(detail=False, methods=["get"], url_path="download-term-report")
     def download_term_report(self, request):
         """
@@ -4,3 +4,6 @@ from django.apps import AppConfig
 class SchoolsettingsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'schoolSettings'
+
+    def ready(self):
+        import schoolSettings.signals
@@ -0,0 +1,132 @@
+# schoolSettings/permission_cache.py
+"""
+Compiled, cached role permissions.
+
+``ModulePermissionBase.user_has_permission`` used to load every active
+``UserRole`` of the user on every request and then query custom permissions
+and role permissions once per role. The answer only changes when roles or
+permissions change, so each user's effective permissions are compiled into a
+``PermissionSet`` - a frozenset of ``(module, permission_type)`` pairs plus
+the sections the user can access - and cached:
+
+* under the ``permission_set`` cache namespace: saving/deleting a ``Role``
+  or ``Permission`` (or changing a role's permissions) bumps it,
+  invalidating everyone;
+* per user: ``UserRole`` changes drop that user's entry;
+* until the earliest ``expires_at`` of the user's role assignments, so an
+  expiring assignment stops granting on time.
+
+The invalidation signal handlers are in ``schoolSettings/signals.py``.
+"""
+
+import logging
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from utils.caching import bump_namespace, make_key, record
+
+logger = logging.getLogger(__name__)
+
+CACHE_NAMESPACE = "permission_set"
+SECTIONS = ("primary", "secondary", "nursery")
+
+
+def get_cache_ttl():
+    return getattr(settings, "PERMISSION_CACHE_TTL", 300)
+
+
+class PermissionSet:
+    """Effective module permissions and section access of one user"""
+
+    __slots__ = ("grants", "sections", "valid_until")
+
+    def __init__(self, grants=(), sections=(), valid_until=None):
+        self.grants = frozenset(grants)
+        self.sections = frozenset(sections)
+        self.valid_until = valid_until
+
+    def has_permission(self, module, permission_type):
+        return (module, permission_type) in self.grants
+
+    def has_section(self, section):
+        return section in self.sections
+
+    def is_stale(self, now=None):
+        return self.valid_until is not None and (now or timezone.now()) >= self.valid_until
+
+
+def compile_permission_set(user):
+    """Build a user's PermissionSet from their active role assignments"""
+    from .models import Permission, UserRole
+
+    user_roles = (
+        UserRole.objects.filter(user=user, is_active=True)
+        .select_related("role")
+        .prefetch_related(
+            Prefetch(
+                "custom_permissions",
+                queryset=Permission.objects.filter(granted=True),
+                to_attr="granted_custom_permissions",
+            ),
+            Prefetch(
+                "role__permissions",
+                queryset=Permission.objects.filter(section="all"),
+                to_attr="all_section_permissions",
+            ),
+        )
+    )
+
+    now = timezone.now()
+    grants, sections, expiries = set(), set(), []
+    for user_role in user_roles:
+        if user_role.expires_at:
+            if now > user_role.expires_at:
+                continue
+            expiries.append(user_role.expires_at)
+
+        # Custom permissions (granted ones) and the role's all-section ones
+        for perm in user_role.granted_custom_permissions:
+            grants.add((perm.module, perm.permission_type))
+        for perm in user_role.role.all_section_permissions:
+            grants.add((perm.module, perm.permission_type))
+
+        for section in SECTIONS:
+            if getattr(user_role, f"{section}_section_access"):
+                sections.add(section)
+
+    logger.info(
+        f"🔐 Permissions compiled for {user}: {len(grants)} grants, "
+        f"sections={sorted(sections)}"
+    )
+    return PermissionSet(grants, sections, min(expiries) if expiries else None)
+
+
+def get_permission_set(user):
+    """A user's PermissionSet, from the request-local copy or the cache"""
+    permission_set = getattr(user, "_permission_set", None)
+    if permission_set is not None and not permission_set.is_stale():
+        return permission_set
+
+    key = make_key(CACHE_NAMESPACE, user.pk)
+    permission_set = cache.get(key)
+    if permission_set is None or permission_set.is_stale():
+        record(CACHE_NAMESPACE, "misses")
+        permission_set = compile_permission_set(user)
+        cache.set(key, permission_set, get_cache_ttl())
+    else:
+        record(CACHE_NAMESPACE, "hits")
+
+    # request.user lives for one request; keep the set on it
+    user._permission_set = permission_set
+    return permission_set
+
+
+def invalidate_permission_set(user_id=None):
+    """Drop one user's compiled permissions, or everyone's when ``user_id`` is None"""
+    if user_id is None:
+        bump_namespace(CACHE_NAMESPACE)
+        return
+    cache.delete(make_key(CACHE_NAMESPACE, user_id))
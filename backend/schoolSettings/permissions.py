@@ -245,6 +245,8 @@
 from rest_framework import permissions
 from django.contrib.auth import get_user_model
 
+from .permission_cache import get_permission_set
+
 User = get_user_model()
 
 
@@ -355,31 +357,9 @@ class ModulePermissionBase(permissions.BasePermission):
         if user.is_superuser:
             return True
 
-        # Get all active role assignments for the user
-        from schoolSettings.models import UserRole
-
-        user_roles = UserRole.objects.filter(
-            user=user, is_active=True
-        ).prefetch_related("role", "role__permissions", "custom_permissions")
-
-        for user_role in user_roles:
-            # Skip expired assignments
-            if user_role.is_expired():
-                continue
-
-            # Check custom permissions first (they override role permissions)
-            custom_perm = user_role.custom_permissions.filter(
-                module=module, permission_type=permission_type, granted=True
-            ).first()
-
-            if custom_perm:
-                return True
-
-            # Check role permissions
-            if user_role.role.has_permission(module, permission_type):
-                return True
-
-        return False
+        # Granted custom and role permissions of the active, unexpired
+        # role assignments, compiled once and cached
+        return get_permission_set(user).has_permission(module, permission_type)
 
 
 # ============================================================================
@@ -636,23 +616,7 @@ class SectionPermissionBase(permissions.BasePermission):
             return True
 
         # Get user's section access from role assignments
-        from schoolSettings.models import UserRole
-
-        user_roles = UserRole.objects.filter(user=request.user, is_active=True)
-
-        for user_role in user_roles:
-            if user_role.is_expired():
-                continue
-
-            # Check section access based on section type
-            if self.section == "primary" and user_role.primary_section_access:
-                return True
-            elif self.section == "secondary" and user_role.secondary_section_access:
-                return True
-            elif self.section == "nursery" and user_role.nursery_section_access:
-                return True
-
-        return False
+        return get_permission_set(request.user).has_section(self.section)
 
 
 class HasPrimarySectionAccess(SectionPermissionBase):
@@ -698,34 +662,10 @@ class SubSectionPermissionBase(permissions.BasePermission):
         if request.user.is_superuser:
             return True
 
-        # Get user's section access from role assignments
-        from schoolSettings.models import UserRole
-
-        user_roles = UserRole.objects.filter(user=request.user, is_active=True)
-
-        for user_role in user_roles:
-            if user_role.is_expired():
-                continue
-
-            # Check if user has access to the parent section
-            has_section_access = False
-            if self.section == "primary" and user_role.primary_section_access:
-                has_section_access = True
-            elif self.section == "secondary" and user_role.secondary_section_access:
-                has_section_access = True
-            elif self.section == "nursery" and user_role.nursery_section_access:
-                has_section_access = True
-
-            if has_section_access:
-                # If no specific grade levels specified, grant access
-                if not self.grade_levels:
-                    return True
-
-                # TODO: Check if role has specific grade level restrictions
-                # For now, if they have section access, they can access sub-sections
-                return True
-
-        return False
+        # Check if user has access to the parent section
+        # TODO: Check if role has specific grade level restrictions
+        # For now, if they have section access, they can access sub-sections
+        return get_permission_set(request.user).has_section(self.section)
 
 
 class HasJuniorSecondaryAccess(SubSectionPermissionBase):
@@ -1008,35 +948,19 @@ def get_user_sections(user):
             "senior_secondary": True,
         }
 
-    from schoolSettings.models import UserRole
-
-    user_roles = UserRole.objects.filter(user=user, is_active=True)
-
-    sections = {
-        "primary": False,
-        "secondary": False,
-        "nursery": False,
-        "junior_secondary": False,
-        "senior_secondary": False,
+    permission_set = get_permission_set(user)
+    secondary = permission_set.has_section("secondary")
+
+    return {
+        "primary": permission_set.has_section("primary"),
+        "secondary": secondary,
+        "nursery": permission_set.has_section("nursery"),
+        # Assume if they have secondary access, they have both junior and senior
+        # unless specific grade level restrictions apply
+        "junior_secondary": secondary,
+        "senior_secondary": secondary,
     }
 
-    for user_role in user_roles:
-        if user_role.is_expired():
-            continue
-
-        if user_role.primary_section_access:
-            sections["primary"] = True
-        if user_role.secondary_section_access:
-            sections["secondary"] = True
-            # Assume if they have secondary access, they have both junior and senior
-            # unless specific grade level restrictions apply
-            sections["junior_secondary"] = True
-            sections["senior_secondary"] = True
-        if user_role.nursery_section_access:
-            sections["nursery"] = True
-
-    return sections
-
 
 def get_user_permissions(user):
     """
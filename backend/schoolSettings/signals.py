@@ -0,0 +1,51 @@
+# schoolSettings/signals.py
+"""Keep cached settings and compiled permission sets in step with the database"""
+
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from utils.caching import bump_namespace
+
+from .models import Permission, Role, SchoolSettings, UserRole
+from .permission_cache import invalidate_permission_set
+
+SCHOOL_SETTINGS_CACHE = "school_settings"
+
+
+@receiver(post_save, sender=SchoolSettings)
+@receiver(post_delete, sender=SchoolSettings)
+def school_settings_changed(sender, **kwargs):
+    transaction.on_commit(lambda: bump_namespace(SCHOOL_SETTINGS_CACHE))
+
+
+def _invalidate_on_commit(user_id=None):
+    transaction.on_commit(lambda: invalidate_permission_set(user_id))
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+def user_role_changed(sender, instance, **kwargs):
+    _invalidate_on_commit(instance.user_id)
+
+
+@receiver(m2m_changed, sender=UserRole.custom_permissions.through)
+def user_role_custom_permissions_changed(sender, instance, action, reverse, **kwargs):
+    if not action.startswith("post_"):
+        return
+    # Changed from the Permission side, several users may be affected
+    _invalidate_on_commit(None if reverse else instance.user_id)
+
+
+@receiver(post_save, sender=Role)
+@receiver(post_delete, sender=Role)
+@receiver(post_save, sender=Permission)
+@receiver(post_delete, sender=Permission)
+def role_or_permission_changed(sender, **kwargs):
+    _invalidate_on_commit()
+
+
+@receiver(m2m_changed, sender=Role.permissions.through)
+def role_permissions_changed(sender, action, **kwargs):
+    if action.startswith("post_"):
+        _invalidate_on_commit()
@@ -1,3 +1,102 @@
+from datetime import timedelta
+
+from django.core.cache import cache
 from django.test import TestCase
+from django.utils import timezone
+
+from users.models import CustomUser
+
+from .models import Permission, Role, SchoolSettings, UserRole
+from .permissions import HasResultsPermission, get_user_sections
+
+
+class PermissionCacheTest(TestCase):
+    """Role permissions are compiled once and invalidated when they change"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="results.officer@example.com",
+            username="results_officer",
+            first_name="Results",
+            last_name="Officer",
+            role="teacher",
+            password="x",
+        )
+        self.read = Permission.objects.create(module="results", permission_type="read")
+        self.write = Permission.objects.create(module="results", permission_type="write")
+        self.role = Role.objects.create(name="Results Officer")
+        self.role.permissions.add(self.read)
+        self.user_role = UserRole.objects.create(
+            user=self.user, role=self.role, nursery_section_access=False
+        )
+
+    def check(self, permission_type):
+        # A fresh user object per "request"
+        user = CustomUser.objects.get(pk=self.user.pk)
+        return HasResultsPermission().user_has_permission(user, "results", permission_type)
+
+    def test_repeated_checks_hit_the_cache(self):
+        self.assertTrue(self.check("read"))
+
+        with self.assertNumQueries(1):  # only the user lookup in check()
+            self.assertTrue(self.check("read"))
+
+        user = CustomUser.objects.get(pk=self.user.pk)
+        with self.assertNumQueries(0):
+            permission = HasResultsPermission()
+            self.assertTrue(permission.user_has_permission(user, "results", "read"))
+            self.assertFalse(permission.user_has_permission(user, "results", "write"))
+            self.assertFalse(permission.user_has_permission(user, "exams", "read"))
+            sections = get_user_sections(user)
+        self.assertTrue(sections["senior_secondary"])
+        self.assertFalse(sections["nursery"])
+
+    def test_role_permission_change_invalidates(self):
+        self.assertFalse(self.check("write"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.role.permissions.add(self.write)
+
+        self.assertTrue(self.check("write"))
+
+    def test_custom_permission_and_expiry(self):
+        export = Permission.objects.create(
+            module="results", permission_type="admin", granted=True
+        )
+        self.assertFalse(self.check("admin"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user_role.custom_permissions.add(export)
+        self.assertTrue(self.check("admin"))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user_role.expires_at = timezone.now() - timedelta(minutes=1)
+            self.user_role.save()
+        self.assertFalse(self.check("read"))
+
+
+class SchoolSettingsCacheTest(TestCase):
+    """The public settings endpoint is cached until the settings are saved"""
+
+    url = "/api/school-settings/school-settings/"
+
+    def setUp(self):
+        cache.clear()
+        self.settings = SchoolSettings.objects.create(school_name="Old Name")
+
+    def get(self):
+        response = self.client.get(self.url, HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_cached_until_saved(self):
+        self.assertEqual(self.get()["school_name"], "Old Name")
+        with self.assertNumQueries(0):
+            self.get()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.settings.school_name = "New Name"
+            self.settings.save()
 
-# Create your tests here.
+        self.assertEqual(self.get()["school_name"], "New Name")
@@ -16,11 +16,11 @@ from rest_framework.views import APIView
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.core.cache import cache
 import cloudinary
 import cloudinary.uploader
 import logging
 
+from utils.caching import get_or_compute, make_key
 
 from .models import (
     SchoolSettings,
@@ -30,6 +30,7 @@ from .models import (
     Role,
     UserRole,
 )
+from .signals import SCHOOL_SETTINGS_CACHE
 from .serializers import (
     SchoolSettingsSerializer,
     SchoolAnnouncementSerializer,
@@ -99,29 +100,26 @@ class SchoolSettingsDetail(APIView):
             return [AllowAny()]
         return [IsAuthenticated(), IsAdminUser()]
 
+    def _serialize_settings(self, request):
+        # Get from database
+        settings = SchoolSettings.objects.first()
+        if not settings:
+            settings = SchoolSettings.objects.create()
+
+        serializer = SchoolSettingsSerializer(settings, context={"request": request})
+        return dict(serializer.data)
+
     def get(self, request):
         """Get current school settings with caching"""
         try:
-            # Try to get from cache first (5 minute cache)
-            cache_key = "school_settings"
-            cached_data = cache.get(cache_key)
-
-            if cached_data:
-                return Response(cached_data)
-
-            # Get from database
-            settings = SchoolSettings.objects.first()
-            if not settings:
-                settings = SchoolSettings.objects.create()
-
-            serializer = SchoolSettingsSerializer(
-                settings, context={"request": request}
+            # Cached for 5 minutes; saving SchoolSettings invalidates it
+            data = get_or_compute(
+                make_key(SCHOOL_SETTINGS_CACHE, "detail"),
+                lambda: self._serialize_settings(request),
+                300,
+                SCHOOL_SETTINGS_CACHE,
             )
-
-            # Cache the response
-            cache.set(cache_key, serializer.data, 300)  # 5 minutes
-
-            return Response(serializer.data)
+            return Response(data)
 
         except Exception as e:
             logger.error(f"Failed to fetch settings: {str(e)}", exc_info=True)
@@ -167,9 +165,6 @@ class SchoolSettingsDetail(APIView):
             if serializer.is_valid():
                 serializer.save()
 
-                # Clear cache after update
-                cache.delete("school_settings")
-
                 return Response(serializer.data)
             else:
                 logger.warning(f"Settings validation failed: {serializer.errors}")
@@ -356,9 +351,6 @@ def upload_logo(request):
 
             logger.info(f"Logo URL saved to database: {logo_url}")
 
-            # Clear cache
-            cache.delete("school_settings")
-
             return Response(
                 {
                     "logoUrl": logo_url,
@@ -490,9 +482,6 @@ def upload_favicon(request):
 
             logger.info(f"✅ Favicon URL saved to database: {favicon_url}")
 
-            # Clear cache
-            cache.delete("school_settings")
-
             return Response(
                 {
                     "faviconUrl": favicon_url,
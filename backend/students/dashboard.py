@@ -0,0 +1,249 @@
+# students/dashboard.py
+"""
+Precomputed figures of the student dashboard.
+
+``StudentViewSet.dashboard`` used to count attendance twice, load every
+result to average its percentage in Python, load each result's subject and
+each attendance record's section lazily, and filter every active
+announcement's ``target_audience`` in Python.
+
+The attendance and result figures of each student now live in one
+``StudentDashboardSnapshot`` row, read by primary key. Attendance and
+result writes mark their student as dirty and the snapshots of all dirty
+students are rebuilt together, once, when the transaction commits
+(``students/signals.py``); a missing snapshot is built on first read.
+Month counters are stored per calendar month so "this month" needs no
+query.
+
+Announcements are the same for every student: they are filtered with a
+JSON containment lookup in the database and cached for
+``settings.STUDENT_DASHBOARD_CACHE_TTL`` seconds.
+"""
+
+import logging
+from collections import defaultdict
+
+from django.conf import settings
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import ExtractMonth
+from django.utils import timezone
+
+from attendance.models import Attendance
+from parent.dashboard import latest_per_student
+from result.models import StudentResult
+from schoolSettings.models import SchoolAnnouncement
+from subject.utils import json_contains_any
+from utils.caching import bump_namespace, get_or_compute, make_key
+from utils.commit_batches import CommitBatch, CommitBatchScheduler
+
+from .models import Student, StudentDashboardSnapshot
+
+logger = logging.getLogger(__name__)
+
+ANNOUNCEMENTS_NAMESPACE = "student_announcements"
+RECENT_LIMIT = 5
+ANNOUNCEMENT_LIMIT = 5
+
+SNAPSHOT_FIELDS = [
+    "attendance_total",
+    "attendance_present",
+    "attendance_by_month",
+    "results_total",
+    "results_by_month",
+    "subjects_total",
+    "average_score",
+    "recent_attendance",
+    "recent_results",
+    "refreshed_at",
+]
+
+
+# ============================================================================
+# SNAPSHOTS
+# ============================================================================
+
+
+def _attendance_figures(student_ids):
+    rows = (
+        Attendance.objects.filter(student_id__in=student_ids)
+        .values("student_id", month=ExtractMonth("date"))
+        .annotate(total=Count("id"), present=Count("id", filter=Q(status="P")))
+    )
+    figures = defaultdict(lambda: {"total": 0, "present": 0, "by_month": {}})
+    for row in rows:
+        student = figures[row["student_id"]]
+        student["total"] += row["total"]
+        student["present"] += row["present"]
+        student["by_month"][str(row["month"])] = row["total"]
+    return figures
+
+
+def _result_figures(student_ids):
+    rows = (
+        StudentResult.objects.filter(student_id__in=student_ids)
+        .values("student_id", month=ExtractMonth("created_at"))
+        .annotate(total=Count("id"), percentage_sum=Sum("percentage"))
+    )
+    figures = defaultdict(lambda: {"total": 0, "percentage_sum": 0, "by_month": {}})
+    for row in rows:
+        student = figures[row["student_id"]]
+        student["total"] += row["total"]
+        student["percentage_sum"] += row["percentage_sum"] or 0
+        student["by_month"][str(row["month"])] = row["total"]
+
+    subjects = (
+        StudentResult.objects.filter(student_id__in=student_ids)
+        .values("student_id")
+        .annotate(count=Count("subject", distinct=True))
+    )
+    for row in subjects:
+        figures[row["student_id"]]["subjects"] = row["count"]
+    return figures
+
+
+def build_snapshots(student_ids):
+    """Unsaved snapshots of the given students, in a fixed number of queries"""
+    student_ids = list(student_ids)
+    attendance = _attendance_figures(student_ids)
+    results = _result_figures(student_ids)
+    recent_attendance = latest_per_student(
+        Attendance.objects.all(),
+        student_ids,
+        [F("date").desc(), F("id").desc()],
+        RECENT_LIMIT,
+        ["date", "status", "section__name"],
+    )
+    recent_results = latest_per_student(
+        StudentResult.objects.all(),
+        student_ids,
+        [F("created_at").desc()],
+        RECENT_LIMIT,
+        ["subject__name", "total_score", "percentage", "created_at"],
+    )
+    status_labels = dict(Attendance.STATUS_CHOICES)
+
+    snapshots = []
+    for student_id in student_ids:
+        attended = attendance[student_id]
+        scored = results[student_id]
+        snapshots.append(
+            StudentDashboardSnapshot(
+                student_id=student_id,
+                attendance_total=attended["total"],
+                attendance_present=attended["present"],
+                attendance_by_month=attended["by_month"],
+                results_total=scored["total"],
+                results_by_month=scored["by_month"],
+                subjects_total=scored.get("subjects", 0),
+                average_score=(
+                    float(scored["percentage_sum"]) / scored["total"]
+                    if scored["total"]
+                    else 0
+                ),
+                recent_attendance=[
+                    {
+                        "date": row["date"].isoformat(),
+                        "status": status_labels.get(row["status"], row["status"]),
+                        "section": row["section__name"],
+                    }
+                    for row in recent_attendance.get(student_id, [])
+                ],
+                recent_results=[
+                    {
+                        "subject": row["subject__name"],
+                        "total_score": str(row["total_score"]),
+                        "percentage": str(row["percentage"]),
+                        "created_at": row["created_at"].isoformat(),
+                    }
+                    for row in recent_results.get(student_id, [])
+                ],
+            )
+        )
+    return snapshots
+
+
+def refresh_student_snapshots(student_ids):
+    """Rebuild and upsert the snapshots of the given (existing) students"""
+    student_ids = list(
+        Student.objects.filter(id__in=set(student_ids)).values_list("id", flat=True)
+    )
+    if not student_ids:
+        return 0
+
+    StudentDashboardSnapshot.objects.bulk_create(
+        build_snapshots(student_ids),
+        update_conflicts=True,
+        unique_fields=["student"],
+        update_fields=SNAPSHOT_FIELDS,
+    )
+    logger.debug(f"Refreshed dashboard snapshots of {len(student_ids)} students")
+    return len(student_ids)
+
+
+def get_student_snapshot(student):
+    """The student's snapshot, built on first access"""
+    try:
+        return StudentDashboardSnapshot.objects.get(student_id=student.id)
+    except StudentDashboardSnapshot.DoesNotExist:
+        refresh_student_snapshots([student.id])
+        return StudentDashboardSnapshot.objects.get(student_id=student.id)
+
+
+class SnapshotBatch(CommitBatch):
+    """Students whose snapshot is rebuilt when the transaction commits"""
+
+    error_message = "Error refreshing dashboard snapshots"
+
+    def __init__(self):
+        super().__init__()
+        self.student_ids = set()
+
+    def add(self, *student_ids):
+        self.student_ids.update(student_ids)
+
+    def run(self):
+        refresh_student_snapshots(self.student_ids)
+
+
+snapshot_scheduler = CommitBatchScheduler(SnapshotBatch)
+
+
+def schedule_snapshot_refresh(*student_ids):
+    if student_ids:
+        snapshot_scheduler.add(*student_ids)
+
+
+# ============================================================================
+# ANNOUNCEMENTS
+# ============================================================================
+
+
+def get_student_announcements():
+    """Current announcements targeting students, pinned first"""
+
+    def compute():
+        now = timezone.now()
+        announcements = SchoolAnnouncement.objects.all()
+        return list(
+            announcements.filter(
+                json_contains_any("target_audience", ["student"], announcements.db),
+                is_active=True,
+                start_date__lte=now,
+                end_date__gte=now,
+            )
+            .order_by("-is_pinned", "-created_at")
+            .values(
+                "id", "title", "content", "announcement_type", "is_pinned", "created_at"
+            )[:ANNOUNCEMENT_LIMIT]
+        )
+
+    return get_or_compute(
+        make_key(ANNOUNCEMENTS_NAMESPACE, "current"),
+        compute,
+        getattr(settings, "STUDENT_DASHBOARD_CACHE_TTL", 60),
+        ANNOUNCEMENTS_NAMESPACE,
+    )
+
+
+def invalidate_student_announcements():
+    bump_namespace(ANNOUNCEMENTS_NAMESPACE)
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.1 on 2026-10-17 23:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('students', '0002_resultchecktoken_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StudentDashboardSnapshot',
+            fields=[
+                ('student', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dashboard_snapshot', serialize=False, to='students.student')),
+                ('attendance_total', models.PositiveIntegerField(default=0)),
+                ('attendance_present', models.PositiveIntegerField(default=0)),
+                ('attendance_by_month', models.JSONField(default=dict)),
+                ('results_total', models.PositiveIntegerField(default=0)),
+                ('results_by_month', models.JSONField(default=dict)),
+                ('subjects_total', models.PositiveIntegerField(default=0)),
+                ('average_score', models.FloatField(default=0)),
+                ('recent_attendance', models.JSONField(default=list)),
+                ('recent_results', models.JSONField(default=list)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Student Dashboard Snapshot',
+            },
+        ),
+    ]
@@ -251,6 +251,38 @@ class Student(models.Model):
                 self.education_level = "SENIOR_SECONDARY"
         super().save(*args, **kwargs)
 
+
+class StudentDashboardSnapshot(models.Model):
+    """
+    Precomputed attendance and result figures of a student's dashboard,
+    refreshed by students/dashboard.py when attendance or results change
+    """
+
+    student = models.OneToOneField(
+        Student,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="dashboard_snapshot",
+    )
+    attendance_total = models.PositiveIntegerField(default=0)
+    attendance_present = models.PositiveIntegerField(default=0)
+    # Attendance records and results per calendar month ("1".."12")
+    attendance_by_month = models.JSONField(default=dict)
+    results_total = models.PositiveIntegerField(default=0)
+    results_by_month = models.JSONField(default=dict)
+    subjects_total = models.PositiveIntegerField(default=0)
+    average_score = models.FloatField(default=0)
+    recent_attendance = models.JSONField(default=list)
+    recent_results = models.JSONField(default=list)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = "Student Dashboard Snapshot"
+
+    def __str__(self):
+        return f"Dashboard snapshot - {self.student_id}"
+
+
 User = get_user_model()
 
 
@@ -1,8 +1,13 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from .models import Student
+from .dashboard import invalidate_student_announcements, schedule_snapshot_refresh
 from classroom.models import Classroom, StudentEnrollment, GradeLevel, Section
 from academics.models import AcademicSession, Term
+from attendance.models import Attendance
+from result.models import StudentResult
+from schoolSettings.models import SchoolAnnouncement
 
 
 @receiver(post_save, sender=Student)
@@ -131,3 +136,18 @@ def auto_enroll_or_update_student(sender, instance, created, **kwargs):
         import traceback
 
         traceback.print_exc()
+
+
+@receiver(post_save, sender=Attendance)
+@receiver(post_delete, sender=Attendance)
+@receiver(post_save, sender=StudentResult)
+@receiver(post_delete, sender=StudentResult)
+def refresh_dashboard_snapshot(sender, instance, **kwargs):
+    """Rebuild the student's dashboard snapshot once the transaction commits"""
+    schedule_snapshot_refresh(instance.student_id)
+
+
+@receiver(post_save, sender=SchoolAnnouncement)
+@receiver(post_delete, sender=SchoolAnnouncement)
+def invalidate_dashboard_announcements(sender, **kwargs):
+    transaction.on_commit(invalidate_student_announcements)
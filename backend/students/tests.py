@@ -1,3 +1,115 @@
+import datetime
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from attendance.models import Attendance
+from classroom.models import GradeLevel, Section
+from schoolSettings.models import SchoolAnnouncement
+from users.models import CustomUser
+
+from .dashboard import SnapshotBatch
+from .models import Student, StudentDashboardSnapshot
+
+
+class StudentDashboardSnapshotTest(TestCase):
+    """The dashboard reads one snapshot row, refreshed when attendance changes"""
+
+    url = "/api/students/students/dashboard/"
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="pupil@example.com",
+            username="pupil",
+            first_name="Pupil",
+            last_name="One",
+            role="student",
+            password="x",
+        )
+        self.student = Student.objects.create(
+            user=self.user,
+            gender="F",
+            date_of_birth=datetime.date(2010, 1, 1),
+            student_class="SS_1",
+            education_level="SENIOR_SECONDARY",
+        )
+        grade_level = GradeLevel.objects.create(
+            name="SS 1", education_level="SENIOR_SECONDARY", order=1
+        )
+        self.section = Section.objects.create(name="A", grade_level=grade_level)
+        self.today = datetime.date.today()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            for days_ago, status in [(0, "P"), (1, "A"), (2, "P"), (40, "P")]:
+                self.attend(days_ago, status)
+
+            now = timezone.now()
+            for audience, title in [(["student", "parent"], "Exams"), (["parent"], "PTA")]:
+                SchoolAnnouncement.objects.create(
+                    title=title,
+                    content="...",
+                    target_audience=audience,
+                    start_date=now - datetime.timedelta(days=1),
+                    end_date=now + datetime.timedelta(days=1),
+                    created_by=self.user,
+                )
+
+    def attend(self, days_ago, status):
+        return Attendance.objects.create(
+            student=self.student,
+            section=self.section,
+            date=self.today - datetime.timedelta(days=days_ago),
+            status=status,
+        )
+
+    def dashboard(self):
+        client = APIClient()
+        client.force_authenticate(CustomUser.objects.get(pk=self.user.pk))
+        response = client.get(self.url, HTTP_HOST="localhost")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_dashboard_reads_the_snapshot(self):
+        data = self.dashboard()
+
+        attendance = data["statistics"]["attendance"]
+        self.assertEqual((attendance["present"], attendance["total"]), (3, 4))
+        self.assertEqual(attendance["rate"], 75.0)
+        self.assertEqual(data["statistics"]["subjects"]["count"], 0)
+
+        # The 40-day-old record is not a recent activity
+        self.assertEqual(
+            [activity["title"] for activity in data["recent_activities"]],
+            ["Attendance - Present", "Attendance - Absent", "Attendance - Present"],
+        )
+        self.assertEqual(data["recent_activities"][0]["description"], "Section: A")
+        self.assertEqual([a["title"] for a in data["announcements"]], ["Exams"])
+
+    def test_announcements_without_json_containment(self):
+        with mock.patch.object(
+            connection.features, "supports_json_field_contains", False
+        ):
+            data = self.dashboard()
+        self.assertEqual([a["title"] for a in data["announcements"]], ["Exams"])
+
+    def test_attendance_write_refreshes_the_snapshot(self):
+        self.assertEqual(self.dashboard()["statistics"]["attendance"]["total"], 4)
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            for days_ago in range(3, 6):
+                self.attend(days_ago, "L")
+        # Three writes, one refresh
+        refreshes = [
+            c for c in callbacks if isinstance(getattr(c, "__self__", None), SnapshotBatch)
+        ]
+        self.assertEqual(len(refreshes), 1)
 
-# Create your tests here.
+        snapshot = StudentDashboardSnapshot.objects.get(student=self.student)
+        self.assertEqual(snapshot.attendance_total, 7)
+        self.assertEqual(len(snapshot.recent_attendance), 5)
+        self.assertEqual(self.dashboard()["statistics"]["attendance"]["present"], 3)
@@ -18,6 +18,7 @@ import csv
 from datetime import date, timedelta, datetime, time
 from django.utils import timezone
 from .models import Student, ResultCheckToken
+from .dashboard import get_student_announcements, get_student_snapshot
 from .serializers import (
     StudentScheduleSerializer,
     StudentWeeklyScheduleSerializer,
@@ -27,9 +28,6 @@ from .serializers import (
     StudentCreateSerializer,
     ResultTokenSerializer,
 )
-from attendance.models import Attendance
-from result.models import StudentResult
-from schoolSettings.models import SchoolAnnouncement
 from events.models import Event
 from academics.models import AcademicCalendar, Term
 import string
@@ -39,8 +37,27 @@ import random
 from .serializers import ResultTokenSerializer
 import logging
 
+from utils.exporting import CSVExport
+
 logger = logging.getLogger(__name__)
 
+STUDENT_EXPORT_COLUMNS = [
+    ("id", "id"),
+    ("registration_number", "registration_number"),
+    ("first_name", "user__first_name"),
+    ("last_name", "user__last_name"),
+    ("email", "user__email"),
+    ("gender", "gender"),
+    ("date_of_birth", "date_of_birth"),
+    ("education_level", "education_level"),
+    ("student_class", "student_class"),
+    ("classroom", "classroom"),
+    ("stream", "stream__name"),
+    ("parent_contact", "parent_contact"),
+    ("admission_date", "admission_date"),
+    ("is_active", "is_active"),
+]
+
 User = get_user_model()
 
 
@@ -864,6 +881,15 @@ class StudentViewSet(AutoSectionFilterMixin, viewsets.ModelViewSet):
             )
 
     # SPECIAL ENDPOINTS - Using proper @action decorators
+    @action(detail=False, methods=["get"], url_path="export-csv")
+    def export_csv(self, request):
+        """Stream the filtered student list as CSV (?compress=gzip for .csv.gz)"""
+        return CSVExport(
+            self.filter_queryset(self.get_queryset()),
+            STUDENT_EXPORT_COLUMNS,
+            "students.csv",
+        ).response(request)
+
     @action(detail=False, methods=["get"], url_path="my-schedule")
     def my_schedule(self, request):
         """Get current user's schedule."""
@@ -1199,58 +1225,45 @@ class StudentViewSet(AutoSectionFilterMixin, viewsets.ModelViewSet):
 
         today = date.today()
 
-        # Get attendance statistics
-        total_attendance = Attendance.objects.filter(student=student).count()
-        present_attendance = Attendance.objects.filter(
-            student=student, status="P"
-        ).count()
+        # Attendance and result figures, precomputed per student
+        snapshot = get_student_snapshot(student)
+        total_attendance = snapshot.attendance_total
+        present_attendance = snapshot.attendance_present
         attendance_rate = (
             (present_attendance / total_attendance * 100) if total_attendance > 0 else 0
         )
-
-        # Get recent attendance (last 30 days)
-        thirty_days_ago = today - timedelta(days=30)
-        recent_attendance = Attendance.objects.filter(
-            student=student, date__gte=thirty_days_ago
-        ).order_by("-date")[:10]
-
-        # Get academic performance
-        results = StudentResult.objects.filter(student=student)
-        total_subjects = results.values("subject").distinct().count()
-
-        if results.exists():
-            average_score = (
-                sum(result.percentage for result in results if result.percentage)
-                / results.count()
-            )
-        else:
-            average_score = 0
+        total_subjects = snapshot.subjects_total
+        average_score = snapshot.average_score
 
         # Get recent activities
         recent_activities = []
 
         # Add recent results
-        recent_results = results.order_by("-created_at")[:5]
-        for result in recent_results:
+        for result in snapshot.recent_results:
+            created_at = datetime.fromisoformat(result["created_at"])
             recent_activities.append(
                 {
                     "type": "result",
-                    "title": f"{result.subject.name} Result",
-                    "description": f"Score: {result.total_score} ({result.percentage}%)",
-                    "date": result.created_at.strftime("%Y-%m-%d"),
-                    "time_ago": self._get_time_ago(result.created_at),
+                    "title": f"{result['subject']} Result",
+                    "description": f"Score: {result['total_score']} ({result['percentage']}%)",
+                    "date": created_at.strftime("%Y-%m-%d"),
+                    "time_ago": self._get_time_ago(created_at),
                 }
             )
 
-        # Add recent attendance
-        for attendance in recent_attendance[:5]:
+        # Add recent attendance (last 30 days)
+        thirty_days_ago = today - timedelta(days=30)
+        for attendance in snapshot.recent_attendance:
+            attendance_date = date.fromisoformat(attendance["date"])
+            if attendance_date < thirty_days_ago:
+                break
             recent_activities.append(
                 {
                     "type": "attendance",
-                    "title": f"Attendance - {attendance.get_status_display()}",
-                    "description": f"Section: {attendance.section.name}",
-                    "date": attendance.date.strftime("%Y-%m-%d"),
-                    "time_ago": self._get_time_ago(attendance.date),
+                    "title": f"Attendance - {attendance['status']}",
+                    "description": f"Section: {attendance['section']}",
+                    "date": attendance["date"],
+                    "time_ago": self._get_time_ago(attendance_date),
                 }
             )
 
@@ -1259,27 +1272,19 @@ class StudentViewSet(AutoSectionFilterMixin, viewsets.ModelViewSet):
         recent_activities = recent_activities[:5]
 
         # Get announcements for students
-        all_announcements = SchoolAnnouncement.objects.filter(
-            is_active=True, start_date__lte=timezone.now(), end_date__gte=timezone.now()
-        ).order_by("-is_pinned", "-created_at")
-
-        announcements = [
-            announcement
-            for announcement in all_announcements
-            if "student" in announcement.target_audience
-        ][:5]
-
         announcements_data = []
-        for announcement in announcements:
+        for announcement in get_student_announcements():
             announcements_data.append(
                 {
-                    "id": announcement.id,
-                    "title": announcement.title,
-                    "content": announcement.content,
-                    "type": announcement.announcement_type,
-                    "is_pinned": announcement.is_pinned,
-                    "created_at": announcement.created_at.strftime("%Y-%m-%d %H:%M"),
-                    "time_ago": self._get_time_ago(announcement.created_at),
+                    "id": announcement["id"],
+                    "title": announcement["title"],
+                    "content": announcement["content"],
+                    "type": announcement["announcement_type"],
+                    "is_pinned": announcement["is_pinned"],
+                    "created_at": announcement["created_at"].strftime(
+                        "%Y-%m-%d %H:%M"
+                    ),
+                    "time_ago": self._get_time_ago(announcement["created_at"]),
                 }
             )
 
@@ -1366,13 +1371,13 @@ class StudentViewSet(AutoSectionFilterMixin, viewsets.ModelViewSet):
             "upcoming_events": events_data,
             "academic_calendar": calendar_data,
             "quick_stats": {
-                "total_results": results.count(),
-                "this_term_results": results.filter(
-                    created_at__month=today.month
-                ).count(),
-                "attendance_this_month": Attendance.objects.filter(
-                    student=student, date__month=today.month
-                ).count(),
+                "total_results": snapshot.results_total,
+                "this_term_results": snapshot.results_by_month.get(
+                    str(today.month), 0
+                ),
+                "attendance_this_month": snapshot.attendance_by_month.get(
+                    str(today.month), 0
+                ),
             },
         }
 
@@ -5,6 +5,7 @@ from django.urls import reverse
 from django.utils.safestring import mark_safe
 
 from .models import Subject, SchoolStreamConfiguration, SchoolStreamSubjectAssignment
+from .utils import filter_by_levels
 
 
 class PrerequisiteInline(admin.TabularInline):
@@ -248,7 +249,7 @@ class SubjectAdmin(admin.ModelAdmin):
     @admin.action(description="🌐 Mark as cross-cutting")
     def make_cross_cutting(self, request, queryset):
         # Only apply to Senior Secondary subjects
-        ss_subjects = queryset.filter(education_levels__contains=["SENIOR_SECONDARY"])
+        ss_subjects = filter_by_levels(queryset, ["SENIOR_SECONDARY"])
         updated = ss_subjects.update(is_cross_cutting=True)
         self.message_user(
             request,
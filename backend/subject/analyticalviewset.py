@@ -9,7 +9,6 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Prefetch, Avg, Sum, Count, Case, When, IntegerField
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
-from django.core.cache import cache
 from django.db import transaction
 from django.core.exceptions import ValidationError
 from django.utils import timezone
@@ -26,6 +25,7 @@ from .models import (
 import logging
 
 from classroom.models import GradeLevel
+from .utils import cached_subject_response, filter_by_levels
 
 
 class SubjectAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
@@ -50,59 +50,54 @@ class SubjectAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
     http_method_names = ["get", "head", "options"]
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 60)
     def dashboard(self, request):
         """Comprehensive analytics dashboard with Nigerian education system metrics"""
-        cache_key = "subjects_analytics_dashboard_v4"
-        stats = cache.get(cache_key)
+        queryset = Subject.objects.all()
 
-        if not stats:
-            queryset = Subject.objects.all()
-
-            # Core metrics
-            total_subjects = queryset.count()
-            active_subjects = queryset.filter(
-                is_active=True, is_discontinued=False
-            ).count()
-
-            stats = {
-                "overview": {
-                    "total_subjects": total_subjects,
-                    "active_subjects": active_subjects,
-                    "inactive_subjects": queryset.filter(is_active=False).count(),
-                    "discontinued_subjects": queryset.filter(
-                        is_discontinued=True
-                    ).count(),
-                    "compulsory_subjects": queryset.filter(is_compulsory=True).count(),
-                    "elective_subjects": queryset.filter(is_compulsory=False).count(),
-                    "practical_subjects": queryset.filter(has_practical=True).count(),
-                    "lab_required_subjects": queryset.filter(requires_lab=True).count(),
-                    "cross_cutting_subjects": queryset.filter(
-                        is_cross_cutting=True
-                    ).count(),
-                    "activity_based_subjects": queryset.filter(
-                        is_activity_based=True
-                    ).count(),
-                    "specialist_required_subjects": queryset.filter(
-                        requires_specialist_teacher=True
-                    ).count(),
-                },
-                "by_category": self._get_category_breakdown(queryset),
-                "by_education_level": self._get_education_level_breakdown(queryset),
-                "nursery_analysis": self._get_nursery_level_breakdown(queryset),
-                "ss_analysis": self._get_ss_subject_breakdown(queryset),
-                "academic_metrics": self._get_academic_metrics(queryset),
-                "resource_requirements": self._get_resource_requirements(queryset),
-                "grade_distribution": self._get_grade_distribution(queryset),
-                "curriculum_metrics": self._get_curriculum_metrics(queryset),
-                "trends": self._get_trend_analysis(queryset),
-            }
+        # Core metrics
+        total_subjects = queryset.count()
+        active_subjects = queryset.filter(
+            is_active=True, is_discontinued=False
+        ).count()
 
-            # Cache for 1 hour
-            cache.set(cache_key, stats, 60 * 60)
+        stats = {
+            "overview": {
+                "total_subjects": total_subjects,
+                "active_subjects": active_subjects,
+                "inactive_subjects": queryset.filter(is_active=False).count(),
+                "discontinued_subjects": queryset.filter(
+                    is_discontinued=True
+                ).count(),
+                "compulsory_subjects": queryset.filter(is_compulsory=True).count(),
+                "elective_subjects": queryset.filter(is_compulsory=False).count(),
+                "practical_subjects": queryset.filter(has_practical=True).count(),
+                "lab_required_subjects": queryset.filter(requires_lab=True).count(),
+                "cross_cutting_subjects": queryset.filter(
+                    is_cross_cutting=True
+                ).count(),
+                "activity_based_subjects": queryset.filter(
+                    is_activity_based=True
+                ).count(),
+                "specialist_required_subjects": queryset.filter(
+                    requires_specialist_teacher=True
+                ).count(),
+            },
+            "by_category": self._get_category_breakdown(queryset),
+            "by_education_level": self._get_education_level_breakdown(queryset),
+            "nursery_analysis": self._get_nursery_level_breakdown(queryset),
+            "ss_analysis": self._get_ss_subject_breakdown(queryset),
+            "academic_metrics": self._get_academic_metrics(queryset),
+            "resource_requirements": self._get_resource_requirements(queryset),
+            "grade_distribution": self._get_grade_distribution(queryset),
+            "curriculum_metrics": self._get_curriculum_metrics(queryset),
+            "trends": self._get_trend_analysis(queryset),
+        }
 
         return Response(stats)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 60)
     def category_analysis(self, request):
         """Deep dive into category-specific analytics"""
         category = request.query_params.get("category")
@@ -125,12 +120,13 @@ class SubjectAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(analysis)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 60)
     def education_level_analysis(self, request):
         """Detailed analysis by education level"""
         level = request.query_params.get("level")
 
         if level and level in dict(EDUCATION_LEVELS):
-            queryset = Subject.objects.filter(education_levels__contains=[level])
+            queryset = filter_by_levels(Subject.objects.all(), [level])
         else:
             queryset = Subject.objects.all()
 
@@ -154,11 +150,10 @@ class SubjectAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(analysis)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 60)
     def nursery_analytics(self, request):
         """Specialized analytics for nursery education"""
-        nursery_subjects = Subject.objects.filter(
-            education_levels__contains=["NURSERY"]
-        )
+        nursery_subjects = filter_by_levels(Subject.objects.all(), ["NURSERY"])
 
         analytics = {
             "overview": {
@@ -183,11 +178,10 @@ class SubjectAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(analytics)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 60)
     def senior_secondary_analytics(self, request):
         """Specialized analytics for Senior Secondary education"""
-        ss_subjects = Subject.objects.filter(
-            education_levels__contains=["SENIOR_SECONDARY"]
-        )
+        ss_subjects = filter_by_levels(Subject.objects.all(), ["SENIOR_SECONDARY"])
 
         analytics = {
             "overview": {
@@ -213,6 +207,7 @@ class SubjectAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(analytics)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 60)
     def resource_utilization(self, request):
         """Analyze resource requirements and utilization"""
         queryset = Subject.objects.filter(is_active=True)
@@ -250,6 +245,7 @@ class SubjectAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(utilization)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 60)
     def academic_planning(self, request):
         """Insights for academic planning and curriculum development"""
         planning_data = {
@@ -265,6 +261,7 @@ class SubjectAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
         return Response(planning_data)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 60)
     def curriculum_compliance(self, request):
         """Analyze compliance with Nigerian curriculum standards"""
         compliance_data = {
@@ -337,7 +334,7 @@ class SubjectAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
         """Calculate breakdown by education level with detailed metrics"""
         breakdown = {}
         for level_code, display in EDUCATION_LEVELS:
-            level_subjects = queryset.filter(education_levels__contains=[level_code])
+            level_subjects = filter_by_levels(queryset, [level_code])
 
             breakdown[level_code] = {
                 "display_name": display,
@@ -360,12 +357,12 @@ class SubjectAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
 
     def _get_nursery_level_breakdown(self, queryset):
         """Calculate breakdown by nursery levels"""
-        nursery_subjects = queryset.filter(education_levels__contains=["NURSERY"])
+        nursery_subjects = filter_by_levels(queryset, ["NURSERY"])
         breakdown = {}
 
         for level_code, display in NURSERY_LEVELS:
-            level_subjects = nursery_subjects.filter(
-                nursery_levels__contains=[level_code]
+            level_subjects = filter_by_levels(
+                nursery_subjects, [level_code], "nursery_levels"
             )
             breakdown[level_code] = {
                 "display_name": display,
@@ -380,7 +377,7 @@ class SubjectAnalyticsViewSet(viewsets.ReadOnlyModelViewSet):
 
     def _get_ss_subject_breakdown(self, queryset):
         """Calculate breakdown by Senior Secondary subject types"""
-        ss_subjects = queryset.filter(education_levels__contains=["SENIOR_SECONDARY"])
+        ss_subjects = filter_by_levels(queryset, ["SENIOR_SECONDARY"])
         breakdown = {}
 
         for type_code, display in SS_SUBJECT_TYPES:
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 00:49
+
+import django.contrib.postgres.indexes
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('classroom', '0011_alter_classroomteacherassignment_classroom_and_more'),
+        ('subject', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='subject',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['education_levels'], name='subject_education_levels_gin', opclasses=['jsonb_path_ops']),
+        ),
+    ]
@@ -1,8 +1,11 @@
 from django.db import models
+from django.contrib.postgres.indexes import GinIndex
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.core.exceptions import ValidationError
 from django.utils.translation import gettext_lazy as _
 
+from .utils import filter_by_levels
+
 
 # Updated subject categories to match your school structure
 SUBJECT_CATEGORY_CHOICES = [
@@ -163,6 +166,14 @@ class Subject(models.Model):
 
     class Meta:
         ordering = ["education_levels", "category", "subject_order", "name"]
+        indexes = [
+            # Serves the education_levels__contains (jsonb @>) section filters
+            GinIndex(
+                fields=["education_levels"],
+                name="subject_education_levels_gin",
+                opclasses=["jsonb_path_ops"],
+            ),
+        ]
         verbose_name = "Subject"
         verbose_name_plural = "Subjects"
 
@@ -251,38 +262,29 @@ class Subject(models.Model):
     @classmethod
     def get_nursery_subjects(cls):
         """Get all nursery subjects"""
-        return cls.objects.filter(
-            education_levels__contains=["NURSERY"], is_active=True
-        )
+        return filter_by_levels(cls.objects.filter(is_active=True), ["NURSERY"])
 
     @classmethod
     def get_primary_subjects(cls):
         """Get all primary subjects"""
-        return cls.objects.filter(
-            education_levels__contains=["PRIMARY"], is_active=True
-        )
+        return filter_by_levels(cls.objects.filter(is_active=True), ["PRIMARY"])
 
     @classmethod
     def get_junior_secondary_subjects(cls):
         """Get all junior secondary subjects"""
-        return cls.objects.filter(
-            education_levels__contains=["JUNIOR_SECONDARY"], is_active=True
-        )
+        return filter_by_levels(cls.objects.filter(is_active=True), ["JUNIOR_SECONDARY"])
 
     @classmethod
     def get_senior_secondary_subjects(cls):
         """Get all senior secondary subjects"""
-        return cls.objects.filter(
-            education_levels__contains=["SENIOR_SECONDARY"], is_active=True
-        )
+        return filter_by_levels(cls.objects.filter(is_active=True), ["SENIOR_SECONDARY"])
 
     @classmethod
     def get_cross_cutting_subjects(cls):
         """Get cross-cutting subjects for Senior Secondary"""
-        return cls.objects.filter(
-            education_levels__contains=["SENIOR_SECONDARY"],
-            is_cross_cutting=True,
-            is_active=True,
+        return filter_by_levels(
+            cls.objects.filter(is_cross_cutting=True, is_active=True),
+            ["SENIOR_SECONDARY"],
         )
 
     def get_dependent_subjects(self):
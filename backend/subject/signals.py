@@ -0,0 +1,21 @@
+# subject/signals.py
+"""Drop the cached subject responses whenever the catalogue changes"""
+
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .models import SchoolStreamConfiguration, SchoolStreamSubjectAssignment, Subject
+from .utils import clear_subject_caches
+
+
+@receiver(post_save, sender=Subject)
+@receiver(post_delete, sender=Subject)
+@receiver(post_save, sender=SchoolStreamConfiguration)
+@receiver(post_delete, sender=SchoolStreamConfiguration)
+@receiver(post_save, sender=SchoolStreamSubjectAssignment)
+@receiver(post_delete, sender=SchoolStreamSubjectAssignment)
+@receiver(m2m_changed, sender=Subject.grade_levels.through)
+@receiver(m2m_changed, sender=Subject.prerequisites.through)
+def subject_catalogue_changed(sender, **kwargs):
+    if kwargs.get("action", "post_").startswith("post_"):
+        clear_subject_caches()
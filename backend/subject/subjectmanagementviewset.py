@@ -7,7 +7,6 @@ import logging
 from datetime import datetime, timedelta
 
 # import pandas as pd  # Commented out - not available in container
-from django.core.cache import cache
 from django.core.exceptions import ValidationError
 from django.db import transaction
 from django.db.models import Q, Count, Avg, Sum, Prefetch, Max, Min
@@ -37,6 +36,12 @@ from .serializers import (
     SubjectCreateUpdateSerializer,
     SubjectEducationLevelSerializer,
 )
+from .utils import (
+    cached_subject_response,
+    clear_subject_caches,
+    filter_by_levels,
+    get_subject_cache_metrics,
+)
 
 
 class SubjectManagementViewSet(viewsets.ViewSet):
@@ -91,7 +96,7 @@ class SubjectManagementViewSet(viewsets.ViewSet):
                         errors.append({f"subject_{i}": str(e)})
 
             # Clear all relevant caches
-            self._clear_subject_caches()
+            clear_subject_caches()
 
             return Response(
                 {
@@ -159,7 +164,7 @@ class SubjectManagementViewSet(viewsets.ViewSet):
                     f"Fields: {update_fields}. Reason: {reason}"
                 )
 
-                self._clear_subject_caches()
+                clear_subject_caches()
 
                 return Response(
                     {
@@ -204,7 +209,7 @@ class SubjectManagementViewSet(viewsets.ViewSet):
                     f"Bulk assessment update: {updated_count} subjects by {request.user}"
                 )
 
-                self._clear_subject_caches()
+                clear_subject_caches()
 
                 return Response(
                     {
@@ -280,7 +285,7 @@ class SubjectManagementViewSet(viewsets.ViewSet):
                     ).delete()
                     result["deleted_count"] = deleted_count
 
-                self._clear_subject_caches()
+                clear_subject_caches()
                 logger.info(f"Bulk delete completed by {request.user}: {result}")
 
         except Exception as e:
@@ -357,7 +362,7 @@ class SubjectManagementViewSet(viewsets.ViewSet):
             queryset = queryset.filter(is_active=True, is_discontinued=False)
 
         if education_level:
-            queryset = queryset.filter(education_levels__contains=[education_level])
+            queryset = filter_by_levels(queryset, [education_level])
 
         if category:
             queryset = queryset.filter(category=category)
@@ -377,6 +382,7 @@ class SubjectManagementViewSet(viewsets.ViewSet):
             return Response({"error": f"Export failed: {str(e)}"}, status=500)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 60)
     def inactive_subjects(self, request):
         """Enhanced inactive subjects analysis"""
         inactive_subjects = Subject.objects.filter(
@@ -428,7 +434,7 @@ class SubjectManagementViewSet(viewsets.ViewSet):
             with transaction.atomic():
                 updated_count = subjects.update(is_active=True, is_discontinued=False)
 
-                self._clear_subject_caches()
+                clear_subject_caches()
 
                 logger.info(
                     f"Bulk reactivation: {updated_count} subjects by {request.user}"
@@ -490,7 +496,7 @@ class SubjectManagementViewSet(viewsets.ViewSet):
                     self._fix_invalid_education_levels()
                 )
 
-                self._clear_subject_caches()
+                clear_subject_caches()
 
                 logger.info(
                     f"Data cleanup completed by {request.user}: {cleanup_results}"
@@ -508,22 +514,18 @@ class SubjectManagementViewSet(viewsets.ViewSet):
             return Response({"error": "Cleanup failed"}, status=500)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 60)
     def analytics_dashboard(self, request):
         """Enhanced analytics dashboard for subjects"""
-        cache_key = "subjects_analytics_dashboard_v4"
-        dashboard_data = cache.get(cache_key)
-
-        if not dashboard_data:
-            dashboard_data = {
-                "overview": self._get_subjects_overview(),
-                "distribution": self._get_subjects_distribution(),
-                "assessment_analysis": self._get_assessment_analysis(),
-                "resource_requirements": self._get_resource_requirements(),
-                "trends": self._get_subjects_trends(),
-                "quality_metrics": self._get_quality_metrics(),
-                "last_updated": timezone.now().isoformat(),
-            }
-            cache.set(cache_key, dashboard_data, timeout=3600)  # Cache for 1 hour
+        dashboard_data = {
+            "overview": self._get_subjects_overview(),
+            "distribution": self._get_subjects_distribution(),
+            "assessment_analysis": self._get_assessment_analysis(),
+            "resource_requirements": self._get_resource_requirements(),
+            "trends": self._get_subjects_trends(),
+            "quality_metrics": self._get_quality_metrics(),
+            "last_updated": timezone.now().isoformat(),
+        }
 
         return Response(dashboard_data)
 
@@ -575,7 +577,7 @@ class SubjectManagementViewSet(viewsets.ViewSet):
                             f"Failed to duplicate subject {subject_id}: {str(e)}"
                         )
 
-                self._clear_subject_caches()
+                clear_subject_caches()
 
                 return Response(
                     {
@@ -608,17 +610,6 @@ class SubjectManagementViewSet(viewsets.ViewSet):
 
         return ca_weight + exam_weight + practical_weight == 100
 
-    def _clear_subject_caches(self):
-        """Clear all subject-related caches"""
-        cache_keys = [
-            "subjects_cache_v1",
-            "subjects_analytics_dashboard_v3",
-            "subjects_analytics_dashboard_v4",
-            "subjects_overview_v1",
-            "subjects_distribution_v1",
-        ]
-        cache.delete_many(cache_keys)
-
     def _check_subject_dependencies(self, subjects):
         """Check for subject dependencies"""
         dependencies = []
@@ -850,7 +841,7 @@ class SubjectManagementViewSet(viewsets.ViewSet):
                         result["errors"].append({"row": i + 1, "error": str(e)})
                         result["error_count"] += 1
 
-                self._clear_subject_caches()
+                clear_subject_caches()
 
         except Exception as e:
             raise Exception(f"Import processing failed: {str(e)}")
@@ -906,9 +897,7 @@ class SubjectManagementViewSet(viewsets.ViewSet):
         stats = {}
         for choice in EDUCATION_LEVELS:
             level_code, level_name = choice
-            count = inactive_subjects.filter(
-                education_levels__contains=[level_code]
-            ).count()
+            count = filter_by_levels(inactive_subjects, [level_code]).count()
             stats[level_name] = count
         return stats
 
@@ -1053,9 +1042,8 @@ class SubjectManagementViewSet(viewsets.ViewSet):
         """Fix missing SS subject types for Senior Secondary subjects"""
         count = 0
 
-        ss_subjects_without_type = Subject.objects.filter(
-            education_levels__contains=["SENIOR_SECONDARY"],
-            ss_subject_type__isnull=True,
+        ss_subjects_without_type = filter_by_levels(
+            Subject.objects.filter(ss_subject_type__isnull=True), ["SENIOR_SECONDARY"]
         )
 
         for subject in ss_subjects_without_type:
@@ -1137,8 +1125,8 @@ class SubjectManagementViewSet(viewsets.ViewSet):
                 is_discontinued=True
             ).count(),
             "by_education_level": {
-                level_name: Subject.objects.filter(
-                    education_levels__contains=[level_code], is_active=True
+                level_name: filter_by_levels(
+                    Subject.objects.filter(is_active=True), [level_code]
                 ).count()
                 for level_code, level_name in EDUCATION_LEVELS
             },
@@ -1160,8 +1148,8 @@ class SubjectManagementViewSet(viewsets.ViewSet):
         """Get detailed subjects distribution analysis"""
         return {
             "nursery_distribution": {
-                level_name: Subject.objects.filter(
-                    nursery_levels__contains=[level_code], is_active=True
+                level_name: filter_by_levels(
+                    Subject.objects.filter(is_active=True), [level_code], "nursery_levels"
                 ).count()
                 for level_code, level_name in NURSERY_LEVELS
             },
@@ -1281,9 +1269,9 @@ class SubjectManagementViewSet(viewsets.ViewSet):
                 "valid_education_levels": Subject.objects.exclude(
                     education_levels=[]
                 ).count(),
-                "valid_ss_types": Subject.objects.filter(
-                    education_levels__contains=["SENIOR_SECONDARY"],
-                    ss_subject_type__isnull=False,
+                "valid_ss_types": filter_by_levels(
+                    Subject.objects.filter(ss_subject_type__isnull=False),
+                    ["SENIOR_SECONDARY"],
                 ).count(),
                 "consistent_practical_config": Subject.objects.filter(
                     has_practical=True, practical_hours__gt=0
@@ -1308,9 +1296,8 @@ class SubjectManagementViewSet(viewsets.ViewSet):
             )
 
         # Check for SS subjects without types
-        ss_without_types = Subject.objects.filter(
-            education_levels__contains=["SENIOR_SECONDARY"],
-            ss_subject_type__isnull=True,
+        ss_without_types = filter_by_levels(
+            Subject.objects.filter(ss_subject_type__isnull=True), ["SENIOR_SECONDARY"]
         )
         if ss_without_types.exists():
             issues.append(
@@ -1398,6 +1385,8 @@ class SubjectManagementViewSet(viewsets.ViewSet):
 
     def _get_performance_metrics(self):
         """Get performance-related metrics"""
+        cache_metrics = get_subject_cache_metrics()
+        hit_rate = cache_metrics["hit_rate"]
         return {
             "query_performance": {
                 "avg_subjects_per_level": Subject.objects.values("education_levels")
@@ -1405,9 +1394,10 @@ class SubjectManagementViewSet(viewsets.ViewSet):
                 .aggregate(Avg("count"))["count__avg"]
                 or 0,
             },
+            # Subject cache hits/misses of this process since it started
             "cache_efficiency": {
-                "cache_hit_ratio": 85,  # This would come from actual cache metrics
-                "avg_response_time": "120ms",  # This would come from monitoring
+                **cache_metrics,
+                "cache_hit_ratio": None if hit_rate is None else round(hit_rate * 100),
             },
         }
 
@@ -6,9 +6,9 @@ from django_filters.rest_framework import DjangoFilterBackend
 from django.db.models import Q, Prefetch, Count, Avg
 from django.utils.decorators import method_decorator
 from django.views.decorators.cache import cache_page
-from django.core.cache import cache
 from django.db import transaction, connection
 from django.core.exceptions import ValidationError
+from utils.search import search
 from utils.section_filtering import SectionFilterMixin
 from .models import (
     Subject,
@@ -24,7 +24,12 @@ from .serializers import (
     SubjectCreateUpdateSerializer,
     SubjectEducationLevelSerializer,
 )
-from .utils import clear_subject_caches
+from .utils import (
+    SECTION_ADMIN_LEVELS,
+    cached_subject_response,
+    filter_by_levels,
+    json_contains_any,
+)
 
 from classroom.models import GradeLevel  # Commented out to avoid circular import
 
@@ -33,7 +38,7 @@ logger = logging.getLogger(__name__)
 
 def filter_by_json_field(queryset, field_name, value):
     """
-    Database-agnostic JSON field filtering that works with both SQLite and PostgreSQL.
+    Filter a queryset on a JSON array field containing ``value``.
 
     Args:
         queryset: The base queryset to filter
@@ -41,33 +46,19 @@ def filter_by_json_field(queryset, field_name, value):
         value: The value to search for in the JSON array
 
     Returns:
-        Filtered queryset
+        Filtered queryset (jsonb containment, evaluated by the database)
     """
-    # Since the database doesn't support contains lookup for JSON fields,
-    # use Python-based filtering for all cases
-    subject_ids = []
-    for subject in queryset:
-        if value in getattr(subject, field_name, []):
-            subject_ids.append(subject.id)
-    return queryset.filter(id__in=subject_ids)
+    return filter_by_levels(queryset, [value], field_name)
 
 
 def filter_subjects_by_education_level(queryset, education_level):
-    """Filter subjects by education level using Python-based filtering."""
-    subject_ids = []
-    for subject in queryset:
-        if education_level in getattr(subject, "education_levels", []):
-            subject_ids.append(subject.id)
-    return queryset.filter(id__in=subject_ids)
+    """Filter subjects by education level."""
+    return filter_by_levels(queryset, [education_level])
 
 
 def filter_subjects_by_nursery_level(queryset, nursery_level):
-    """Filter subjects by nursery level using Python-based filtering."""
-    subject_ids = []
-    for subject in queryset:
-        if nursery_level in getattr(subject, "nursery_levels", []):
-            subject_ids.append(subject.id)
-    return queryset.filter(id__in=subject_ids)
+    """Filter subjects by nursery level."""
+    return filter_by_levels(queryset, [nursery_level], "nursery_levels")
 
 
 class SubjectViewSet(SectionFilterMixin, viewsets.ModelViewSet):
@@ -146,109 +137,71 @@ class SubjectViewSet(SectionFilterMixin, viewsets.ModelViewSet):
         else:
             return [IsAuthenticated()]
 
-    def filter_subjects_by_section_access(self, queryset):
+    def get_section_access_scope(self):
         """
-        Filter subjects based on user's section access permissions
+        Which subjects the user's section access lets them see, as
+        ("all", []), ("active", []) or ("levels", [education levels])
         """
+        if hasattr(self, "_section_access_scope"):
+            return self._section_access_scope
+        self._section_access_scope = self._resolve_section_access_scope()
+        return self._section_access_scope
+
+    def _resolve_section_access_scope(self):
         user = self.request.user
 
-        # Superadmins see everything
-        if user.is_superuser and user.is_staff:
-            return queryset
-
-        # Check if user is a section admin
-        section_admin_roles = [
-            "secondary_admin",
-            "senior_secondary_admin",
-            "junior_secondary_admin",
-            "primary_admin",
-            "nursery_admin",
-        ]
+        # Anonymous readers and superadmins see everything
+        if not user.is_authenticated or (user.is_superuser and user.is_staff):
+            return ("all", [])
 
         user_role = getattr(user, "role", None)
 
-        if user_role in section_admin_roles:
-            # Determine which education levels this admin can access
-            if user_role == "primary_admin":
-                # Filter subjects that include PRIMARY in education_levels array
-                subject_ids = []
-                for subject in queryset:
-                    education_levels = getattr(subject, "education_levels", [])
-                    if "PRIMARY" in education_levels or "ALL" in education_levels:
-                        subject_ids.append(subject.id)
-                return queryset.filter(id__in=subject_ids)
-
-            elif user_role == "nursery_admin":
-                # Filter subjects that include NURSERY in education_levels array
-                subject_ids = []
-                for subject in queryset:
-                    education_levels = getattr(subject, "education_levels", [])
-                    if "NURSERY" in education_levels or "ALL" in education_levels:
-                        subject_ids.append(subject.id)
-                return queryset.filter(id__in=subject_ids)
-
-            elif user_role in [
-                "secondary_admin",
-                "senior_secondary_admin",
-                "junior_secondary_admin",
-            ]:
-                # Filter subjects for secondary levels (both JSS and SSS)
-                subject_ids = []
-                for subject in queryset:
-                    education_levels = getattr(subject, "education_levels", [])
-                    if any(
-                        level in education_levels
-                        for level in ["JUNIOR_SECONDARY", "SENIOR_SECONDARY", "ALL"]
-                    ):
-                        subject_ids.append(subject.id)
-                return queryset.filter(id__in=subject_ids)
+        # Section admins see the subjects of their section(s)
+        if user_role in SECTION_ADMIN_LEVELS:
+            return ("levels", [*SECTION_ADMIN_LEVELS[user_role], "ALL"])
+
         # Check for role assignments from permissions system
         try:
-            from school_settings.models import UserRole
+            from schoolSettings.models import UserRole
 
-            user_roles = UserRole.objects.filter(
+            accessible_levels = set()
+            for primary, secondary, nursery in UserRole.objects.filter(
                 user=user, is_active=True
-            ).select_related("role")
-
-            if user_roles.exists():
-                # Build list of accessible education levels
-                accessible_levels = set()
-
-                for user_role_obj in user_roles:
-                    if user_role_obj.primary_section_access:
-                        accessible_levels.add("PRIMARY")
-                    if user_role_obj.secondary_section_access:
-                        accessible_levels.add("JUNIOR_SECONDARY")
-                        accessible_levels.add("SENIOR_SECONDARY")
-                    if user_role_obj.nursery_section_access:
-                        accessible_levels.add("NURSERY")
-
-                if accessible_levels:
-                    accessible_levels.add(
-                        "ALL"
-                    )  # Always include subjects marked as ALL
-
-                    # Filter subjects by accessible education levels
-                    subject_ids = []
-                    for subject in queryset:
-                        education_levels = getattr(subject, "education_levels", [])
-                        if any(
-                            level in education_levels for level in accessible_levels
-                        ):
-                            subject_ids.append(subject.id)
-                    return queryset.filter(id__in=subject_ids)
+            ).values_list(
+                "primary_section_access",
+                "secondary_section_access",
+                "nursery_section_access",
+            ):
+                if primary:
+                    accessible_levels.add("PRIMARY")
+                if secondary:
+                    accessible_levels.update(["JUNIOR_SECONDARY", "SENIOR_SECONDARY"])
+                if nursery:
+                    accessible_levels.add("NURSERY")
+
+            if accessible_levels:
+                # Always include subjects marked as ALL
+                return ("levels", [*sorted(accessible_levels), "ALL"])
 
         except Exception as e:
-            import logging
-
-            logger = logging.getLogger(__name__)
             logger.warning(f"Error checking role assignments: {e}")
         # Default: return all active subjects for regular admins and teachers
         if user.is_staff or user_role in ["admin", "teacher"]:
-            return queryset
+            return ("all", [])
 
         # For other users, return all active subjects
-        return queryset.filter(is_active=True)
+        return ("active", [])
+
+    def filter_subjects_by_section_access(self, queryset):
+        """
+        Filter subjects based on user's section access permissions
+        """
+        scope, levels = self.get_section_access_scope()
+        if scope == "levels":
+            return filter_by_levels(queryset, levels)
+        if scope == "active":
+            return queryset.filter(is_active=True)
+        return queryset
 
     def get_queryset(self):
         """Enhanced queryset with smart prefetching and filtering"""
@@ -427,6 +380,12 @@ class SubjectViewSet(SectionFilterMixin, viewsets.ModelViewSet):
     #             pass
 
     #     return queryset
+    @cached_subject_response(
+        60 * 30,
+        scoped=True,
+        # Teacher assignments are not part of the subject catalogue
+        bypass_params=["teacher_id", "teacher_specialization"],
+    )
     def list(self, request, *args, **kwargs):
         """Enhanced list with comprehensive metadata"""
         response = super().list(request, *args, **kwargs)
@@ -454,22 +413,20 @@ class SubjectViewSet(SectionFilterMixin, viewsets.ModelViewSet):
         return response
 
     def perform_create(self, serializer):
-        """Create with enhanced logging and cache invalidation"""
+        """Create with enhanced logging (subject/signals.py drops the caches)"""
         with transaction.atomic():
             subject = serializer.save()
-            clear_subject_caches()
             logger.info(
                 f"Subject '{subject.name}' ({subject.code}) created by {self.request.user} "
                 f"for levels: {subject.education_levels_display}"
             )
 
     def perform_update(self, serializer):
-        """Update with enhanced logging and cache invalidation"""
+        """Update with enhanced logging (subject/signals.py drops the caches)"""
         with transaction.atomic():
             old_name = serializer.instance.name
             old_levels = serializer.instance.education_levels_display
             subject = serializer.save()
-            clear_subject_caches()
             logger.info(
                 f"Subject '{old_name}' updated to '{subject.name}' by {self.request.user} "
                 f"(Levels: {old_levels} -> {subject.education_levels_display})"
@@ -511,9 +468,6 @@ class SubjectViewSet(SectionFilterMixin, viewsets.ModelViewSet):
                     f"Subject '{subject_info['name']}' has been permanently deleted"
                 )
 
-            # Clear caches
-            clear_subject_caches()
-
             # Return explicit JSON response
             return Response(
                 {
@@ -536,210 +490,178 @@ class SubjectViewSet(SectionFilterMixin, viewsets.ModelViewSet):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
 
-    def _clear_subject_caches(self):
-        """Clear all subject-related caches"""
-        cache_keys = [
-            "subjects_cache_v1",
-            "subjects_by_category_v3",
-            "subjects_by_education_level_v2",
-            "nursery_subjects_v1",
-            "ss_subjects_by_type_v1",
-            "cross_cutting_subjects_v1",
-        ]
-        for key in cache_keys:
-            cache.delete(key)
-
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 30, scoped=True)
     def by_category(self, request):
         """Get subjects grouped by category with enhanced metadata"""
-        cache_key = "subjects_by_category_v3"
-        result = cache.get(cache_key)
-
-        if not result:
-            result = {}
-            for category, display in SUBJECT_CATEGORY_CHOICES:
-                subjects = (
-                    self.get_queryset()
-                    .filter(category=category, is_active=True)
-                    .order_by("subject_order", "name")
-                )
+        result = {}
+        for category, display in SUBJECT_CATEGORY_CHOICES:
+            subjects = (
+                self.get_queryset()
+                .filter(category=category, is_active=True)
+                .order_by("subject_order", "name")
+            )
 
-                result[category] = {
-                    "display_name": display,
-                    "icon": self._get_category_icon(category),
-                    "count": subjects.count(),
-                    "summary": {
-                        "cross_cutting": subjects.filter(is_cross_cutting=True).count(),
-                    },
-                    "subjects": SubjectListSerializer(subjects, many=True).data,
-                }
-            cache.set(cache_key, result, 60 * 30)
+            result[category] = {
+                "display_name": display,
+                "icon": self._get_category_icon(category),
+                "count": subjects.count(),
+                "summary": {
+                    "cross_cutting": subjects.filter(is_cross_cutting=True).count(),
+                },
+                "subjects": SubjectListSerializer(subjects, many=True).data,
+            }
 
         return Response(result)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 30, scoped=True)
     def by_education_level(self, request):
         """Get subjects grouped by education level"""
-        cache_key = "subjects_by_education_level_v2"
-        result = cache.get(cache_key)
-
-        if not result:
-            result = {}
-            for level_code, level_name in EDUCATION_LEVELS:
-                subjects_queryset = (
-                    filter_subjects_by_education_level(self.get_queryset(), level_code)
-                    .filter(is_active=True)
-                    .order_by("category", "subject_order", "name")
-                )
+        result = {}
+        for level_code, level_name in EDUCATION_LEVELS:
+            subjects_queryset = (
+                filter_subjects_by_education_level(self.get_queryset(), level_code)
+                .filter(is_active=True)
+                .order_by("category", "subject_order", "name")
+            )
 
-                # Special handling for nursery subjects
-                nursery_breakdown = {}
-                if level_code == "NURSERY":
-                    for nursery_code, nursery_name in NURSERY_LEVELS:
-                        nursery_subjects = filter_subjects_by_nursery_level(
-                            subjects_queryset, nursery_code
-                        )
-                        if nursery_subjects.exists():
-                            nursery_breakdown[nursery_code] = {
-                                "name": nursery_name,
-                                "count": nursery_subjects.count(),
-                                "subjects": SubjectListSerializer(
-                                    nursery_subjects, many=True
-                                ).data,
-                            }
-
-                # Special handling for Senior Secondary subjects
-                ss_breakdown = {}
-                if level_code == "SENIOR_SECONDARY":
-                    for ss_type_code, ss_type_name in SS_SUBJECT_TYPES:
-                        ss_subjects = subjects_queryset.filter(
-                            ss_subject_type=ss_type_code
-                        )
-                        if ss_subjects.exists():
-                            ss_breakdown[ss_type_code] = {
-                                "name": ss_type_name,
-                                "count": ss_subjects.count(),
-                                "subjects": SubjectListSerializer(
-                                    ss_subjects, many=True
-                                ).data,
-                            }
-
-                result[level_code] = {
-                    "name": level_name,
-                    "count": subjects_queryset.count(),
-                    "summary": {
-                        "cross_cutting": subjects_queryset.filter(
-                            is_cross_cutting=True
-                        ).count(),
-                    },
-                    "subjects": SubjectListSerializer(
-                        subjects_queryset, many=True
-                    ).data,
-                    "nursery_breakdown": (
-                        nursery_breakdown if level_code == "NURSERY" else None
-                    ),
-                    "ss_breakdown": (
-                        ss_breakdown if level_code == "SENIOR_SECONDARY" else None
-                    ),
-                }
+            # Special handling for nursery subjects
+            nursery_breakdown = {}
+            if level_code == "NURSERY":
+                for nursery_code, nursery_name in NURSERY_LEVELS:
+                    nursery_subjects = filter_subjects_by_nursery_level(
+                        subjects_queryset, nursery_code
+                    )
+                    if nursery_subjects.exists():
+                        nursery_breakdown[nursery_code] = {
+                            "name": nursery_name,
+                            "count": nursery_subjects.count(),
+                            "subjects": SubjectListSerializer(
+                                nursery_subjects, many=True
+                            ).data,
+                        }
+
+            # Special handling for Senior Secondary subjects
+            ss_breakdown = {}
+            if level_code == "SENIOR_SECONDARY":
+                for ss_type_code, ss_type_name in SS_SUBJECT_TYPES:
+                    ss_subjects = subjects_queryset.filter(
+                        ss_subject_type=ss_type_code
+                    )
+                    if ss_subjects.exists():
+                        ss_breakdown[ss_type_code] = {
+                            "name": ss_type_name,
+                            "count": ss_subjects.count(),
+                            "subjects": SubjectListSerializer(
+                                ss_subjects, many=True
+                            ).data,
+                        }
+
+            result[level_code] = {
+                "name": level_name,
+                "count": subjects_queryset.count(),
+                "summary": {
+                    "cross_cutting": subjects_queryset.filter(
+                        is_cross_cutting=True
+                    ).count(),
+                },
+                "subjects": SubjectListSerializer(
+                    subjects_queryset, many=True
+                ).data,
+                "nursery_breakdown": (
+                    nursery_breakdown if level_code == "NURSERY" else None
+                ),
+                "ss_breakdown": (
+                    ss_breakdown if level_code == "SENIOR_SECONDARY" else None
+                ),
+            }
 
-            cache.set(cache_key, result, 60 * 30)
 
         return Response(result)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 20)
     def nursery_subjects(self, request):
         """Get nursery subjects with detailed breakdown"""
-        cache_key = "nursery_subjects_v1"
-        result = cache.get(cache_key)
-
-        if not result:
-            nursery_level = request.query_params.get("level")
-            base_query = Subject.get_nursery_subjects()
-
-            if nursery_level:
-                base_query = filter_subjects_by_nursery_level(base_query, nursery_level)
-
-            result = {
-                "total_count": base_query.count(),
-                "activity_based_count": base_query.filter(
-                    is_activity_based=True
-                ).count(),
-                "by_nursery_level": {},
-                "subjects": SubjectListSerializer(base_query, many=True).data,
-            }
+        nursery_level = request.query_params.get("level")
+        base_query = Subject.get_nursery_subjects()
 
-            # Breakdown by nursery levels
-            for level_code, level_name in NURSERY_LEVELS:
-                level_subjects = filter_subjects_by_nursery_level(
-                    base_query, level_code
-                )
-                result["by_nursery_level"][level_code] = {
-                    "name": level_name,
-                    "count": level_subjects.count(),
-                    "subjects": SubjectListSerializer(level_subjects, many=True).data,
-                }
+        if nursery_level:
+            base_query = filter_subjects_by_nursery_level(base_query, nursery_level)
+
+        result = {
+            "total_count": base_query.count(),
+            "activity_based_count": base_query.filter(
+                is_activity_based=True
+            ).count(),
+            "by_nursery_level": {},
+            "subjects": SubjectListSerializer(base_query, many=True).data,
+        }
+
+        # Breakdown by nursery levels
+        for level_code, level_name in NURSERY_LEVELS:
+            level_subjects = filter_subjects_by_nursery_level(
+                base_query, level_code
+            )
+            result["by_nursery_level"][level_code] = {
+                "name": level_name,
+                "count": level_subjects.count(),
+                "subjects": SubjectListSerializer(level_subjects, many=True).data,
+            }
 
-            cache.set(cache_key, result, 60 * 20)
 
         return Response(result)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 20)
     def senior_secondary_subjects(self, request):
         """Get Senior Secondary subjects with classification breakdown"""
-        cache_key = "ss_subjects_by_type_v1"
-        result = cache.get(cache_key)
-
-        if not result:
-            ss_subjects = Subject.get_senior_secondary_subjects()
-            subject_type = request.query_params.get("type")
-
-            if subject_type:
-                ss_subjects = ss_subjects.filter(ss_subject_type=subject_type)
-
-            result = {
-                "total_count": ss_subjects.count(),
-                "cross_cutting_count": ss_subjects.filter(
-                    is_cross_cutting=True
-                ).count(),
-                "by_subject_type": {},
-                "cross_cutting_subjects": SubjectListSerializer(
-                    Subject.get_cross_cutting_subjects(), many=True
-                ).data,
-                "all_subjects": SubjectListSerializer(ss_subjects, many=True).data,
-            }
+        ss_subjects = Subject.get_senior_secondary_subjects()
+        subject_type = request.query_params.get("type")
+
+        if subject_type:
+            ss_subjects = ss_subjects.filter(ss_subject_type=subject_type)
+
+        result = {
+            "total_count": ss_subjects.count(),
+            "cross_cutting_count": ss_subjects.filter(
+                is_cross_cutting=True
+            ).count(),
+            "by_subject_type": {},
+            "cross_cutting_subjects": SubjectListSerializer(
+                Subject.get_cross_cutting_subjects(), many=True
+            ).data,
+            "all_subjects": SubjectListSerializer(ss_subjects, many=True).data,
+        }
 
-            # Breakdown by subject types
-            for type_code, type_name in SS_SUBJECT_TYPES:
-                type_subjects = ss_subjects.filter(ss_subject_type=type_code)
-                result["by_subject_type"][type_code] = {
-                    "name": type_name,
-                    "count": type_subjects.count(),
-                    "subjects": SubjectListSerializer(type_subjects, many=True).data,
-                }
+        # Breakdown by subject types
+        for type_code, type_name in SS_SUBJECT_TYPES:
+            type_subjects = ss_subjects.filter(ss_subject_type=type_code)
+            result["by_subject_type"][type_code] = {
+                "name": type_name,
+                "count": type_subjects.count(),
+                "subjects": SubjectListSerializer(type_subjects, many=True).data,
+            }
 
-            cache.set(cache_key, result, 60 * 20)
 
         return Response(result)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 30)
     def cross_cutting_subjects(self, request):
         """Get cross-cutting subjects for Senior Secondary"""
-        cache_key = "cross_cutting_subjects_v1"
-        result = cache.get(cache_key)
-
-        if not result:
-            cross_cutting = Subject.get_cross_cutting_subjects()
-            result = {
-                "count": cross_cutting.count(),
-                "description": "Cross-cutting subjects required for all Senior Secondary students",
-                "subjects": SubjectListSerializer(cross_cutting, many=True).data,
-            }
-            cache.set(cache_key, result, 60 * 30)
+        cross_cutting = Subject.get_cross_cutting_subjects()
+        result = {
+            "count": cross_cutting.count(),
+            "description": "Cross-cutting subjects required for all Senior Secondary students",
+            "subjects": SubjectListSerializer(cross_cutting, many=True).data,
+        }
 
         return Response(result)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 30, scoped=True)
     def for_grade(self, request):
         """Enhanced grade-specific subject retrieval"""
         grade_level = request.query_params.get("grade")
@@ -830,11 +752,11 @@ class SubjectViewSet(SectionFilterMixin, viewsets.ModelViewSet):
         if len(query) < 2:
             return Response({"suggestions": []})
 
-        subjects = Subject.objects.filter(
-            Q(name__icontains=query)
-            | Q(short_name__icontains=query)
-            | Q(code__icontains=query),
-            is_active=True,
+        # Trigram-indexed, best matches first
+        subjects = search(
+            Subject.objects.filter(is_active=True),
+            ["name", "short_name", "code"],
+            query,
         ).values(
             "id",
             "name",
@@ -933,46 +855,50 @@ class SubjectViewSet(SectionFilterMixin, viewsets.ModelViewSet):
         return Response(response_data)
 
     @action(detail=False, methods=["get"])
+    @cached_subject_response(60 * 10)
     def statistics(self, request):
         """Get comprehensive subject statistics"""
-        cache_key = "subject_statistics_v1"
-        result = cache.get(cache_key)
-
-        if not result:
-            # Use the base queryset without filtering to avoid query_params issues
-            queryset = Subject.objects.all()
-
-            result = {
-                "overview": {
-                    "total_subjects": queryset.count(),
-                    "active_subjects": queryset.filter(is_active=True).count(),
-                },
-                "by_education_level": {},
-                "by_category": {},
-                "by_requirements": {
-                    "cross_cutting": queryset.filter(is_cross_cutting=True).count(),
-                },
-            }
+        # Use the base queryset without filtering to avoid query_params issues
+        queryset = Subject.objects.all()
+
+        result = {
+            "overview": {
+                "total_subjects": queryset.count(),
+                "active_subjects": queryset.filter(is_active=True).count(),
+            },
+            "by_education_level": {},
+            "by_category": {},
+            "by_requirements": {
+                "cross_cutting": queryset.filter(is_cross_cutting=True).count(),
+            },
+        }
 
-            # Statistics by education level
-            for level_code, level_name in EDUCATION_LEVELS:
-                level_subjects = filter_by_json_field(
-                    queryset, "education_levels", level_code
+        # Statistics by education level, counted in one query
+        level_counts = queryset.aggregate(
+            **{
+                level_code: Count(
+                    "id",
+                    filter=json_contains_any(
+                        "education_levels", [level_code], queryset.db
+                    ),
                 )
-                result["by_education_level"][level_code] = {
-                    "name": level_name,
-                    "count": level_subjects.count(),
-                }
+                for level_code, _ in EDUCATION_LEVELS
+            }
+        )
+        for level_code, level_name in EDUCATION_LEVELS:
+            result["by_education_level"][level_code] = {
+                "name": level_name,
+                "count": level_counts[level_code],
+            }
 
-            # Statistics by category
-            for category_code, category_name in SUBJECT_CATEGORY_CHOICES:
-                category_subjects = queryset.filter(category=category_code)
-                result["by_category"][category_code] = {
-                    "name": category_name,
-                    "count": category_subjects.count(),
-                }
+        # Statistics by category
+        for category_code, category_name in SUBJECT_CATEGORY_CHOICES:
+            category_subjects = queryset.filter(category=category_code)
+            result["by_category"][category_code] = {
+                "name": category_name,
+                "count": category_subjects.count(),
+            }
 
-            cache.set(cache_key, result, 60 * 10)
 
         return Response(result)
 
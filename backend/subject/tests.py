@@ -1,3 +1,163 @@
+from types import SimpleNamespace
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection
 from django.test import TestCase
+from rest_framework.test import APIClient
+
+from schoolSettings.models import Role, UserRole
+from users.models import CustomUser
+from utils.caching import reset_cache_metrics
+
+from .models import Subject
+from .subjectviewset import SubjectViewSet, filter_subjects_by_nursery_level
+from .utils import filter_by_levels, get_subject_cache_metrics
+
+
+class SectionAccessFilterTest(TestCase):
+    """Section access is a jsonb containment filter, run by the database"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for code, levels, nursery_levels in [
+            ("NUR", ["NURSERY"], ["NURSERY_1"]),
+            ("PRI", ["PRIMARY"], []),
+            ("JSS", ["JUNIOR_SECONDARY"], []),
+            ("NUR-PRI", ["NURSERY", "PRIMARY"], ["PRE_NURSERY"]),
+        ]:
+            Subject.objects.create(
+                name=code,
+                code=code,
+                education_levels=levels,
+                nursery_levels=nursery_levels,
+            )
+
+    def user(self, role):
+        return CustomUser.objects.create_user(
+            email=f"{role}@subjects.com",
+            username=f"subjects{role}",
+            first_name=role.title(),
+            last_name="User",
+            role=role,
+            password="x",
+            is_active=True,
+        )
+
+    def visible_codes(self, user):
+        viewset = SubjectViewSet(request=SimpleNamespace(user=user))
+        queryset = viewset.filter_subjects_by_section_access(Subject.objects.all())
+        with self.assertNumQueries(1):
+            return set(queryset.values_list("code", flat=True))
+
+    def test_section_admins(self):
+        for role, codes in [
+            ("primary_admin", {"PRI", "NUR-PRI"}),
+            ("nursery_admin", {"NUR", "NUR-PRI"}),
+            ("secondary_admin", {"JSS"}),
+            ("teacher", {"NUR", "PRI", "JSS", "NUR-PRI"}),
+        ]:
+            self.assertEqual(self.visible_codes(self.user(role)), codes)
+
+    def test_role_assignment(self):
+        user = self.user("student")
+        UserRole.objects.create(
+            user=user,
+            role=Role.objects.create(name="Nursery desk"),
+            primary_section_access=False,
+            secondary_section_access=False,
+        )
+        self.assertEqual(self.visible_codes(user), {"NUR", "NUR-PRI"})
+
+    def test_without_json_containment(self):
+        # SQLite has no JSON containment; the quoted value is matched instead
+        with mock.patch.object(
+            connection.features, "supports_json_field_contains", False
+        ):
+            self.test_section_admins()
+            self.assertEqual(
+                set(
+                    filter_by_levels(
+                        Subject.objects.all(), ["NURSERY", "ALL"]
+                    ).values_list("code", flat=True)
+                ),
+                {"NUR", "NUR-PRI"},
+            )
+
+    def test_level_helpers_without_json_containment(self):
+        with mock.patch.object(
+            connection.features, "supports_json_field_contains", False
+        ):
+            self.assertEqual(
+                set(Subject.get_primary_subjects().values_list("code", flat=True)),
+                {"PRI", "NUR-PRI"},
+            )
+            self.assertEqual(
+                list(
+                    filter_by_levels(
+                        Subject.get_nursery_subjects(), ["PRE_NURSERY"], "nursery_levels"
+                    ).values_list("code", flat=True)
+                ),
+                ["NUR-PRI"],
+            )
+
+    def test_nursery_level(self):
+        self.assertEqual(
+            list(
+                filter_subjects_by_nursery_level(
+                    Subject.objects.all(), "PRE_NURSERY"
+                ).values_list("code", flat=True)
+            ),
+            ["NUR-PRI"],
+        )
+
+
+class SubjectCacheTest(TestCase):
+    """Subject responses are cached until the catalogue changes"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.subject = Subject.objects.create(
+            name="Basic Science", code="BSC", education_levels=["PRIMARY"]
+        )
+        cls.admin = CustomUser.objects.create_superuser(
+            email="cache@subjects.com",
+            username="subjectscache",
+            first_name="Cache",
+            last_name="Admin",
+            password="x",
+        )
+
+    def setUp(self):
+        cache.clear()
+        reset_cache_metrics()
+        self.client = APIClient(HTTP_HOST="localhost")
+        self.client.force_authenticate(self.admin)
+
+    def names(self, url, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return [subject["name"] for subject in response.data["PRIMARY"]["subjects"]]
+
+    def test_invalidated_by_subject_changes(self):
+        url = "/api/subjects/by_education_level/"
+        self.assertEqual(self.names(url), ["Basic Science"])
+        generation = get_subject_cache_metrics()["generation"]
+        with self.assertNumQueries(0):
+            self.assertEqual(self.names(url), ["Basic Science"])
+        # Query parameters are part of the key
+        self.assertEqual(self.names(url, education_level="NURSERY"), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.subject.name = "Basic Science and Technology"
+            self.subject.save()
+        self.assertEqual(self.names(url), ["Basic Science and Technology"])
+
+        # The subject list is cached the same way
+        listed = self.client.get("/api/subjects/").data
+        with self.assertNumQueries(0):
+            self.assertEqual(self.client.get("/api/subjects/").data, listed)
 
-# Create your tests here.
+        metrics = get_subject_cache_metrics()
+        self.assertEqual((metrics["hits"], metrics["misses"]), (2, 4))
+        self.assertEqual(metrics["generation"], generation + 1)
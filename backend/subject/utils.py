@@ -1,25 +1,144 @@
-from django.core.cache import cache
+# subject/utils.py
+"""
+Subject helpers: the catalogue cache and education level filters.
+
+Cached subject responses (the subject list, the ``by_*`` groupings,
+statistics and the analytics dashboards) used to live under hand-listed
+keys such as ``subjects_by_category_v3``, deleted by three diverging
+``clear_subject_caches`` lists that missed some of them, and keyed without
+the user's section access or the query parameters. They now all live in
+the ``subjects`` namespace of ``utils.caching``:
+
+* ``cached_subject_response`` caches an action's response data under a key
+  built from the view, the action, its arguments, the query parameters
+  and (``scoped=True``) the user's section access;
+* ``clear_subject_caches`` bumps the namespace generation once the
+  transaction commits, so every cached response goes at once. The signal
+  handlers in ``subject/signals.py`` call it on any ``Subject`` or stream
+  configuration change; bulk ``update()`` calls still call it themselves.
+
+Hits and misses are counted per process by ``utils.caching`` and reported
+by ``get_subject_cache_metrics``.
+"""
+
+import functools
+import json
 import logging
+from functools import reduce
+from operator import or_
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.db.models import Q
+from rest_framework.response import Response
+
+from utils.caching import (
+    bump_namespace,
+    get_cache_metrics,
+    get_or_compute,
+    make_key,
+    namespace_version,
+)
 
 logger = logging.getLogger(__name__)
 
+SUBJECT_CACHE = "subjects"
+
 
 def clear_subject_caches():
-    """Clear all subject-related caches"""
-    cache_keys = [
-        "subjects_cache_v1",
-        "subjects_by_category_v3",
-        "subjects_by_education_level_v2",
-        "nursery_subjects_v1",
-        "ss_subjects_by_type_v1",
-        "cross_cutting_subjects_v1",
-        "subject_statistics_v1",
-    ]
-
-    cleared_count = 0
-    for key in cache_keys:
-        if cache.delete(key):
-            cleared_count += 1
-
-    logger.info(f"Cleared {cleared_count} subject cache keys")
-    return cleared_count
+    """Invalidate every cached subject response once the transaction commits"""
+    transaction.on_commit(lambda: bump_namespace(SUBJECT_CACHE))
+
+
+def get_subject_cache_metrics():
+    """Generation and this process's hits/misses of the subject cache"""
+    counts = get_cache_metrics().get(
+        SUBJECT_CACHE, {"hits": 0, "misses": 0, "waits": 0, "hit_rate": None}
+    )
+    return {"generation": namespace_version(SUBJECT_CACHE), **counts}
+
+
+class _Uncacheable(Exception):
+    def __init__(self, response):
+        self.response = response
+
+
+def cached_subject_response(timeout, scoped=False, bypass_params=()):
+    """
+    Cache a viewset action's successful response data in the subjects
+    namespace. ``scoped`` adds the view's ``get_section_access_scope()`` to
+    the key; requests with any of ``bypass_params`` are never cached (their
+    results depend on more than subjects).
+    """
+
+    def decorator(view_method):
+        @functools.wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            params = request.query_params
+            if any(param in params for param in bypass_params):
+                return view_method(self, request, *args, **kwargs)
+
+            parts = [
+                type(self).__name__,
+                view_method.__name__,
+                *args,
+                *(f"{name}={value}" for name, value in sorted(kwargs.items())),
+                *(f"{name}={params.getlist(name)}" for name in sorted(params)),
+            ]
+            if scoped:
+                parts.extend(self.get_section_access_scope())
+
+            def compute():
+                response = view_method(self, request, *args, **kwargs)
+                if response.status_code != 200:
+                    raise _Uncacheable(response)
+                return response.data
+
+            try:
+                data = get_or_compute(
+                    make_key(SUBJECT_CACHE, *parts), compute, timeout, SUBJECT_CACHE
+                )
+            except _Uncacheable as e:
+                return e.response
+            return Response(data)
+
+        return wrapper
+
+    return decorator
+
+
+# Education levels each section admin role can see; subjects marked "ALL"
+# are visible to every section
+SECTION_ADMIN_LEVELS = {
+    "primary_admin": ["PRIMARY"],
+    "nursery_admin": ["NURSERY"],
+    "secondary_admin": ["JUNIOR_SECONDARY", "SENIOR_SECONDARY"],
+    "senior_secondary_admin": ["JUNIOR_SECONDARY", "SENIOR_SECONDARY"],
+    "junior_secondary_admin": ["JUNIOR_SECONDARY", "SENIOR_SECONDARY"],
+}
+
+
+def json_contains_any(field_name, values, using=DEFAULT_DB_ALIAS):
+    """
+    Q matching rows whose JSON array ``field_name`` holds any of ``values``.
+
+    Each value is a jsonb containment test (``field @> '["VALUE"]'``), which
+    Postgres answers from the GIN index on ``Subject.education_levels``
+    instead of loading every subject into Python. Databases without JSON
+    containment (SQLite) match the quoted value in the stored JSON text
+    instead, which is exact for arrays of strings.
+    """
+    values = list(values)
+    if not values:
+        return Q(pk__in=[])
+    if connections[using].features.supports_json_field_contains:
+        lookups = (Q(**{f"{field_name}__contains": [value]}) for value in values)
+    else:
+        lookups = (
+            Q(**{f"{field_name}__icontains": json.dumps(value)}) for value in values
+        )
+    return reduce(or_, lookups)
+
+
+def filter_by_levels(queryset, levels, field_name="education_levels"):
+    """Subjects of ``queryset`` that apply to any of ``levels``"""
+    return queryset.filter(json_contains_any(field_name, levels, queryset.db))
@@ -2,6 +2,11 @@ from rest_framework import serializers
 from .models import Teacher, AssignmentRequest, TeacherSchedule
 from classroom.models import GradeLevel, Section, ClassroomTeacherAssignment, Classroom
 from subject.models import Subject
+from utils.schedule_conflicts import (
+    ConflictRules,
+    ScheduleConflictListSerializer,
+    ScheduleConflictSerializerMixin,
+)
 
 
 class TeacherAssignmentSerializer(serializers.ModelSerializer):
@@ -107,13 +112,24 @@ class AssignmentRequestSerializer(serializers.ModelSerializer):
         return delta.days
 
 
-class TeacherScheduleSerializer(serializers.ModelSerializer):
+class TeacherScheduleSerializer(
+    ScheduleConflictSerializerMixin, serializers.ModelSerializer
+):
     """Fixed serializer - removed non-existent classroom field"""
 
     subject_name = serializers.CharField(source="subject.name", read_only=True)
 
+    # Active entries of the same session and term may not overlap
+    conflict_rules = ConflictRules(
+        "day_of_week",
+        {"teacher": "teacher_id", "section": "section_id"},
+        scope=("academic_session", "term"),
+        active={"is_active": True},
+    )
+
     class Meta:
         model = TeacherSchedule
+        list_serializer_class = ScheduleConflictListSerializer
         fields = [
             "id",
             "teacher",
@@ -494,15 +494,13 @@ class TeacherScheduleViewSet(AutoSectionFilterMixin, viewsets.ModelViewSet):
                 {"error": "teacher_id and schedules are required"},
                 status=status.HTTP_400_BAD_REQUEST,
             )
-        created_schedules = []
         for schedule_data in schedules_data:
             schedule_data["teacher"] = teacher_id
-            serializer = self.get_serializer(data=schedule_data)
-            if serializer.is_valid():
-                schedule = serializer.save()
-                created_schedules.append(schedule)
-            else:
-                return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        # Validated together (conflicts included) so nothing is saved on error
+        serializer = self.get_serializer(data=schedules_data, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        created_schedules = serializer.save()
         return Response(
             {
                 "message": f"Created {len(created_schedules)} schedule entries",
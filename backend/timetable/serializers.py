@@ -1,14 +1,27 @@
 from rest_framework import serializers
+from utils.schedule_conflicts import (
+    ConflictRules,
+    ScheduleConflictListSerializer,
+    ScheduleConflictSerializerMixin,
+)
 from .models import Timetable
 
 
-class TimetableSerializer(serializers.ModelSerializer):
+class TimetableSerializer(
+    ScheduleConflictSerializerMixin, serializers.ModelSerializer
+):
     section_name = serializers.CharField(source="section.__str__", read_only=True)
     subject_name = serializers.CharField(source="subject.name", read_only=True)
     teacher_name = serializers.CharField(source="teacher.__str__", read_only=True)
 
+    # A teacher or a section can't be in two lessons at once
+    conflict_rules = ConflictRules(
+        "day", {"teacher": "teacher_id", "section": "section_id"}
+    )
+
     class Meta:
         model = Timetable
+        list_serializer_class = ScheduleConflictListSerializer
         fields = [
             "id",
             "section",
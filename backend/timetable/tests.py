@@ -1,3 +1,83 @@
+import datetime
+
 from django.test import TestCase
 
-# Create your tests here.
+from classroom.models import GradeLevel, Section
+from subject.models import Subject
+from teacher.models import Teacher
+from users.models import CustomUser
+
+from .models import Timetable
+from .serializers import TimetableSerializer
+
+
+class TimetableConflictTest(TestCase):
+    """Overlapping entries are rejected before anything is inserted"""
+
+    @classmethod
+    def setUpTestData(cls):
+        grade_level = GradeLevel.objects.create(
+            name="JSS 1", education_level="JUNIOR_SECONDARY", order=1
+        )
+        cls.sections = [
+            Section.objects.create(name=name, grade_level=grade_level)
+            for name in "AB"
+        ]
+        cls.subject = Subject.objects.create(
+            name="English", code="ENG", education_levels=["JUNIOR_SECONDARY"]
+        )
+        user = CustomUser.objects.create_user(
+            email="teacher@example.com",
+            username="teacher",
+            first_name="Ada",
+            last_name="Teacher",
+            role="teacher",
+            password="x",
+        )
+        cls.teacher = Teacher.objects.create(user=user, employee_id="T-1")
+        cls.stored = Timetable.objects.create(
+            section=cls.sections[0],
+            subject=cls.subject,
+            teacher=cls.teacher,
+            day="Monday",
+            start_time=datetime.time(8),
+            end_time=datetime.time(9),
+        )
+
+    def row(self, section, day, start, end):
+        return {
+            "section": section.pk,
+            "subject": self.subject.pk,
+            "teacher": self.teacher.pk,
+            "day": day,
+            "start_time": f"{start:02}:00",
+            "end_time": f"{end:02}:00",
+        }
+
+    def test_bulk_rows_are_checked_together(self):
+        rows = [
+            self.row(self.sections[1], "Monday", 9, 10),  # right after the stored one
+            self.row(self.sections[1], "Tuesday", 8, 10),
+            self.row(self.sections[0], "Tuesday", 9, 11),  # same teacher as above
+        ]
+        serializer = TimetableSerializer(data=rows, many=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertEqual(len(serializer.errors["non_field_errors"]), 1)
+        self.assertIn("Teacher conflict on Tuesday", str(serializer.errors))
+
+        serializer = TimetableSerializer(data=rows[:2], many=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+        self.assertEqual(Timetable.objects.count(), 3)
+
+    def test_single_create_and_update(self):
+        serializer = TimetableSerializer(
+            data=self.row(self.sections[1], "Monday", 8, 10)
+        )
+        self.assertFalse(serializer.is_valid())
+
+        # Moving the stored entry doesn't conflict with itself
+        serializer = TimetableSerializer(
+            self.stored, data={"start_time": "08:30"}, partial=True
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
@@ -131,6 +131,22 @@ class TimetableViewSet(viewsets.ModelViewSet):
         if errors:
             return Response({"errors": errors}, status=400)
 
+        # Rows are checked against the stored timetable one by one; check
+        # them against each other before saving any
+        rules = TimetableSerializer.conflict_rules
+        rows = [Timetable(**serializer.validated_data) for serializer in entries]
+        lines = {id(row): line for line, row in enumerate(rows, start=2)}
+        conflicts = rules.find(rows)
+        if conflicts:
+            errors = [
+                {
+                    "line": lines[id(conflict.second)],
+                    "errors": [rules.describe(conflict)],
+                }
+                for conflict in conflicts
+            ]
+            return Response({"errors": errors}, status=400)
+
         # Save all valid entries
         for serializer in entries:
             serializer.save()
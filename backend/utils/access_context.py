@@ -0,0 +1,230 @@
+# utils/access_context.py
+"""
+What the current user may see, resolved once per request.
+
+``SectionFilterMixin`` used to re-fetch the ``CustomUser`` on every
+``get_user_role()`` call and query ``Teacher``/``Classroom``/``Section`` again
+for each of ``get_user_section_access()`` and
+``get_user_education_level_access()`` - a dashboard filtering six querysets
+paid for that six times. ``AccessContext`` holds the role, education levels,
+section IDs and classroom IDs of a user:
+
+* memoized on the request, so one request resolves it at most once;
+* cached across requests for ``settings.ACCESS_CONTEXT_CACHE_TTL`` seconds,
+  keyed on the user's ID, role, section, superuser flag and join date, so a
+  changed role or section (or a new user that reuses a deleted user's ID)
+  never reads the old context;
+* dropped by the signal handlers in ``utils/signals.py`` when a user's role,
+  teacher assignments or enrollments change: each user's keys carry the
+  version of their own ``access_context:user:<id>`` namespace, and a
+  classroom/section change bumps the ``access_context`` namespace and so
+  invalidates everyone.
+"""
+
+import logging
+
+from django.conf import settings
+from django.db.models import Q
+
+from .caching import bump_namespace, get_or_compute, make_key, namespace_version
+
+logger = logging.getLogger(__name__)
+
+ALL_EDUCATION_LEVELS = ["NURSERY", "PRIMARY", "JUNIOR_SECONDARY", "SENIOR_SECONDARY"]
+FULL_ACCESS_ROLES = ["superadmin", "admin", "principal"]
+SECTION_ADMIN_LEVELS = {
+    "secondary_admin": ["JUNIOR_SECONDARY", "SENIOR_SECONDARY"],
+    "nursery_admin": ["NURSERY"],
+    "primary_admin": ["PRIMARY"],
+    "junior_secondary_admin": ["JUNIOR_SECONDARY"],
+    "senior_secondary_admin": ["SENIOR_SECONDARY"],
+}
+ROLE_PRIORITY = [
+    ("superadmin", ["super_admin", "superadmin"]),
+    ("admin", ["admin", "principal"]),
+    ("secondary_admin", ["secondary_admin"]),
+    ("nursery_admin", ["nursery_admin"]),
+    ("primary_admin", ["primary_admin"]),
+    ("junior_secondary_admin", ["junior_secondary_admin"]),
+    ("senior_secondary_admin", ["senior_secondary_admin"]),
+    ("teacher", ["teacher"]),
+    ("student", ["student"]),
+    ("parent", ["parent"]),
+]
+
+CACHE_NAMESPACE = "access_context"
+REQUEST_ATTR = "_access_context"
+
+
+def get_cache_ttl():
+    return getattr(settings, "ACCESS_CONTEXT_CACHE_TTL", 60)
+
+
+class AccessContext:
+    """
+    Role and scope of one user.
+
+    ``section_ids`` is ``None`` when the user sees every section;
+    ``classroom_ids`` are the teacher's assigned classrooms or the student's
+    active enrollments.
+    """
+
+    def __init__(
+        self,
+        user_id=None,
+        username="",
+        role=None,
+        is_superuser=False,
+        education_levels=(),
+        section_ids=(),
+        classroom_ids=(),
+    ):
+        self.user_id = user_id
+        self.username = username
+        self.role = role
+        self.is_superuser = is_superuser
+        self.education_levels = list(education_levels)
+        self.section_ids = None if section_ids is None else list(section_ids)
+        self.classroom_ids = list(classroom_ids)
+
+    @property
+    def has_full_access(self):
+        return self.is_superuser or self.role in FULL_ACCESS_ROLES
+
+    def __repr__(self):
+        return (
+            f"AccessContext(user={self.username!r}, role={self.role!r}, "
+            f"levels={self.education_levels})"
+        )
+
+
+def resolve_role(user):
+    """Role name of a user in lowercase, or None"""
+    if user.is_superuser:
+        return "superadmin"
+
+    role = getattr(user, "role", None)
+    if role and isinstance(role, str):
+        return role.lower()
+
+    # Legacy role assignment relationship
+    userrole = getattr(user, "userrole", None)
+    if userrole is not None:
+        role_names = [role.name.lower() for role in userrole.roles.all()]
+        for resolved, names in ROLE_PRIORITY:
+            if any(name in role_names for name in names):
+                return resolved
+        if role_names:
+            return role_names[0]
+
+    return None
+
+
+def build_access_context(user):
+    """Resolve a user's access from the database"""
+    from classroom.models import Classroom, Section, StudentEnrollment
+
+    role = resolve_role(user)
+    context = AccessContext(
+        user_id=user.pk,
+        username=user.username,
+        role=role,
+        is_superuser=user.is_superuser,
+    )
+
+    if context.has_full_access:
+        context.education_levels = list(ALL_EDUCATION_LEVELS)
+        context.section_ids = None
+
+    elif role in SECTION_ADMIN_LEVELS:
+        context.education_levels = list(SECTION_ADMIN_LEVELS[role])
+        context.section_ids = list(
+            Section.objects.filter(
+                grade_level__education_level__in=context.education_levels
+            )
+            .values_list("id", flat=True)
+            .distinct()
+        )
+
+    elif role == "teacher":
+        rows = (
+            Classroom.objects.filter(
+                Q(class_teacher__user_id=user.pk)
+                | Q(classroomteacherassignment__teacher__user_id=user.pk)
+            )
+            .values_list("id", "section_id", "section__grade_level__education_level")
+            .distinct()
+        )
+        classroom_ids, section_ids, levels = set(), set(), set()
+        for classroom_id, section_id, education_level in rows:
+            classroom_ids.add(classroom_id)
+            section_ids.add(section_id)
+            if education_level:
+                levels.add(education_level)
+        context.classroom_ids = sorted(classroom_ids)
+        context.section_ids = sorted(section_ids)
+        context.education_levels = sorted(levels)
+
+    elif role == "student":
+        context.classroom_ids = list(
+            StudentEnrollment.objects.filter(
+                student__user_id=user.pk, is_active=True
+            ).values_list("classroom_id", flat=True)
+        )
+
+    logger.info(f"🔐 Access resolved for {user.username}: {context}")
+    return context
+
+
+def _user_namespace(user_id):
+    return f"{CACHE_NAMESPACE}:user:{user_id}"
+
+
+def access_cache_key(user):
+    """Cache key of a user's AccessContext; changes with their role or section"""
+    return make_key(
+        CACHE_NAMESPACE,
+        user.pk,
+        namespace_version(_user_namespace(user.pk)),
+        getattr(user, "role", None),
+        getattr(user, "section", None),
+        user.is_superuser,
+        getattr(user, "date_joined", None),
+    )
+
+
+def get_user_access_context(user):
+    """AccessContext of a user, from the cache when fresh"""
+    if not getattr(user, "is_authenticated", False):
+        return AccessContext()
+
+    return get_or_compute(
+        access_cache_key(user),
+        lambda: build_access_context(user),
+        get_cache_ttl(),
+        CACHE_NAMESPACE,
+    )
+
+
+def get_access_context(request):
+    """AccessContext of the request's user, resolved at most once per request"""
+    # DRF's Request wraps the Django request; memoize on the one both share
+    holder = getattr(request, "_request", request)
+    user = request.user
+    user_id = getattr(user, "pk", None)
+
+    memo = getattr(holder, REQUEST_ATTR, None)
+    if memo is not None and memo.user_id == user_id:
+        return memo
+
+    context = get_user_access_context(user)
+    setattr(holder, REQUEST_ATTR, context)
+    return context
+
+
+def invalidate_access_context(user_id=None):
+    """Forget one user's cached access, or everyone's when ``user_id`` is None"""
+    if user_id is None:
+        bump_namespace(CACHE_NAMESPACE)
+        return
+    bump_namespace(_user_namespace(user_id))
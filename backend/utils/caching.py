@@ -0,0 +1,210 @@
+# utils/caching.py
+"""
+Cache-aside helpers on the shared ``default`` cache.
+
+Every cached value lives under a namespace whose version is stored in the
+cache itself: ``make_key("class_stats", ...)`` yields
+``class_stats:v<version>:...`` and ``bump_namespace("class_stats")`` makes
+every key of the namespace unreachable at once (they expire on their own).
+A missing version key (never set, or evicted by a culling backend) is
+seeded from the clock rather than a constant, so it always starts above any
+version the namespace reached before and old entries never come back.
+
+``cached_query`` wraps a function in cache-aside with stampede protection:
+on a miss one caller takes a short-lived lock (``cache.add``) and computes
+the value while concurrent callers poll for it for up to
+``settings.CACHE_STAMPEDE_WAIT`` seconds instead of all hitting the
+database. The lock is only as good as the backend's ``add``: atomic on
+Redis, best-effort on the file and database caches (two processes can both
+compute the value; they just store the same thing twice). Hits, misses and
+lock waits are counted per namespace, per process, and reported by
+``get_cache_metrics()``.
+"""
+
+import functools
+import hashlib
+import logging
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT
+from django.db import models
+
+logger = logging.getLogger(__name__)
+
+MISSING = object()
+MAX_KEY_LENGTH = 200
+LOCK_POLL_INTERVAL = 0.05
+
+_metrics = Counter()
+_metrics_lock = threading.Lock()
+
+
+def get_lock_timeout():
+    return getattr(settings, "CACHE_LOCK_TIMEOUT", 30)
+
+
+def get_stampede_wait():
+    return getattr(settings, "CACHE_STAMPEDE_WAIT", 5)
+
+
+# ============================================================================
+# METRICS
+# ============================================================================
+
+
+def record(namespace, event):
+    with _metrics_lock:
+        _metrics[(namespace, event)] += 1
+
+
+def get_cache_metrics():
+    """Hits, misses, lock waits and hit rate per namespace (this process)"""
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+
+    metrics = {}
+    for (namespace, event), count in snapshot.items():
+        metrics.setdefault(namespace, {"hits": 0, "misses": 0, "waits": 0})
+        metrics[namespace][event] = count
+
+    for counts in metrics.values():
+        lookups = counts["hits"] + counts["misses"]
+        counts["hit_rate"] = round(counts["hits"] / lookups, 3) if lookups else None
+    return metrics
+
+
+def reset_cache_metrics():
+    with _metrics_lock:
+        _metrics.clear()
+
+
+# ============================================================================
+# KEYS AND NAMESPACES
+# ============================================================================
+
+
+def _version_key(namespace):
+    return f"{namespace}:version"
+
+
+def _seed_version():
+    # Microseconds since the epoch: more than a namespace can have been bumped
+    return time.time_ns() // 1000
+
+
+def namespace_version(namespace):
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        seed = _seed_version()
+        cache.add(_version_key(namespace), seed, None)
+        version = cache.get(_version_key(namespace), seed)
+    return version
+
+
+def bump_namespace(namespace):
+    """Invalidate every key of a namespace"""
+    try:
+        return cache.incr(_version_key(namespace))
+    except ValueError:
+        version = _seed_version()
+        cache.set(_version_key(namespace), version, None)
+        return version
+
+
+def _key_part(value):
+    if isinstance(value, models.Model):
+        return str(value.pk)
+    if isinstance(value, type) and issubclass(value, models.Model):
+        return value._meta.label_lower
+    if isinstance(value, (list, tuple, set, frozenset)):
+        values = sorted(value, key=str) if isinstance(value, (set, frozenset)) else value
+        return ",".join(_key_part(v) for v in values)
+    return str(value)
+
+
+def make_key(namespace, *parts):
+    """Versioned key of a namespace; long keys are hashed"""
+    suffix = ":".join(_key_part(part) for part in parts)
+    if len(suffix) > MAX_KEY_LENGTH or any(c.isspace() for c in suffix):
+        suffix = hashlib.sha1(suffix.encode()).hexdigest()
+    return f"{namespace}:v{namespace_version(namespace)}:{suffix}"
+
+
+# ============================================================================
+# CACHE-ASIDE
+# ============================================================================
+
+
+def get_or_compute(key, compute, timeout=DEFAULT_TIMEOUT, namespace="default"):
+    """Cached value of ``key``, computing it once on a miss"""
+    value = cache.get(key, MISSING)
+    if value is not MISSING:
+        record(namespace, "hits")
+        return value
+
+    record(namespace, "misses")
+    lock_key = f"{key}:lock"
+    if not cache.add(lock_key, 1, get_lock_timeout()):
+        # Someone else is computing it; wait for their result
+        record(namespace, "waits")
+        deadline = time.monotonic() + get_stampede_wait()
+        while time.monotonic() < deadline:
+            time.sleep(LOCK_POLL_INTERVAL)
+            value = cache.get(key, MISSING)
+            if value is not MISSING:
+                return value
+        logger.warning(f"⏳ Gave up waiting for cache key {key}, computing it")
+        return compute()
+
+    try:
+        value = compute()
+        cache.set(key, value, timeout)
+    finally:
+        cache.delete(lock_key)
+    return value
+
+
+def cached_query(namespace, timeout=DEFAULT_TIMEOUT, key=None):
+    """
+    Cache a function's result under ``namespace``.
+
+    The key is built from the function name and its arguments (model
+    instances by pk, model classes by label), or from ``key(*args, **kwargs)``
+    when given. The wrapper gets ``invalidate(*args, **kwargs)`` to drop one
+    result and ``invalidate_all()`` to drop the namespace.
+    """
+
+    def decorator(func):
+        def build_key(*args, **kwargs):
+            if key is not None:
+                parts = key(*args, **kwargs)
+                if not isinstance(parts, (list, tuple)):
+                    parts = (parts,)
+            else:
+                parts = (
+                    *args,
+                    *(f"{k}={_key_part(v)}" for k, v in sorted(kwargs.items())),
+                )
+            return make_key(namespace, func.__name__, *parts)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return get_or_compute(
+                build_key(*args, **kwargs),
+                lambda: func(*args, **kwargs),
+                timeout,
+                namespace,
+            )
+
+        wrapper.make_key = build_key
+        wrapper.invalidate = lambda *args, **kwargs: cache.delete(
+            build_key(*args, **kwargs)
+        )
+        wrapper.invalidate_all = lambda: bump_namespace(namespace)
+        return wrapper
+
+    return decorator
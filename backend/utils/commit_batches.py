@@ -0,0 +1,94 @@
+# utils/commit_batches.py
+"""
+Work collected during a transaction and run once when it commits.
+
+Signal handlers that maintain derived data (result positions, attendance
+rollups, student dashboard snapshots) only mark what a write made stale. A
+``CommitBatchScheduler`` keeps one open ``CommitBatch`` per thread and
+transaction: the first addition registers the batch's ``commit`` with
+``transaction.on_commit`` and later additions join it, so any number of
+saves in one transaction cause a single run after it commits. Outside a
+transaction ``on_commit`` runs at once, so every addition runs by itself.
+"""
+
+import logging
+import threading
+
+from django.db import transaction
+
+
+class CommitBatch:
+    """
+    What one transaction made stale; subclasses implement ``add`` and ``run``.
+
+    With ``error_message`` set, ``commit`` logs a failing run instead of
+    raising it: stale derived data must never break the write that caused it.
+    """
+
+    error_message = None
+
+    def __init__(self):
+        self.done = False
+
+    def add(self, *args, **kwargs):
+        raise NotImplementedError
+
+    def run(self):
+        raise NotImplementedError
+
+    def commit(self):
+        """on_commit callback; runs the batch at most once"""
+        if self.done:
+            return
+        self.done = True
+        try:
+            self.run()
+        except Exception as e:
+            if self.error_message is None:
+                raise
+            logging.getLogger(type(self).__module__).error(
+                f"❌ {self.error_message}: {e}", exc_info=True
+            )
+
+
+class CommitBatchScheduler:
+    """Thread-local collector of one ``batch_class`` batch per transaction"""
+
+    batch_class = CommitBatch
+
+    def __init__(self, batch_class=None, using=None):
+        if batch_class is not None:
+            self.batch_class = batch_class
+        self.using = using
+        self._local = threading.local()
+
+    def new_batch(self):
+        return self.batch_class()
+
+    def current(self):
+        """The batch of this thread's transaction still waiting to run, or None"""
+        batch = getattr(self._local, "batch", None)
+        if batch is None or batch.done:
+            return None
+        # A rolled back transaction silently drops its on_commit callbacks, so
+        # a batch is only reusable while its callback is still pending
+        connection = transaction.get_connection(self.using)
+        if not any(
+            getattr(func, "__self__", None) is batch
+            for _, func, _ in connection.run_on_commit
+        ):
+            return None
+        return batch
+
+    def add(self, *args, **kwargs):
+        """Add to the current batch, opening one for the transaction if needed"""
+        batch = self.current()
+        if batch is not None:
+            batch.add(*args, **kwargs)
+            return batch
+
+        batch = self.new_batch()
+        batch.add(*args, **kwargs)
+        self._local.batch = batch
+        transaction.on_commit(batch.commit, using=self.using)
+        return batch
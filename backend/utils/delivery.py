@@ -0,0 +1,173 @@
+# utils/delivery.py
+"""
+Pooled outbound email/SMS delivery.
+
+Bulk senders (fee reminders, bulk messages) used to call ``send_mail`` or
+build a Twilio client once per message. Here each worker of a channel
+opens one sender - one email backend connection, or one Twilio ``Client``
+- and sends all of its share of the messages through it, while a
+``RateLimiter`` shared by the channel's workers keeps the total under the
+provider's messages-per-second limit.
+
+``deliver(channel, messages, workers, rate)`` takes objects with
+``subject``, ``body`` and ``address`` attributes and records the outcome
+on each of them (``delivered``, ``error``, ``external_id``,
+``delivered_at``); saving the outcome is left to the caller, in bulk.
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.utils import timezone
+
+EMAIL = "EMAIL"
+SMS = "SMS"
+
+
+class RateLimiter:
+    """Spaces calls to ``wait`` at least ``1 / rate`` seconds apart"""
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_slot = 0
+        self.lock = threading.Lock()
+
+    def wait(self):
+        if not self.interval:
+            return
+        with self.lock:
+            now = time.monotonic()
+            slot = max(now, self.next_slot)
+            self.next_slot = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class EmailSender:
+    """One open email backend connection for a worker's messages"""
+
+    @staticmethod
+    def configure():
+        return None
+
+    def __init__(self, config):
+        self.connection = get_connection(fail_silently=False)
+
+    def __enter__(self):
+        self.connection.open()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.connection.close()
+
+    def send(self, message):
+        sent = self.connection.send_messages(
+            [
+                EmailMessage(
+                    subject=message.subject,
+                    body=message.body,
+                    from_email=settings.DEFAULT_FROM_EMAIL,
+                    to=[message.address],
+                    connection=self.connection,
+                )
+            ]
+        )
+        if not sent:
+            raise RuntimeError("Email backend did not send the message")
+        return None
+
+
+class SMSSender:
+    """One Twilio client for a worker's messages"""
+
+    @staticmethod
+    def configure():
+        """Read in the dispatching thread, so workers never query the DB"""
+        from schoolSettings.models import CommunicationSettings
+
+        comm_settings = CommunicationSettings.objects.first()
+        if not comm_settings or not comm_settings.twilio_configured:
+            raise RuntimeError("Twilio is not configured")
+        return comm_settings
+
+    def __init__(self, config):
+        from twilio.rest import Client
+
+        self.from_number = config.twilio_phone_number
+        self.client = Client(config.twilio_account_sid, config.twilio_auth_token)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        pass
+
+    def send(self, message):
+        return self.client.messages.create(
+            body=message.body, from_=self.from_number, to=message.address
+        ).sid
+
+
+SENDERS = {EMAIL: EmailSender, SMS: SMSSender}
+
+
+def _fail(messages, error):
+    for message in messages:
+        message.delivered = False
+        message.error = str(error)
+
+
+def _send_share(channel, messages, config, limiter):
+    """One worker: one sender for its share of the messages"""
+    with ExitStack() as stack:
+        try:
+            # Opening the sender connects (SMTP); failing that fails the share
+            sender = stack.enter_context(SENDERS[channel](config))
+        except Exception as e:
+            _fail(messages, e)
+            return
+        for message in messages:
+            limiter.wait()
+            try:
+                message.external_id = sender.send(message)
+            except Exception as e:
+                message.delivered = False
+                message.error = str(e)
+            else:
+                message.delivered = True
+                message.error = None
+                message.delivered_at = timezone.now()
+
+
+def deliver(channel, messages, workers=1, rate=0, limiter=None):
+    """
+    Send ``messages`` over ``channel`` through up to ``workers`` pooled
+    senders at most ``rate`` per second (0 = unlimited); pass a shared
+    ``limiter`` to keep the rate across several calls
+    """
+    messages = list(messages)
+    if not messages:
+        return messages
+    try:
+        config = SENDERS[channel].configure()
+    except Exception as e:
+        _fail(messages, e)
+        return messages
+
+    limiter = limiter or RateLimiter(rate)
+    workers = max(1, min(int(workers), len(messages)))
+    if workers == 1:
+        _send_share(channel, messages, config, limiter)
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            list(
+                pool.map(
+                    lambda share: _send_share(channel, share, config, limiter),
+                    [messages[i::workers] for i in range(workers)],
+                )
+            )
+    return messages
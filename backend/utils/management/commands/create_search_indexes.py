@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from utils.search import create_trigram_indexes
+
+
+class Command(BaseCommand):
+    help = "Install pg_trgm and create the trigram indexes behind name search"
+
+    def handle(self, *args, **options):
+        created = create_trigram_indexes()
+        if not created:
+            self.stdout.write(
+                self.style.WARNING("⚠️ pg_trgm is not available on this database")
+            )
+            return
+        self.stdout.write(
+            self.style.SUCCESS(f"✅ Trigram indexes in place on {created} columns")
+        )
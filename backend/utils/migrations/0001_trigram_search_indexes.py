@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def create_indexes(apps, schema_editor):
+    from utils.search import create_trigram_indexes
+
+    create_trigram_indexes(schema_editor.connection, apps)
+
+
+def drop_indexes(apps, schema_editor):
+    from utils.search import drop_trigram_indexes
+
+    drop_trigram_indexes(schema_editor.connection, apps)
+
+
+class Migration(migrations.Migration):
+    """pg_trgm indexes for name search; skipped where pg_trgm is unavailable"""
+
+    dependencies = [
+        ("users", "0006_fix_admin_username"),
+        ("students", "0003_studentdashboardsnapshot"),
+        ("teacher", "0002_rename_academic_year_teacherschedule_academic_session_and_more"),
+        ("subject", "0002_education_levels_gin_index"),
+    ]
+
+    operations = [migrations.RunPython(create_indexes, drop_indexes)]
@@ -0,0 +1,354 @@
+# utils/pagination.py
+"""
+Keyset (cursor) pagination for list endpoints.
+
+Offset pagination pays for ``COUNT(*)`` and for every skipped row: page 400
+of a multi-year attendance table reads 20,000 rows to return 50.
+``KeysetPagination`` instead remembers where the last page ended - the
+values of its ordering columns - and asks for the rows after that position::
+
+    WHERE date <= '2024-03-01' AND (date < '2024-03-01' OR id < 81234)
+    ORDER BY date DESC, id DESC LIMIT 51
+
+With an index on the ordering columns each page costs the same however deep
+it is. Orderings always end with the primary key so positions are unique; a
+viewset declares its index-backed ordering as ``cursor_ordering``, otherwise
+its ``?ordering=`` or ``ordering`` is used (fields must be non-nullable).
+
+Totals are opt-in: ``?count=exact`` runs ``COUNT(*)``, ``?count=estimated``
+asks the PostgreSQL planner instead.
+
+Migration path for clients: a request paginates when it sends ``?limit=``
+or ``?cursor=`` (follow ``next``/``previous`` from there); other requests
+keep the endpoint's old behaviour (``legacy_pagination_class``, unpaginated
+by default) until ``settings.PAGINATION_ENFORCED`` is switched on.
+"""
+
+import base64
+import binascii
+import json
+import logging
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.filters import OrderingFilter
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+logger = logging.getLogger(__name__)
+
+COUNT_EXACT = "exact"
+COUNT_ESTIMATED = "estimated"
+
+
+def _encode_value(value):
+    if hasattr(value, "isoformat"):
+        # Full precision; DjangoJSONEncoder drops microseconds
+        return value.isoformat()
+    if isinstance(value, (int, float, str, bool)) or value is None:
+        return value
+    return str(value)
+
+
+class KeysetField:
+    """One column of a keyset ordering"""
+
+    def __init__(self, path, descending, field):
+        self.path = path
+        self.descending = descending
+        self.field = field
+
+    def order_by(self, reverse=False):
+        return f"-{self.path}" if self.descending != reverse else self.path
+
+    def value_from(self, obj):
+        *relations, last = self.path.split("__")
+        for name in relations:
+            obj = getattr(obj, name)
+        if last == "pk":
+            return obj.pk
+        return getattr(obj, self.field.attname)
+
+
+def resolve_keyset_ordering(model, ordering):
+    """KeysetFields of an ordering, or None if it can't be paginated by keyset"""
+    fields = []
+    for item in ordering:
+        if not isinstance(item, str) or item == "?":
+            return None
+
+        descending = item.startswith("-")
+        path = item.lstrip("-")
+        current = model
+        field = None
+        for name in path.split("__"):
+            try:
+                field = (
+                    current._meta.pk if name == "pk" else current._meta.get_field(name)
+                )
+            except FieldDoesNotExist:
+                return None
+            # NULLs have no position; reverse and many-valued relations repeat rows
+            if getattr(field, "null", True) or field.many_to_many or field.one_to_many:
+                return None
+            if field.is_relation:
+                current = field.related_model
+        fields.append(KeysetField(path, descending, field))
+
+    # A unique last column makes every position unambiguous
+    last = fields[-1] if fields else None
+    if last is None or "__" in last.path or not last.field.primary_key:
+        descending = fields[0].descending if fields else True
+        fields.append(KeysetField("pk", descending, model._meta.pk))
+    return fields
+
+
+class KeysetPagination(BasePagination):
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    count_query_param = "count"
+    ordering = ("-pk",)
+    legacy_pagination_class = None
+    invalid_cursor_message = "Invalid cursor"
+
+    def __init__(self):
+        self.legacy = None
+
+    def get_default_page_size(self):
+        return getattr(settings, "PAGINATION_PAGE_SIZE", 50)
+
+    def get_max_page_size(self):
+        return getattr(settings, "PAGINATION_MAX_PAGE_SIZE", 500)
+
+    def is_requested(self, request):
+        params = request.query_params
+        return (
+            getattr(settings, "PAGINATION_ENFORCED", False)
+            or self.cursor_query_param in params
+            or self.page_size_query_param in params
+        )
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.get_max_page_size(),
+            )
+        except (KeyError, ValueError):
+            return self.get_default_page_size()
+
+    # ------------------------------------------------------------------
+    # Ordering and cursors
+    # ------------------------------------------------------------------
+
+    def get_ordering(self, request, queryset, view):
+        """Keyset ordering of the request: ?ordering=, cursor_ordering, ordering"""
+        candidates = []
+        for backend in getattr(view, "filter_backends", []):
+            if isinstance(backend, type) and issubclass(backend, OrderingFilter):
+                ordering_filter = backend()
+                if request.query_params.get(ordering_filter.ordering_param):
+                    candidates.append(
+                        ordering_filter.get_ordering(request, queryset, view)
+                    )
+        candidates += [
+            getattr(view, "cursor_ordering", None),
+            getattr(view, "ordering", None),
+            self.ordering,
+        ]
+
+        for candidate in candidates:
+            if not candidate:
+                continue
+            if isinstance(candidate, str):
+                candidate = (candidate,)
+            fields = resolve_keyset_ordering(queryset.model, candidate)
+            if fields:
+                return fields
+            logger.debug(f"Ordering {candidate} can't be paginated by keyset")
+        return resolve_keyset_ordering(queryset.model, ("-pk",))
+
+    def encode_cursor(self, values, reverse=False):
+        payload = {"p": [_encode_value(value) for value in values]}
+        if reverse:
+            payload["r"] = 1
+        data = json.dumps(payload, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(data).decode().rstrip("=")
+
+    def decode_cursor(self, request, fields):
+        """(position, reverse) of the request's cursor, or (None, False)"""
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+
+        try:
+            data = base64.urlsafe_b64decode(encoded + "=" * (-len(encoded) % 4))
+            payload = json.loads(data)
+            values = payload["p"]
+            if len(values) != len(fields):
+                raise ValueError("cursor does not match the ordering")
+            position = [
+                field.field.to_python(value) for field, value in zip(fields, values)
+            ]
+        except (binascii.Error, ValueError, KeyError, TypeError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, bool(payload.get("r"))
+
+    def position_filter(self, fields, position, reverse=False):
+        """Rows strictly after ``position`` in (possibly reversed) order"""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(fields, position):
+            lookup = "lt" if field.descending != reverse else "gt"
+            condition |= equal & Q(**{f"{field.path}__{lookup}": value})
+            equal &= Q(**{field.path: value})
+
+        # Redundant, but lets the database start an index range scan
+        first = fields[0]
+        lookup = "lte" if first.descending != reverse else "gte"
+        return Q(**{f"{first.path}__{lookup}": position[0]}) & condition
+
+    # ------------------------------------------------------------------
+    # Counts
+    # ------------------------------------------------------------------
+
+    def get_count(self, queryset, request):
+        count_type = request.query_params.get(self.count_query_param)
+        if count_type == COUNT_ESTIMATED:
+            estimate = self.estimate_count(queryset)
+            if estimate is not None:
+                return estimate, COUNT_ESTIMATED
+            return queryset.count(), COUNT_EXACT
+        if count_type == COUNT_EXACT:
+            return queryset.count(), COUNT_EXACT
+        return None, None
+
+    def estimate_count(self, queryset):
+        """Row estimate of the query planner (PostgreSQL), or None"""
+        if connections[queryset.db].vendor != "postgresql":
+            return None
+        try:
+            plan = json.loads(queryset.order_by().explain(format="json"))
+            return int(plan[0]["Plan"]["Plan Rows"])
+        except Exception as e:
+            logger.warning(f"Could not estimate row count: {e}")
+            return None
+
+    # ------------------------------------------------------------------
+    # Pagination
+    # ------------------------------------------------------------------
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.legacy = None
+        if not self.is_requested(request):
+            if self.legacy_pagination_class is None:
+                return None
+            self.legacy = self.legacy_pagination_class()
+            return self.legacy.paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.fields = self.get_ordering(request, queryset, view)
+        self.count, self.count_type = self.get_count(queryset, request)
+
+        position, reverse = self.decode_cursor(request, self.fields)
+        queryset = queryset.order_by(*(f.order_by(reverse) for f in self.fields))
+        if position is not None:
+            queryset = queryset.filter(
+                self.position_filter(self.fields, position, reverse)
+            )
+
+        rows = list(queryset[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if reverse:
+            rows.reverse()
+            has_next, has_previous = True, has_more
+        else:
+            has_next, has_previous = has_more, position is not None
+
+        self.next_position = self._position_of(rows[-1]) if has_next and rows else None
+        self.previous_position = (
+            self._position_of(rows[0]) if has_previous and rows else None
+        )
+        if reverse and not rows:
+            # Paged back past the start; the first page follows
+            self.next_position = None
+        return rows
+
+    def _position_of(self, obj):
+        return [field.value_from(obj) for field in self.fields]
+
+    def _page_url(self, cursor):
+        # The total is only counted for the page that asked for it
+        url = remove_query_param(
+            self.request.build_absolute_uri(), self.count_query_param
+        )
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self._page_url(self.encode_cursor(self.next_position))
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self._page_url(self.encode_cursor(self.previous_position, reverse=True))
+
+    def get_paginated_response(self, data):
+        if self.legacy is not None:
+            return self.legacy.get_paginated_response(data)
+
+        payload = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+        }
+        if self.count is not None:
+            payload["count"] = self.count
+            payload["count_type"] = self.count_type
+        payload["results"] = data
+        return Response(payload)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "count": {"type": "integer"},
+                "count_type": {"type": "string", "enum": [COUNT_EXACT, COUNT_ESTIMATED]},
+                "results": schema,
+            },
+        }
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.cursor_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Position returned as next/previous",
+                "schema": {"type": "string"},
+            },
+            {
+                "name": self.page_size_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Rows per page",
+                "schema": {"type": "integer"},
+            },
+            {
+                "name": self.count_query_param,
+                "required": False,
+                "in": "query",
+                "description": "Include a total: exact or estimated",
+                "schema": {"type": "string", "enum": [COUNT_EXACT, COUNT_ESTIMATED]},
+            },
+        ]
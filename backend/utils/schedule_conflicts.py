@@ -0,0 +1,186 @@
+# utils/schedule_conflicts.py
+"""
+Overlap detection for weekly schedules (``ClassSchedule``, ``Timetable``,
+``TeacherSchedule``).
+
+Two entries conflict when they share a day and a resource - a teacher, a
+classroom, a section - and their times overlap (``start < other_end and
+end > other_start``; back-to-back lessons don't conflict). Checking each
+entry with its own overlap query costs O(n) queries and O(n²) work.
+
+``ConflictRules`` loads the entries once, groups them by (resource, day,
+value) and sweeps each group in start order, keeping the entries still
+running in a heap ordered by end time: every entry overlaps exactly the
+entries left in the heap when it starts. That is O(n log n + conflicts).
+
+The same rules validate new entries before they are inserted:
+``ScheduleConflictSerializerMixin`` checks a single create/update against
+the stored schedule and ``ScheduleConflictListSerializer`` checks a whole
+bulk create - against the stored schedule and against itself - with one
+query.
+"""
+
+import copy
+import heapq
+from collections import defaultdict, namedtuple
+from functools import reduce
+from operator import attrgetter, or_
+
+from django.db.models import Q
+from rest_framework import serializers
+
+Conflict = namedtuple("Conflict", ["resource", "first", "second"])
+
+
+def overlapping_pairs(
+    entries, start=attrgetter("start_time"), end=attrgetter("end_time")
+):
+    """(earlier, later) pairs of entries whose time ranges overlap"""
+    running = []  # (end, order, entry) of the entries started so far
+    for order, entry in enumerate(sorted(entries, key=start)):
+        entry_start = start(entry)
+        while running and running[0][0] <= entry_start:
+            heapq.heappop(running)
+        for _, _, other in running:
+            yield other, entry
+        heapq.heappush(running, (end(entry), order, entry))
+
+
+class ConflictRules:
+    """
+    Which entries of a schedule model may not overlap.
+
+    ``resources`` maps a resource name to the field that identifies it
+    (``{"teacher": "teacher_id"}``); ``scope`` fields must also be equal for
+    entries to conflict (e.g. academic session and term); only entries
+    matching ``active`` are considered.
+    """
+
+    def __init__(self, day_field, resources, scope=(), active=None):
+        self.day_field = day_field
+        self.resources = resources
+        self.scope = tuple(scope)
+        self.active = active or {}
+
+    def _is_active(self, entry):
+        return all(
+            getattr(entry, field) == value for field, value in self.active.items()
+        )
+
+    def find(self, entries):
+        """Every conflicting pair among ``entries``"""
+        groups = defaultdict(list)
+        for entry in entries:
+            if not self._is_active(entry):
+                continue
+            shared = tuple(
+                getattr(entry, field) for field in (self.day_field, *self.scope)
+            )
+            for resource, field in self.resources.items():
+                value = getattr(entry, field)
+                if value is not None:
+                    groups[(resource, shared, value)].append(entry)
+
+        conflicts = []
+        for (resource, _, _), group in groups.items():
+            if len(group) > 1:
+                conflicts.extend(
+                    Conflict(resource, first, second)
+                    for first, second in overlapping_pairs(group)
+                )
+        return conflicts
+
+    def find_new(self, entries, queryset):
+        """
+        Conflicts of ``entries`` (unsaved, or edited copies of saved rows)
+        with each other and with the rows of ``queryset``, in one query
+        """
+        entries = [entry for entry in entries if self._is_active(entry)]
+        if not entries:
+            return []
+
+        resource_filter = reduce(
+            or_,
+            (
+                Q(**{f"{field}__in": {getattr(e, field) for e in entries}})
+                for field in self.resources.values()
+            ),
+        )
+        days = {getattr(entry, self.day_field) for entry in entries}
+        stored = (
+            queryset.filter(**self.active)
+            .filter(**{f"{self.day_field}__in": days})
+            .filter(resource_filter)
+            .exclude(pk__in=[entry.pk for entry in entries if entry.pk is not None])
+            .order_by()
+        )
+
+        new = {id(entry) for entry in entries}
+        return [
+            conflict
+            for conflict in self.find([*stored, *entries])
+            if id(conflict.first) in new or id(conflict.second) in new
+        ]
+
+    def describe(self, conflict):
+        _, first, second = conflict
+        day = getattr(first, self.day_field)
+        return (
+            f"{conflict.resource.capitalize()} conflict on {day}: "
+            f"{_label(first)} {first.start_time}-{first.end_time} overlaps "
+            f"{_label(second)} {second.start_time}-{second.end_time}"
+        )
+
+
+def _label(entry):
+    return f"entry {entry.pk}" if entry.pk is not None else "new entry"
+
+
+# ============================================================================
+# SERIALIZERS
+# ============================================================================
+
+
+class ScheduleConflictListSerializer(serializers.ListSerializer):
+    """Bulk creates are checked for conflicts together, before any insert"""
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        model = self.child.Meta.model
+        entries = [model(**item) for item in attrs]
+        self.child.raise_conflicts(entries)
+        return attrs
+
+
+class ScheduleConflictSerializerMixin:
+    """
+    Rejects creates and updates that overlap the stored schedule according
+    to the serializer's ``conflict_rules``; set
+    ``Meta.list_serializer_class = ScheduleConflictListSerializer`` so bulk
+    creates are checked as a whole.
+    """
+
+    conflict_rules = None
+
+    def raise_conflicts(self, entries):
+        conflicts = self.conflict_rules.find_new(
+            entries, self.Meta.model._default_manager.all()
+        )
+        if conflicts:
+            raise serializers.ValidationError(
+                [self.conflict_rules.describe(conflict) for conflict in conflicts]
+            )
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        if isinstance(self.parent, ScheduleConflictListSerializer):
+            return attrs  # checked with the rest of the list
+
+        if self.instance is not None:
+            entry = copy.copy(self.instance)
+            for field, value in attrs.items():
+                setattr(entry, field, value)
+        else:
+            entry = self.Meta.model(**attrs)
+        self.raise_conflicts([entry])
+        return attrs
@@ -0,0 +1,272 @@
+# utils/search.py
+"""
+Indexed type-ahead search.
+
+Name searches - the DRF ``SearchFilter`` on the student, result and
+attendance viewsets, ``ParentViewSet.search``, ``TeacherViewSet``'s
+``?search=``, ``SubjectViewSet.search_suggestions`` - are ``icontains``
+lookups, which Postgres runs as ``UPPER(col::text) LIKE UPPER('%term%')``:
+a sequential scan, joined through ``student__user`` row by row. A
+``pg_trgm`` GIN index on ``UPPER(col)`` answers exactly that predicate, so
+those lookups become index scans without changing them:
+
+* ``TRIGRAM_INDEXES`` lists the indexed columns. The ``utils`` migration
+  ``0001_trigram_search_indexes`` creates the extension and the indexes
+  where ``pg_trgm`` is available; ``python manage.py
+  create_search_indexes`` does it again later (e.g. once the extension has
+  been installed on the server);
+* ``search(queryset, fields, term)`` filters with one ``icontains`` per
+  word of the term (so "ada obi" finds Ada Obi) and ranks the matches for
+  type-ahead: prefix matches first, then by ``pg_trgm`` word similarity;
+* ``SEARCH_ENTITIES`` and ``search_entities`` back the unified
+  ``/api/search/`` endpoint (``utils.views.UnifiedSearchView``), which
+  section-filters each entity the way its viewset does.
+
+Without ``pg_trgm`` (SQLite, or a server without the extension such as a
+bare test database) the same lookups run unindexed and the ranking falls
+back to prefix matches first, then name order.
+"""
+
+import logging
+from functools import reduce
+from operator import or_
+
+from django.apps import apps as django_apps
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Case, FloatField, Q, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+logger = logging.getLogger(__name__)
+
+SEARCH_MIN_LENGTH = 2
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 50
+
+# Columns with a trigram index, by model
+TRIGRAM_INDEXES = {
+    "users.CustomUser": ["first_name", "last_name", "username", "email"],
+    "students.Student": ["registration_number"],
+    "teacher.Teacher": ["employee_id"],
+    "subject.Subject": ["name", "short_name", "code"],
+}
+
+# Database alias -> whether pg_trgm is installed
+_trigram_installed = {}
+
+
+def trigram_enabled(using=DEFAULT_DB_ALIAS):
+    """Whether ``using`` is Postgres with the pg_trgm extension installed"""
+    if using not in _trigram_installed:
+        connection = connections[using]
+        installed = False
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                installed = cursor.fetchone() is not None
+        _trigram_installed[using] = installed
+    return _trigram_installed[using]
+
+
+def create_trigram_indexes(connection=None, apps=None):
+    """
+    Install pg_trgm and create ``TRIGRAM_INDEXES``; returns the number of
+    indexed columns, 0 when the database can't have them
+    """
+    connection = connection or connections[DEFAULT_DB_ALIAS]
+    apps = apps or django_apps
+    if connection.vendor != "postgresql":
+        return 0
+
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT 1 FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        if cursor.fetchone() is None:
+            logger.warning("⚠️ pg_trgm is not available, search stays unindexed")
+            return 0
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+        created = 0
+        quote = connection.ops.quote_name
+        for label, field_names in TRIGRAM_INDEXES.items():
+            model = apps.get_model(label)
+            table = model._meta.db_table
+            for field_name in field_names:
+                column = model._meta.get_field(field_name).column
+                index = quote(trigram_index_name(table, column))
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index} ON {quote(table)} "
+                    f"USING gin (UPPER({quote(column)}) gin_trgm_ops)"
+                )
+                created += 1
+
+    _trigram_installed.pop(connection.alias, None)
+    return created
+
+
+def drop_trigram_indexes(connection=None, apps=None):
+    connection = connection or connections[DEFAULT_DB_ALIAS]
+    apps = apps or django_apps
+    if connection.vendor != "postgresql":
+        return
+    with connection.cursor() as cursor:
+        for label, field_names in TRIGRAM_INDEXES.items():
+            model = apps.get_model(label)
+            table = model._meta.db_table
+            for field_name in field_names:
+                column = model._meta.get_field(field_name).column
+                cursor.execute(
+                    "DROP INDEX IF EXISTS "
+                    f"{connection.ops.quote_name(trigram_index_name(table, column))}"
+                )
+
+
+def trigram_index_name(table, column):
+    # Postgres truncates identifiers at 63 characters
+    return f"{table}_{column}_trgm"[-63:]
+
+
+# ============================================================================
+# RANKED SEARCH
+# ============================================================================
+
+
+def search(queryset, fields, term):
+    """
+    Rows of ``queryset`` where every word of ``term`` is in one of
+    ``fields``, annotated with ``search_rank`` and ordered best first
+    """
+    words = term.split()
+    if not words:
+        return queryset.none()
+    queryset = queryset.filter(
+        *(
+            reduce(or_, (Q(**{f"{field}__icontains": word}) for field in fields))
+            for word in words
+        )
+    )
+
+    prefix = reduce(
+        or_, (Q(**{f"{field}__istartswith": words[0]}) for field in fields)
+    )
+    rank = Case(
+        When(prefix, then=Value(1.0)), default=Value(0.0), output_field=FloatField()
+    )
+    if trigram_enabled(queryset.db):
+        from django.contrib.postgres.search import TrigramWordSimilarity
+
+        similarities = [TrigramWordSimilarity(term, field) for field in fields]
+        similarity = (
+            Greatest(*similarities) if len(similarities) > 1 else similarities[0]
+        )
+        rank = rank + Coalesce(similarity, Value(0.0), output_field=FloatField())
+
+    return queryset.annotate(search_rank=rank).order_by("-search_rank", fields[0], "pk")
+
+
+class SearchEntity:
+    """One kind of result of the unified search"""
+
+    def __init__(self, label, fields, related=(), active_filter=None):
+        self.label = label
+        self.fields = fields
+        self.related = related
+        self.active_filter = active_filter or {}
+
+    @property
+    def model(self):
+        return django_apps.get_model(self.label)
+
+    def queryset(self):
+        return self.model.objects.filter(**self.active_filter).select_related(
+            *self.related
+        )
+
+    def describe(self, obj):
+        """(title, detail) shown for a result"""
+        raise NotImplementedError
+
+
+class StudentSearch(SearchEntity):
+    def describe(self, student):
+        return (
+            student.user.full_name,
+            " · ".join(
+                filter(
+                    None,
+                    [student.get_student_class_display(), student.registration_number],
+                )
+            ),
+        )
+
+
+class TeacherSearch(SearchEntity):
+    def describe(self, teacher):
+        return teacher.user.full_name, teacher.employee_id
+
+
+class ParentSearch(SearchEntity):
+    def describe(self, parent):
+        return parent.user.full_name, parent.user.email
+
+
+class SubjectSearch(SearchEntity):
+    def describe(self, subject):
+        return subject.short_name or subject.name, subject.code
+
+
+SEARCH_ENTITIES = {
+    "student": StudentSearch(
+        "students.Student",
+        [
+            "user__first_name",
+            "user__last_name",
+            "registration_number",
+            "user__username",
+        ],
+        related=["user"],
+        active_filter={"is_active": True},
+    ),
+    "teacher": TeacherSearch(
+        "teacher.Teacher",
+        ["user__first_name", "user__last_name", "employee_id"],
+        related=["user"],
+        active_filter={"is_active": True},
+    ),
+    "parent": ParentSearch(
+        "parent.ParentProfile",
+        ["user__first_name", "user__last_name", "user__username", "user__email"],
+        related=["user"],
+        active_filter={"user__is_active": True},
+    ),
+    "subject": SubjectSearch(
+        "subject.Subject",
+        ["name", "short_name", "code"],
+        active_filter={"is_active": True},
+    ),
+}
+
+
+def search_entities(term, types=None, limit=DEFAULT_LIMIT, restrict=None):
+    """
+    The best ``limit`` matches of ``term`` across ``types`` (all when None),
+    as dicts best first; ``restrict(queryset)`` applies section access
+    """
+    results = []
+    for kind in types or SEARCH_ENTITIES:
+        entity = SEARCH_ENTITIES[kind]
+        queryset = entity.queryset()
+        if restrict is not None:
+            queryset = restrict(queryset)
+        for obj in search(queryset, entity.fields, term)[:limit]:
+            title, detail = entity.describe(obj)
+            results.append(
+                {
+                    "type": kind,
+                    "id": obj.pk,
+                    "title": title,
+                    "detail": detail,
+                    "rank": round(obj.search_rank, 4),
+                }
+            )
+    # Stable: equal ranks keep each entity's own order
+    results.sort(key=lambda result: -result["rank"])
+    return results[:limit]
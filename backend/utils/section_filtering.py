@@ -893,6 +893,7 @@
 
 from django.db.models import Q
 from classroom.models import Section
+from .access_context import get_access_context
 import logging
 
 logger = logging.getLogger(__name__)
@@ -903,267 +904,58 @@ class SectionFilterMixin:
     Enhanced mixin to automatically filter querysets based on user's section and role.
     """
 
+    def get_access_context(self):
+        """Role and scope of the current user, resolved once per request"""
+        return get_access_context(self.request)
+
     def get_user_role(self):
         """
         Helper method to get user's role from various possible sources.
         Returns role name as string in lowercase.
         """
-        user = self.request.user
-
-        # 🔥 FIX: Refresh user from database to get all attributes
-        # This is needed because request.user might be a SimpleLazyObject
-        if hasattr(user, "_wrapped"):
-            # It's a SimpleLazyObject, force evaluation
-            user = user._wrapped
-
-        # If user has an ID, refresh from database to ensure we have all fields
-        if hasattr(user, "id") and user.id:
-            from users.models import CustomUser
-
-            try:
-                user = CustomUser.objects.get(id=user.id)
-            except CustomUser.DoesNotExist:
-                logger.warning(f"⚠️ User {user.username} not found in database")
-                return None
-
-        # Check if superuser first
-        if user.is_superuser:
-            logger.info(f"✅ User {user.username} is superuser")
-            return "superadmin"
-
-        # Check for role attribute directly on user
-        if hasattr(user, "role") and user.role and isinstance(user.role, str):
-            role = user.role.lower()
-            logger.info(f"📋 User {user.username} has role: {role}")
-            return role
-
-        # Check for userrole relationship (many-to-many)
-        if hasattr(user, "userrole"):
-            roles = user.userrole.roles.all()
-            if roles.exists():
-                # Return the highest priority role
-                role_names = [role.name.lower() for role in roles]
-
-                # Priority order
-                if "super_admin" in role_names or "superadmin" in role_names:
-                    return "superadmin"
-                if "admin" in role_names or "principal" in role_names:
-                    return "admin"
-                if "secondary_admin" in role_names:
-                    return "secondary_admin"
-                if "nursery_admin" in role_names:
-                    return "nursery_admin"
-                if "primary_admin" in role_names:
-                    return "primary_admin"
-                if "junior_secondary_admin" in role_names:
-                    return "junior_secondary_admin"
-                if "senior_secondary_admin" in role_names:
-                    return "senior_secondary_admin"
-                if "teacher" in role_names:
-                    return "teacher"
-                if "student" in role_names:
-                    return "student"
-                if "parent" in role_names:
-                    return "parent"
-
-                # Return first role if no priority match
-                return role_names[0] if role_names else None
-
-        logger.warning(f"⚠️ No role found for user {user.username}")
-        return None
+        return self.get_access_context().role
 
     def get_user_section_access(self):
         """
         Returns the sections the current user has access to based on their role.
         """
-        user = self.request.user
-        role = self.get_user_role()
-
-        logger.info(f"🔍 Getting section access for {user.username} with role: {role}")
+        access = self.get_access_context()
 
-        # Super Admin sees everything
-        if role == "superadmin" or user.is_superuser:
-            logger.info("✅ Super admin access - returning all sections")
+        if access.section_ids is None:
             return Section.objects.all()
 
-        # Admin/Principal sees everything
-        if role in ["admin", "principal"]:
-            logger.info("✅ Admin access - returning all sections")
-            return Section.objects.all()
-
-        # Secondary Admin sees both JSS and SSS
-        if role == "secondary_admin":
-            logger.info("🔒 Secondary admin access")
-            return Section.objects.filter(
-                grade_level__education_level__in=[
-                    "JUNIOR_SECONDARY",
-                    "SENIOR_SECONDARY",
-                ]
-            ).distinct()
-
-        # Section-specific admins
-        if role in [
-            "nursery_admin",
-            "primary_admin",
-            "junior_secondary_admin",
-            "senior_secondary_admin",
-        ]:
-            role_to_education_level = {
-                "nursery_admin": "NURSERY",
-                "primary_admin": "PRIMARY",
-                "junior_secondary_admin": "JUNIOR_SECONDARY",
-                "senior_secondary_admin": "SENIOR_SECONDARY",
-            }
-            edu_level = role_to_education_level.get(role)
-            if edu_level:
-                logger.info(f"🔒 Section admin access for {edu_level}")
-                return Section.objects.filter(
-                    grade_level__education_level=edu_level
-                ).distinct()
-
-        # Teachers see sections of their assigned classrooms
-        if role == "teacher":
-            try:
-                from teacher.models import Teacher
-                from classroom.models import Classroom
-
-                teacher = Teacher.objects.get(user=user)
-
-                assigned_classrooms = Classroom.objects.filter(
-                    Q(class_teacher=teacher)
-                    | Q(classroomteacherassignment__teacher=teacher)
-                ).distinct()
-
-                section_ids = assigned_classrooms.values_list(
-                    "section_id", flat=True
-                ).distinct()
-
-                sections = Section.objects.filter(id__in=section_ids)
-                logger.info(f"🔒 Teacher access - {sections.count()} sections")
-                return sections
-            except Exception as e:
-                logger.error(f"Error getting teacher sections: {str(e)}")
-                return Section.objects.none()
-
-        # Students see only their section
-        if role == "student":
-            try:
-                from students.models import Student
-
-                student = Student.objects.get(user=user)
-                if hasattr(student, "current_classroom") and student.current_classroom:
-                    return Section.objects.filter(
-                        id=student.current_classroom.section_id
-                    )
-            except Exception as e:
-                logger.error(f"Error getting student sections: {str(e)}")
-
-        logger.warning(f"⚠️ No section access for user {user.username} with role {role}")
-        return Section.objects.none()
+        if not access.section_ids:
+            logger.warning(
+                f"⚠️ No section access for user {access.username} with role {access.role}"
+            )
+        return Section.objects.filter(id__in=access.section_ids)
 
     def get_user_education_level_access(self):
         """
         Returns the specific education levels the user has access to.
         More granular than section access.
         """
-        user = self.request.user
-        role = self.get_user_role()
-
-        logger.info(
-            f"🎓 Getting education level access for {user.username} with role: {role}"
-        )
-
-        # Super Admin sees everything
-        if role == "superadmin" or user.is_superuser:
-            logger.info("✅ Super admin - all education levels")
-            return ["NURSERY", "PRIMARY", "JUNIOR_SECONDARY", "SENIOR_SECONDARY"]
-
-        # General Admin/Principal sees everything
-        if role in ["admin", "principal"]:
-            logger.info("✅ Admin/Principal - all education levels")
-            return ["NURSERY", "PRIMARY", "JUNIOR_SECONDARY", "SENIOR_SECONDARY"]
-
-        # Secondary Admin sees both JSS and SSS
-        if role == "secondary_admin":
-            logger.info("🔒 Secondary admin - JSS and SSS only")
-            return ["JUNIOR_SECONDARY", "SENIOR_SECONDARY"]
-
-        # Section-specific admins - THIS IS THE KEY FIX
-        section_admin_mapping = {
-            "nursery_admin": ["NURSERY"],
-            "primary_admin": ["PRIMARY"],
-            "junior_secondary_admin": ["JUNIOR_SECONDARY"],
-            "senior_secondary_admin": ["SENIOR_SECONDARY"],
-        }
-
-        if role in section_admin_mapping:
-            levels = section_admin_mapping[role]
-            logger.info(f"🔒 Section admin '{role}' - restricted to: {levels}")
-            return levels
-
-        # For teachers, get from their assigned classrooms/subjects
-        if role == "teacher":
-            try:
-                from teacher.models import Teacher
-                from classroom.models import Classroom
-
-                teacher = Teacher.objects.get(user=user)
-
-                # Get education levels from assigned classrooms via section
-                assigned_classrooms = Classroom.objects.filter(
-                    Q(class_teacher=teacher)
-                    | Q(classroomteacherassignment__teacher=teacher)
-                ).select_related("section__grade_level")
-
-                # Get education levels through section -> grade_level
-                education_levels = set()
-                for classroom in assigned_classrooms:
-                    if classroom.section and classroom.section.grade_level:
-                        education_levels.add(
-                            classroom.section.grade_level.education_level
-                        )
-
-                levels = list(education_levels)
-                logger.info(f"🔒 Teacher education level access: {levels}")
-                return levels
-
-            except Exception as e:
-                logger.error(f"Error getting teacher education levels: {str(e)}")
-                return []
-
-        logger.warning(f"⚠️ No education level access for user {user.username}")
-        return []
+        return list(self.get_access_context().education_levels)
 
     def apply_section_filters(self, queryset):
         """
         🔥 Automatically apply section-based filtering to any queryset.
         This is the core method that enforces section restrictions.
         """
-        user = self.request.user
-        role = self.get_user_role()
+        access = self.get_access_context()
 
         # Get the model name to determine how to filter
         model_name = queryset.model.__name__
 
-        logger.info(
-            f"🔍 Applying filters for {user.username} (role: {role}) on {model_name}"
-        )
-
-        # Super admins see everything - NO FILTERING
-        if role == "superadmin" or user.is_superuser:
-            logger.info(f"✅ Super admin - no filtering on {model_name}")
-            return queryset
-
-        # General admins/principals see everything - NO FILTERING
-        if role in ["admin", "principal"]:
-            logger.info(f"✅ Admin/Principal - no filtering on {model_name}")
+        # Super admins, general admins and principals see everything
+        if access.has_full_access:
             return queryset
 
         # Get user's allowed education levels
-        allowed_education_levels = self.get_user_education_level_access()
+        allowed_education_levels = access.education_levels
 
         if not allowed_education_levels:
-            logger.warning(f"❌ No education level access for {user.username}")
+            logger.warning(f"❌ No education level access for {access.username}")
             return queryset.none()
 
         logger.info(f"🔒 Restricting {model_name} to: {allowed_education_levels}")
@@ -1173,9 +965,6 @@ class SectionFilterMixin:
             # STUDENT MODELS
             if model_name == "Student":
                 filtered = queryset.filter(education_level__in=allowed_education_levels)
-                logger.info(
-                    f"✅ Filtered Students: {filtered.count()} of {queryset.count()}"
-                )
                 return filtered
 
             # CLASSROOM MODELS - Filter through section relationship
@@ -1183,9 +972,6 @@ class SectionFilterMixin:
                 filtered = queryset.filter(
                     section__grade_level__education_level__in=allowed_education_levels
                 )
-                logger.info(
-                    f"✅ Filtered Classrooms: {filtered.count()} of {queryset.count()}"
-                )
                 return filtered
 
             # 🔥 FIX: TEACHER MODELS
@@ -1203,9 +989,6 @@ class SectionFilterMixin:
                     | Q(assigned_classes__in=allowed_classrooms)
                 ).distinct()
 
-                logger.info(
-                    f"✅ Filtered Teachers: {filtered.count()} of {queryset.count()}"
-                )
                 return filtered
 
             # 🔥 FIX: PARENT MODELS
@@ -1215,9 +998,6 @@ class SectionFilterMixin:
                     students__education_level__in=allowed_education_levels
                 ).distinct()
 
-                logger.info(
-                    f"✅ Filtered Parents: {filtered.count()} of {queryset.count()}"
-                )
                 return filtered
 
             # 🔥 FIX: MESSAGE MODELS
@@ -1243,9 +1023,6 @@ class SectionFilterMixin:
                     | Q(recipient_id__in=allowed_parents)
                 ).distinct()
 
-                logger.info(
-                    f"✅ Filtered Messages: {filtered.count()} of {queryset.count()}"
-                )
                 return filtered
 
             # ENROLLMENT MODELS
@@ -1256,7 +1033,10 @@ class SectionFilterMixin:
 
             # SUBJECT MODELS
             elif model_name == "Subject":
-                return queryset.filter(education_level__in=allowed_education_levels)
+                from subject.utils import filter_by_levels
+
+                # education_levels is a JSON list; "ALL" subjects suit everyone
+                return filter_by_levels(queryset, [*allowed_education_levels, "ALL"])
 
             # GRADE LEVEL MODELS
             elif model_name == "GradeLevel":
@@ -1403,16 +1183,4 @@ class AutoSectionFilterMixin(SectionFilterMixin):
             )
 
         # Apply section-based filtering
-        filtered_queryset = self.apply_section_filters(queryset)
-
-        user = self.request.user
-        role = self.get_user_role()
-        model_name = queryset.model.__name__
-
-        logger.info(
-            f"📊 get_queryset result for {model_name}: "
-            f"User={user.username}, Role={role}, "
-            f"Original={queryset.count()}, Filtered={filtered_queryset.count()}"
-        )
-
-        return filtered_queryset
+        return self.apply_section_filters(queryset)
@@ -0,0 +1,78 @@
+# utils/signals.py
+"""Drop cached AccessContexts when what they were resolved from changes"""
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from classroom.models import (
+    Classroom,
+    ClassroomTeacherAssignment,
+    GradeLevel,
+    Section,
+    StudentEnrollment,
+)
+from schoolSettings.models import UserRole
+from students.models import Student
+from teacher.models import Teacher
+
+from .access_context import invalidate_access_context
+
+
+def _invalidate_on_commit(user_id=None):
+    transaction.on_commit(lambda: invalidate_access_context(user_id))
+
+
+@receiver(post_save, sender=settings.AUTH_USER_MODEL)
+@receiver(post_delete, sender=settings.AUTH_USER_MODEL)
+def user_access_changed(sender, instance, **kwargs):
+    _invalidate_on_commit(instance.pk)
+
+
+@receiver(post_save, sender=UserRole)
+@receiver(post_delete, sender=UserRole)
+@receiver(post_save, sender=Teacher)
+@receiver(post_delete, sender=Teacher)
+@receiver(post_save, sender=Student)
+@receiver(post_delete, sender=Student)
+def profile_access_changed(sender, instance, **kwargs):
+    _invalidate_on_commit(instance.user_id)
+
+
+@receiver(post_save, sender=ClassroomTeacherAssignment)
+@receiver(post_delete, sender=ClassroomTeacherAssignment)
+def teacher_assignment_changed(sender, instance, **kwargs):
+    user_id = (
+        Teacher.objects.filter(pk=instance.teacher_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    if user_id:
+        _invalidate_on_commit(user_id)
+
+
+@receiver(post_save, sender=StudentEnrollment)
+@receiver(post_delete, sender=StudentEnrollment)
+def enrollment_changed(sender, instance, **kwargs):
+    user_id = (
+        Student.objects.filter(pk=instance.student_id)
+        .values_list("user_id", flat=True)
+        .first()
+    )
+    if user_id:
+        _invalidate_on_commit(user_id)
+
+
+@receiver(post_save, sender=Classroom)
+@receiver(post_delete, sender=Classroom)
+@receiver(post_save, sender=Section)
+@receiver(post_delete, sender=Section)
+@receiver(post_save, sender=GradeLevel)
+@receiver(post_delete, sender=GradeLevel)
+@receiver(m2m_changed, sender=Classroom.subject_teachers.through)
+@receiver(m2m_changed, sender=Classroom.students.through)
+def class_structure_changed(sender, **kwargs):
+    """Class teachers and section levels affect many users at once"""
+    if kwargs.get("action", "post_").startswith("post_"):
+        _invalidate_on_commit()
@@ -1,3 +1,464 @@
-from django.test import TestCase
+import csv
+import gzip
+import io
+import threading
+from datetime import datetime, time, timezone
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import RequestFactory, SimpleTestCase, TestCase, override_settings
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from parent.models import ParentProfile
+from students.models import Student
+from subject.models import Subject
+from users.models import CustomUser
+
+from .commit_batches import CommitBatch, CommitBatchScheduler
+from .exporting import CSVExport
+from .caching import cached_query, get_cache_metrics, make_key, reset_cache_metrics
+from .pagination import KeysetPagination
+from .schedule_conflicts import ConflictRules
+from .search import create_trigram_indexes, search
+from .section_filtering import SectionFilterMixin
+
+
+class AccessContextTest(TestCase):
+    """Role and section access are resolved once and cached until changed"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = CustomUser.objects.create_user(
+            email="primary.admin@example.com",
+            username="primary_admin",
+            first_name="Primary",
+            last_name="Admin",
+            role="primary_admin",
+            password="x",
+        )
+
+    def view(self):
+        request = RequestFactory().get("/")
+        request.user = CustomUser.objects.get(pk=self.user.pk)
+        view = SectionFilterMixin()
+        view.request = request
+        return view
+
+    def test_access_is_resolved_once(self):
+        view = self.view()
+        with self.assertNumQueries(1):
+            self.assertEqual(view.get_user_role(), "primary_admin")
+            self.assertEqual(view.get_user_education_level_access(), ["PRIMARY"])
+            view.get_user_section_access()
+            view.get_user_role()
+
+        other_request = self.view()
+        with self.assertNumQueries(0):
+            self.assertEqual(other_request.get_user_role(), "primary_admin")
+
+    def test_role_change_invalidates_cached_access(self):
+        self.assertEqual(self.view().get_user_role(), "primary_admin")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.role = "secondary_admin"
+            self.user.save()
+
+        view = self.view()
+        self.assertEqual(view.get_user_role(), "secondary_admin")
+        self.assertEqual(
+            view.get_user_education_level_access(),
+            ["JUNIOR_SECONDARY", "SENIOR_SECONDARY"],
+        )
+
+    def test_cache_key_follows_the_user(self):
+        self.assertEqual(self.view().get_user_role(), "primary_admin")
+
+        # The key changes with the role even before any invalidation runs
+        CustomUser.objects.filter(pk=self.user.pk).update(role="nursery_admin")
+        self.assertEqual(self.view().get_user_education_level_access(), ["NURSERY"])
+
+        # A new user reusing a deleted user's ID starts from scratch
+        pk = self.user.pk
+        self.user.delete()
+        self.user = CustomUser.objects.create_user(
+            pk=pk,
+            email="nursery.admin@example.com",
+            username="nursery_admin",
+            first_name="Nursery",
+            last_name="Admin",
+            role="nursery_admin",
+            password="x",
+        )
+        view = self.view()
+        with self.assertNumQueries(1):
+            self.assertEqual(view.get_user_role(), "nursery_admin")
+
+
+class CommitBatchTest(TestCase):
+    """Additions of one transaction run together, once, after it commits"""
+
+    class Batch(CommitBatch):
+        error_message = "Error running the test batch"
+        runs = []
+
+        def __init__(self):
+            super().__init__()
+            self.items = set()
+
+        def add(self, *items):
+            self.items.update(items)
+
+        def run(self):
+            if "boom" in self.items:
+                raise RuntimeError("boom")
+            self.runs.append(self.items)
+
+    def setUp(self):
+        self.Batch.runs = []
+        self.scheduler = CommitBatchScheduler(self.Batch)
+
+    def test_one_run_per_transaction(self):
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            # A batch opened in a rolled back savepoint goes with its callback
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                self.scheduler.add(3)
+                raise RuntimeError
+            for item in [1, 2, 1]:
+                self.scheduler.add(item)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(self.Batch.runs, [{1, 2}])
+
+        # The next transaction opens a new batch
+        with self.captureOnCommitCallbacks(execute=True):
+            self.scheduler.add(4)
+        self.assertEqual(self.Batch.runs, [{1, 2}, {4}])
+
+    def test_failures_are_logged(self):
+        with self.assertLogs("utils.tests", "ERROR") as logs:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.scheduler.add("boom")
+        self.assertIn("Error running the test batch: boom", logs.output[0])
+
+
+class CachedQueryTest(SimpleTestCase):
+    """Cache-aside with namespaced keys, stampede protection and metrics"""
+
+    def setUp(self):
+        cache.clear()
+        reset_cache_metrics()
+        self.calls = []
+
+        @cached_query("test_stats", timeout=60)
+        def class_stats(student_class, term="FIRST"):
+            self.calls.append((student_class, term))
+            return {"class": student_class, "term": term}
+
+        self.class_stats = class_stats
+
+    def test_hits_misses_and_invalidation(self):
+        self.assertEqual(self.class_stats("SS_1")["class"], "SS_1")
+        self.class_stats("SS_1")
+        self.class_stats("SS_1", term="SECOND")
+        self.assertEqual(len(self.calls), 2)
+
+        self.class_stats.invalidate("SS_1")
+        self.class_stats("SS_1")
+        self.assertEqual(len(self.calls), 3)
+
+        self.class_stats.invalidate_all()
+        self.class_stats("SS_1", term="SECOND")
+        self.assertEqual(len(self.calls), 4)
+
+        metrics = get_cache_metrics()["test_stats"]
+        self.assertEqual((metrics["hits"], metrics["misses"]), (1, 4))
+        self.assertEqual(metrics["hit_rate"], 0.2)
+
+    @override_settings(CACHE_STAMPEDE_WAIT=2)
+    def test_concurrent_miss_waits_for_the_lock_holder(self):
+        key = self.class_stats.make_key("SS_2")
+        cache.add(f"{key}:lock", 1, 30)
+
+        # Another worker finishes computing while we wait
+        timer = threading.Timer(0.2, lambda: cache.set(key, {"class": "cached"}))
+        timer.start()
+        self.addCleanup(timer.cancel)
+
+        self.assertEqual(self.class_stats("SS_2"), {"class": "cached"})
+        self.assertEqual(self.calls, [])
+        self.assertEqual(get_cache_metrics()["test_stats"]["waits"], 1)
+
+    def test_evicted_version_does_not_resurrect_old_entries(self):
+        self.class_stats("SS_1")
+        self.class_stats.invalidate_all()
+        self.class_stats("SS_1")
+        # A culling backend evicts the version key, not the entries
+        cache.delete("test_stats:version")
+        self.class_stats("SS_1")
+        self.assertEqual(len(self.calls), 3)
+
+    def test_long_keys_are_hashed(self):
+        key = make_key("test_stats", "x" * 500)
+        self.assertLess(len(key), 100)
+
+
+class KeysetPaginationTest(TestCase):
+    """Cursor pages are stable, complete and opt-in"""
+
+    class View:
+        cursor_ordering = ("-date_joined", "-id")
+
+    def setUp(self):
+        joined = [datetime(2024, 1, day // 3 + 1, tzinfo=timezone.utc) for day in range(8)]
+        for i, date_joined in enumerate(joined):
+            user = CustomUser.objects.create_user(
+                email=f"user{i}@example.com",
+                username=f"user{i}",
+                first_name="User",
+                last_name=str(i),
+                role="teacher",
+                password="x",
+            )
+            CustomUser.objects.filter(pk=user.pk).update(date_joined=date_joined)
+        self.expected = list(
+            CustomUser.objects.order_by("-date_joined", "-id").values_list("id", flat=True)
+        )
+
+    def paginate(self, url):
+        request = Request(APIRequestFactory().get(url))
+        paginator = KeysetPagination()
+        page = paginator.paginate_queryset(CustomUser.objects.all(), request, self.View())
+        if page is None:
+            return None, None
+        response = paginator.get_paginated_response([user.id for user in page])
+        return response.data, page
+
+    def test_unpaginated_unless_requested(self):
+        self.assertEqual(self.paginate("/users/"), (None, None))
+
+    def test_pages_forward_and_back(self):
+        data, _ = self.paginate("/users/?limit=3&count=exact")
+        self.assertEqual(data["count"], len(self.expected))
+        self.assertIsNone(data["previous"])
+
+        pages = [data]
+        while pages[-1]["next"]:
+            with self.assertNumQueries(1):
+                data, _ = self.paginate(pages[-1]["next"])
+            pages.append(data)
+        seen = [user_id for page in pages for user_id in page["results"]]
+        self.assertEqual(seen, self.expected)
+
+        data, _ = self.paginate(pages[-1]["previous"])
+        self.assertEqual(data["results"], pages[-2]["results"])
+
+    def test_estimated_count_and_invalid_cursor(self):
+        data, _ = self.paginate("/users/?limit=2&count=estimated")
+        # Only PostgreSQL has planner estimates; elsewhere the count is exact
+        expected = "estimated" if connection.vendor == "postgresql" else "exact"
+        self.assertEqual(data["count_type"], expected)
+        self.assertIsInstance(data["count"], int)
+
+        with self.assertRaises(NotFound):
+            self.paginate("/users/?cursor=not-a-cursor")
+
+
+class CSVExportTest(TestCase):
+    """Exports stream joined columns from one query, optionally gzipped"""
+
+    def setUp(self):
+        for i in range(5):
+            CustomUser.objects.create_user(
+                email=f"export{i}@example.com",
+                username=f"export{i}",
+                first_name="Export",
+                last_name=str(i),
+                role="teacher",
+                password="x",
+            )
+        self.export = CSVExport(
+            CustomUser.objects.filter(email__startswith="export").order_by("email"),
+            [
+                ("email", "email"),
+                ("name", "last_name", lambda value: f"No. {value}"),
+                ("joined", "date_joined__year"),
+            ],
+            "users.csv",
+            chunk_size=2,
+        )
+
+    def read(self, url):
+        request = RequestFactory().get(url)
+        with self.assertNumQueries(1):
+            response = self.export.response(request)
+            content = b"".join(response.streaming_content)
+        return response, content
+
+    def test_plain_and_gzip(self):
+        response, content = self.read("/export/")
+        self.assertEqual(response["Content-Type"], "text/csv")
+        rows = list(csv.reader(io.StringIO(content.decode())))
+        self.assertEqual(rows[0], ["email", "name", "joined"])
+        self.assertEqual(rows[1][:2], ["export0@example.com", "No. 0"])
+        self.assertEqual(len(rows), 6)
+
+        response, compressed = self.read("/export/?compress=gzip")
+        self.assertIn('filename="users.csv.gz"', response["Content-Disposition"])
+        self.assertEqual(gzip.decompress(compressed), content)
+
+
+class ScheduleConflictTest(SimpleTestCase):
+    """The sweep finds exactly the overlapping pairs of each day and resource"""
+
+    rules = ConflictRules(
+        "day", {"teacher": "teacher_id", "room": "room_id"}, active={"active": True}
+    )
+
+    def entry(self, pk, day, start, end, teacher_id, room_id, active=True):
+        return SimpleNamespace(
+            pk=pk,
+            day=day,
+            start_time=time(start),
+            end_time=time(end),
+            teacher_id=teacher_id,
+            room_id=room_id,
+            active=active,
+        )
+
+    def pairs(self, entries):
+        return sorted(
+            (resource, first.pk, second.pk)
+            for resource, first, second in self.rules.find(entries)
+        )
+
+    def test_overlaps_per_day_and_resource(self):
+        entries = [
+            self.entry(1, "MON", 8, 10, teacher_id=1, room_id=1),
+            self.entry(2, "MON", 9, 11, teacher_id=1, room_id=2),
+            self.entry(3, "MON", 10, 12, teacher_id=1, room_id=1),  # starts as 1 ends
+            self.entry(4, "MON", 8, 12, teacher_id=2, room_id=2),
+            self.entry(5, "TUE", 8, 12, teacher_id=1, room_id=1),
+            self.entry(6, "MON", 8, 12, teacher_id=1, room_id=3, active=False),
+        ]
+        self.assertEqual(
+            self.pairs(entries),
+            [("room", 4, 2), ("teacher", 1, 2), ("teacher", 2, 3)],
+        )
+
+    def test_matches_pairwise_comparison(self):
+        entries = [
+            self.entry(i, "MON", i % 7, i % 7 + 1 + i % 3, i % 4, i % 5)
+            for i in range(60)
+        ]
+        expected = sorted(
+            (resource, a.pk, b.pk)
+            for resource, field in self.rules.resources.items()
+            for i, a in enumerate(entries)
+            for b in entries[i + 1 :]
+            if getattr(a, field) == getattr(b, field)
+            and a.start_time < b.end_time
+            and a.end_time > b.start_time
+        )
+        found = sorted(
+            (resource, *sorted((a, b)))
+            for resource, a, b in self.pairs(entries)
+        )
+        self.assertEqual(found, expected)
+
+
+class UnifiedSearchTest(TestCase):
+    """Type-ahead search ranks across entities within the user's sections"""
+
+    @classmethod
+    def setUpTestData(cls):
+        def user(username, first_name, last_name, role, **fields):
+            return CustomUser.objects.create_user(
+                email=f"{username}@search.com",
+                username=username,
+                first_name=first_name,
+                last_name=last_name,
+                role=role,
+                password="x",
+                is_active=True,
+                **fields,
+            )
+
+        cls.admin = user("searchadmin", "Search", "Admin", "admin")
+        cls.primary_admin = user("searchprimary", "Section", "Head", "primary_admin")
+        for username, first_name, last_name, level, student_class in [
+            ("adaobi", "Ada", "Obi", "PRIMARY", "PRIMARY_1"),
+            ("kemiada", "Kemi", "Badamosi", "JUNIOR_SECONDARY", "JSS_1"),
+        ]:
+            Student.objects.create(
+                user=user(username, first_name, last_name, "student"),
+                gender="F",
+                date_of_birth=datetime(2015, 1, 1).date(),
+                student_class=student_class,
+                education_level=level,
+            )
+        ParentProfile.objects.create(user=user("bisi", "Bisi", "Oladapo", "parent"))
+        Subject.objects.create(
+            name="Yoruba Adage Studies", code="YAS", education_levels=["PRIMARY"]
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def get(self, user, **params):
+        client = APIClient(HTTP_HOST="localhost")
+        client.force_authenticate(user)
+        return client.get("/api/search/", params)
+
+    def test_ranked_across_entities(self):
+        response = self.get(self.admin, q="ada")
+        self.assertEqual(response.status_code, 200)
+        results = [(r["type"], r["title"]) for r in response.data["results"]]
+        # The only prefix match ranks above the matches further in, with
+        # or without pg_trgm
+        self.assertEqual(results[0], ("student", "Ada Obi"))
+        ranks = [r["rank"] for r in response.data["results"]]
+        self.assertGreater(ranks[0], max(ranks[1:]))
+        self.assertCountEqual(
+            results[1:],
+            [
+                ("student", "Kemi Badamosi"),
+                ("parent", "Bisi Oladapo"),
+                ("subject", "Yoruba Adage Studies"),
+            ],
+        )
+
+        response = self.get(self.admin, q="ada obi", types="student")
+        self.assertEqual(
+            [r["title"] for r in response.data["results"]], ["Ada Obi"]
+        )
+        self.assertEqual(self.get(self.admin, q="ada", types="x").status_code, 400)
+
+    def test_section_access(self):
+        response = self.get(self.primary_admin, q="ada", types="student,subject")
+        self.assertCountEqual(
+            [r["title"] for r in response.data["results"]],
+            ["Ada Obi", "Yoruba Adage Studies"],
+        )
+
+    def test_section_access_without_json_containment(self):
+        # SQLite can't run jsonb containment; the subject rule falls back
+        with mock.patch.object(
+            connection.features, "supports_json_field_contains", False
+        ):
+            self.test_section_access()
+
+    def test_search_helper(self):
+        # Words may match different fields; every word has to match
+        self.assertEqual(
+            list(
+                search(
+                    CustomUser.objects.all(), ["first_name", "last_name"], "obi ada"
+                ).values_list("username", flat=True)
+            ),
+            ["adaobi"],
+        )
+        # No pg_trgm on the test database: indexing is skipped
+        self.assertEqual(create_trigram_indexes(), 0)
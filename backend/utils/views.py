@@ -1,6 +1,17 @@
 from utils.email import send_email_via_brevo
-from utils.section_filtering import AutoSectionFilterMixin
+from utils.section_filtering import AutoSectionFilterMixin, SectionFilterMixin
+from utils.search import (
+    DEFAULT_LIMIT,
+    MAX_LIMIT,
+    SEARCH_ENTITIES,
+    SEARCH_MIN_LENGTH,
+    search_entities,
+)
 from django.http import JsonResponse
+from rest_framework import status
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
 
 def test_email_view(request):
@@ -11,3 +22,42 @@ def test_email_view(request):
     status_code, response_text = send_email_via_brevo(subject, html_content, to_email)
 
     return JsonResponse({"status_code": status_code, "response": response_text})
+
+
+class UnifiedSearchView(SectionFilterMixin, APIView):
+    """
+    Type-ahead search across students, teachers, parents and subjects.
+
+    GET /api/search/?q=<term>[&types=student,subject][&limit=10]
+
+    Results are ranked across the entities, best first, and limited to what
+    the user's section access lets them see.
+    """
+
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        term = request.query_params.get("q", "").strip()
+        if len(term) < SEARCH_MIN_LENGTH:
+            return Response({"query": term, "results": []})
+
+        types = [
+            kind for kind in request.query_params.get("types", "").split(",") if kind
+        ]
+        unknown = set(types) - SEARCH_ENTITIES.keys()
+        if unknown:
+            return Response(
+                {"error": f"Unknown search types: {', '.join(sorted(unknown))}"},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        try:
+            limit = int(request.query_params.get("limit", DEFAULT_LIMIT))
+        except ValueError:
+            limit = DEFAULT_LIMIT
+        limit = max(1, min(limit, MAX_LIMIT))
+
+        results = search_entities(
+            term, types or None, limit, restrict=self.apply_section_filters
+        )
+        return Response({"query": term, "results": results})